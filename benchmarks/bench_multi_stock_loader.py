@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多股票加载基准测试
+
+使用注入延迟的本地模拟数据源，对比逐只串行获取与
+DataManager.get_multiple_stocks 并发加载的耗时。
+
+使用方法:
+python benchmarks/bench_multi_stock_loader.py --symbols 200 --latency 0.05 --workers 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.data_manager import DataManager
+
+class FakeProvider:
+    """模拟Tushare接口：每次调用固定延迟后返回随机日线数据"""
+
+    def __init__(self, latency: float, days: int = 250):
+        self.latency = latency
+        self.dates = pd.bdate_range('2023-01-02', periods=days).strftime('%Y%m%d')
+        self.calls = 0
+
+    def daily(self, ts_code=None, start_date=None, end_date=None, trade_date=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        close = 10 + np.random.randn(len(self.dates)).cumsum() * 0.1
+        return pd.DataFrame({
+            'ts_code': ts_code,
+            'trade_date': self.dates,
+            'open': close,
+            'high': close + 0.1,
+            'low': close - 0.1,
+            'close': close,
+            'vol': 1e5,
+            'amount': 1e6
+        })
+
+def main():
+    parser = argparse.ArgumentParser(description='多股票加载基准测试')
+    parser.add_argument('--symbols', type=int, default=200, help='股票数量')
+    parser.add_argument('--latency', type=float, default=0.05, help='单次调用延迟（秒）')
+    parser.add_argument('--workers', type=int, default=8, help='线程池大小')
+    parser.add_argument('--rate-limit', type=float, default=60000, help='每分钟调用上限')
+    args = parser.parse_args()
+
+    symbols = [f"{i:06d}.SZ" for i in range(1, args.symbols + 1)]
+
+    def make_manager() -> DataManager:
+        # 每次测量使用新的实例并关闭进程内缓存，避免第二次测量只计时缓存命中
+        data_manager = DataManager({
+            'cache_enabled': False,
+            'data_sources': {'tushare': {'rate_limit': args.rate_limit}},
+            'performance': {'parallel': {'max_workers': args.workers}}
+        })
+        data_manager.pro = FakeProvider(args.latency)
+        return data_manager
+
+    data_manager = make_manager()
+    start = time.perf_counter()
+    serial = [data_manager.get_daily_data(code, '20230101', '20231231') for code in symbols]
+    serial_time = time.perf_counter() - start
+
+    data_manager = make_manager()
+    start = time.perf_counter()
+    panel = data_manager.get_multiple_stocks(symbols, '20230101', '20231231')
+    concurrent_time = time.perf_counter() - start
+    assert data_manager.pro.calls == len(symbols)
+
+    print(f"股票数量: {args.symbols}, 单次延迟: {args.latency * 1000:.0f}ms, 线程数: {args.workers}")
+    print(f"串行获取:   {serial_time:8.2f}s ({sum(len(d) for d in serial)} 行)")
+    print(f"并发加载:   {concurrent_time:8.2f}s ({len(panel)} 行)")
+    print(f"加速比:     {serial_time / concurrent_time:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准测试
+
+在全新的解释器中用 python -X importtime 测量以下场景的导入耗时和总耗时：
+- 单独创建 FactorEngine()
+- 创建 RestAPI()
+- 创建 DataManager() 并首次访问数据源客户端（即延迟导入tushare的开销）
+
+与“导入tushare/akshare”的基线对比，即可得到延迟加载节省的冷启动时间。
+
+使用方法:
+python benchmarks/bench_startup.py --repeat 5
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    'FactorEngine()': 'from src.factor.factor_engine import FactorEngine; FactorEngine()',
+    'RestAPI()': 'from src.api.rest_api import RestAPI; RestAPI()',
+    'DataManager()': 'from src.data.data_manager import DataManager; DataManager()',
+    'DataManager().pro': 'from src.data.data_manager import DataManager; DataManager().pro',
+    '基线: import tushare, akshare': 'import tushare, akshare',
+}
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+def measure(code: str):
+    """
+    运行一次并解析 -X importtime 输出
+
+    Returns:
+        (顶层模块累计导入耗时ms, 最慢的顶层模块列表)，运行失败返回None
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+
+    top_level = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # 缩进为1个空格的是顶层导入，其累计耗时包含全部子模块
+        if match and len(match.group(3)) == 1:
+            top_level.append((int(match.group(2)) / 1000, match.group(4)))
+    total = sum(cumulative for cumulative, _ in top_level)
+    return total, sorted(top_level, reverse=True)[:3]
+
+def main():
+    parser = argparse.ArgumentParser(description='启动耗时基准测试')
+    parser.add_argument('--repeat', type=int, default=5, help='每个场景重复次数，取中位数')
+    args = parser.parse_args()
+
+    print(f"{'场景':<32}{'导入耗时中位数(ms)':>20}  最慢的顶层导入")
+    for name, code in SCENARIOS.items():
+        runs = [measure(code) for _ in range(args.repeat)]
+        if any(run is None for run in runs):
+            print(f"{name:<32}{'运行失败':>20}")
+            continue
+        median = statistics.median(total for total, _ in runs)
+        slowest = ', '.join(f"{module} {ms:.0f}ms" for ms, module in runs[-1][1])
+        print(f"{name:<32}{median:>20.1f}  {slowest}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地存储格式基准测试
+
+生成 股票数 × 交易日 的日线长表，对比CSV与Parquet的
+写入耗时、磁盘占用、全量加载和单列加载耗时。
+
+使用方法:
+python benchmarks/bench_storage.py                        # 5000只股票 × 10年
+python benchmarks/bench_storage.py --symbols 500 --years 2
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.storage import CsvStorage, ParquetStorage
+
+def make_panel(n_symbols: int, n_days: int) -> pd.DataFrame:
+    """生成以trade_date为索引的日线长表"""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2014-01-02', periods=n_days, name='trade_date')
+    symbols = [f"{i:06d}.SZ" for i in range(1, n_symbols + 1)]
+
+    close = 10 * np.exp(rng.normal(0, 0.02, (n_days, n_symbols)).cumsum(axis=0))
+    close = close.ravel()
+    return pd.DataFrame({
+        'ts_code': np.tile(symbols, n_days),
+        'open': close * (1 + rng.normal(0, 0.005, close.size)),
+        'high': close * 1.01,
+        'low': close * 0.99,
+        'close': close,
+        'pre_close': close * 0.998,
+        'vol': rng.integers(1_000, 1_000_000, close.size).astype('float64'),
+        'amount': close * 1e5
+    }, index=dates.repeat(n_symbols))
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='本地存储格式基准测试')
+    parser.add_argument('--symbols', type=int, default=5000, help='股票数量')
+    parser.add_argument('--years', type=int, default=10, help='年数（每年250个交易日）')
+    args = parser.parse_args()
+
+    panel = make_panel(args.symbols, args.years * 250)
+    print(f"面板规模: {args.symbols} 只股票 × {args.years} 年 = {len(panel):,} 行, "
+          f"内存 {panel.memory_usage(deep=True).sum() / 1024 ** 2:,.0f} MB")
+    print(f"{'格式':<10}{'写入(s)':>10}{'磁盘(MB)':>12}{'全量加载(s)':>14}{'加载close(s)':>14}{'类型一致':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for storage in (CsvStorage(tmp_dir), ParquetStorage(tmp_dir)):
+            _, write_time = timed(storage.save, panel, 'panel')
+            size = storage.path('panel').stat().st_size / 1024 ** 2
+            loaded, load_time = timed(storage.load, 'panel')
+            _, close_time = timed(storage.load, 'panel', columns=['close'])
+            same_dtypes = loaded.dtypes.equals(panel.dtypes) and isinstance(loaded.index, pd.DatetimeIndex)
+            name = storage.suffix.lstrip('.')
+            print(f"{name:<10}{write_time:>10.2f}{size:>12.1f}{load_time:>14.2f}{close_time:>14.2f}{str(same_dtypes):>10}")
+            del loaded
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,11 @@ import os
 # 添加项目根目录到路径
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__))))
 
+from src.data.data_manager import DataManager
+from src.data.preloader import Preloader
+from src.data.realtime import QuoteService
+from src.utils.config_manager import ConfigManager
+
 # 页面配置
 st.set_page_config(
     page_title="量化股票选股系统",
@@ -62,9 +67,33 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_data_manager():
+    """进程内只创建一次的数据管理器，预加载器和各页面共用其缓存"""
+    return DataManager(ConfigManager().config)
+
+@st.cache_resource
+def get_preloader():
+    """进程内只创建一次的后台预加载器，未启用预加载时返回None"""
+    config = ConfigManager().config
+    if not Preloader.enabled(config):
+        return None
+    return Preloader.from_config(get_data_manager(), config).start()
+
+@st.cache_resource
+def get_quote_service():
+    """进程内只创建一次的实时行情服务，首次打开实时行情页面时开始轮询，未启用实时行情时返回None"""
+    config = ConfigManager().config
+    if not QuoteService.enabled(config):
+        return None
+    return QuoteService.from_config(config).start()
+
 def main():
     """主函数"""
     
+    # 启动后台缓存预热
+    get_preloader()
+    
     # 标题
     st.markdown('<h1 class="main-header">📊 量化股票选股系统</h1>', unsafe_allow_html=True)
     
@@ -135,16 +164,26 @@ def show_realtime_market():
     # 热门股票
     st.subheader("🔥 热门股票")
     
-    # 模拟热门股票数据
-    hot_stocks = pd.DataFrame({
-        '股票代码': ['000001.SZ', '000002.SZ', '000858.SZ', '600519.SH', '601318.SH'],
-        '股票名称': ['平安银行', '万科A', '五粮液', '贵州茅台', '中国平安'],
-        '最新价': [15.68, 25.32, 178.45, 1680.00, 45.67],
-        '涨跌幅': ['+2.1%', '+1.8%', '+3.2%', '+0.5%', '+1.2%'],
-        '成交量': ['1.2亿', '8900万', '5600万', '120万', '2.1亿']
-    })
+    quote_service = get_quote_service()
+    if quote_service is None:
+        st.info("未启用实时行情")
+        return
     
+    quotes = quote_service.latest(['price', 'pct_chg', 'vol', 'amount'])
+    
+    if quotes.empty:
+        st.info("正在获取全市场实时行情...")
+        return
+    
+    # 按成交额取前20只
+    hot_stocks = quotes.dropna(subset=['amount']).nlargest(20, 'amount').reset_index()
+    hot_stocks.columns = ['股票代码', '最新价', '涨跌幅(%)', '成交量(手)', '成交额(千元)']
     st.dataframe(hot_stocks, use_container_width=True)
+    
+    # 日内走势（最近的快照）
+    symbol = st.selectbox("日内走势", hot_stocks['股票代码'])
+    window = quote_service.window([symbol], 'price', quote_service.capacity)
+    st.line_chart(window[symbol])
 
 def show_backtest():
     """策略回测页面"""
@@ -259,6 +298,22 @@ def show_factor_analysis():
     })
     
     st.dataframe(ic_data, use_container_width=True)
+    
+    # 预加载股票的最新因子值（读取预热后的缓存）
+    st.subheader("📋 最新因子值")
+    
+    preloader = get_preloader()
+    if preloader is None or not preloader.factors:
+        st.info("未配置预加载因子")
+    elif not preloader.ready:
+        st.warning("因子预加载中，请稍候")
+    else:
+        factor_values = get_data_manager().get_factor_values(preloader.stocks, preloader.factors)
+        if factor_values.empty:
+            st.error("没有可用的因子数据")
+        else:
+            latest = factor_values.groupby(level='ts_code').tail(1).reset_index()
+            st.dataframe(latest, use_container_width=True)
 
 def show_stock_selection():
     """选股结果页面"""
@@ -365,6 +420,22 @@ def show_system_config():
     
     st.json(data_sources)
     
+    # 缓存预热进度
+    st.subheader("🔥 数据预加载")
+    
+    preloader = get_preloader()
+    if preloader is None:
+        st.info("未启用预加载")
+    else:
+        status = preloader.status()
+        st.progress(status['progress'], text=f"{status['completed']}/{status['total']}")
+        if status['ready']:
+            st.success("✅ 预加载完成")
+        else:
+            st.warning(f"预加载中: {status['current']}")
+        if status['failed']:
+            st.error(f"加载失败: {', '.join(status['failed'])}")
+    
     # 日志查看
     st.subheader("📝 系统日志")
     
@@ -20,20 +20,12 @@
 - Web可视化界面
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "QuantStock Team"
 __email__ = "quantstock@example.com"
 
-# 导入核心模块
-from . import api
-from . import backtest
-from . import data
-from . import factor
-from . import models
-from . import risk
-from . import strategy
-from . import utils
-
 # 定义公共API
 __all__ = [
     'api',
@@ -44,4 +36,15 @@ __all__ = [
     'risk',
     'strategy',
     'utils'
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    """首次访问时导入子模块，避免导入src即加载全部依赖"""
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -8,14 +8,19 @@ API模块 - 量化股票选股系统API接口
 4. 选股结果推送
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "QuantStock Team"
 
-from .rest_api import RestAPI
-from .websocket_api import WebSocketAPI
-from .data_api import DataAPI
-from .backtest_api import BacktestAPI
-from .factor_api import FactorAPI
+# 名称 -> 所在模块，按需导入
+_LAZY_IMPORTS = {
+    'RestAPI': '.rest_api',
+    'WebSocketAPI': '.websocket_api',
+    'DataAPI': '.data_api',
+    'BacktestAPI': '.backtest_api',
+    'FactorAPI': '.factor_api'
+}
 
 __all__ = [
     'RestAPI',
@@ -23,4 +28,16 @@ __all__ = [
     'DataAPI',
     'BacktestAPI',
     'FactorAPI'
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    """首次访问时导入对应模块，避免导入包时加载全部依赖"""
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
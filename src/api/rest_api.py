@@ -19,8 +19,13 @@ from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 
 from ..data.data_manager import DataManager
+from ..data.fundamentals import FUNDAMENTAL_FACTORS
+from ..data.preloader import Preloader
+from ..data.realtime import QuoteService
 from ..backtest.backtest_engine import BacktestEngine, SimpleMovingAverageStrategy
-from ..factor.factor_engine import FactorEngine
+from ..factor.factor_engine import FactorEngine, MACDFactor, RSIFactor
+from ..utils.config_manager import ConfigManager
+from ..utils.single_flight import SingleFlight
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -38,6 +43,10 @@ class APIResponse:
         if self.timestamp is None:
             self.timestamp = datetime.now().isoformat()
 
+def to_records(data: pd.DataFrame) -> List[Dict[str, Any]]:
+    """DataFrame转为记录列表，NaN转为None（JSON不支持NaN）"""
+    return data.astype(object).where(data.notna(), None).to_dict('records')
+
 class RestAPI:
     """RESTful API服务"""
     
@@ -46,9 +55,24 @@ class RestAPI:
         self.app = Flask(__name__)
         CORS(self.app)
         
-        # 初始化组件
-        self.data_manager = DataManager(self.config.get('data', {}))
+        # 初始化组件（DataManager读取performance.cache、data_sources、database等顶层配置）
+        self.data_manager = DataManager(self.config)
         self.factor_engine = FactorEngine(self.config.get('factor', {}))
+        for factor in [RSIFactor(), MACDFactor()]:
+            self.factor_engine.register_factor(factor)
+        
+        # 合并同一接口、同一股票和区间的并发请求
+        self.single_flight = SingleFlight()
+        
+        # 后台预热配置的股票和因子，预热期间的相同请求等待进行中的加载
+        self.preloader: Optional[Preloader] = None
+        if Preloader.enabled(self.config):
+            self.preloader = Preloader.from_config(self.data_manager, self.config).start()
+        
+        # 实时行情：后台轮询全市场快照
+        self.quote_service: Optional[QuoteService] = None
+        if QuoteService.enabled(self.config):
+            self.quote_service = QuoteService.from_config(self.config).start()
         
         # 注册路由
         self._register_routes()
@@ -64,6 +88,30 @@ class RestAPI:
                 message="服务运行正常"
             ).__dict__)
         
+        @self.app.route('/ready', methods=['GET'])
+        def readiness_check():
+            """就绪检查，预加载完成前返回503和进度"""
+            if self.preloader is None:
+                return jsonify(APIResponse(
+                    success=True,
+                    data={'state': 'disabled', 'ready': True},
+                    message="未启用预加载"
+                ).__dict__)
+            
+            status = self.preloader.status()
+            if not status['ready']:
+                return jsonify(APIResponse(
+                    success=False,
+                    data=status,
+                    message=f"预加载中: {status['completed']}/{status['total']}"
+                ).__dict__), 503
+            
+            return jsonify(APIResponse(
+                success=True,
+                data=status,
+                message="预加载完成"
+            ).__dict__)
+        
         @self.app.route('/api/stocks', methods=['GET'])
         def get_stocks():
             """获取股票列表"""
@@ -87,12 +135,15 @@ class RestAPI:
                 start_date = request.args.get('start_date')
                 end_date = request.args.get('end_date')
                 
-                if not start_date:
-                    start_date = (datetime.now() - timedelta(days=365)).strftime('%Y%m%d')
                 if not end_date:
                     end_date = datetime.now().strftime('%Y%m%d')
+                if not start_date:
+                    start_date = self.data_manager.trading_days_back(end_date, 252)
                 
-                data = self.data_manager.get_daily_data(symbol, start_date, end_date)
+                data = self.single_flight.do(
+                    ('stock_data', symbol, start_date, end_date),
+                    lambda: self.data_manager.get_daily_data(symbol, start_date, end_date)
+                )
                 
                 return jsonify(APIResponse(
                     success=True,
@@ -106,6 +157,58 @@ class RestAPI:
                     message=str(e)
                 ).__dict__), 500
         
+        @self.app.route('/api/quotes', methods=['GET'])
+        def get_quotes():
+            """最新全市场实时行情截面，可用symbols参数（逗号分隔）筛选"""
+            if self.quote_service is None:
+                return jsonify(APIResponse(
+                    success=False,
+                    message="未启用实时行情"
+                ).__dict__), 503
+            
+            quotes = self.quote_service.latest()
+            symbols = request.args.get('symbols')
+            if symbols:
+                quotes = quotes.reindex([s for s in symbols.split(',') if s in quotes.index])
+            
+            return jsonify(APIResponse(
+                success=True,
+                data=to_records(quotes.reset_index())
+            ).__dict__)
+        
+        @self.app.route('/api/quotes/<symbol>/window', methods=['GET'])
+        def get_quote_window(symbol: str):
+            """股票最近n次快照的日内窗口"""
+            if self.quote_service is None:
+                return jsonify(APIResponse(
+                    success=False,
+                    message="未启用实时行情"
+                ).__dict__), 503
+            
+            try:
+                n = int(request.args.get('n', 20))
+                if n <= 0:
+                    raise ValueError(n)
+            except ValueError:
+                return jsonify(APIResponse(
+                    success=False,
+                    message="快照数n必须为正整数"
+                ).__dict__), 400
+            
+            try:
+                field = request.args.get('field', 'price')
+                window = self.quote_service.window([symbol], field, n)
+                return jsonify(APIResponse(
+                    success=True,
+                    data=[{'time': t.isoformat(), field: None if pd.isna(v) else v}
+                          for t, v in window[symbol].items()]
+                ).__dict__)
+            except KeyError as e:
+                return jsonify(APIResponse(
+                    success=False,
+                    message=str(e)
+                ).__dict__), 404
+        
         @self.app.route('/api/factors', methods=['GET'])
         def get_factors():
             """获取因子列表"""
@@ -113,6 +216,7 @@ class RestAPI:
                 {'name': 'pe_ratio', 'description': '市盈率'},
                 {'name': 'pb_ratio', 'description': '市净率'},
                 {'name': 'roe', 'description': '净资产收益率'},
+                {'name': 'net_profit_growth', 'description': '净利润增长率'},
                 {'name': 'rsi', 'description': '相对强弱指标'},
                 {'name': 'macd', 'description': 'MACD指标'}
             ]
@@ -136,15 +240,39 @@ class RestAPI:
                         message="股票代码不能为空"
                     ).__dict__), 400
                 
-                # 获取数据
-                data = self.data_manager.get_multiple_stocks(symbols)
+                unknown = [name for name in factors
+                           if name not in FUNDAMENTAL_FACTORS and name not in self.factor_engine.factors]
+                if not factors or unknown:
+                    return jsonify(APIResponse(
+                        success=False,
+                        message=f"不支持的因子: {unknown}" if unknown else "因子不能为空"
+                    ).__dict__), 400
+                
+                frames = []
+                
+                # 财务因子（与预加载共用缓存，预热中的相同请求等待其结果）
+                fundamental = [name for name in factors if name in FUNDAMENTAL_FACTORS]
+                if fundamental:
+                    frames.append(self.data_manager.get_factor_values(symbols, fundamental))
                 
-                # 计算因子
-                factor_data = self.factor_engine.calculate_factors(data, factors)
+                # 技术因子由因子引擎按股票计算
+                technical = [name for name in factors if name in self.factor_engine.factors]
+                if technical:
+                    data = self.single_flight.do(
+                        ('backtest_data', tuple(sorted(set(symbols)))),
+                        lambda: self.data_manager.get_multiple_stocks(symbols)
+                    )
+                    if not data.empty:
+                        frames.append(self.data_manager.restore_dates(
+                            self.factor_engine.calculate_factors(data, technical)
+                        ))
+                
+                frames = [frame for frame in frames if not frame.empty]
+                factor_data = pd.concat(frames, axis=1).reset_index() if frames else pd.DataFrame()
                 
                 return jsonify(APIResponse(
                     success=True,
-                    data=factor_data.to_dict('records')
+                    data=to_records(factor_data)
                 ).__dict__)
                 
             except Exception as e:
@@ -170,7 +298,10 @@ class RestAPI:
                     ).__dict__), 400
                 
                 # 获取历史数据
-                data = self.data_manager.get_multiple_stocks(symbols)
+                data = self.single_flight.do(
+                    ('backtest_data', tuple(sorted(set(symbols)))),
+                    lambda: self.data_manager.get_multiple_stocks(symbols)
+                )
                 
                 # 创建回测引擎
                 engine = BacktestEngine({
@@ -187,7 +318,7 @@ class RestAPI:
                         message=f"不支持的策略类型: {strategy_type}"
                     ).__dict__), 400
                 
-                engine.set_data(data)
+                engine.set_data(self.data_manager.restore_dates(data))
                 engine.set_strategy(strategy)
                 
                 # 运行回测
@@ -234,6 +365,13 @@ class RestAPI:
         """应用筛选条件"""
         filtered = stocks.copy()
         
+        # 股票池筛选：按位图索引中最新交易日的成员
+        universe = self.data_manager.universe
+        if filters.get('in_universe') and len(universe.dates):
+            criteria = filters.get('universe_criteria')
+            mask = universe.mask(universe.dates[-1], criteria, symbols=filtered['ts_code'].astype(str).tolist())
+            filtered = filtered[mask]
+        
         # 市值筛选
         if 'min_market_cap' in filters:
             filtered = filtered[filtered['market_cap'] >= filters['min_market_cap']]
@@ -264,5 +402,5 @@ class RestAPI:
         self.app.run(host=host, port=port, debug=debug)
 
 if __name__ == "__main__":
-    api = RestAPI()
+    api = RestAPI(ConfigManager().config)
     api.run(debug=True)
\ No newline at end of file
@@ -10,14 +10,31 @@
 - 结果可视化
 """
 
-from .backtest_engine import BacktestEngine
-from .portfolio import Portfolio
-from .performance import PerformanceAnalyzer
-from .risk_manager import RiskManager
+import importlib
+
+# 名称 -> 所在模块，按需导入
+_LAZY_IMPORTS = {
+    'BacktestEngine': '.backtest_engine',
+    'Portfolio': '.portfolio',
+    'PerformanceAnalyzer': '.performance',
+    'RiskManager': '.risk_manager'
+}
 
 __all__ = [
     'BacktestEngine',
     'Portfolio',
     'PerformanceAnalyzer',
     'RiskManager'
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    """首次访问时导入对应模块，避免导入包时加载全部依赖"""
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
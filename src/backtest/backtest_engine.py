@@ -12,6 +12,7 @@ from abc import ABC, abstractmethod
 from .portfolio import Portfolio
 from .performance import PerformanceAnalyzer
 from .risk_manager import RiskManager
+from ..data.snapshot import DatasetSnapshot, ResultCache
 
 class Strategy(ABC):
     """策略基类"""
@@ -59,11 +60,32 @@ class BacktestEngine:
         self.strategy = None
         self.results = None
         
+        # 数据来自快照时，回测结果按 (快照id, 参数) 持久化复用
+        self.snapshot: Optional[DatasetSnapshot] = None
+        self.snapshot_query: Dict = {}
+        cache_dir = self.config.get('result_cache_dir')
+        self.result_cache = ResultCache(cache_dir) if cache_dir else None
+        
     def set_data(self, data: pd.DataFrame):
         """设置回测数据"""
         self.data = data.copy()
+        self.snapshot = None
         self.logger.info(f"设置回测数据: {len(data)} 条记录")
     
+    def set_snapshot(self,
+                     snapshot: DatasetSnapshot,
+                     start_date: str = None,
+                     end_date: str = None,
+                     symbols: Optional[List[str]] = None):
+        """从数据集快照读取回测数据，结果可按快照缓存"""
+        self.set_data(snapshot.query(start_date, end_date, symbols))
+        self.snapshot = snapshot
+        self.snapshot_query = {
+            'start_date': start_date,
+            'end_date': end_date,
+            'symbols': sorted(symbols) if symbols is not None else None
+        }
+    
     def set_strategy(self, strategy: Strategy):
         """设置策略"""
         self.strategy = strategy
@@ -76,6 +98,20 @@ class BacktestEngine:
         if self.strategy is None:
             raise ValueError("请先设置策略")
         
+        key = None
+        if self.snapshot is not None and self.result_cache is not None:
+            key = self.snapshot.cache_key('backtest', {
+                'query': self.snapshot_query,
+                'strategy': self.strategy.__class__.__name__,
+                'parameters': self.strategy.get_parameters(),
+                'config': {k: v for k, v in self.config.items() if k != 'result_cache_dir'}
+            })
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                self.logger.info(f"复用快照{self.snapshot.snapshot_id}的回测结果: {key[:12]}")
+                self.results = cached
+                return self.results
+        
         self.logger.info("开始回测...")
         
         # 生成交易信号
@@ -86,6 +122,8 @@ class BacktestEngine:
         
         # 分析结果
         self.results = self.performance_analyzer.analyze(results)
+        if key is not None:
+            self.result_cache.set(key, self.results)
         
         self.logger.info("回测完成")
         return self.results
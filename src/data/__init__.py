@@ -10,14 +10,65 @@
 - 数据质量检查
 """
 
-from .data_manager import DataManager
-from .market_data import MarketData
-from .stock_data import StockData
-from .fundamental_data import FundamentalData
+import importlib
+
+# 名称 -> 所在模块，按需导入
+_LAZY_IMPORTS = {
+    'DataManager': '.data_manager',
+    'MarketData': '.market_data',
+    'StockData': '.stock_data',
+    'FundamentalData': '.fundamental_data',
+    'CacheManifest': '.cache_manifest',
+    'PanelStore': '.panel_store',
+    'MarketDataStore': '.sql_store',
+    'SQLiteStore': '.sql_store',
+    'PointInTimeFundamentals': '.fundamentals',
+    'adjust_prices': '.adjustment',
+    'TradingCalendar': '.trading_calendar',
+    'compact_frame': '.compact',
+    'CrossSectionStream': '.cross_section_stream',
+    'PartitionedStore': '.partitioned_store',
+    'AsyncFetcher': '.async_fetcher',
+    'SourceRouter': '.source_router',
+    'Preloader': '.preloader',
+    'DatasetSnapshot': '.snapshot',
+    'UniverseIndex': '.universe',
+    'QuoteService': '.realtime',
+    'MinuteBarStore': '.minute_bars'
+}
 
 __all__ = [
     'DataManager',
     'MarketData', 
     'StockData',
-    'FundamentalData'
-]
\ No newline at end of file
+    'FundamentalData',
+    'CacheManifest',
+    'PanelStore',
+    'MarketDataStore',
+    'SQLiteStore',
+    'PointInTimeFundamentals',
+    'adjust_prices',
+    'TradingCalendar',
+    'compact_frame',
+    'CrossSectionStream',
+    'PartitionedStore',
+    'AsyncFetcher',
+    'SourceRouter',
+    'Preloader',
+    'DatasetSnapshot',
+    'UniverseIndex',
+    'QuoteService',
+    'MinuteBarStore'
+]
+
+def __getattr__(name):
+    """首次访问时导入对应模块，避免导入包时加载全部依赖"""
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
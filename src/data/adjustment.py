@@ -0,0 +1,74 @@
+"""
+复权计算 - 基于累计复权因子的向量化前复权/后复权
+
+复权因子（adj_factor）是按股票累乘的除权系数，与原始日线一同缓存：
+- 后复权价格 = 原始价格 × adj_factor
+- 前复权价格 = 原始价格 × adj_factor / 最新adj_factor
+
+历史的累计因子不会随新除权事件改变，出现新因子时只需把新的日线和因子追加到缓存，
+前复权按缓存的因子重新相除即可，无需重新获取历史行情。
+"""
+
+from typing import List, Union
+
+import pandas as pd
+
+PRICE_FIELDS = ['open', 'high', 'low', 'close', 'pre_close']
+
+def _symbol_key(bars: pd.DataFrame) -> Union[pd.Series, pd.Index]:
+    """获取分组用的股票代码（列或索引层）"""
+    if 'ts_code' in bars.columns:
+        return bars['ts_code']
+    if 'ts_code' in (bars.index.names or []):
+        return bars.index.get_level_values('ts_code')
+    # 单只股票的数据
+    return pd.Index([''] * len(bars))
+
+def adj_factor_from_pre_close(bars: pd.DataFrame) -> pd.Series:
+    """
+    由日线的 pre_close 推算累计复权因子
+
+    除权除息日的 pre_close 是除权后的昨收价，与前一交易日收盘价之比即当日除权系数，
+    按股票一次累乘得到累计因子（首日为1）。
+
+    Args:
+        bars: 按交易日升序排列的日线数据，需包含 close 和 pre_close
+    """
+    symbols = _symbol_key(bars)
+    prev_close = bars['close'].groupby(symbols).shift(1)
+    ratio = (prev_close / bars['pre_close']).fillna(1.0)
+    return ratio.groupby(symbols).cumprod().rename('adj_factor')
+
+def adjust_prices(bars: pd.DataFrame,
+                  how: str = 'qfq',
+                  fields: List[str] = None) -> pd.DataFrame:
+    """
+    计算复权价格
+
+    Args:
+        bars: 按交易日升序排列的日线数据（单只股票或多股票长表），
+              有 adj_factor 列时直接使用，否则由 pre_close 推算
+        how: qfq 前复权，hfq 后复权
+        fields: 需要复权的价格字段
+
+    Returns:
+        增加 {field}_{how} 列的数据
+    """
+    if how not in ('qfq', 'hfq'):
+        raise ValueError(f"不支持的复权方式: {how}")
+
+    fields = [field for field in (fields or PRICE_FIELDS) if field in bars.columns]
+    if 'adj_factor' in bars.columns:
+        factor = bars['adj_factor'].astype(float)
+        # 缺失的因子沿用前值（停牌等），开头缺失视为1
+        factor = factor.groupby(_symbol_key(bars)).ffill().fillna(1.0)
+    else:
+        factor = adj_factor_from_pre_close(bars)
+
+    if how == 'qfq':
+        factor = factor / factor.groupby(_symbol_key(bars)).transform('last')
+
+    adjusted = bars.copy()
+    for field in fields:
+        adjusted[f"{field}_{how}"] = bars[field] * factor.values
+    return adjusted
@@ -0,0 +1,231 @@
+"""
+异步数据获取 - 基于asyncio/aiohttp的并发数据源客户端
+
+- Tushare直接按其HTTP协议（POST {url}/{api_name}）异步请求，数千个股票/日期请求在一个事件循环中协作执行
+- AkShare只提供同步函数，在线程池中执行
+- 每个数据源一个信号量限制并发数，Tushare另受令牌桶限制每分钟调用次数
+- 限流错误（40203 / HTTP 429）和网络错误按指数退避重试
+- run_sync 为同步调用方提供门面，已有事件循环时在独立线程中运行
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Dict, Iterable, List, Sequence, Tuple
+
+import pandas as pd
+import aiohttp
+
+from ..utils.rate_limiter import TokenBucket, retry_with_backoff_async
+
+TUSHARE_URL = 'http://api.waditu.com/dataapi'
+
+# Tushare 超过每分钟调用次数时的错误码
+TUSHARE_RATE_LIMIT_CODE = 40203
+
+class ProviderError(Exception):
+    """数据源返回的业务错误"""
+
+class RateLimitError(ProviderError):
+    """数据源限流，稍后重试可能成功"""
+
+def run_sync(coro: Awaitable) -> Any:
+    """
+    在同步代码中运行协程
+
+    当前线程没有事件循环时直接asyncio.run；已在事件循环中（如Jupyter、异步Web框架）时
+    在独立线程的新事件循环中运行并等待结果。
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result = {}
+
+    def runner():
+        try:
+            result['value'] = asyncio.run(coro)
+        except BaseException as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=runner, name='async-fetcher')
+    thread.start()
+    thread.join()
+    if 'error' in result:
+        raise result['error']
+    return result['value']
+
+class AsyncTushareClient:
+    """Tushare HTTP接口的异步客户端"""
+
+    def __init__(self, token: str, session: aiohttp.ClientSession, url: str = TUSHARE_URL, timeout: float = 30):
+        """
+        初始化客户端
+
+        Args:
+            token: Tushare token
+            session: aiohttp会话（由调用方管理生命周期）
+            url: 接口地址
+            timeout: 单次请求超时（秒）
+        """
+        self.token = token
+        self.session = session
+        self.url = url.rstrip('/')
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async def query(self, api_name: str, fields: str = '', **params) -> pd.DataFrame:
+        """
+        调用接口
+
+        Raises:
+            RateLimitError: 超过调用频率
+            ProviderError: 其它业务错误
+        """
+        payload = {'api_name': api_name, 'token': self.token, 'params': params, 'fields': fields}
+        async with self.session.post(f"{self.url}/{api_name}", json=payload, timeout=self.timeout) as response:
+            if response.status == 429:
+                raise RateLimitError(f"{api_name}: HTTP 429")
+            response.raise_for_status()
+            result = await response.json(content_type=None)
+
+        if result.get('code') == TUSHARE_RATE_LIMIT_CODE:
+            raise RateLimitError(f"{api_name}: {result.get('msg')}")
+        if result.get('code') != 0:
+            raise ProviderError(f"{api_name}: {result.get('msg')}")
+
+        data = result.get('data') or {}
+        return pd.DataFrame(data.get('items', []), columns=data.get('fields', []))
+
+class AsyncFetcher:
+    """按数据源限制并发的异步数据获取器"""
+
+    # 重试的异常类型：限流、网络错误、超时
+    RETRY_EXCEPTIONS = (RateLimitError, aiohttp.ClientError, asyncio.TimeoutError)
+
+    def __init__(self, config: Dict = None, tushare_url: str = None):
+        """
+        初始化异步获取器
+
+        Args:
+            config: 配置字典，读取 data_sources.{tushare,akshare} 下的
+                    token、timeout、retry_count、retry_delay、rate_limit、max_concurrency
+            tushare_url: Tushare接口地址，默认官方地址
+        """
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+
+        tushare = self._source_config('tushare')
+        self.token = self.config.get('tushare_token', tushare.get('token', 'your_token_here'))
+        self.tushare_url = tushare_url or tushare.get('url', TUSHARE_URL)
+        self.timeout = tushare.get('timeout', 30)
+        self.retry_count = tushare.get('retry_count', 3)
+        self.retry_delay = tushare.get('retry_delay', 0.5)
+        self.rate_limiter = TokenBucket.per_minute(tushare.get('rate_limit', 500))
+
+        self.concurrency = {
+            'tushare': tushare.get('max_concurrency', 8),
+            'akshare': self._source_config('akshare').get('max_concurrency', 4),
+        }
+
+    def _source_config(self, provider: str) -> Dict:
+        return self.config.get('data_sources', {}).get(provider, {}) or {}
+
+    def _semaphores(self) -> Dict[str, asyncio.Semaphore]:
+        """信号量绑定到当前事件循环，每次运行重新创建"""
+        return {provider: asyncio.Semaphore(limit) for provider, limit in self.concurrency.items()}
+
+    async def _tushare_call(self,
+                            client: AsyncTushareClient,
+                            semaphore: asyncio.Semaphore,
+                            api_name: str,
+                            params: Dict) -> pd.DataFrame:
+        """获取令牌和并发名额后调用一次Tushare接口，失败按退避重试"""
+        async def call():
+            await self.rate_limiter.acquire_async()
+            async with semaphore:
+                return await client.query(api_name, **params)
+
+        return await retry_with_backoff_async(
+            call, retry_count=self.retry_count, base_delay=self.retry_delay,
+            exceptions=self.RETRY_EXCEPTIONS
+        )
+
+    async def fetch_tushare_many(self, requests: Sequence[Tuple[str, Dict]]) -> List[pd.DataFrame]:
+        """
+        并发调用多个Tushare接口
+
+        Args:
+            requests: [(接口名称, 参数)]
+
+        Returns:
+            与requests顺序一致的结果，重试耗尽的请求为空DataFrame
+        """
+        semaphore = self._semaphores()['tushare']
+        async with aiohttp.ClientSession() as session:
+            client = AsyncTushareClient(self.token, session, self.tushare_url, self.timeout)
+            results = await asyncio.gather(
+                *(self._tushare_call(client, semaphore, api_name, params) for api_name, params in requests),
+                return_exceptions=True
+            )
+
+        frames = []
+        for (api_name, params), result in zip(requests, results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"获取{api_name}{params}失败: {result}")
+                result = pd.DataFrame()
+            frames.append(result)
+        return frames
+
+    async def fetch_akshare_many(self, requests: Sequence[Tuple[str, Dict]]) -> List[pd.DataFrame]:
+        """
+        并发调用多个AkShare函数（同步函数在线程池中执行）
+
+        Args:
+            requests: [(函数名称, 参数)]，如 ('stock_zh_a_hist', {'symbol': '000001'})
+        """
+        import akshare as ak
+
+        semaphore = self._semaphores()['akshare']
+        loop = asyncio.get_running_loop()
+
+        async def call(func_name: str, params: Dict) -> pd.DataFrame:
+            async with semaphore:
+                try:
+                    func = getattr(ak, func_name)
+                    return await loop.run_in_executor(None, lambda: func(**params))
+                except Exception as e:
+                    self.logger.error(f"获取AkShare {func_name}{params}失败: {e}")
+                    return pd.DataFrame()
+
+        return list(await asyncio.gather(*(call(func_name, params) for func_name, params in requests)))
+
+    async def fetch_daily_many(self,
+                               stock_codes: Iterable[str],
+                               start_date: str,
+                               end_date: str) -> Dict[str, pd.DataFrame]:
+        """并发获取多只股票的日线数据，返回 {ts_code: 原始日线数据}，失败的股票不包含在内"""
+        stock_codes = list(dict.fromkeys(stock_codes))
+        frames = await self.fetch_tushare_many([
+            ('daily', {'ts_code': code, 'start_date': start_date, 'end_date': end_date})
+            for code in stock_codes
+        ])
+        return {code: frame for code, frame in zip(stock_codes, frames) if not frame.empty}
+
+    async def fetch_cross_sections(self, trade_dates: Iterable[str]) -> Dict[str, pd.DataFrame]:
+        """并发获取多个交易日的全市场日线截面，返回 {trade_date: 截面数据}"""
+        trade_dates = list(trade_dates)
+        frames = await self.fetch_tushare_many([('daily', {'trade_date': d}) for d in trade_dates])
+        return {d: frame for d, frame in zip(trade_dates, frames) if not frame.empty}
+
+    def get_tushare_many(self, requests: Sequence[Tuple[str, Dict]]) -> List[pd.DataFrame]:
+        """fetch_tushare_many 的同步门面"""
+        return run_sync(self.fetch_tushare_many(requests))
+
+    def get_daily_many(self, stock_codes: Iterable[str], start_date: str, end_date: str) -> Dict[str, pd.DataFrame]:
+        """fetch_daily_many 的同步门面"""
+        return run_sync(self.fetch_daily_many(stock_codes, start_date, end_date))
+
+    def get_cross_sections(self, trade_dates: Iterable[str]) -> Dict[str, pd.DataFrame]:
+        """fetch_cross_sections 的同步门面"""
+        return run_sync(self.fetch_cross_sections(trade_dates))
@@ -0,0 +1,102 @@
+"""
+缓存清单 - 记录本地缓存数据的高水位（最新交易日）
+
+清单以JSON文件保存在数据目录下，包括：
+- 全市场截面已更新到的交易日
+- 每只股票已缓存的最新交易日
+- 按请求区间缓存的数据（如指数日线）已覆盖的最早日期
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+class CacheManifest:
+    """缓存清单类"""
+
+    VERSION = 1
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        初始化缓存清单
+
+        Args:
+            path: 清单文件路径
+        """
+        self.path = Path(path)
+        self.logger = logging.getLogger(__name__)
+        self.last_trade_date: Optional[str] = None
+        self.symbols: Dict[str, str] = {}
+        self.starts: Dict[str, str] = {}
+        # 加载后是否有改动，没有改动时无需保存
+        self.changed = False
+        self.load()
+
+    def load(self):
+        """从文件加载清单，文件不存在或损坏时视为空清单"""
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            self.last_trade_date = manifest.get('last_trade_date')
+            self.symbols = dict(manifest.get('symbols', {}))
+            self.starts = dict(manifest.get('starts', {}))
+        except Exception as e:
+            self.logger.warning(f"缓存清单读取失败，将全量重建: {e}")
+            self.reset()
+
+    def save(self):
+        """保存清单（先写临时文件再替换，避免中断时损坏）"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            'version': self.VERSION,
+            'updated_at': datetime.now().isoformat(),
+            'last_trade_date': self.last_trade_date,
+            'symbols': self.symbols,
+            'starts': self.starts
+        }
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.changed = False
+
+    def reset(self):
+        """清空所有水位"""
+        self.last_trade_date = None
+        self.symbols = {}
+        self.starts = {}
+        self.changed = True
+
+    def get_watermark(self, stock_code: str) -> Optional[str]:
+        """获取股票已缓存的最新交易日（YYYYMMDD），未缓存返回None"""
+        return self.symbols.get(stock_code)
+
+    def set_watermark(self, stock_code: str, trade_date: str):
+        """更新股票的水位，只会向前推进"""
+        current = self.symbols.get(stock_code)
+        if current is None or trade_date > current:
+            self.symbols[stock_code] = trade_date
+            self.changed = True
+
+    def get_start(self, stock_code: str) -> Optional[str]:
+        """获取已覆盖的最早日期（YYYYMMDD），未记录返回None"""
+        return self.starts.get(stock_code)
+
+    def extend_start(self, stock_code: str, start_date: str):
+        """更新已覆盖的最早日期，只会向前扩展"""
+        current = self.starts.get(stock_code)
+        if current is None or start_date < current:
+            self.starts[stock_code] = start_date
+            self.changed = True
+
+    def advance(self, trade_date: str):
+        """推进全市场截面的水位"""
+        if self.last_trade_date is None or trade_date > self.last_trade_date:
+            self.last_trade_date = trade_date
+            self.changed = True
@@ -0,0 +1,179 @@
+"""
+紧凑数据类型 - 降低日线和股票列表的内存占用
+
+接口返回的数据全部是float64和Python字符串对象，全市场多年面板会占用数GB内存：
+- 价格、成交量等浮点列转为float32
+- ts_code、name、area、industry 等重复字符串转为共享字典的分类类型
+- 交易日可转为交易日历上的int32序号
+
+compact_report 对比紧凑表示与float64表示的内存占用和因子计算差异。
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .trading_calendar import TradingCalendar
+
+FLOAT32_FIELDS = ['open', 'high', 'low', 'close', 'pre_close', 'change', 'pct_chg',
+                  'vol', 'amount']
+
+CATEGORY_FIELDS = ['ts_code', 'symbol', 'name', 'area', 'industry', 'market', 'exchange']
+
+class CategoryDictionary:
+    """按字段共享的分类字典，同一字段的所有数据使用同一套类别编码"""
+
+    def __init__(self, fields: Iterable[str] = CATEGORY_FIELDS):
+        """
+        初始化分类字典
+
+        Args:
+            fields: 转为分类类型的字段
+        """
+        self.fields = list(fields)
+        self._dtypes: Dict[str, pd.CategoricalDtype] = {}
+        self._lock = threading.Lock()
+
+    def dtype(self, field: str) -> Optional[pd.CategoricalDtype]:
+        """字段当前的分类类型"""
+        return self._dtypes.get(field)
+
+    def update(self, data: pd.DataFrame):
+        """将数据中出现的新值加入字典（已有编码不变，新值追加在末尾）"""
+        with self._lock:
+            for field in self.fields:
+                if field not in data.columns:
+                    continue
+                values = data[field]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    values = values.cat.categories.to_series()
+                new = pd.Index(values.dropna().astype(str).unique())
+
+                dtype = self._dtypes.get(field)
+                if dtype is None:
+                    self._dtypes[field] = pd.CategoricalDtype(new.sort_values())
+                else:
+                    missing = new.difference(dtype.categories)
+                    if len(missing):
+                        self._dtypes[field] = pd.CategoricalDtype(dtype.categories.append(missing))
+
+    def encode(self, data: pd.DataFrame) -> pd.DataFrame:
+        """将字典字段转换为共享的分类类型"""
+        self.update(data)
+        columns = {
+            field: data[field].astype(str).where(data[field].notna()).astype(self._dtypes[field])
+            for field in self.fields
+            if field in data.columns and data[field].dtype != self._dtypes[field]
+        }
+        return data.assign(**columns) if columns else data
+
+def compact_frame(data: pd.DataFrame,
+                  categories: CategoryDictionary = None,
+                  calendar: TradingCalendar = None,
+                  float_fields: Iterable[str] = None) -> pd.DataFrame:
+    """
+    转换为紧凑数据类型
+
+    Args:
+        data: 日线数据或股票列表
+        categories: 共享的分类字典，默认为本次数据新建
+        calendar: 提供时将trade_date（列或索引）转为交易日历上的int32序号
+        float_fields: 转为float32的字段，默认价格和成交量字段
+
+    Returns:
+        转换后的数据
+    """
+    if data.empty:
+        return data
+
+    float_fields = FLOAT32_FIELDS if float_fields is None else list(float_fields)
+    columns = {
+        field: data[field].astype('float32')
+        for field in float_fields
+        if field in data.columns and data[field].dtype == np.float64
+    }
+    compact = data.assign(**columns) if columns else data.copy()
+    compact = (categories or CategoryDictionary()).encode(compact)
+
+    if calendar is not None:
+        compact = to_date_ordinals(compact, calendar)
+    return compact
+
+def to_date_ordinals(data: pd.DataFrame, calendar: TradingCalendar) -> pd.DataFrame:
+    """
+    trade_date（列或索引层）转为int32交易日序号
+
+    Raises:
+        ValueError: 存在不在日历中的日期
+    """
+    if 'trade_date' in data.columns:
+        return data.assign(trade_date=_ordinals(calendar, data['trade_date']))
+
+    if isinstance(data.index, pd.MultiIndex) and 'trade_date' in data.index.names:
+        level = data.index.names.index('trade_date')
+        ordinals = _ordinals(calendar, data.index.levels[level])
+        return data.set_axis(data.index.set_levels(ordinals, level=level))
+
+    if isinstance(data.index, pd.DatetimeIndex):
+        return data.set_axis(pd.Index(_ordinals(calendar, data.index), name='trade_date'))
+    return data
+
+def _ordinals(calendar: TradingCalendar, dates) -> np.ndarray:
+    ordinals = calendar.ordinals(dates)
+    if (ordinals < 0).any():
+        raise ValueError(f"{int((ordinals < 0).sum())}个日期不是日历中的交易日")
+    return ordinals.astype('int32')
+
+def from_date_ordinals(data: pd.DataFrame, calendar: TradingCalendar) -> pd.DataFrame:
+    """将int32交易日序号还原为日期"""
+    if 'trade_date' in data.columns:
+        return data.assign(trade_date=calendar.dates[data['trade_date'].to_numpy()])
+
+    if isinstance(data.index, pd.MultiIndex) and 'trade_date' in data.index.names:
+        level = data.index.names.index('trade_date')
+        dates = calendar.dates[data.index.levels[level].to_numpy()]
+        return data.set_axis(data.index.set_levels(dates, level=level))
+
+    if data.index.name == 'trade_date':
+        return data.set_axis(calendar.dates[data.index.to_numpy()].rename('trade_date'))
+    return data
+
+def compact_report(data: pd.DataFrame,
+                   factors: Mapping[str, Callable[[pd.DataFrame], pd.Series]] = None,
+                   categories: CategoryDictionary = None) -> Dict:
+    """
+    对比紧凑表示与原始表示的内存占用和因子计算差异
+
+    Args:
+        data: 原始（float64/object）数据
+        factors: {因子名: 输入数据、返回因子序列的函数}
+        categories: 共享的分类字典
+
+    Returns:
+        {'memory': 各列及合计内存（字节）, 'factors': 各因子的最大绝对/相对误差}
+    """
+    compact = compact_frame(data, categories=categories)
+
+    before = data.memory_usage(deep=True)
+    after = compact.memory_usage(deep=True)
+    memory = pd.DataFrame({'float64': before, 'compact': after})
+    memory.loc['total'] = memory.sum()
+    memory['ratio'] = memory['compact'] / memory['float64']
+
+    factor_diffs = {}
+    for name, func in (factors or {}).items():
+        # 按位置比较，两种表示下因子的行顺序一致
+        expected = np.asarray(func(data), dtype='float64')
+        actual = np.asarray(func(compact), dtype='float64')
+        diff = np.abs(actual - expected)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rel_diff = np.where(expected != 0, diff / np.abs(expected), np.nan)
+        factor_diffs[name] = {
+            'max_abs_diff': float(np.nanmax(diff)) if np.isfinite(diff).any() else 0.0,
+            'max_rel_diff': float(np.nanmax(rel_diff)) if np.isfinite(rel_diff).any() else 0.0,
+            'nan_mismatch': int((np.isnan(expected) != np.isnan(actual)).sum())
+        }
+
+    return {'memory': memory, 'factors': factor_diffs}
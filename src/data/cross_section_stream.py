@@ -0,0 +1,240 @@
+"""
+截面数据流 - 按交易日逐个输出全市场截面，内存占用与历史长度无关
+
+数据按固定交易日数分块从磁盘读取，后台线程预取下一块，读取与计算重叠：
+- 每次迭代输出一个交易日的截面（CrossSection）
+- 保留最近lookback个交易日的回看缓冲，滚动窗口直接取数组视图
+- 峰值内存约为 (lookback + chunk_size × (prefetch + 1)) × 股票数 × 字段数
+"""
+
+import queue
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .panel_store import PanelStore
+from .sql_store import MarketDataStore
+
+# 分块加载函数: 本块的交易日 -> {字段: 交易日 × 股票 矩阵}
+ChunkLoader = Callable[[pd.DatetimeIndex], Dict[str, np.ndarray]]
+
+_DONE = object()
+
+class _Failure:
+    """后台线程中的异常，转交给迭代方重新抛出"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+class CrossSection:
+    """单个交易日的全市场截面及其回看窗口"""
+
+    def __init__(self,
+                 trade_date: pd.Timestamp,
+                 symbols: np.ndarray,
+                 buffers: Dict[str, np.ndarray],
+                 buffer_dates: pd.DatetimeIndex,
+                 row: int,
+                 lookback: int):
+        self.trade_date = trade_date
+        self.symbols = symbols
+        self.lookback = lookback
+        self._buffers = buffers
+        self._buffer_dates = buffer_dates
+        self._row = row
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self._buffers)
+
+    def values(self, field: str) -> np.ndarray:
+        """当日字段值（按symbols顺序，未交易为NaN）"""
+        return self._buffers[field][self._row]
+
+    def window(self, field: str, length: int = None) -> np.ndarray:
+        """
+        截至当日（含）的字段窗口，交易日 × 股票 的数组视图
+
+        Args:
+            field: 字段名
+            length: 窗口包含的交易日数，默认lookback + 1；历史不足时返回已有部分
+        """
+        length = self.lookback + 1 if length is None else length
+        if length > self.lookback + 1:
+            raise ValueError(f"窗口长度{length}超过回看缓冲{self.lookback + 1}")
+        return self._buffers[field][max(0, self._row - length + 1):self._row + 1]
+
+    def window_frame(self, field: str, length: int = None) -> pd.DataFrame:
+        """截至当日的字段窗口宽表（索引为交易日，列为股票代码）"""
+        values = self.window(field, length)
+        dates = self._buffer_dates[self._row - len(values) + 1:self._row + 1]
+        return pd.DataFrame(values, index=dates.rename('trade_date'),
+                            columns=pd.Index(self.symbols, name='ts_code'), copy=False)
+
+    def to_frame(self, dropna: bool = True) -> pd.DataFrame:
+        """
+        当日截面数据，以ts_code为索引
+
+        Args:
+            dropna: 是否去掉全部字段都缺失（未上市或停牌）的股票
+        """
+        frame = pd.DataFrame({field: self.values(field) for field in self._buffers},
+                             index=pd.Index(self.symbols, name='ts_code'))
+        return frame.dropna(how='all') if dropna else frame
+
+class CrossSectionStream:
+    """按交易日输出截面的数据流"""
+
+    def __init__(self,
+                 load_chunk: ChunkLoader,
+                 trade_dates: Sequence,
+                 symbols: Sequence[str],
+                 fields: Sequence[str],
+                 lookback: int = 0,
+                 chunk_size: int = 20,
+                 prefetch: int = 1):
+        """
+        初始化截面数据流
+
+        Args:
+            load_chunk: 分块加载函数，返回 {字段: len(交易日) × len(symbols) 矩阵}
+            trade_dates: 升序交易日
+            symbols: 股票代码轴
+            fields: 字段
+            lookback: 回看缓冲保留的历史交易日数（滚动窗口长度 - 1）
+            chunk_size: 每块读取的交易日数
+            prefetch: 后台预取的块数，0表示不使用后台线程
+        """
+        self.load_chunk = load_chunk
+        self.trade_dates = pd.DatetimeIndex(pd.to_datetime(list(trade_dates)))
+        self.symbols = np.asarray(symbols)
+        self.fields = list(fields)
+        self.lookback = lookback
+        self.chunk_size = max(1, chunk_size)
+        self.prefetch = prefetch
+
+    @classmethod
+    def from_panel(cls,
+                   panel: PanelStore,
+                   start_date=None,
+                   end_date=None,
+                   fields: Sequence[str] = None,
+                   symbols: Sequence[str] = None,
+                   **kwargs) -> 'CrossSectionStream':
+        """
+        从内存映射面板读取
+
+        每块从内存映射复制到内存，缺页读取发生在预取线程中。
+        """
+        fields = [field for field in (fields or panel.fields) if field in panel.fields]
+        rows = panel.date_slice(start_date, end_date)
+        columns = None if symbols is None else panel.symbol_positions(symbols)
+
+        def load_chunk(chunk_dates: pd.DatetimeIndex) -> Dict[str, np.ndarray]:
+            chunk_rows = panel.date_slice(chunk_dates[0], chunk_dates[-1])
+            arrays = {}
+            for field in fields:
+                values = panel.array(field)[chunk_rows]
+                arrays[field] = np.array(values if columns is None else values[:, columns])
+            return arrays
+
+        return cls(load_chunk, panel.dates[rows].astype('datetime64[ns]'),
+                   panel.symbols if symbols is None else symbols, fields, **kwargs)
+
+    @classmethod
+    def from_store(cls,
+                   store: MarketDataStore,
+                   trade_dates: Sequence,
+                   symbols: Sequence[str],
+                   fields: Sequence[str],
+                   **kwargs) -> 'CrossSectionStream':
+        """从行情数据库按交易日读取截面"""
+        fields = list(fields)
+        symbol_index = pd.Index(symbols)
+
+        def load_chunk(chunk_dates: pd.DatetimeIndex) -> Dict[str, np.ndarray]:
+            arrays = {field: np.full((len(chunk_dates), len(symbol_index)), np.nan) for field in fields}
+            for i, trade_date in enumerate(chunk_dates.strftime('%Y%m%d')):
+                cross_section = store.get_cross_section(trade_date)
+                columns = symbol_index.get_indexer(cross_section.index)
+                found = columns >= 0
+                for field in fields:
+                    if field in cross_section.columns:
+                        arrays[field][i, columns[found]] = cross_section[field].to_numpy(dtype=float)[found]
+            return arrays
+
+        return cls(load_chunk, trade_dates, symbols, fields, **kwargs)
+
+    def _chunks(self) -> Iterator[Tuple[pd.DatetimeIndex, Dict[str, np.ndarray]]]:
+        """按顺序读取各块"""
+        for start in range(0, len(self.trade_dates), self.chunk_size):
+            chunk_dates = self.trade_dates[start:start + self.chunk_size]
+            yield chunk_dates, self.load_chunk(chunk_dates)
+
+    def _prefetched(self) -> Iterator[Tuple[pd.DatetimeIndex, Dict[str, np.ndarray]]]:
+        """后台线程提前读取后续的块，迭代中止时通知线程退出"""
+        if self.prefetch <= 0:
+            yield from self._chunks()
+            return
+
+        chunks = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for chunk in self._chunks():
+                    if not put(chunk):
+                        return
+                put(_DONE)
+            except BaseException as e:
+                put(_Failure(e))
+
+        producer = threading.Thread(target=produce, name='cross-section-prefetch', daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            stop.set()
+            producer.join()
+
+    def __iter__(self) -> Iterator[CrossSection]:
+        buffers: Optional[Dict[str, np.ndarray]] = None
+        buffer_dates = pd.DatetimeIndex([])
+
+        for chunk_dates, arrays in self._prefetched():
+            if buffers is None:
+                buffers, buffer_dates = arrays, chunk_dates
+            else:
+                # 只保留上一块末尾的lookback个交易日
+                keep = min(self.lookback, len(buffer_dates))
+                tail = len(buffer_dates) - keep
+                buffers = {
+                    field: np.concatenate([buffers[field][tail:], arrays[field]])
+                    for field in self.fields
+                }
+                buffer_dates = buffer_dates[tail:].append(chunk_dates)
+
+            offset = len(buffer_dates) - len(chunk_dates)
+            for i, trade_date in enumerate(chunk_dates):
+                yield CrossSection(trade_date, self.symbols, buffers, buffer_dates,
+                                   offset + i, self.lookback)
+
+    def __len__(self) -> int:
+        return len(self.trade_dates)
@@ -6,9 +6,37 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
-from typing import Dict, List, Optional, Union
-import akshare as ak
-import tushare as ts
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from ..utils.cache_manager import CacheManager
+from ..utils.rate_limiter import TokenBucket, retry_with_backoff
+from ..utils.single_flight import SingleFlight
+from ..utils.data_validator import DataValidator
+from .cache_manifest import CacheManifest
+from .storage import CsvStorage, create_storage
+from .panel_store import PanelStore
+from .sql_store import MarketDataStore, create_market_store
+from .fundamentals import FUNDAMENTAL_FACTORS, INDICATOR_FIELDS, PointInTimeFundamentals, report_periods
+from .adjustment import adjust_prices
+from .trading_calendar import TradingCalendar
+from .compact import CategoryDictionary, compact_frame, from_date_ordinals
+from .cross_section_stream import CrossSectionStream
+from .partitioned_store import PartitionedStore
+from .snapshot import DatasetSnapshot
+from .universe import UniverseIndex
+from .minute_bars import MinuteBarStore, MinuteResampler
+from .source_router import AkShareSource, SourceRouter, TushareSource
+
+# 前端可选的回测基准指数
+BENCHMARK_INDICES = {
+    '上证指数': '000001.SH',
+    '沪深300': '000300.SH',
+    '中证500': '000905.SH',
+    '创业板指': '399006.SZ'
+}
 
 class DataManager:
     """数据管理器类"""
@@ -23,28 +51,202 @@ class DataManager:
         self.config = config or {}
         self.logger = logging.getLogger(__name__)
         
+        # 本地数据目录
+        self.data_dir = Path(self.config.get('data_dir', 'data'))
+        self.storage = create_storage(self.config.get('storage_format', 'parquet'), self.data_dir)
+        
+        # 行情数据库（配置了database时启用）
+        db_config = self.config.get('database')
+        self.market_store: Optional[MarketDataStore] = (
+            create_market_store(db_config, self.data_dir) if db_config else None
+        )
+        
+        # 按 年份/交易所 分区的日线数据集，partitioned_dataset开启时随缓存更新写入
+        self.dataset = PartitionedStore(self.data_dir / "dataset")
+        self.write_dataset = self.config.get('partitioned_dataset', False)
+        
+        # 固定的数据集快照，设置后query_daily只读取该快照
+        self.snapshot: Optional[DatasetSnapshot] = None
+        
+        # 按交易日的股票池位图索引，universe_index开启时随缓存更新追加
+        self.universe = UniverseIndex.from_config(
+            self.data_dir / "universe", self._get_config('stock_selection', {}) or {}
+        )
+        self.update_universe_index = self.config.get('universe_index', False)
+        
+        # 按交易日分区的1分钟线存储
+        self.minute_store = MinuteBarStore(self.data_dir / "minute")
+        
+        # 缓存更新的数据获取方式: by_date（按交易日取全市场截面）或 by_symbol（逐只股票）
+        self.fetch_mode = self.config.get('fetch_mode', 'by_date')
+        
+        # 入库日线的质量校验，剔除错误行并记录最近一次的各检查项计数
+        validation_config = self.config.get('data_validation', {}) or {}
+        self.validate_data = validation_config.get('enabled', True)
+        self.validator = DataValidator.from_config(validation_config)
+        self.quality_summary: Dict[str, int] = {}
+        
+        # 缓存日线时一并缓存复权因子
+        self.with_adj_factor = self.config.get('with_adj_factor', True)
+        
+        # 紧凑数据类型：float32价格成交量、共享字典的分类代码
+        self.compact_dtypes = self.config.get('compact_dtypes', False)
+        self.categories = CategoryDictionary()
+        
+        # 指数日线：首次从index_start起分段获取全部历史，之后按水位增量追加；
+        # index_codes中的指数随缓存更新一起更新
+        self.index_start = self.config.get('index_start', self.config.get('calendar_start', '20100101'))
+        self.index_batch_years = self.config.get('index_batch_years', 10)
+        self.index_codes = list(self.config.get('index_codes', []))
+        self._index_lock = threading.Lock()
+        
+        # 财务指标公告后延迟生效的自然日数，避免公告当日即使用造成前视偏差
+        self.announcement_lag_days = self.config.get('announcement_lag_days', 1)
+        
+        # 时点财务指标表随缓存更新（预加载财务因子时默认开启），首次获取最近fundamentals_years年的报告期
+        preload_factors = self._get_config('performance.preload.factors', []) or []
+        self.pit_fundamentals = self.config.get(
+            'pit_fundamentals', any(name in FUNDAMENTAL_FACTORS for name in preload_factors)
+        )
+        self.fundamentals_years = self.config.get('fundamentals_years', 3)
+        
+        # 首次或强制重建缓存时获取的历史交易日数
+        self.cache_days = self.config.get('cache_days', 30)
+        
+        # 交易日历（首次使用时获取并常驻内存）
+        self.calendar_start = self.config.get('calendar_start', '20100101')
+        self._calendar: Optional[TradingCalendar] = None
+        self._calendar_lock = threading.Lock()
+        
+        # 接口调用控制：超时、重试、限流与并发数
+        self.timeout = self._get_config('data_sources.tushare.timeout', 30)
+        self.retry_count = self._get_config('data_sources.tushare.retry_count', 3)
+        self.retry_delay = self._get_config('data_sources.tushare.retry_delay', 0.5)
+        self.rate_limiter = TokenBucket.per_minute(
+            self._get_config('data_sources.tushare.rate_limit', 500)
+        )
+        self.max_workers = self._get_config('performance.parallel.max_workers', 4)
+        
+        # 批量获取改用asyncio并发请求（见 async_fetcher）
+        self.async_fetch = self._get_config('performance.parallel.async_fetch', False)
+        self._async_fetcher = None
+        
+        # 进程内数据缓存
+        cache_config = dict(self._get_config('performance.cache', {}))
+        if 'cache_enabled' in self.config:
+            cache_config['enabled'] = self.config['cache_enabled']
+        self.cache = CacheManager.from_config(cache_config)
+        
+        # 合并并发的相同请求
+        self.single_flight = SingleFlight()
+        
         # 初始化数据源
         self._init_data_sources()
         
+    def _get_config(self, key: str, default: Any = None) -> Any:
+        """获取配置值，支持点分路径（如 'data_sources.tushare.timeout'）"""
+        value = self.config
+        for k in key.split('.'):
+            if isinstance(value, dict) and k in value:
+                value = value[k]
+            else:
+                return default
+        return value
+    
     def _init_data_sources(self):
-        """初始化数据源"""
-        # Tushare初始化
-        ts_token = self.config.get('tushare_token', 'your_token_here')
-        ts.set_token(ts_token)
-        self.pro = ts.pro_api()
+        """初始化数据源（客户端在首次使用时创建，避免导入tushare拖慢启动）"""
+        self._pro = None
+        self._pro_lock = threading.Lock()
+        
+        # 按 data_sources 中启用的数据源和优先级路由，失败时自动切换
+        self.router = SourceRouter.from_config(
+            self._get_config('data_sources', {}),
+            {'tushare': TushareSource(self._call_api), 'akshare': AkShareSource()}
+        )
         
         self.logger.info("数据管理器初始化完成")
     
+    @property
+    def pro(self):
+        """Tushare Pro接口客户端"""
+        if self._pro is None:
+            with self._pro_lock:
+                if self._pro is None:
+                    import tushare as ts
+                    
+                    ts_token = self.config.get(
+                        'tushare_token',
+                        self._get_config('data_sources.tushare.token', 'your_token_here')
+                    )
+                    ts.set_token(ts_token)
+                    self._pro = ts.pro_api(ts_token, timeout=self.timeout)
+        return self._pro
+    
+    @pro.setter
+    def pro(self, client):
+        self._pro = client
+    
+    @property
+    def async_fetcher(self):
+        """异步数据获取器（首次使用时导入aiohttp），与同步调用共用令牌桶"""
+        if self._async_fetcher is None:
+            from .async_fetcher import AsyncFetcher
+            
+            fetcher = AsyncFetcher(self.config)
+            fetcher.rate_limiter = self.rate_limiter
+            self._async_fetcher = fetcher
+        return self._async_fetcher
+    
+    @async_fetcher.setter
+    def async_fetcher(self, fetcher):
+        self._async_fetcher = fetcher
+    
+    def _call_api(self, api_name: str, **kwargs) -> pd.DataFrame:
+        """
+        调用Tushare接口，统一处理限流和失败重试
+        
+        Args:
+            api_name: 接口名称，如 'daily'、'stock_basic'
+            **kwargs: 接口参数
+            
+        Returns:
+            接口返回的数据，重试耗尽后抛出异常
+        """
+        def call():
+            self.rate_limiter.acquire()
+            return getattr(self.pro, api_name)(**kwargs)
+        
+        return retry_with_backoff(call, retry_count=self.retry_count, base_delay=self.retry_delay)
+    
+    def _cached(self, key: tuple, loader) -> pd.DataFrame:
+        """
+        先查缓存，未命中时调用loader获取
+        
+        同一键的并发请求只有一个会调用loader，其余等待共享结果；
+        只缓存非空结果，返回副本避免调用方修改缓存。
+        """
+        data = self.cache.get(key)
+        if data is None:
+            data = self.single_flight.do(key, lambda: self._load_and_cache(key, loader))
+        return data.copy()
+    
+    def _load_and_cache(self, key: tuple, loader) -> pd.DataFrame:
+        # 等待期间可能已被其它请求写入缓存
+        data = self.cache.get(key)
+        if data is None:
+            data = loader()
+            if not data.empty:
+                self.cache.set(key, data)
+        return data
+    
     def get_stock_list(self) -> pd.DataFrame:
         """获取股票列表"""
+        return self._cached(('stock_list',), self._fetch_stock_list)
+    
+    def _fetch_stock_list(self) -> pd.DataFrame:
         try:
-            # 使用Tushare获取股票列表
-            stock_list = self.pro.stock_basic(
-                exchange='',
-                list_status='L',
-                fields='ts_code,symbol,name,area,industry,list_date'
-            )
-            return stock_list
+            stock_list = self.router.fetch('stock_basic')
+            return self._compact(stock_list)
         except Exception as e:
             self.logger.error(f"获取股票列表失败: {e}")
             return pd.DataFrame()
@@ -54,95 +256,1338 @@ class DataManager:
                       start_date: str, 
                       end_date: str) -> pd.DataFrame:
         """获取日线数据"""
+        return self._cached(
+            ('daily', stock_code, start_date, end_date),
+            lambda: self._fetch_daily_data(stock_code, start_date, end_date)
+        )
+    
+    def _fetch_daily_data(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
         try:
-            # 使用Tushare获取日线数据
-            daily_data = self.pro.daily(
-                ts_code=stock_code,
-                start_date=start_date,
-                end_date=end_date
+            daily_data = self.router.fetch('daily', stock_code, start_date, end_date)
+            history = self._symbol_volume_history(stock_code) if self.validate_data else None
+            return self._compact(self._normalize_daily(self._validate_daily(daily_data, history)))
+        except Exception as e:
+            self.logger.error(f"获取{stock_code}日线数据失败: {e}")
+            return pd.DataFrame()
+    
+    def get_minute_bars(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """获取1分钟线（不缓存，入库使用ingest_minute_bars）"""
+        try:
+            return self.router.fetch('minute', stock_code, start_date, end_date)
+        except Exception as e:
+            self.logger.error(f"获取{stock_code}分钟线失败: {e}")
+            return pd.DataFrame()
+    
+    def ingest_minute_bars(self, stock_codes: List[str], start_date: str, end_date: str = None) -> int:
+        """
+        获取股票的1分钟线并写入分钟线存储
+        
+        Args:
+            stock_codes: 股票代码列表
+            start_date: 开始日期，格式YYYYMMDD
+            end_date: 结束日期，格式YYYYMMDD，默认与开始日期相同
+            
+        Returns:
+            写入的分钟线行数
+        """
+        end_date = end_date or start_date
+        stock_codes = list(dict.fromkeys(stock_codes))
+        if not stock_codes:
+            return 0
+        
+        workers = max(1, min(self.max_workers, len(stock_codes)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda code: self.get_minute_bars(code, start_date, end_date),
+                stock_codes
+            ))
+        frames = [bars for bars in results if not bars.empty]
+        if not frames:
+            return 0
+        
+        bars = pd.concat(frames, ignore_index=True)
+        self.minute_store.write(bars)
+        self.logger.info(f"分钟线入库完成: {len(frames)}只股票, {len(bars)}行")
+        return len(bars)
+    
+    def resample_minutes(self,
+                         freq: str,
+                         start_date: str = None,
+                         end_date: str = None,
+                         stock_codes: List[str] = None) -> pd.DataFrame:
+        """
+        将存储的1分钟线重采样为目标周期
+        
+        按交易日逐个读取分区送入增量重采样器，每个交易日结束后取出已结束的K线，
+        内存中只保留一个交易日的分钟线。
+        
+        Args:
+            freq: 目标周期，如 '5m'、'15m'、'60m'、'1d'
+            start_date: 开始交易日，格式YYYYMMDD
+            end_date: 结束交易日，格式YYYYMMDD
+            stock_codes: 股票代码列表，None表示全部
+            
+        Returns:
+            以(trade_time, ts_code)为索引的K线
+        """
+        resampler = MinuteResampler(freq)
+        start = pd.Timestamp(start_date).strftime('%Y%m%d') if start_date else None
+        end = pd.Timestamp(end_date).strftime('%Y%m%d') if end_date else None
+        
+        frames = []
+        for trade_date in self.minute_store.trade_dates():
+            if (start is not None and trade_date < start) or (end is not None and trade_date > end):
+                continue
+            bars = self.minute_store.read(trade_date, trade_date, stock_codes)
+            if not bars.empty:
+                resampler.update(bars)
+                frames.append(resampler.drain())
+        frames.append(resampler.bars)
+        return pd.concat(frames).sort_index()
+    
+    def get_trade_dates(self, start_date: str, end_date: str) -> List[str]:
+        """获取区间内的交易日列表（YYYYMMDD，升序）"""
+        try:
+            calendar = self.router.fetch('trade_cal', start_date, end_date)
+            return sorted(calendar['cal_date'].astype(str).tolist())
+        except Exception as e:
+            self.logger.error(f"获取交易日历失败: {e}")
+            return []
+    
+    def get_trading_calendar(self, start_date: str = None, end_date: str = None) -> TradingCalendar:
+        """
+        获取交易日历
+        
+        首次调用时一次获取从calendar_start到当年年末的交易日并常驻内存，
+        之后只有请求区间超出已覆盖范围时才重新获取。
+        
+        Args:
+            start_date: 需要覆盖的开始日期，格式YYYYMMDD
+            end_date: 需要覆盖的结束日期，格式YYYYMMDD
+            
+        Returns:
+            交易日历，获取失败时为空日历
+        """
+        start_date = min(start_date or self.calendar_start, self.calendar_start)
+        end_date = max(end_date or '', f"{datetime.now().year}1231")
+        
+        calendar = self._calendar
+        if calendar is not None and calendar.covers(start_date, end_date):
+            return calendar
+        
+        with self._calendar_lock:
+            calendar = self._calendar
+            if calendar is not None:
+                if calendar.covers(start_date, end_date):
+                    return calendar
+                # 扩展为已覆盖范围与请求区间的并集
+                start_date = min(start_date, calendar.start.strftime('%Y%m%d'))
+                end_date = max(end_date, calendar.end.strftime('%Y%m%d'))
+            
+            trade_dates = self.get_trade_dates(start_date, end_date)
+            calendar = TradingCalendar(trade_dates, start_date, end_date)
+            if trade_dates:
+                self._calendar = calendar
+            return calendar
+    
+    def trading_days_back(self, end_date: str, n: int) -> str:
+        """
+        end_date之前第n个交易日（YYYYMMDD），日历不可用时按自然日估算
+        
+        Args:
+            end_date: 结束日期，格式YYYYMMDD
+            n: 交易日数
+        """
+        calendar = self.get_trading_calendar(end_date=end_date)
+        if not len(calendar):
+            return (pd.Timestamp(end_date) - timedelta(days=n)).strftime('%Y%m%d')
+        return calendar.shift(end_date, -n).strftime('%Y%m%d')
+    
+    def get_daily_cross_section(self, trade_date: str) -> pd.DataFrame:
+        """
+        获取某个交易日全市场的日线截面数据（一次调用）
+        
+        Args:
+            trade_date: 交易日，格式YYYYMMDD
+            
+        Returns:
+            包含ts_code、trade_date等列的全市场日线数据
+        """
+        try:
+            return self.router.fetch('daily_by_date', trade_date)
+        except Exception as e:
+            self.logger.error(f"获取{trade_date}全市场日线数据失败: {e}")
+            return pd.DataFrame()
+    
+    def get_daily_basic_cross_section(self, trade_date: str) -> pd.DataFrame:
+        """
+        获取某个交易日全市场的每日指标（市值、换手率，一次调用）
+        
+        Args:
+            trade_date: 交易日，格式YYYYMMDD
+        """
+        try:
+            return self._call_api(
+                'daily_basic',
+                trade_date=trade_date,
+                fields='ts_code,trade_date,close,turnover_rate,total_mv,circ_mv'
             )
+        except Exception as e:
+            self.logger.error(f"获取{trade_date}全市场每日指标失败: {e}")
+            return pd.DataFrame()
+    
+    def get_daily_data_by_dates(self,
+                                start_date: str,
+                                end_date: str,
+                                stock_codes: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        按交易日批量获取日线数据，并拆分为按股票存储的格式
+        
+        每个交易日只调用一次接口，一年约250次调用即可覆盖全市场。
+        
+        Args:
+            start_date: 开始日期，格式YYYYMMDD
+            end_date: 结束日期，格式YYYYMMDD
+            stock_codes: 只保留的股票代码，None表示全市场
             
-            if not daily_data.empty:
-                daily_data['trade_date'] = pd.to_datetime(daily_data['trade_date'])
-                daily_data = daily_data.sort_values('trade_date')
-                daily_data.set_index('trade_date', inplace=True)
-                
-            return daily_data
+        Returns:
+            {ts_code: 以trade_date为索引的日线数据}
+        """
+        trade_dates = list(self.get_trading_calendar(start_date, end_date)
+                           .range(start_date, end_date).strftime('%Y%m%d'))
+        if self.async_fetch:
+            cross_sections, adj_factors = self._get_cross_sections_async(trade_dates)
+        else:
+            cross_sections = [self.get_daily_cross_section(d) for d in trade_dates]
+            adj_factors = [
+                self.get_adj_factor_cross_section(d) if self.with_adj_factor and not cs.empty else None
+                for d, cs in zip(trade_dates, cross_sections)
+            ]
+        
+        frames = []
+        for cross_section, factors in zip(cross_sections, adj_factors):
+            if cross_section.empty:
+                continue
+            if self.with_adj_factor:
+                cross_section = self._merge_adj_factor(cross_section, factors)
+            frames.append(cross_section)
+        
+        if not frames:
+            return {}
+        
+        combined = pd.concat(frames, ignore_index=True)
+        if stock_codes is not None:
+            combined = combined[combined['ts_code'].isin(stock_codes)]
+        
+        # 以update_cache保存的最近成交量为基准检查成交量异常
+        history = self._load_volume_baseline() if self.validate_data else None
+        return self._split_by_symbol(self._validate_daily(combined, history))
+    
+    def _validate_daily(self, bars: pd.DataFrame, volume_history: pd.DataFrame = None) -> pd.DataFrame:
+        """
+        校验新获取的日线数据，剔除错误行，保留的行在quality列记录质量位（如成交量异常）
+        
+        Args:
+            bars: 新获取的日线数据
+            volume_history: 之前交易日的成交量宽表（交易日×股票），作为成交量异常检查的回看基准
+        """
+        if not self.validate_data or bars is None or bars.empty:
+            return bars
+        
+        flags = self.validator.validate(bars, volume_history)
+        self.quality_summary = self.validator.summary(flags)
+        if self.quality_summary['flagged']:
+            counts = {check: count for check, count in self.quality_summary.items()
+                      if check not in ('rows', 'flagged') and count}
+            self.logger.warning(f"日线数据质量检查: {self.quality_summary['flagged']}/{len(bars)}行异常 {counts}")
+        return self.validator.clean(bars.assign(quality=flags.to_numpy()), flags)
+    
+    def _symbol_volume_history(self, stock_code: str) -> Optional[pd.DataFrame]:
+        """本地缓存中单只股票最近的成交量，作为增量获取时成交量检查的基准"""
+        cached = self.load_data(f"daily_{stock_code}")
+        if cached.empty or 'vol' not in cached.columns:
+            return None
+        cached = cached.tail(self.validator.volume_window)
+        return pd.DataFrame({stock_code: cached['vol'].to_numpy()}, index=pd.to_datetime(cached.index.astype(str)))
+    
+    def _load_volume_baseline(self) -> Optional[pd.DataFrame]:
+        """按交易日更新缓存时保存的全市场最近成交量（交易日×股票）"""
+        baseline = self.load_data("volume_baseline")
+        if baseline.empty:
+            return None
+        baseline['trade_date'] = pd.to_datetime(baseline['trade_date'].astype(str))
+        return baseline.pivot_table(index='trade_date', columns='ts_code', values='vol', aggfunc='last')
+    
+    def _save_volume_baseline(self, history: pd.DataFrame):
+        if history.empty:
+            return
+        baseline = history.stack().rename('vol').reset_index()
+        baseline['trade_date'] = baseline['trade_date'].dt.strftime('%Y%m%d')
+        self.save_data(baseline, "volume_baseline")
+    
+    def _get_cross_sections_async(self, trade_dates: List[str]):
+        """并发获取多个交易日的日线截面和复权因子截面"""
+        requests = [('daily', {'trade_date': d}) for d in trade_dates]
+        if self.with_adj_factor:
+            requests += [('adj_factor', {'trade_date': d}) for d in trade_dates]
+        
+        results = self.async_fetcher.get_tushare_many(requests)
+        cross_sections = results[:len(trade_dates)]
+        adj_factors = results[len(trade_dates):] or [None] * len(trade_dates)
+        
+        # 并发请求只走Tushare，失败的交易日再经数据源路由获取
+        if len(self.router.sources) > 1:
+            for i, trade_date in enumerate(trade_dates):
+                if cross_sections[i] is None or cross_sections[i].empty:
+                    cross_sections[i] = self.get_daily_cross_section(trade_date)
+        return cross_sections, adj_factors
+    
+    def get_adj_factor_cross_section(self, trade_date: str) -> pd.DataFrame:
+        """获取某个交易日全市场的复权因子"""
+        try:
+            return self.router.fetch('adj_factor_by_date', trade_date)
         except Exception as e:
-            self.logger.error(f"获取{stock_code}日线数据失败: {e}")
+            self.logger.error(f"获取{trade_date}复权因子失败: {e}")
             return pd.DataFrame()
     
+    def get_adj_factor(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """获取单只股票区间复权因子，以trade_date为索引"""
+        try:
+            factors = self.router.fetch('adj_factor', stock_code, start_date, end_date)
+            return self._normalize_daily(factors)
+        except Exception as e:
+            self.logger.error(f"获取{stock_code}复权因子失败: {e}")
+            return pd.DataFrame()
+    
+    @staticmethod
+    def _merge_adj_factor(bars: pd.DataFrame, factors: pd.DataFrame) -> pd.DataFrame:
+        """按 ts_code/trade_date 将复权因子并入日线数据"""
+        if factors.empty or 'adj_factor' in bars.columns:
+            return bars
+        factors = factors[['ts_code', 'trade_date', 'adj_factor']].astype({'trade_date': str})
+        return bars.astype({'trade_date': str}).merge(factors, on=['ts_code', 'trade_date'], how='left')
+    
+    def get_adjusted_data(self,
+                          stock_code: str,
+                          start_date: str,
+                          end_date: str,
+                          how: str = 'qfq') -> pd.DataFrame:
+        """
+        获取复权日线数据
+        
+        在原始日线基础上增加 open_{how}/high_{how}/low_{how}/close_{how}/pre_close_{how} 列；
+        前复权以区间内最后一个交易日为基准。
+        
+        Args:
+            stock_code: 股票代码
+            start_date: 开始日期，格式YYYYMMDD
+            end_date: 结束日期，格式YYYYMMDD
+            how: qfq 前复权，hfq 后复权
+        """
+        daily_data = self._load_cached_daily(stock_code, start_date, end_date)
+        if daily_data is None:
+            daily_data = self.get_daily_data(stock_code, start_date, end_date)
+        if daily_data.empty:
+            return daily_data
+        
+        if 'adj_factor' not in daily_data.columns:
+            factors = self._cached(
+                ('adj_factor', stock_code, start_date, end_date),
+                lambda: self.get_adj_factor(stock_code, start_date, end_date)
+            )
+            if not factors.empty:
+                daily_data = daily_data.join(factors[['adj_factor']])
+        return adjust_prices(daily_data, how=how)
+    
+    def _load_cached_daily(self, stock_code: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        """
+        从本地日线缓存读取区间数据（随日线一并缓存了adj_factor时）
+        
+        缓存未覆盖区间内的首尾交易日时返回None。新的复权因子随增量更新追加到缓存后，
+        前复权直接按缓存的因子重新计算，不需要重新获取历史行情。
+        """
+        cached = self.load_data(f"daily_{stock_code}")
+        if cached.empty or 'adj_factor' not in cached.columns:
+            return None
+        
+        trade_dates = self.get_trading_calendar(start_date, end_date).range(start_date, end_date)
+        if not len(trade_dates) or cached.index.min() > trade_dates[0] or cached.index.max() < trade_dates[-1]:
+            return None
+        return cached.loc[trade_dates[0]:trade_dates[-1]]
+    
+    def get_multiple_stocks(self,
+                            stock_codes: List[str],
+                            start_date: str = None,
+                            end_date: str = None) -> pd.DataFrame:
+        """
+        并发获取多只股票的日线数据
+        
+        使用有界线程池并发请求，调用频率受令牌桶限流控制，
+        单次请求失败按配置的重试次数退避重试。
+        
+        Args:
+            stock_codes: 股票代码列表
+            start_date: 开始日期，格式YYYYMMDD，默认252个交易日前
+            end_date: 结束日期，格式YYYYMMDD，默认今天
+            
+        Returns:
+            以(trade_date, ts_code)为索引的长表面板数据
+        """
+        if not end_date:
+            end_date = datetime.now().strftime('%Y%m%d')
+        if not start_date:
+            start_date = self.trading_days_back(end_date, 252)
+        
+        stock_codes = list(dict.fromkeys(stock_codes))
+        if not stock_codes:
+            return pd.DataFrame()
+        
+        if self.async_fetch:
+            results = self._get_daily_many_async(stock_codes, start_date, end_date)
+        else:
+            workers = max(1, min(self.max_workers, len(stock_codes)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    lambda code: self.get_daily_data(code, start_date, end_date),
+                    stock_codes
+                ))
+        frames = [
+            daily_data.assign(ts_code=code)
+            for code, daily_data in zip(stock_codes, results)
+            if not daily_data.empty
+        ]
+        
+        if not frames:
+            return pd.DataFrame()
+        
+        # 日历已加载时，紧凑模式的面板以int32交易日序号代替日期（restore_dates还原）
+        calendar = self._calendar
+        if calendar is not None and not calendar.covers(start_date, end_date):
+            calendar = None
+        panel = self._compact(pd.concat(frames), calendar)
+        panel = panel.set_index('ts_code', append=True).sort_index()
+        return panel
+    
+    def _get_daily_many_async(self, stock_codes: List[str], start_date: str, end_date: str) -> List[pd.DataFrame]:
+        """先查缓存，未命中的股票在一个事件循环中并发获取并写入缓存"""
+        keys = {code: ('daily', code, start_date, end_date) for code in stock_codes}
+        results = {code: self.cache.get(key) for code, key in keys.items()}
+        
+        missing = [code for code, data in results.items() if data is None]
+        if missing:
+            fetched = self.async_fetcher.get_daily_many(missing, start_date, end_date)
+            for code, daily_data in fetched.items():
+                history = self._symbol_volume_history(code) if self.validate_data else None
+                daily_data = self._compact(self._normalize_daily(self._validate_daily(daily_data, history)))
+                self.cache.set(keys[code], daily_data)
+                results[code] = daily_data
+            
+            # 并发请求只走Tushare，失败的股票再经数据源路由获取（同一股票的并发请求只执行一次）
+            if len(self.router.sources) > 1:
+                for code in missing:
+                    if code not in fetched:
+                        results[code] = self.get_daily_data(code, start_date, end_date)
+        
+        return [
+            pd.DataFrame() if results[code] is None else results[code].copy()
+            for code in stock_codes
+        ]
+    
+    def _split_by_symbol(self, data: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """将多股票长表按ts_code拆分为单只股票的日线数据"""
+        return {
+            stock_code: self._compact(self._normalize_daily(group))
+            for stock_code, group in data.groupby('ts_code', sort=True)
+        }
+    
+    def _compact(self, data: pd.DataFrame, calendar: TradingCalendar = None) -> pd.DataFrame:
+        """
+        启用compact_dtypes时转换为紧凑数据类型（分类字段共享self.categories）
+        
+        Args:
+            data: 日线数据或股票列表
+            calendar: 提供时trade_date转为int32交易日序号；写入本地存储的数据不传，保留日期
+        """
+        if not self.compact_dtypes:
+            return data
+        try:
+            return compact_frame(data, categories=self.categories, calendar=calendar)
+        except ValueError as e:
+            self.logger.warning(f"交易日序号转换失败，保留日期: {e}")
+            return compact_frame(data, categories=self.categories)
+    
+    def restore_dates(self, data: pd.DataFrame) -> pd.DataFrame:
+        """将紧凑模式的int32交易日序号还原为日期，其它数据原样返回"""
+        if data.empty or self._calendar is None:
+            return data
+        if 'trade_date' in data.columns:
+            dates = data['trade_date']
+        elif 'trade_date' in data.index.names:
+            dates = data.index.get_level_values('trade_date')
+        else:
+            return data
+        if not pd.api.types.is_integer_dtype(dates):
+            return data
+        return from_date_ordinals(data, self._calendar)
+    
+    @staticmethod
+    def _normalize_daily(daily_data: pd.DataFrame) -> pd.DataFrame:
+        """统一日线数据格式：trade_date转为日期索引并升序排列"""
+        if daily_data.empty:
+            return daily_data
+        
+        daily_data = daily_data.copy()
+        daily_data['trade_date'] = pd.to_datetime(daily_data['trade_date'].astype(str))
+        daily_data = daily_data.sort_values('trade_date')
+        daily_data.set_index('trade_date', inplace=True)
+        return daily_data
+    
     def get_fundamental_data(self, 
                            stock_code: str, 
                            date: str) -> pd.DataFrame:
-        """获取基本面数据"""
+        """获取基本面数据（截至date已公告的最新一期财务指标）"""
+        return self._cached(
+            ('fundamental', stock_code, date),
+            lambda: self._fetch_fundamental_data(stock_code, date)
+        )
+    
+    def _fetch_fundamental_data(self, stock_code: str, date: str) -> pd.DataFrame:
         try:
-            # 获取财务指标数据
-            financial = self.pro.fina_indicator(
+            # 按公告日期查询最近一年内发布的财务指标，再取date时点可用的最新一期
+            start_date = (pd.Timestamp(date) - timedelta(days=400)).strftime('%Y%m%d')
+            financial = self._call_api(
+                'fina_indicator',
                 ts_code=stock_code,
-                start_date=date,
+                start_date=start_date,
                 end_date=date
             )
-            return financial
+            if financial.empty:
+                return financial
+            pit = PointInTimeFundamentals(financial, lag_days=self.announcement_lag_days)
+            return pit.as_of(date).reset_index()
         except Exception as e:
             self.logger.error(f"获取{stock_code}基本面数据失败: {e}")
             return pd.DataFrame()
     
-    def get_market_data(self, date: str) -> pd.DataFrame:
-        """获取市场整体数据"""
+    def get_fina_indicator_by_period(self, period: str) -> pd.DataFrame:
+        """
+        按报告期批量获取全市场财务指标（一次调用）
+        
+        Args:
+            period: 报告期，季度末日期，格式YYYYMMDD
+        """
         try:
-            # 获取市场整体数据
-            market_data = self.pro.index_daily(
-                ts_code='000001.SH',  # 上证指数
-                start_date=date,
-                end_date=date
+            return self._call_api(
+                'fina_indicator_vip',
+                period=period,
+                fields=','.join(INDICATOR_FIELDS)
+            )
+        except Exception as e:
+            self.logger.error(f"获取{period}报告期财务指标失败: {e}")
+            return pd.DataFrame()
+    
+    def update_fundamentals(self, start_date: str = None, end_date: str = None) -> PointInTimeFundamentals:
+        """
+        按报告期更新时点财务指标表并保存到本地
+        
+        Args:
+            start_date: 开始日期，覆盖其后的全部报告期；默认从已保存的最新报告期前一年开始
+                        （补取延迟披露和更正的公告），本地没有数据时取最近fundamentals_years年
+            end_date: 结束日期，默认今天
+        """
+        end_date = end_date or datetime.now().strftime('%Y%m%d')
+        pit = self.get_point_in_time_fundamentals()
+        if start_date is None:
+            if pit.table.empty:
+                start = pd.Timestamp(end_date) - pd.DateOffset(years=self.fundamentals_years)
+            else:
+                start = pit.table['end_date'].max() - pd.DateOffset(years=1)
+            start_date = start.strftime('%Y%m%d')
+        
+        for period in report_periods(start_date, end_date):
+            indicators = self.get_fina_indicator_by_period(period)
+            if indicators.empty:
+                continue
+            pit.append(indicators)
+            if self.market_store is not None:
+                self.market_store.upsert_fina_indicator(indicators)
+        
+        self.save_data(pit.table, "fina_indicator_pit")
+        return pit
+    
+    def get_point_in_time_fundamentals(self) -> PointInTimeFundamentals:
+        """加载本地的时点财务指标表"""
+        return PointInTimeFundamentals(
+            self.load_data("fina_indicator_pit"),
+            lag_days=self.announcement_lag_days
+        )
+    
+    def attach_fundamentals(self, panel: pd.DataFrame, pit: PointInTimeFundamentals = None) -> pd.DataFrame:
+        """
+        将时点财务指标合并到日线面板，补充 pe_ratio、pb_ratio、roe、net_profit_growth
+        
+        Args:
+            panel: 以 (trade_date, ts_code) 为索引的日线面板，如 get_multiple_stocks 的结果
+            pit: 时点财务指标表，默认加载本地缓存
+        """
+        pit = pit or self.get_point_in_time_fundamentals()
+        return pit.asof_join(panel)
+    
+    def get_factor_values(self,
+                          stock_codes: List[str],
+                          factors: List[str],
+                          start_date: str = None,
+                          end_date: str = None) -> pd.DataFrame:
+        """
+        获取多只股票的时点财务因子值（如 pe_ratio、pb_ratio、roe）
+        
+        结果按股票集合、单个因子和区间缓存，请求部分因子时可命中预加载的结果；
+        同一因子的并发请求只计算一次。
+        
+        Args:
+            stock_codes: 股票代码列表
+            factors: 因子名称列表，须为 attach_fundamentals 提供的字段
+            start_date: 开始日期，格式YYYYMMDD，默认252个交易日前
+            end_date: 结束日期，格式YYYYMMDD，默认今天
+            
+        Returns:
+            以(trade_date, ts_code)为索引、每个因子一列的面板
+        """
+        if not end_date:
+            end_date = datetime.now().strftime('%Y%m%d')
+        if not start_date:
+            start_date = self.trading_days_back(end_date, 252)
+        
+        codes = tuple(sorted(set(stock_codes)))
+        names = tuple(sorted(set(factors)))
+        if not codes or not names:
+            return pd.DataFrame()
+        
+        values = [
+            self._cached(
+                ('factor_values', codes, name, start_date, end_date),
+                lambda name=name: self._compute_factor_values(list(codes), [name], start_date, end_date)
             )
-            return market_data
+            for name in dict.fromkeys(factors)
+        ]
+        values = [value for value in values if not value.empty]
+        return pd.concat(values, axis=1) if values else pd.DataFrame()
+    
+    def _compute_factor_values(self,
+                               stock_codes: List[str],
+                               factors: List[str],
+                               start_date: str,
+                               end_date: str) -> pd.DataFrame:
+        try:
+            panel = self.get_multiple_stocks(stock_codes, start_date, end_date)
+            if panel.empty:
+                return pd.DataFrame()
+            
+            merged = self.attach_fundamentals(self.restore_dates(panel))
+            missing = [name for name in factors if name not in merged.columns]
+            if missing:
+                self.logger.warning(f"没有可用的财务数据计算因子: {missing}")
+            return merged[[name for name in factors if name in merged.columns]]
         except Exception as e:
-            self.logger.error(f"获取市场整体数据失败: {e}")
+            self.logger.error(f"计算因子{factors}失败: {e}")
+            return pd.DataFrame()
+    
+    def get_market_data(self, date: str, index_codes: List[str] = None) -> pd.DataFrame:
+        """
+        获取市场整体数据（指数当日行情）
+        
+        Args:
+            date: 交易日，格式YYYYMMDD
+            index_codes: 指数代码列表，默认上证指数
+        """
+        data = self.get_index_data(index_codes or [BENCHMARK_INDICES['上证指数']], date, date)
+        if data.empty:
+            return data
+        data = data.reset_index()
+        data['trade_date'] = data['trade_date'].dt.strftime('%Y%m%d')
+        return data
+    
+    @staticmethod
+    def to_index_code(index: str) -> str:
+        """指数名称（如'沪深300'）转换为代码，代码原样返回"""
+        return BENCHMARK_INDICES.get(index, index)
+    
+    def get_index_daily(self, index_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        获取单个指数的日线，以trade_date为索引
+        
+        本地指数缓存与股票日线使用同一存储（index_<代码>），首次只获取请求的区间，
+        之后超出已覆盖范围时向前或向后补齐；早于index_start的日期不会补取。
+        """
+        index_code = self.to_index_code(index_code)
+        return self._cached(
+            ('index_daily', index_code, start_date, end_date),
+            lambda: self._load_index_daily(index_code, start_date, end_date)
+        )
+    
+    def _load_index_daily(self, index_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        try:
+            self._sync_index(index_code, start_date, end_date)
+            index_daily = self.load_data(f"index_{index_code}")
+            if index_daily.empty:
+                return index_daily
+            return index_daily.loc[pd.Timestamp(start_date):pd.Timestamp(end_date)]
+        except Exception as e:
+            self.logger.error(f"获取指数{index_code}日线失败: {e}")
+            return pd.DataFrame()
+    
+    def _sync_index(self, index_code: str, start_date: Optional[str], end_date: str):
+        """
+        将本地指数缓存补齐到覆盖[start_date, end_date]（同一区间的并发补齐只执行一次）
+        
+        Args:
+            index_code: 指数代码
+            start_date: 需要覆盖的开始日期，None表示已覆盖的最早日期（未缓存时为index_start）
+            end_date: 需要覆盖的结束日期
+        """
+        manifest_path = self.data_dir / "index_manifest.json"
+        with self._index_lock:
+            manifest = CacheManifest(manifest_path)
+            watermark = manifest.get_watermark(index_code)
+            # 旧版清单没有记录最早日期，当时从index_start开始缓存
+            first = manifest.get_start(index_code) or (self.index_start if watermark is not None else None)
+        
+        start_date = max(start_date or first or self.index_start, self.index_start)
+        end_date = min(end_date, datetime.now().strftime('%Y%m%d'))
+        if watermark is None:
+            ranges = [(start_date, end_date)]
+        else:
+            ranges = [(start_date, (pd.Timestamp(first) - timedelta(days=1)).strftime('%Y%m%d')),
+                      (self._next_date(watermark), end_date)]
+        
+        for range_start, range_end in ranges:
+            if range_start > range_end:
+                continue
+            fetched = self.single_flight.do(
+                ('index_sync', index_code, range_start, range_end),
+                lambda s=range_start, e=range_end: self._fetch_index_range(index_code, s, e)
+            )
+            self._store_index(manifest_path, index_code, range_start, fetched)
+    
+    def _store_index(self, manifest_path: Path, index_code: str, start_date: str, fetched: pd.DataFrame):
+        """写入新获取的指数日线，并将已覆盖区间扩展到start_date"""
+        with self._index_lock:
+            manifest = CacheManifest(manifest_path)
+            watermark = manifest.get_watermark(index_code)
+            first = manifest.get_start(index_code) or (self.index_start if watermark is not None else None)
+            if watermark is not None:
+                # 丢弃并发补齐时已写入的日期
+                fetched = fetched[(fetched.index < pd.Timestamp(first)) | (fetched.index > pd.Timestamp(watermark))]
+            
+            if not fetched.empty:
+                if watermark is not None and fetched.index.min() > pd.Timestamp(watermark):
+                    self.append_data(fetched, f"index_{index_code}")
+                else:
+                    index_daily = pd.concat([fetched, self.load_data(f"index_{index_code}")]).sort_index()
+                    self.save_data(index_daily[~index_daily.index.duplicated(keep='first')], f"index_{index_code}")
+                if self.market_store is not None:
+                    self.market_store.upsert_index_bars(fetched)
+                if watermark is None or fetched.index.max() > pd.Timestamp(watermark):
+                    watermark = fetched.index.max().strftime('%Y%m%d')
+                    manifest.set_watermark(index_code, watermark)
+            
+            # 补取的区间即使没有数据（如指数基日之前）也记为已覆盖
+            if watermark is not None:
+                manifest.extend_start(index_code, min(start_date, first or start_date))
+            if manifest.changed:
+                manifest.save()
+    
+    def _fetch_index_range(self, index_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """按index_batch_years分段获取指数日线（单次接口调用的返回行数有上限）"""
+        frames = []
+        start = pd.Timestamp(start_date)
+        while start <= pd.Timestamp(end_date):
+            end = min(start + pd.DateOffset(years=self.index_batch_years) - timedelta(days=1), pd.Timestamp(end_date))
+            frames.append(self.router.fetch(
+                'index_daily', index_code, start.strftime('%Y%m%d'), end.strftime('%Y%m%d')
+            ))
+            start = end + timedelta(days=1)
+        
+        frames = [frame for frame in frames if frame is not None and not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        index_daily = self._normalize_daily(pd.concat(frames, ignore_index=True))
+        return index_daily[~index_daily.index.duplicated(keep='last')]
+    
+    def get_index_data(self,
+                       index_codes: List[str],
+                       start_date: str = None,
+                       end_date: str = None) -> pd.DataFrame:
+        """
+        批量获取多个指数的日线
+        
+        Args:
+            index_codes: 指数代码或名称列表，如 ['000300.SH', '中证500']
+            start_date: 开始日期，格式YYYYMMDD，默认252个交易日前
+            end_date: 结束日期，格式YYYYMMDD，默认今天
+            
+        Returns:
+            以(trade_date, ts_code)为索引的长表
+        """
+        if not end_date:
+            end_date = datetime.now().strftime('%Y%m%d')
+        if not start_date:
+            start_date = self.trading_days_back(end_date, 252)
+        
+        index_codes = list(dict.fromkeys(self.to_index_code(code) for code in index_codes))
+        if not index_codes:
+            return pd.DataFrame()
+        
+        workers = max(1, min(self.max_workers, len(index_codes)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda code: self.get_index_daily(code, start_date, end_date),
+                index_codes
+            ))
+        frames = [
+            index_daily.assign(ts_code=code)
+            for code, index_daily in zip(index_codes, results)
+            if not index_daily.empty
+        ]
+        if not frames:
             return pd.DataFrame()
+        return pd.concat(frames).set_index('ts_code', append=True).sort_index()
+    
+    def get_index_panel(self,
+                        index_codes: List[str],
+                        start_date: str = None,
+                        end_date: str = None,
+                        field: str = 'close') -> pd.DataFrame:
+        """
+        多个指数的单字段宽表，行对齐到交易日历，便于与股票面板做向量化计算
+        
+        Args:
+            index_codes: 指数代码或名称列表
+            start_date: 开始日期，格式YYYYMMDD，默认252个交易日前
+            end_date: 结束日期，格式YYYYMMDD，默认今天
+            field: 字段，如 'close'、'pct_chg'
+            
+        Returns:
+            行为交易日、列为指数代码的宽表，缺失交易日为NaN
+        """
+        if not end_date:
+            end_date = datetime.now().strftime('%Y%m%d')
+        if not start_date:
+            start_date = self.trading_days_back(end_date, 252)
+        
+        index_codes = list(dict.fromkeys(self.to_index_code(code) for code in index_codes))
+        data = self.get_index_data(index_codes, start_date, end_date)
+        panel = data[field].unstack('ts_code') if not data.empty else pd.DataFrame()
+        
+        trade_dates = self.get_trading_calendar(start_date, end_date).range(start_date, end_date)
+        if not len(trade_dates):
+            trade_dates = panel.index
+        panel = panel.reindex(index=pd.DatetimeIndex(trade_dates, name='trade_date'), columns=index_codes)
+        panel.columns.name = 'ts_code'
+        return panel
+    
+    def update_indices(self, index_codes: List[str] = None, end_date: str = None) -> int:
+        """
+        将指数本地缓存增量更新到end_date
+        
+        Args:
+            index_codes: 指数代码列表，默认配置的index_codes
+            end_date: 结束日期，默认今天
+            
+        Returns:
+            更新的指数数
+        """
+        end_date = end_date or datetime.now().strftime('%Y%m%d')
+        index_codes = [self.to_index_code(code) for code in (index_codes or self.index_codes)]
+        
+        def sync(code):
+            try:
+                self._sync_index(code, None, end_date)
+                return True
+            except Exception as e:
+                self.logger.error(f"更新指数{code}失败: {e}")
+                return False
+        
+        workers = max(1, min(self.max_workers, len(index_codes) or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            updated = sum(executor.map(sync, index_codes))
+        self.logger.info(f"指数缓存更新完成: {updated}/{len(index_codes)}")
+        return updated
     
     def save_data(self, data: pd.DataFrame, filename: str):
         """保存数据到本地"""
         try:
-            data_dir = Path("data")
-            data_dir.mkdir(exist_ok=True)
-            
-            file_path = data_dir / f"{filename}.csv"
-            data.to_csv(file_path, index=True)
+            file_path = self.storage.save(data, filename)
             self.logger.info(f"数据已保存: {file_path}")
         except Exception as e:
             self.logger.error(f"保存数据失败: {e}")
     
-    def load_data(self, filename: str) -> pd.DataFrame:
-        """从本地加载数据"""
+    def load_data(self, filename: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        从本地加载数据
+        
+        Args:
+            filename: 数据名称
+            columns: 只读取的列，None表示全部
+        """
         try:
-            file_path = Path("data") / f"{filename}.csv"
-            if file_path.exists():
-                return pd.read_csv(file_path, index_col=0)
+            if self.storage.exists(filename):
+                return self.storage.load(filename, columns=columns)
+            
+            # 兼容旧版CSV缓存
+            legacy = CsvStorage(self.data_dir)
+            if legacy.exists(filename):
+                return legacy.load(filename, columns=columns)
             return pd.DataFrame()
         except Exception as e:
             self.logger.error(f"加载数据失败: {e}")
             return pd.DataFrame()
     
+    def append_data(self, data: pd.DataFrame, filename: str):
+        """追加数据到本地文件，文件不存在时新建"""
+        try:
+            file_path = self.storage.append(data, filename)
+            self.logger.info(f"数据已追加: {file_path} (+{len(data)}行)")
+        except Exception as e:
+            self.logger.error(f"追加数据失败: {e}")
+    
+    def export_csv(self, data: pd.DataFrame, filename: str, export_dir: str = None) -> Optional[Path]:
+        """
+        导出数据为CSV文件
+        
+        Args:
+            data: 待导出的数据
+            filename: 文件名（不含扩展名）
+            export_dir: 导出目录，默认 data_dir/export
+        """
+        try:
+            file_path = CsvStorage(export_dir or self.data_dir / "export").save(data, filename)
+            self.logger.info(f"数据已导出: {file_path}")
+            return file_path
+        except Exception as e:
+            self.logger.error(f"导出数据失败: {e}")
+            return None
+    
+    def load_daily_bars(self, stock_code: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+        """从行情数据库查询单只股票的区间日线"""
+        if self.market_store is None:
+            self.logger.warning("未配置行情数据库")
+            return pd.DataFrame()
+        try:
+            return self.market_store.get_daily_bars(stock_code, start_date, end_date)
+        except Exception as e:
+            self.logger.error(f"查询{stock_code}日线数据失败: {e}")
+            return pd.DataFrame()
+    
+    def load_cross_section(self, trade_date: str) -> pd.DataFrame:
+        """从行情数据库查询某交易日全市场日线"""
+        if self.market_store is None:
+            self.logger.warning("未配置行情数据库")
+            return pd.DataFrame()
+        try:
+            return self.market_store.get_cross_section(trade_date)
+        except Exception as e:
+            self.logger.error(f"查询{trade_date}截面数据失败: {e}")
+            return pd.DataFrame()
+    
+    def list_cached_symbols(self) -> List[str]:
+        """列出本地已缓存日线数据的股票代码"""
+        prefix = "daily_"
+        return sorted(
+            path.name[len(prefix):-len(self.storage.suffix)]
+            for path in self.data_dir.glob(f"{prefix}*{self.storage.suffix}")
+        )
+    
+    def build_panel(self,
+                    panel_dir: Union[str, Path] = None,
+                    fields: List[str] = None) -> Optional[PanelStore]:
+        """
+        由本地日线缓存构建内存映射面板
+        
+        Args:
+            panel_dir: 面板目录，默认 data_dir/panel
+            fields: 写入的字段，默认开高低收、成交量、成交额
+            
+        Returns:
+            构建好的面板存储，失败返回None
+        """
+        panel_dir = panel_dir or self.data_dir / "panel"
+        fields = list(fields or PanelStore.FIELDS)
+        
+        try:
+            symbols = self.list_cached_symbols()
+            
+            # 第一遍只读取日期索引，确定日期轴
+            dates = set()
+            for stock_code in symbols:
+                dates.update(self.load_data(f"daily_{stock_code}", columns=[]).index)
+            
+            daily_frames = (
+                (stock_code, self.load_data(f"daily_{stock_code}", columns=fields))
+                for stock_code in symbols
+            )
+            panel = PanelStore.build(panel_dir, daily_frames, dates, symbols, fields)
+            self.logger.info(f"面板构建完成: {panel_dir} {panel.shape}")
+            return panel
+        except Exception as e:
+            self.logger.error(f"构建面板失败: {e}")
+            return None
+    
+    def open_panel(self, panel_dir: Union[str, Path] = None) -> PanelStore:
+        """打开已构建的内存映射面板"""
+        return PanelStore(panel_dir or self.data_dir / "panel")
+    
+    def build_dataset(self, batch_size: int = 500) -> int:
+        """
+        由本地日线缓存构建分区数据集
+        
+        Args:
+            batch_size: 每批合并写入的股票数，控制内存占用
+            
+        Returns:
+            写入的行数
+        """
+        rows = 0
+        try:
+            symbols = self.list_cached_symbols()
+            for start in range(0, len(symbols), batch_size):
+                frames = [
+                    self.load_data(f"daily_{stock_code}").assign(ts_code=stock_code)
+                    for stock_code in symbols[start:start + batch_size]
+                ]
+                frames = [frame for frame in frames if not frame.empty]
+                if frames:
+                    batch = pd.concat(frames)
+                    self.dataset.write(batch)
+                    rows += len(batch)
+            self.logger.info(f"分区数据集构建完成: {len(self.dataset.partitions)} 个分区, {rows} 行")
+        except Exception as e:
+            self.logger.error(f"构建分区数据集失败: {e}")
+        return rows
+    
+    def query_daily(self,
+                    start_date: str = None,
+                    end_date: str = None,
+                    stock_codes: Optional[List[str]] = None,
+                    industry: Union[str, List[str]] = None,
+                    columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        从分区数据集（已固定快照时为快照）查询日线，只读取与条件相交的分区
+        
+        Args:
+            start_date: 开始日期，格式YYYYMMDD
+            end_date: 结束日期，格式YYYYMMDD
+            stock_codes: 股票代码列表
+            industry: 行业（或行业列表），按股票列表换算为股票代码后与stock_codes取交集
+            columns: 只读取的列
+            
+        Returns:
+            以(trade_date, ts_code)为索引的长表
+        """
+        try:
+            if industry is not None:
+                industries = [industry] if isinstance(industry, str) else list(industry)
+                stock_list = self.load_data("stock_list")
+                if stock_list.empty:
+                    stock_list = self.get_stock_list()
+                members = stock_list.loc[stock_list['industry'].isin(industries), 'ts_code'].astype(str)
+                if stock_codes is not None:
+                    members = members[members.isin(stock_codes)]
+                stock_codes = members.tolist()
+            
+            return (self.snapshot or self.dataset).query(start_date, end_date, stock_codes, columns)
+        except Exception as e:
+            self.logger.error(f"查询分区数据集失败: {e}")
+            return pd.DataFrame()
+    
+    def create_snapshot(self, pin: bool = True) -> DatasetSnapshot:
+        """
+        为分区数据集当前内容创建不可变快照
+        
+        Args:
+            pin: 是否固定该快照，之后的query_daily只读取快照数据
+        """
+        snapshot = DatasetSnapshot.create(self.dataset)
+        self.logger.info(f"创建数据集快照: {snapshot.snapshot_id} ({len(snapshot.partitions)} 个分区)")
+        if pin:
+            self.snapshot = snapshot
+        return snapshot
+    
+    def pin_snapshot(self, snapshot_id: str) -> DatasetSnapshot:
+        """
+        固定已有快照，之后的query_daily只读取快照数据
+        
+        Raises:
+            FileNotFoundError: 快照不存在
+        """
+        self.snapshot = DatasetSnapshot.open(self.dataset, snapshot_id)
+        return self.snapshot
+    
+    def unpin_snapshot(self):
+        """取消固定快照，恢复读取最新数据集"""
+        self.snapshot = None
+    
+    def list_snapshots(self) -> List[str]:
+        """已有的数据集快照id"""
+        return DatasetSnapshot.available(self.dataset)
+    
+    def iter_cross_sections(self,
+                            start_date: str = None,
+                            end_date: str = None,
+                            fields: List[str] = None,
+                            lookback: int = 0,
+                            panel_dir: Union[str, Path] = None) -> CrossSectionStream:
+        """
+        按交易日逐个读取全市场截面，适合超出内存的长历史计算
+        
+        优先从内存映射面板读取，未构建面板时从行情数据库逐日读取；
+        分块大小和预取块数由 performance.streaming 配置。
+        
+        Args:
+            start_date: 开始日期，格式YYYYMMDD
+            end_date: 结束日期，格式YYYYMMDD
+            fields: 字段，默认开高低收、成交量、成交额
+            lookback: 回看缓冲保留的历史交易日数
+            panel_dir: 面板目录，默认 data_dir/panel
+            
+        Returns:
+            可迭代的截面数据流
+        """
+        fields = list(fields or PanelStore.FIELDS)
+        options = {
+            'lookback': lookback,
+            'chunk_size': self._get_config('performance.streaming.chunk_size', 20),
+            'prefetch': self._get_config('performance.streaming.prefetch', 1)
+        }
+        
+        panel_dir = Path(panel_dir or self.data_dir / "panel")
+        if (panel_dir / 'meta.json').exists():
+            return CrossSectionStream.from_panel(PanelStore(panel_dir), start_date, end_date, fields, **options)
+        
+        if self.market_store is None:
+            raise FileNotFoundError(f"未找到面板 {panel_dir}，且未配置行情数据库")
+        
+        end_date = end_date or datetime.now().strftime('%Y%m%d')
+        start_date = start_date or self.trading_days_back(end_date, 252)
+        trade_dates = self.get_trading_calendar(start_date, end_date).range(start_date, end_date)
+        symbols = self.market_store.get_stock_basic()['ts_code'].tolist() or self.list_cached_symbols()
+        return CrossSectionStream.from_store(self.market_store, trade_dates, symbols, fields, **options)
+    
+    def update_universe(self, start_date: str = None, end_date: str = None, bars: pd.DataFrame = None) -> int:
+        """
+        追加股票池位图索引中尚未包含的交易日
+        
+        日线截面依次取自bars、行情数据库和分区数据集，都没有的交易日才调用接口；
+        每日指标每个新增交易日调用一次接口。ST状态按名称变更历史判断。
+        
+        Args:
+            start_date: 索引为空时的开始日期，默认cache_days个交易日前
+            end_date: 结束日期，默认今天
+            bars: 本次已获取的日线长表（含ts_code、trade_date列）
+            
+        Returns:
+            新增的交易日数
+        """
+        end_date = end_date or datetime.now().strftime('%Y%m%d')
+        if len(self.universe.dates):
+            start_date = self._next_date(self.universe.dates[-1].strftime('%Y%m%d'))
+        else:
+            start_date = start_date or self.trading_days_back(end_date, self.cache_days)
+        
+        calendar = self.get_trading_calendar(start_date, end_date)
+        trade_dates = calendar.range(start_date, end_date).strftime('%Y%m%d')
+        if not len(trade_dates):
+            return 0
+        
+        stock_list = self.load_data("stock_list")
+        if stock_list.empty:
+            stock_list = self.get_stock_list()
+        
+        cross_sections = self._cached_cross_sections(list(trade_dates), bars)
+        name_history = self.get_name_history()
+        
+        added = 0
+        for trade_date in trade_dates:
+            daily = cross_sections.get(trade_date)
+            if daily is None:
+                daily = self.get_daily_cross_section(trade_date)
+            if daily.empty:
+                # 当日数据尚未发布，之后再追加
+                break
+            self.universe.update(trade_date, daily, self.get_daily_basic_cross_section(trade_date),
+                                 stock_list, calendar, name_history)
+            added += 1
+        
+        self.universe.save()
+        self.logger.info(f"股票池位图索引更新完成: 新增{added}个交易日, {self.universe.shape}")
+        return added
+    
+    def _cached_cross_sections(self, trade_dates: List[str], bars: pd.DataFrame = None) -> Dict[str, pd.DataFrame]:
+        """
+        已获取或本地已有的全市场日线截面
+        
+        Args:
+            trade_dates: 交易日列表（YYYYMMDD）
+            bars: 已获取的日线长表（含ts_code、trade_date列）
+            
+        Returns:
+            {交易日: 全市场日线}，本地没有的交易日不在结果中
+        """
+        cross_sections = {}
+        if bars is not None and not bars.empty:
+            dates = pd.to_datetime(bars['trade_date'].astype(str)).dt.strftime('%Y%m%d')
+            cross_sections = {trade_date: group for trade_date, group in bars.groupby(dates)}
+        
+        missing = [trade_date for trade_date in trade_dates if trade_date not in cross_sections]
+        if not missing:
+            return cross_sections
+        
+        if self.market_store is not None:
+            for trade_date in missing:
+                cross_section = self.load_cross_section(trade_date)
+                if not cross_section.empty:
+                    cross_sections[trade_date] = cross_section.reset_index()
+        elif self.write_dataset:
+            try:
+                stored = self.dataset.query(min(missing), max(missing)).reset_index()
+            except Exception as e:
+                self.logger.warning(f"读取分区数据集失败: {e}")
+                stored = pd.DataFrame()
+            if not stored.empty:
+                dates = stored['trade_date'].dt.strftime('%Y%m%d')
+                cross_sections.update({
+                    trade_date: group for trade_date, group in stored.groupby(dates) if trade_date in missing
+                })
+        return cross_sections
+    
+    def get_name_history(self) -> pd.DataFrame:
+        """获取股票名称变更历史（含ST戴帽、摘帽），用于按交易日判断ST状态"""
+        try:
+            return self._call_api('namechange', fields='ts_code,name,start_date,end_date,change_reason')
+        except Exception as e:
+            self.logger.error(f"获取股票名称变更历史失败: {e}")
+            return pd.DataFrame()
+    
     def update_cache(self, force_update: bool = False):
-        """更新数据缓存"""
+        """
+        更新数据缓存
+        
+        根据缓存清单中记录的水位，只获取上次更新之后的交易日并追加到本地文件。
+        
+        Args:
+            force_update: 是否忽略水位，按cache_days重新构建全部缓存
+        """
         self.logger.info("开始更新数据缓存...")
         
+        manifest = CacheManifest(self.data_dir / "cache_manifest.json")
+        if force_update:
+            manifest.reset()
+        
         # 获取股票列表
         stock_list = self.get_stock_list()
         if not stock_list.empty:
             self.save_data(stock_list, "stock_list")
+            if self.market_store is not None:
+                self.market_store.upsert_stock_basic(stock_list)
         
-        # 获取最近交易数据
+        # 获取水位之后的交易数据
         end_date = datetime.now().strftime('%Y%m%d')
-        start_date = (datetime.now() - timedelta(days=30)).strftime('%Y%m%d')
+        history_start = self.trading_days_back(end_date, self.cache_days)
+        stored = []
+        fetched = None
         
-        # 分批获取数据，避免API限制
-        for idx, row in stock_list.head(100).iterrows():  # 限制前100只股票
-            stock_code = row['ts_code']
-            daily_data = self.get_daily_data(stock_code, start_date, end_date)
-            if not daily_data.empty:
-                self.save_data(daily_data, f"daily_{stock_code}")
+        if self.fetch_mode == 'by_date':
+            # 按交易日获取全市场截面，再拆分到每只股票
+            start_date = self._next_date(manifest.last_trade_date) or history_start
+            if start_date <= end_date:
+                daily_by_symbol = self._truncate_at_gap(
+                    self.get_daily_data_by_dates(start_date, end_date), start_date, end_date
+                )
+                if daily_by_symbol:
+                    fetched = pd.concat(daily_by_symbol.values()).reset_index()
+                    if self.validate_data:
+                        self._save_volume_baseline(
+                            self.validator.volume_history(fetched, self._load_volume_baseline())
+                        )
+                for stock_code, daily_data in daily_by_symbol.items():
+                    stored.append(self._store_daily(manifest, stock_code, daily_data))
+                    manifest.advance(daily_data.index.max().strftime('%Y%m%d'))
+        else:
+            # 逐只股票获取，避免API限制只取前100只
+            for idx, row in stock_list.head(100).iterrows():
+                stock_code = row['ts_code']
+                start_date = self._next_date(manifest.get_watermark(stock_code)) or history_start
+                if start_date > end_date:
+                    continue
+                daily_data = self.get_daily_data(stock_code, start_date, end_date)
+                if not daily_data.empty:
+                    stored.append(self._store_daily(manifest, stock_code, daily_data))
+        
+        # 新增数据一次写入分区数据集，每个分区只重写一次
+        if self.write_dataset:
+            stored = [daily_data for daily_data in stored if not daily_data.empty]
+            if stored:
+                self.dataset.write(pd.concat(stored))
         
-        self.logger.info("数据缓存更新完成")
\ No newline at end of file
+        if self.update_universe_index:
+            self.update_universe(history_start, end_date, fetched)
+        
+        if self.index_codes:
+            self.update_indices(self.index_codes, end_date)
+        
+        if self.pit_fundamentals:
+            self.update_fundamentals(end_date=end_date)
+        
+        if manifest.changed:
+            manifest.save()
+        self.logger.info(f"数据缓存更新完成，最新交易日: {manifest.last_trade_date}")
+    
+    def _truncate_at_gap(self,
+                         daily_by_symbol: Dict[str, pd.DataFrame],
+                         start_date: str,
+                         end_date: str) -> Dict[str, pd.DataFrame]:
+        """
+        截面获取失败的交易日没有任何数据，只保留第一个缺失交易日之前的数据，
+        使水位停在缺失日之前，下次更新从该日重新获取
+        """
+        trade_dates = self.get_trading_calendar(start_date, end_date).range(start_date, end_date)
+        fetched_dates = set()
+        for daily_data in daily_by_symbol.values():
+            fetched_dates.update(daily_data.index)
+        missing = [d for d in trade_dates if d not in fetched_dates]
+        if not missing:
+            return daily_by_symbol
+        
+        first_missing = missing[0]
+        self.logger.warning(f"交易日{first_missing.strftime('%Y%m%d')}没有获取到截面数据，本次只更新到其前一交易日")
+        truncated = {
+            stock_code: daily_data[daily_data.index < first_missing]
+            for stock_code, daily_data in daily_by_symbol.items()
+        }
+        return {stock_code: daily_data for stock_code, daily_data in truncated.items() if not daily_data.empty}
+    
+    def _store_daily(self, manifest: CacheManifest, stock_code: str, daily_data: pd.DataFrame) -> pd.DataFrame:
+        """将新获取的日线数据写入本地缓存并推进水位，返回实际写入的数据"""
+        watermark = manifest.get_watermark(stock_code)
+        filename = f"daily_{stock_code}"
+        
+        if watermark is None:
+            self.save_data(daily_data, filename)
+        else:
+            daily_data = daily_data[daily_data.index > pd.Timestamp(watermark)]
+            if daily_data.empty:
+                return daily_data
+            self.append_data(daily_data, filename)
+        
+        if self.market_store is not None:
+            self.market_store.upsert_daily_bars(daily_data)
+        
+        manifest.set_watermark(stock_code, daily_data.index.max().strftime('%Y%m%d'))
+        return daily_data.assign(ts_code=stock_code)
+    
+    @staticmethod
+    def _next_date(date: Optional[str]) -> Optional[str]:
+        """返回YYYYMMDD日期的下一天，None原样返回"""
+        if date is None:
+            return None
+        return (pd.Timestamp(date) + timedelta(days=1)).strftime('%Y%m%d')
@@ -0,0 +1,152 @@
+"""
+时点财务数据 - 以公告日期为准的财务指标表和向量化的as-of合并
+
+财务指标按公告日期（ann_date）生效，而不是报告期（end_date），
+避免在报告公布前使用其数据造成未来函数。
+"""
+
+import logging
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Tushare fina_indicator 字段 -> 因子使用的字段
+FACTOR_FIELDS = {
+    'roe': 'roe',
+    'netprofit_yoy': 'net_profit_growth',
+}
+
+# attach_fundamentals 提供、可由 DataManager.get_factor_values 获取的因子
+FUNDAMENTAL_FACTORS = ['pe_ratio', 'pb_ratio'] + list(FACTOR_FIELDS.values())
+
+INDICATOR_FIELDS = ['ts_code', 'ann_date', 'end_date', 'eps', 'bps', 'roe', 'roa',
+                    'grossprofit_margin', 'netprofit_margin', 'debt_to_assets',
+                    'netprofit_yoy', 'or_yoy']
+
+def report_periods(start_date: str, end_date: str) -> List[str]:
+    """
+    区间内的报告期（季度末），格式YYYYMMDD
+
+    Args:
+        start_date: 开始日期
+        end_date: 结束日期
+    """
+    # 季度Period在pandas 2.0之后各版本写法一致（季度末偏移别名'QE'需要pandas>=2.2）
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    quarter_ends = pd.period_range(start, end, freq='Q').to_timestamp(how='end').normalize()
+    return list(quarter_ends[(quarter_ends >= start) & (quarter_ends <= end)].strftime('%Y%m%d'))
+
+class PointInTimeFundamentals:
+    """时点财务指标表"""
+
+    def __init__(self, indicators: pd.DataFrame = None, lag_days: int = 1):
+        """
+        初始化时点财务指标表
+
+        Args:
+            indicators: fina_indicator 原始数据，需包含 ts_code/ann_date/end_date
+            lag_days: 公告后延迟生效的自然日数（公告多在收盘后发布，默认次日可用）
+        """
+        self.logger = logging.getLogger(__name__)
+        self.lag_days = lag_days
+        self.table = pd.DataFrame(columns=INDICATOR_FIELDS)
+        if indicators is not None:
+            self.append(indicators)
+
+    def append(self, indicators: pd.DataFrame):
+        """追加财务指标（重复的 ts_code/end_date/ann_date 以新数据为准）"""
+        if indicators is None or indicators.empty:
+            return
+
+        new = indicators.dropna(subset=['ann_date', 'end_date']).copy()
+        for col in ('ann_date', 'end_date'):
+            new[col] = pd.to_datetime(new[col].astype(str))
+
+        table = pd.concat([self.table, new], ignore_index=True) if not self.table.empty else new
+        table = table.drop_duplicates(['ts_code', 'end_date', 'ann_date'], keep='last')
+        self.table = table.sort_values(['ts_code', 'ann_date', 'end_date']).reset_index(drop=True)
+
+    def effective_records(self) -> pd.DataFrame:
+        """
+        生成按生效日期排列的记录
+
+        同一股票在公告较早报告期的更正时，不应覆盖已公布的更新报告期，
+        因此只保留报告期不早于此前已公布最新报告期的记录。
+        """
+        table = self.table
+        if table.empty:
+            return table.assign(available_date=pd.Series(dtype='datetime64[ns]'))
+
+        latest_period = table.groupby('ts_code')['end_date'].cummax()
+        records = table[table['end_date'] >= latest_period].copy()
+
+        records['available_date'] = records['ann_date'] + pd.Timedelta(days=self.lag_days)
+        # 年初至今EPS年化：一季报×4，半年报×2，三季报×4/3，年报×1
+        if 'eps' in records.columns:
+            months = records['end_date'].dt.month
+            records['eps_annualized'] = records['eps'].astype(float) * 12 / months
+        for source, target in FACTOR_FIELDS.items():
+            if source in records.columns:
+                records[target] = records[source].astype(float)
+
+        # 同一生效日有多条记录时保留报告期最新的一条
+        records = records.sort_values(['available_date', 'ts_code', 'end_date'])
+        records = records.drop_duplicates(['ts_code', 'available_date'], keep='last')
+        return records.reset_index(drop=True)
+
+    def asof_join(self, panel: pd.DataFrame, fields: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        将财务指标按生效日期as-of合并到日线面板（全市场一次完成）
+
+        Args:
+            panel: 以 (trade_date, ts_code) 为索引或包含这两列的日线面板
+            fields: 合并的字段，默认 roe、net_profit_growth、eps_annualized、bps、end_date
+
+        Returns:
+            与panel行顺序一致、增加财务字段的面板；包含close时同时计算pe_ratio、pb_ratio
+        """
+        fields = fields or ['end_date', 'eps_annualized', 'bps'] + list(FACTOR_FIELDS.values())
+        index_names = None
+        if isinstance(panel.index, pd.MultiIndex):
+            index_names = list(panel.index.names)
+            panel = panel.reset_index()
+
+        records = self.effective_records()
+        fields = [field for field in fields if field in records.columns]
+
+        left = panel.assign(_row=np.arange(len(panel)))
+        left['trade_date'] = pd.to_datetime(left['trade_date'])
+        right = records[['ts_code', 'available_date'] + fields].copy()
+        right['available_date'] = right['available_date'].astype(left['trade_date'].dtype)
+        left['ts_code'] = left['ts_code'].astype(str)
+        right['ts_code'] = right['ts_code'].astype(str)
+
+        merged = pd.merge_asof(
+            left.sort_values('trade_date'),
+            right.sort_values('available_date'),
+            left_on='trade_date',
+            right_on='available_date',
+            by='ts_code',
+            direction='backward'
+        )
+        merged = merged.sort_values('_row').drop(columns=['_row', 'available_date'])
+        merged.index = panel.index
+
+        if 'close' in merged.columns and 'eps_annualized' in merged.columns:
+            eps = merged['eps_annualized'].where(merged['eps_annualized'] != 0)
+            merged['pe_ratio'] = merged['close'] / eps
+
+        if 'close' in merged.columns and 'bps' in merged.columns:
+            bps = merged['bps'].astype(float)
+            merged['pb_ratio'] = merged['close'] / bps.where(bps != 0)
+
+        if index_names is not None:
+            merged = merged.set_index(index_names)
+        return merged
+
+    def as_of(self, date) -> pd.DataFrame:
+        """某一日期可用的全市场最新财务指标，以ts_code为索引"""
+        records = self.effective_records()
+        records = records[records['available_date'] <= pd.Timestamp(date)]
+        return records.drop_duplicates('ts_code', keep='last').set_index('ts_code').sort_index()
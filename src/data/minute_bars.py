@@ -0,0 +1,365 @@
+"""
+分钟线 - 紧凑的分钟线存储与向量化重采样
+
+分钟线行数是日线的240倍，存储和计算都按紧凑布局处理：
+- 时间为int32的分钟数（自1970-01-01起的交易所本地时间分钟），价格、成交量为float32
+- 按交易日分区：trade_date=YYYYMMDD/part-0.parquet，文件内按 ts_code、minute 排序
+- 重采样（1分钟 -> 5/15/30/60分钟、日线）对全市场一次完成：按 (股票, 周期) 分组边界
+  用 reduceat 计算开高低收和成交量，不逐股票循环
+- MinuteResampler 缓存每只股票尚未结束的周期（部分K线），新分钟线到达时只聚合新增的数据；
+  已结束的K线可用 drain() 取出，或用 max_completed 限制保留的数量，长时间运行时内存有界
+
+A股分钟线以K线结束时间标记（09:31 为 09:30-09:31），周期从每个交易时段开始对齐：
+60分钟线为 10:30、11:30、14:00、15:00。集合竞价的 09:30 / 13:00 K线并入第一个周期。
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+MINUTE_COLUMNS = ['ts_code', 'trade_time', 'open', 'high', 'low', 'close', 'vol', 'amount']
+
+PRICE_FIELDS = ['open', 'high', 'low', 'close']
+
+# 周期 -> 包含的分钟数（每个交易日240分钟）
+FREQUENCIES = {'1m': 1, '5m': 5, '15m': 15, '30m': 30, '60m': 60, '120m': 120, '1d': 240}
+
+# 交易时段（当日分钟数）：上午 09:30-11:30，下午 13:00-15:00
+MORNING_OPEN, AFTERNOON_OPEN, SESSION_MINUTES = 9 * 60 + 30, 13 * 60, 120
+
+def to_minutes(times) -> np.ndarray:
+    """时间转换为int32分钟数"""
+    values = np.asarray(pd.to_datetime(pd.Series(times)), dtype='datetime64[m]')
+    return values.astype(np.int64).astype(np.int32)
+
+def from_minutes(minutes: np.ndarray) -> pd.DatetimeIndex:
+    """int32分钟数还原为时间"""
+    return pd.DatetimeIndex(np.asarray(minutes, dtype=np.int64).astype('datetime64[m]').astype('datetime64[ns]'))
+
+def session_index(minutes: np.ndarray) -> np.ndarray:
+    """分钟在当日交易时段中的序号 1..240（集合竞价归入第一分钟）"""
+    minute_of_day = minutes % 1440
+    morning = minute_of_day < (MORNING_OPEN + SESSION_MINUTES + AFTERNOON_OPEN) // 2
+    return np.where(
+        morning,
+        np.clip(minute_of_day - MORNING_OPEN, 1, SESSION_MINUTES),
+        SESSION_MINUTES + np.clip(minute_of_day - AFTERNOON_OPEN, 1, SESSION_MINUTES)
+    ).astype(np.int32)
+
+def bucket_labels(minutes: np.ndarray, period: int) -> np.ndarray:
+    """每个分钟所属周期的结束时间（int32分钟数）"""
+    index = session_index(minutes)
+    end = ((index - 1) // period + 1) * period
+    end_of_day = np.where(end <= SESSION_MINUTES, MORNING_OPEN + end, AFTERNOON_OPEN + end - SESSION_MINUTES)
+    return (minutes - minutes % 1440 + end_of_day).astype(np.int32)
+
+def parse_freq(freq: Union[str, int]) -> int:
+    """周期字符串转换为分钟数"""
+    if isinstance(freq, (int, np.integer)):
+        period = int(freq)
+    elif freq in FREQUENCIES:
+        period = FREQUENCIES[freq]
+    elif freq in ('D', 'daily'):
+        period = 240
+    else:
+        raise ValueError(f"不支持的周期: {freq}，可选 {list(FREQUENCIES)}")
+    if period not in FREQUENCIES.values():
+        raise ValueError(f"周期须能整除交易时段: {period}")
+    return period
+
+def _aggregate(codes: np.ndarray, minutes: np.ndarray, values: Dict[str, np.ndarray], period: int) -> Dict[str, np.ndarray]:
+    """
+    按 (股票, 周期) 聚合已按 股票、分钟 排序的分钟线
+
+    Returns:
+        code、minute（周期结束时间）、开高低收、vol、amount，以及 complete（周期内最后一分钟已到达）
+    """
+    if not len(codes):
+        return {'code': codes, 'minute': minutes, 'complete': np.zeros(0, bool),
+                **{field: np.zeros(0) for field in values}}
+
+    labels = bucket_labels(minutes, period)
+    change = (codes[1:] != codes[:-1]) | (labels[1:] != labels[:-1])
+    starts = np.flatnonzero(np.concatenate([[True], change]))
+    ends = np.concatenate([starts[1:], [len(codes)]]) - 1
+
+    result = {'code': codes[starts], 'minute': labels[starts]}
+    if 'open' in values:
+        result['open'] = values['open'][starts]
+    if 'high' in values:
+        result['high'] = np.maximum.reduceat(values['high'], starts)
+    if 'low' in values:
+        result['low'] = np.minimum.reduceat(values['low'], starts)
+    if 'close' in values:
+        result['close'] = values['close'][ends]
+    for field in ('vol', 'amount'):
+        if field in values:
+            # float32存储，累加使用float64
+            result[field] = np.add.reduceat(values[field].astype(np.float64), starts)
+
+    index = session_index(minutes[ends])
+    result['complete'] = index % period == 0
+    return result
+
+def _sorted_arrays(bars: pd.DataFrame):
+    """分钟线转为按 股票、分钟 排序的数组"""
+    codes = bars['ts_code'].astype(str).to_numpy()
+    minutes = bars['minute'].to_numpy(dtype=np.int32) if 'minute' in bars.columns else to_minutes(bars['trade_time'])
+    order = np.lexsort((minutes, codes))
+    values = {field: bars[field].to_numpy()[order] for field in PRICE_FIELDS + ['vol', 'amount'] if field in bars.columns}
+    return codes[order], minutes[order], values
+
+def _to_frame(result: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """聚合结果转换为以 (trade_time, ts_code) 为索引的K线"""
+    fields = [field for field in PRICE_FIELDS + ['vol', 'amount'] if field in result]
+    frame = pd.DataFrame({field: result[field] for field in fields})
+    frame.index = pd.MultiIndex.from_arrays(
+        [from_minutes(result['minute']), result['code']], names=['trade_time', 'ts_code']
+    )
+    return frame.sort_index()
+
+def resample_minutes(bars: pd.DataFrame, freq: Union[str, int]) -> pd.DataFrame:
+    """
+    全市场分钟线一次重采样
+
+    Args:
+        bars: 分钟线长表，包含 ts_code、minute（或 trade_time）和开高低收、vol、amount
+        freq: 目标周期，如 '5m'、'60m'、'1d'
+
+    Returns:
+        以 (trade_time, ts_code) 为索引的K线，trade_time为周期结束时间
+    """
+    codes, minutes, values = _sorted_arrays(bars)
+    return _to_frame(_aggregate(codes, minutes, values, parse_freq(freq)))
+
+class MinuteResampler:
+    """增量重采样器，缓存每只股票未结束的部分K线"""
+
+    def __init__(self, freq: Union[str, int], max_completed: Optional[int] = None):
+        """
+        Args:
+            freq: 目标周期，如 '5m'、'60m'、'1d'
+            max_completed: 最多保留的已结束K线数，超出时丢弃最早的，None表示不限
+        """
+        self.period = parse_freq(freq)
+        self.max_completed = max_completed
+        self.rows_processed = 0
+        self._completed: List[Dict[str, np.ndarray]] = []
+        self._partial: Dict[str, np.ndarray] = _aggregate(
+            np.array([], dtype=object), np.array([], dtype=np.int32),
+            {field: np.zeros(0) for field in PRICE_FIELDS + ['vol', 'amount']}, self.period
+        )
+        self._last_minute: Dict[str, int] = {}
+        self._frame: Optional[pd.DataFrame] = None
+        self._lock = threading.Lock()
+
+    def update(self, bars: pd.DataFrame) -> pd.DataFrame:
+        """
+        加入新到达的分钟线，只聚合新增部分并与缓存的部分K线合并
+
+        每只股票早于（含）已处理的最后一分钟的数据视为重复并忽略。
+
+        Args:
+            bars: 新的分钟线
+
+        Returns:
+            本次新增或更新的K线
+        """
+        codes, minutes, values = _sorted_arrays(bars)
+
+        with self._lock:
+            last = pd.Series(self._last_minute, dtype=np.float64).reindex(codes).to_numpy()
+            fresh = np.isnan(last) | (minutes > last)
+            codes, minutes = codes[fresh], minutes[fresh]
+            values = {field: array[fresh] for field, array in values.items()}
+            self.rows_processed += len(codes)
+
+            new = _aggregate(codes, minutes, values, self.period)
+            if not len(new['code']):
+                return _to_frame(new)
+
+            # 第一批数据确定缓存的字段类型，避免初始的空数组把float32提升为float64
+            if not len(self._partial['code']) and not self._completed:
+                self._partial = {key: array[:0] for key, array in new.items()}
+
+            # 每只股票第一根新K线与缓存的部分K线属于同一周期时合并
+            partial = self._partial
+            positions = pd.Index(partial['code']).get_indexer(new['code'])
+            first = np.concatenate([[True], new['code'][1:] != new['code'][:-1]])
+            merge = first & (positions >= 0)
+            merge[merge] = partial['minute'][positions[merge]] == new['minute'][merge]
+            source = positions[merge]
+            if 'open' in new:
+                new['open'][merge] = partial['open'][source]
+            if 'high' in new:
+                new['high'][merge] = np.maximum(new['high'][merge], partial['high'][source])
+            if 'low' in new:
+                new['low'][merge] = np.minimum(new['low'][merge], partial['low'][source])
+            for field in ('vol', 'amount'):
+                if field in new:
+                    new[field][merge] = new[field][merge] + partial[field][source]
+
+            # 有新数据但未合并的部分K线已被新周期取代，即已结束
+            updated = np.isin(partial['code'], new['code'])
+            superseded = updated & ~np.isin(partial['code'], new['code'][merge])
+            if superseded.any():
+                self._completed.append({key: array[superseded] for key, array in partial.items()})
+
+            # 每只股票最后一根未结束的K线作为新的部分K线，其余已结束
+            last_of_symbol = np.concatenate([new['code'][1:] != new['code'][:-1], [True]])
+            still_partial = last_of_symbol & ~new['complete']
+            kept = ~updated
+            self._partial = {
+                key: np.concatenate([partial[key][kept], new[key][still_partial]]) for key in partial
+            }
+            if (~still_partial).any():
+                self._completed.append({key: array[~still_partial] for key, array in new.items()})
+
+            ends = np.flatnonzero(np.concatenate([codes[1:] != codes[:-1], [True]]))
+            self._last_minute.update(zip(codes[ends].tolist(), minutes[ends].tolist()))
+            self._evict()
+            self._frame = None
+
+        return _to_frame(new)
+
+    def _evict(self):
+        """已结束的K线超过max_completed时丢弃最早的"""
+        if self.max_completed is None:
+            return
+        excess = sum(len(part['code']) for part in self._completed) - self.max_completed
+        while excess > 0 and self._completed:
+            size = len(self._completed[0]['code'])
+            if size <= excess:
+                self._completed.pop(0)
+            else:
+                self._completed[0] = {key: array[excess:] for key, array in self._completed[0].items()}
+            excess -= size
+
+    def _combine(self, parts: List[Dict[str, np.ndarray]]) -> pd.DataFrame:
+        parts = parts + [{key: array[:0] for key, array in self._partial.items()}]
+        return _to_frame({key: np.concatenate([part[key] for part in parts]) for key in self._partial})
+
+    def drain(self) -> pd.DataFrame:
+        """取出并清空已结束的K线，未结束的部分K线仍保留在缓存中"""
+        with self._lock:
+            completed, self._completed = self._completed, []
+            self._frame = None
+            return self._combine(completed)
+
+    @property
+    def bars(self) -> pd.DataFrame:
+        """缓存中的K线（未取出的已结束K线和部分K线），以 (trade_time, ts_code) 为索引"""
+        with self._lock:
+            if self._frame is None:
+                self._frame = self._combine(self._completed + [self._partial])
+            return self._frame
+
+class MinuteBarStore:
+    """按交易日分区的分钟线存储"""
+
+    PART_FILE = 'part-0.parquet'
+    FLOAT32_FIELDS = PRICE_FIELDS + ['vol', 'amount']
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Args:
+            root: 存储根目录
+        """
+        self.root = Path(root)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    def partition_path(self, trade_date: str) -> Path:
+        return self.root / f"trade_date={trade_date}" / self.PART_FILE
+
+    def trade_dates(self) -> List[str]:
+        """已存储的交易日"""
+        return sorted(path.parent.name.split('=', 1)[1] for path in self.root.glob(f"trade_date=*/{self.PART_FILE}"))
+
+    @classmethod
+    def compact(cls, bars: pd.DataFrame) -> pd.DataFrame:
+        """转换为紧凑布局: ts_code、int32 minute、float32 开高低收和成交量"""
+        minutes = bars['minute'].to_numpy(dtype=np.int32) if 'minute' in bars.columns else to_minutes(bars['trade_time'])
+        compact = pd.DataFrame({'ts_code': bars['ts_code'].astype(str).to_numpy(), 'minute': minutes})
+        for field in cls.FLOAT32_FIELDS:
+            if field in bars.columns:
+                compact[field] = bars[field].to_numpy(dtype=np.float32)
+        return compact
+
+    def write(self, bars: pd.DataFrame) -> int:
+        """
+        写入分钟线，与已有数据按 (ts_code, minute) 合并，新数据优先
+
+        Args:
+            bars: 包含 ts_code、trade_time（或minute）和行情字段的分钟线
+
+        Returns:
+            写入的交易日数
+        """
+        if bars.empty:
+            return 0
+
+        bars = self.compact(bars)
+        days = (bars['minute'] // 1440).astype(np.int64)
+        with self._lock:
+            written = 0
+            for day, new in bars.groupby(days.to_numpy(), sort=True):
+                trade_date = (np.datetime64(int(day), 'D')).astype(str).replace('-', '')
+                path = self.partition_path(trade_date)
+                if path.exists():
+                    new = pd.concat([pd.read_parquet(path, engine='pyarrow'), new], ignore_index=True)
+                    new = new.drop_duplicates(['ts_code', 'minute'], keep='last')
+                new = new.sort_values(['ts_code', 'minute']).reset_index(drop=True)
+                new['ts_code'] = new['ts_code'].astype('category')
+
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix('.tmp')
+                new.to_parquet(tmp_path, engine='pyarrow', compression='zstd', index=False)
+                os.replace(tmp_path, path)
+                written += 1
+        return written
+
+    def read(self,
+             start_date: str = None,
+             end_date: str = None,
+             symbols: Optional[Sequence[str]] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        读取分钟线（紧凑布局）
+
+        Args:
+            start_date: 开始交易日，格式YYYYMMDD
+            end_date: 结束交易日，格式YYYYMMDD
+            symbols: 股票代码列表，None表示全部
+            columns: 只读取的字段，None表示全部
+
+        Returns:
+            包含 ts_code、minute 和行情字段的长表，按交易日、股票、分钟排序
+        """
+        start = pd.Timestamp(start_date).strftime('%Y%m%d') if start_date else None
+        end = pd.Timestamp(end_date).strftime('%Y%m%d') if end_date else None
+        filters = [('ts_code', 'in', list(symbols))] if symbols is not None else None
+        read_columns = None if columns is None else list(dict.fromkeys(['ts_code', 'minute'] + columns))
+
+        frames = [
+            pd.read_parquet(self.partition_path(trade_date), engine='pyarrow', columns=read_columns, filters=filters)
+            for trade_date in self.trade_dates()
+            if (start is None or trade_date >= start) and (end is None or trade_date <= end)
+        ]
+        frames = [frame.assign(ts_code=frame['ts_code'].astype(str)) for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=['ts_code', 'minute'] + (columns or self.FLOAT32_FIELDS))
+        return pd.concat(frames, ignore_index=True)
+
+    def resample(self,
+                 freq: Union[str, int],
+                 start_date: str = None,
+                 end_date: str = None,
+                 symbols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """读取区间内的分钟线并重采样为目标周期"""
+        return resample_minutes(self.read(start_date, end_date, symbols), freq)
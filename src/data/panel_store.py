@@ -0,0 +1,179 @@
+"""
+面板数据存储 - 基于numpy.memmap的 日期 × 股票 × 字段 稠密矩阵
+
+目录结构：
+- meta.json: 字段列表、数据类型和矩阵形状
+- dates.npy: 升序交易日轴（datetime64[D]）
+- symbols.npy: 升序股票代码轴
+- {field}.bin: 每个字段一个 日期 × 股票 的行主序矩阵，缺失值为NaN
+
+多个进程可以同时以只读方式映射同一份文件，切片不会复制数据。
+"""
+
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+class PanelStore:
+    """内存映射面板存储类"""
+
+    FIELDS = ('open', 'high', 'low', 'close', 'vol', 'amount')
+
+    def __init__(self, panel_dir: Union[str, Path]):
+        """
+        打开面板存储（只读取元数据和坐标轴，字段矩阵按需映射）
+
+        Args:
+            panel_dir: 面板目录
+        """
+        self.panel_dir = Path(panel_dir)
+        self.logger = logging.getLogger(__name__)
+
+        with open(self.panel_dir / 'meta.json', 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+
+        self.fields: List[str] = self.meta['fields']
+        self.dtype = np.dtype(self.meta['dtype'])
+        self.dates: np.ndarray = np.load(self.panel_dir / 'dates.npy')
+        self.symbols: np.ndarray = np.load(self.panel_dir / 'symbols.npy')
+        self.shape = (len(self.dates), len(self.symbols))
+
+        self._arrays: Dict[str, np.memmap] = {}
+        self._symbol_index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def build(cls,
+              panel_dir: Union[str, Path],
+              daily_frames: Iterable,
+              dates: Sequence,
+              symbols: Sequence[str],
+              fields: Sequence[str] = FIELDS,
+              dtype: str = 'float64') -> 'PanelStore':
+        """
+        由按股票组织的日线数据构建面板
+
+        先写入临时目录，完成后替换旧面板，已打开旧面板的进程不受影响。
+
+        Args:
+            panel_dir: 面板目录
+            daily_frames: 可迭代的 (ts_code, 以trade_date为索引的日线数据)
+            dates: 日期轴
+            symbols: 股票代码轴
+            fields: 写入的字段
+            dtype: 矩阵数据类型
+
+        Returns:
+            打开的面板存储
+        """
+        panel_dir = Path(panel_dir)
+        build_dir = panel_dir.with_name(panel_dir.name + '.building')
+        if build_dir.exists():
+            shutil.rmtree(build_dir)
+        build_dir.mkdir(parents=True)
+
+        date_axis = np.unique(pd.to_datetime(list(dates)).values.astype('datetime64[D]'))
+        symbol_axis = np.array(sorted(set(symbols)))
+        shape = (len(date_axis), len(symbol_axis))
+        date_pos = pd.Index(date_axis)
+        symbol_pos = {code: i for i, code in enumerate(symbol_axis)}
+
+        arrays = {}
+        for field in fields:
+            arrays[field] = np.memmap(build_dir / f"{field}.bin", dtype=dtype, mode='w+', shape=shape)
+            arrays[field][:] = np.nan
+
+        for stock_code, daily_data in daily_frames:
+            col = symbol_pos.get(stock_code)
+            if col is None or daily_data.empty:
+                continue
+            rows = date_pos.get_indexer(daily_data.index.values.astype('datetime64[D]'))
+            valid = rows >= 0
+            for field in fields:
+                if field in daily_data.columns:
+                    arrays[field][rows[valid], col] = daily_data[field].to_numpy(dtype=dtype)[valid]
+
+        for array in arrays.values():
+            array.flush()
+        del arrays
+
+        np.save(build_dir / 'dates.npy', date_axis)
+        np.save(build_dir / 'symbols.npy', symbol_axis)
+        with open(build_dir / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'fields': list(fields),
+                'dtype': np.dtype(dtype).str,
+                'shape': list(shape),
+                'built_at': pd.Timestamp.now().isoformat()
+            }, f, indent=2)
+
+        if panel_dir.exists():
+            shutil.rmtree(panel_dir)
+        os.replace(build_dir, panel_dir)
+        return cls(panel_dir)
+
+    def array(self, field: str) -> np.memmap:
+        """获取字段的只读内存映射矩阵（日期 × 股票）"""
+        if field not in self._arrays:
+            if field not in self.fields:
+                raise KeyError(f"面板中不存在字段: {field}")
+            self._arrays[field] = np.memmap(
+                self.panel_dir / f"{field}.bin", dtype=self.dtype, mode='r', shape=self.shape
+            )
+        return self._arrays[field]
+
+    def date_slice(self, start_date=None, end_date=None) -> slice:
+        """将日期区间（含两端）转换为行切片"""
+        start = 0 if start_date is None else np.searchsorted(
+            self.dates, np.datetime64(pd.Timestamp(start_date), 'D'), side='left')
+        end = len(self.dates) if end_date is None else np.searchsorted(
+            self.dates, np.datetime64(pd.Timestamp(end_date), 'D'), side='right')
+        return slice(int(start), int(end))
+
+    def symbol_positions(self, symbols: Sequence[str]) -> np.ndarray:
+        """股票代码转为列位置，不存在的代码抛出KeyError"""
+        if self._symbol_index is None:
+            self._symbol_index = {code: i for i, code in enumerate(self.symbols)}
+        return np.array([self._symbol_index[code] for code in symbols], dtype=np.intp)
+
+    def get(self,
+            field: str,
+            start_date=None,
+            end_date=None,
+            symbols: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        获取字段矩阵的切片
+
+        只按日期切片时返回内存映射的视图（零拷贝）；
+        指定股票列表时按列取数，会复制所选列。
+
+        Args:
+            field: 字段名
+            start_date: 开始日期
+            end_date: 结束日期
+            symbols: 股票代码列表，None表示全部
+        """
+        values = self.array(field)[self.date_slice(start_date, end_date)]
+        if symbols is not None:
+            values = values[:, self.symbol_positions(symbols)]
+        return values
+
+    def to_frame(self,
+                 field: str,
+                 start_date=None,
+                 end_date=None,
+                 symbols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """获取字段的宽表（索引为交易日，列为股票代码）"""
+        rows = self.date_slice(start_date, end_date)
+        columns = self.symbols if symbols is None else list(symbols)
+        return pd.DataFrame(
+            self.get(field, start_date, end_date, symbols),
+            index=pd.DatetimeIndex(self.dates[rows].astype('datetime64[ns]'), name='trade_date'),
+            columns=pd.Index(columns, name='ts_code'),
+            copy=False
+        )
@@ -0,0 +1,213 @@
+"""
+分区数据集 - 按 年份/交易所 分区存储全市场日线
+
+目录结构（Hive风格分区）：
+- year=2024/exchange=SZ/part-0.parquet: 该年该交易所的日线，按 ts_code、trade_date 排序
+- _index.json: 每个分区的最小/最大交易日、行数、股票代码和文件内容哈希
+
+查询先用索引排除与日期区间、股票列表不相交的分区，只打开需要的文件；
+文件内再按行组统计信息下推日期和股票代码过滤条件。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+def file_digest(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """文件内容的sha256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class PartitionedStore:
+    """分区数据集类"""
+
+    VERSION = 1
+    PART_FILE = 'part-0.parquet'
+
+    def __init__(self, root: Union[str, Path], row_group_size: int = 65536):
+        """
+        打开分区数据集（目录不存在时在首次写入时创建）
+
+        Args:
+            root: 数据集根目录
+            row_group_size: parquet行组行数，越小过滤越精确，元数据越多
+        """
+        self.root = Path(root)
+        self.row_group_size = row_group_size
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.partitions: Dict[str, Dict] = {}
+        self._load_index()
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / '_index.json'
+
+    def _load_index(self):
+        """读取分区索引，文件不存在或损坏时视为空数据集"""
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.partitions = json.load(f).get('partitions', {})
+        except Exception as e:
+            self.logger.warning(f"分区索引读取失败: {e}")
+            self.partitions = {}
+
+    def _save_index(self):
+        """保存分区索引（先写临时文件再替换）"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': self.VERSION,
+                'updated_at': datetime.now().isoformat(),
+                'partitions': self.partitions
+            }, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def partition_key(year: int, exchange: str) -> str:
+        return f"year={year}/exchange={exchange}"
+
+    def partition_path(self, key: str) -> Path:
+        """分区的数据文件路径"""
+        return self.root / key / self.PART_FILE
+
+    @staticmethod
+    def _prepare(bars: pd.DataFrame) -> pd.DataFrame:
+        """统一为包含ts_code、trade_date（日期类型）列的长表"""
+        if 'trade_date' not in bars.columns:
+            bars = bars.reset_index()
+        bars = bars.copy()
+        bars['trade_date'] = pd.to_datetime(bars['trade_date'].astype(str))
+        bars['ts_code'] = bars['ts_code'].astype(str)
+        return bars
+
+    def write(self, bars: pd.DataFrame) -> int:
+        """
+        写入日线数据，与分区中已有数据按 (ts_code, trade_date) 合并，新数据优先
+
+        Args:
+            bars: 包含ts_code和trade_date（列或索引）的日线长表
+
+        Returns:
+            写入的分区数
+        """
+        if bars.empty:
+            return 0
+
+        bars = self._prepare(bars)
+        year = bars['trade_date'].dt.year
+        exchange = bars['ts_code'].str.rsplit('.', n=1).str[-1]
+
+        with self._lock:
+            written = 0
+            for (part_year, part_exchange), new in bars.groupby([year, exchange], sort=True):
+                key = self.partition_key(int(part_year), part_exchange)
+                path = self.partition_path(key)
+                if path.exists():
+                    new = pd.concat([pd.read_parquet(path, engine='pyarrow'), new], ignore_index=True)
+                    new = new.drop_duplicates(['ts_code', 'trade_date'], keep='last')
+                new = new.sort_values(['ts_code', 'trade_date']).reset_index(drop=True)
+
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix('.tmp')
+                new.to_parquet(tmp_path, engine='pyarrow', compression='zstd', index=False,
+                               row_group_size=self.row_group_size)
+                os.replace(tmp_path, path)
+
+                self.partitions[key] = {
+                    'year': int(part_year),
+                    'exchange': part_exchange,
+                    'min_date': new['trade_date'].min().strftime('%Y%m%d'),
+                    'max_date': new['trade_date'].max().strftime('%Y%m%d'),
+                    'rows': len(new),
+                    'symbols': sorted(new['ts_code'].unique()),
+                    'sha256': file_digest(path)
+                }
+                written += 1
+
+            self._save_index()
+        return written
+
+    def plan(self,
+             start_date: str = None,
+             end_date: str = None,
+             symbols: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        根据索引选出需要读取的分区
+
+        Args:
+            start_date: 开始日期，格式YYYYMMDD
+            end_date: 结束日期，格式YYYYMMDD
+            symbols: 股票代码列表，None表示全部
+
+        Returns:
+            分区键列表
+        """
+        start = pd.Timestamp(start_date).strftime('%Y%m%d') if start_date else None
+        end = pd.Timestamp(end_date).strftime('%Y%m%d') if end_date else None
+        wanted = set(symbols) if symbols is not None else None
+        exchanges = {code.rsplit('.', 1)[-1] for code in wanted} if wanted is not None else None
+
+        keys = []
+        for key, info in sorted(self.partitions.items()):
+            if start and info['max_date'] < start:
+                continue
+            if end and info['min_date'] > end:
+                continue
+            if exchanges is not None and info['exchange'] not in exchanges:
+                continue
+            if wanted is not None and wanted.isdisjoint(info['symbols']):
+                continue
+            keys.append(key)
+        return keys
+
+    def query(self,
+              start_date: str = None,
+              end_date: str = None,
+              symbols: Optional[Sequence[str]] = None,
+              columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        查询日线数据
+
+        Args:
+            start_date: 开始日期，格式YYYYMMDD
+            end_date: 结束日期，格式YYYYMMDD
+            symbols: 股票代码列表，None表示全部
+            columns: 只读取的列，None表示全部
+
+        Returns:
+            以(trade_date, ts_code)为索引的长表
+        """
+        filters = []
+        if start_date:
+            filters.append(('trade_date', '>=', pd.Timestamp(start_date)))
+        if end_date:
+            filters.append(('trade_date', '<=', pd.Timestamp(end_date)))
+        if symbols is not None:
+            filters.append(('ts_code', 'in', list(symbols)))
+        read_columns = None if columns is None else list(dict.fromkeys(['trade_date', 'ts_code'] + columns))
+
+        frames = [
+            pd.read_parquet(self.partition_path(key), engine='pyarrow',
+                            columns=read_columns, filters=filters or None)
+            for key in self.plan(start_date, end_date, symbols)
+        ]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+
+        data = pd.concat(frames, ignore_index=True)
+        return data.set_index(['trade_date', 'ts_code']).sort_index()
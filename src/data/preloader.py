@@ -0,0 +1,151 @@
+"""
+数据预加载 - 服务启动时在后台预热缓存
+
+按 performance.preload 配置依次加载股票列表、指定股票的日线数据和因子值到DataManager缓存：
+- 预加载使用与接口默认参数相同的区间（最近252个交易日至今天），缓存键一致
+- DataManager对同一缓存键合并并发请求，预热期间到达的相同请求等待进行中的加载，不重复调用数据源
+- status() 报告进度，供就绪检查接口使用
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+from .data_manager import DataManager
+
+class Preloader:
+    """后台缓存预加载器"""
+
+    def __init__(self,
+                 data_manager: DataManager,
+                 stocks: Sequence[str] = (),
+                 factors: Sequence[str] = (),
+                 lookback: int = 252):
+        """
+        初始化预加载器
+
+        Args:
+            data_manager: 数据管理器，预加载结果写入其缓存
+            stocks: 预加载日线数据的股票代码
+            factors: 预计算的因子名称，如 pe_ratio、pb_ratio、roe
+            lookback: 预加载的交易日数
+        """
+        self.data_manager = data_manager
+        self.stocks = list(dict.fromkeys(stocks))
+        self.factors = list(dict.fromkeys(factors))
+        self.lookback = lookback
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._status: Dict[str, Any] = {
+            'state': 'pending',
+            'total': 1 + len(self.stocks) + (1 if self.factors else 0),
+            'completed': 0,
+            'failed': [],
+            'current': None,
+            'started_at': None,
+            'finished_at': None
+        }
+
+    @classmethod
+    def from_config(cls, data_manager: DataManager, config: Dict) -> 'Preloader':
+        """
+        由配置创建
+
+        Args:
+            data_manager: 数据管理器
+            config: 完整配置，读取 performance.preload 下的 stocks、factors、lookback
+        """
+        preload = (config.get('performance', {}) or {}).get('preload', {}) or {}
+        return cls(
+            data_manager,
+            stocks=preload.get('stocks', []),
+            factors=preload.get('factors', []),
+            lookback=preload.get('lookback', 252)
+        )
+
+    @staticmethod
+    def enabled(config: Dict) -> bool:
+        """配置中是否开启了预加载"""
+        preload = (config.get('performance', {}) or {}).get('preload', {}) or {}
+        return bool(preload.get('enabled', False))
+
+    def start(self) -> 'Preloader':
+        """在后台线程中开始预加载（重复调用不会重复启动）"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name='cache-preload', daemon=True)
+                self._thread.start()
+        return self
+
+    def run(self):
+        """依次执行预加载步骤，单个步骤失败只记录，不影响其余步骤"""
+        end_date = datetime.now().strftime('%Y%m%d')
+        self._update(state='running', started_at=datetime.now().isoformat())
+        self.logger.info(f"开始预加载: {len(self.stocks)}只股票, 因子{self.factors}")
+
+        try:
+            start_date = self.data_manager.trading_days_back(end_date, self.lookback)
+
+            steps = [('stock_list', self.data_manager.get_stock_list)]
+            steps += [
+                (code, lambda code=code: self.data_manager.get_daily_data(code, start_date, end_date))
+                for code in self.stocks
+            ]
+            if self.factors:
+                steps.append(('factors', lambda: self.data_manager.get_factor_values(
+                    self.stocks, self.factors, start_date, end_date
+                )))
+
+            for name, load in steps:
+                self._run_step(name, load)
+        finally:
+            self._update(state='ready', current=None, finished_at=datetime.now().isoformat())
+            self._done.set()
+            status = self.status()
+            self.logger.info(f"预加载完成: {status['completed']}/{status['total']}, 失败{status['failed']}")
+
+    def _run_step(self, name: str, load):
+        self._update(current=name)
+        try:
+            ok = not load().empty
+        except Exception as e:
+            self.logger.error(f"预加载{name}失败: {e}")
+            ok = False
+
+        with self._lock:
+            self._status['completed'] += 1
+            if not ok:
+                self._status['failed'].append(name)
+
+    def _update(self, **values):
+        with self._lock:
+            self._status.update(values)
+
+    @property
+    def ready(self) -> bool:
+        """预加载是否已结束"""
+        return self._done.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        等待预加载结束
+
+        Args:
+            timeout: 最长等待秒数，None表示一直等待
+
+        Returns:
+            是否已结束
+        """
+        return self._done.wait(timeout)
+
+    def status(self) -> Dict[str, Any]:
+        """预加载进度: state（pending/running/ready）、total、completed、failed、current、起止时间"""
+        with self._lock:
+            status = dict(self._status, failed=list(self._status['failed']))
+        status['ready'] = self.ready
+        status['progress'] = status['completed'] / status['total'] if status['total'] else 1.0
+        return status
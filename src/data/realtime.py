@@ -0,0 +1,347 @@
+"""
+实时行情 - 全市场快照轮询与预分配的环形缓冲
+
+行情服务按固定间隔获取全市场快照，写入预分配的numpy环形缓冲：
+- 每个字段一个 快照 × 股票 的矩阵，写入只是对一行赋值，不为每次快照创建DataFrame
+- 最新截面和最近N次快照的日内窗口直接从数组中读取
+- 快照数据源可替换，ReplaySpotSource 回放录制的快照用于测试
+"""
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .source_router import AkShareSource
+
+QUOTE_FIELDS = ['price', 'open', 'high', 'low', 'pre_close', 'change', 'pct_chg', 'vol', 'amount']
+
+class SpotSource(ABC):
+    """全市场实时快照数据源"""
+
+    @abstractmethod
+    def fetch(self) -> pd.DataFrame:
+        """当前全市场快照，包含ts_code列和QUOTE_FIELDS中的字段"""
+        pass
+
+class AkShareSpotSource(SpotSource):
+    """AkShare（东方财富）全市场实时行情，字段换算为Tushare口径"""
+
+    SPOT_FIELDS = {
+        '最新价': 'price', '今开': 'open', '最高': 'high', '最低': 'low', '昨收': 'pre_close',
+        '涨跌额': 'change', '涨跌幅': 'pct_chg', '成交量': 'vol', '成交额': 'amount'
+    }
+
+    def __init__(self, ak=None):
+        """
+        Args:
+            ak: akshare模块或提供相同函数的对象，默认首次使用时导入akshare
+        """
+        self._ak = ak
+
+    @property
+    def ak(self):
+        if self._ak is None:
+            import akshare
+            self._ak = akshare
+        return self._ak
+
+    def fetch(self) -> pd.DataFrame:
+        raw = self.ak.stock_zh_a_spot_em()
+        spot = raw.rename(columns=self.SPOT_FIELDS).reindex(columns=QUOTE_FIELDS)
+        # 停牌股票的行情字段为 '-' 等非数值
+        spot = spot.apply(pd.to_numeric, errors='coerce')
+        # AkShare成交额单位为元，Tushare为千元
+        spot['amount'] = spot['amount'] / 1000
+        spot.insert(0, 'ts_code', raw['代码'].map(AkShareSource.to_ts_code))
+        return spot
+
+class ReplaySpotSource(SpotSource):
+    """按顺序回放录制的快照，回放完后重复最后一个"""
+
+    def __init__(self, snapshots: Sequence[pd.DataFrame]):
+        """
+        Args:
+            snapshots: 录制的快照，每个包含ts_code列和行情字段
+        """
+        if not snapshots:
+            raise ValueError("至少需要一个快照")
+        self.snapshots = list(snapshots)
+        self.position = 0
+
+    @classmethod
+    def from_dir(cls, directory: Union[str, Path]) -> 'ReplaySpotSource':
+        """读取目录中按文件名排序的 *.parquet 快照"""
+        paths = sorted(Path(directory).glob('*.parquet'))
+        return cls([pd.read_parquet(path, engine='pyarrow') for path in paths])
+
+    @staticmethod
+    def record(source: SpotSource, directory: Union[str, Path], count: int, interval: float = 0.0):
+        """从数据源录制count个快照到目录，文件名为序号"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for i in range(count):
+            source.fetch().to_parquet(directory / f"{i:06d}.parquet", engine='pyarrow', index=False)
+            if interval and i + 1 < count:
+                time.sleep(interval)
+
+    def fetch(self) -> pd.DataFrame:
+        snapshot = self.snapshots[min(self.position, len(self.snapshots) - 1)]
+        self.position += 1
+        return snapshot
+
+class QuoteRingBuffer:
+    """预分配的 快照 × 股票 环形缓冲"""
+
+    def __init__(self,
+                 symbols: Sequence[str],
+                 capacity: int = 1200,
+                 fields: Sequence[str] = QUOTE_FIELDS):
+        """
+        初始化环形缓冲
+
+        Args:
+            symbols: 股票轴，之后不再变化，快照中不在轴上的股票忽略
+            capacity: 保留的最近快照数
+            fields: 保存的行情字段
+        """
+        self.symbols = np.asarray(list(symbols))
+        self.fields = list(fields)
+        self.capacity = capacity
+        self._symbol_index = pd.Index(self.symbols)
+        self._columns = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        self._values = {field: np.full((capacity, len(self.symbols)), np.nan) for field in self.fields}
+        self._times = np.zeros(capacity, dtype='datetime64[ns]')
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """缓冲中的快照数"""
+        return min(self._count, self.capacity)
+
+    @property
+    def total(self) -> int:
+        """累计写入的快照数"""
+        return self._count
+
+    def write(self, timestamp, snapshot: pd.DataFrame) -> int:
+        """
+        写入一个全市场快照（覆盖最早的一行）
+
+        Args:
+            timestamp: 快照时间
+            snapshot: 包含ts_code列和行情字段的快照
+
+        Returns:
+            写入的股票数
+        """
+        positions = self._symbol_index.get_indexer(snapshot['ts_code'])
+        found = positions >= 0
+        positions = positions[found]
+
+        with self._lock:
+            row = self._count % self.capacity
+            self._times[row] = np.datetime64(pd.Timestamp(timestamp), 'ns')
+            for field in self.fields:
+                target = self._values[field][row]
+                target.fill(np.nan)
+                if field in snapshot.columns:
+                    target[positions] = snapshot[field].to_numpy(dtype=float)[found]
+            self._count += 1
+        return len(positions)
+
+    def _rows(self, n: int) -> np.ndarray:
+        """最近n次快照的行号，由旧到新"""
+        n = min(n, len(self))
+        return np.arange(self._count - n, self._count) % self.capacity
+
+    def _positions(self, symbols: Optional[Sequence[str]]):
+        if symbols is None:
+            return slice(None)
+        positions = [self._columns.get(symbol) for symbol in symbols]
+        missing = [symbol for symbol, position in zip(symbols, positions) if position is None]
+        if missing:
+            raise KeyError(f"股票不在行情缓冲中: {missing}")
+        return np.asarray(positions, dtype=np.int64)
+
+    def latest(self,
+               fields: Optional[Sequence[str]] = None,
+               symbols: Optional[Sequence[str]] = None) -> Tuple[Optional[pd.Timestamp], Dict[str, np.ndarray]]:
+        """
+        最新截面
+
+        Args:
+            fields: 字段，默认全部
+            symbols: 股票代码，默认整个股票轴
+
+        Returns:
+            (快照时间, {字段: 按股票顺序的数组})，缓冲为空时时间为None、数组为空
+        """
+        fields = self.fields if fields is None else list(fields)
+        columns = self._positions(symbols)
+        with self._lock:
+            if not self._count:
+                return None, {field: np.empty(0) for field in fields}
+            row = (self._count - 1) % self.capacity
+            values = {field: self._values[field][row, columns].copy() for field in fields}
+            timestamp = pd.Timestamp(self._times[row])
+        return timestamp, values
+
+    def window(self,
+               field: str,
+               n: int,
+               symbols: Optional[Sequence[str]] = None) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+        """
+        最近n次快照的日内窗口
+
+        Args:
+            field: 字段
+            n: 快照数，超过缓冲中的数量时返回已有部分
+            symbols: 股票代码，默认整个股票轴
+
+        Returns:
+            (快照时间, 快照 × 股票 数组)，由旧到新
+        """
+        columns = self._positions(symbols)
+        with self._lock:
+            rows = self._rows(n)
+            values = self._values[field][rows][:, columns]
+            times = pd.DatetimeIndex(self._times[rows])
+        return times, values
+
+    def latest_frame(self, fields: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """最新截面，以ts_code为索引（无行情的股票已去除）"""
+        timestamp, values = self.latest(fields)
+        if timestamp is None:
+            return pd.DataFrame(columns=self.fields if fields is None else list(fields))
+        frame = pd.DataFrame(values, index=pd.Index(self.symbols, name='ts_code'))
+        return frame.dropna(how='all')
+
+    def window_frame(self, field: str, n: int, symbols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """最近n次快照的窗口宽表（索引为快照时间，列为股票代码）"""
+        times, values = self.window(field, n, symbols)
+        columns = self.symbols if symbols is None else list(symbols)
+        return pd.DataFrame(values, index=times.rename('time'), columns=pd.Index(columns, name='ts_code'))
+
+class QuoteService:
+    """按固定间隔轮询全市场快照并写入环形缓冲的行情服务"""
+
+    def __init__(self,
+                 source: SpotSource,
+                 symbols: Optional[Sequence[str]] = None,
+                 capacity: int = 1200,
+                 interval: float = 3.0,
+                 fields: Sequence[str] = QUOTE_FIELDS):
+        """
+        初始化行情服务
+
+        Args:
+            source: 快照数据源
+            symbols: 股票轴，默认取第一次快照中的全部股票
+            capacity: 每只股票保留的最近快照数
+            interval: 轮询间隔（秒）
+            fields: 保存的行情字段
+        """
+        self.source = source
+        self.capacity = capacity
+        self.interval = interval
+        self.fields = list(fields)
+        self.logger = logging.getLogger(__name__)
+
+        self.buffer: Optional[QuoteRingBuffer] = (
+            QuoteRingBuffer(symbols, capacity, fields) if symbols is not None else None
+        )
+        self.stats = {'polls': 0, 'errors': 0, 'last_latency': None, 'last_error': None}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def enabled(config: Dict) -> bool:
+        """配置中是否开启了实时行情"""
+        realtime = (config.get('performance', {}) or {}).get('realtime', {}) or {}
+        return bool(realtime.get('enabled', False))
+
+    @classmethod
+    def from_config(cls, config: Dict, source: SpotSource = None, symbols: Sequence[str] = None) -> 'QuoteService':
+        """
+        由配置创建
+
+        Args:
+            config: 完整配置，读取 performance.realtime 下的 interval、capacity
+            source: 快照数据源，默认AkShare
+            symbols: 股票轴，默认取第一次快照
+        """
+        realtime = (config.get('performance', {}) or {}).get('realtime', {}) or {}
+        return cls(
+            source or AkShareSpotSource(),
+            symbols=symbols,
+            capacity=realtime.get('capacity', 1200),
+            interval=realtime.get('interval', 3.0)
+        )
+
+    def poll_once(self, timestamp=None) -> int:
+        """
+        获取一次快照并写入缓冲
+
+        Returns:
+            写入的股票数，获取失败返回0
+        """
+        start = time.monotonic()
+        try:
+            snapshot = self.source.fetch()
+            if self.buffer is None:
+                self.buffer = QuoteRingBuffer(sorted(snapshot['ts_code'].astype(str).unique()),
+                                              self.capacity, self.fields)
+            written = self.buffer.write(timestamp or pd.Timestamp.now(), snapshot)
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.stats['last_error'] = str(e)
+            self.logger.error(f"获取实时行情快照失败: {e}")
+            return 0
+        finally:
+            self.stats['polls'] += 1
+        self.stats['last_latency'] = time.monotonic() - start
+        return written
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.poll_once()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def start(self) -> 'QuoteService':
+        """在后台线程中开始轮询（重复调用不会重复启动）"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='quote-service', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        """停止轮询"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def latest(self, fields: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """最新全市场截面，以ts_code为索引"""
+        if self.buffer is None:
+            return pd.DataFrame(columns=self.fields if fields is None else list(fields))
+        return self.buffer.latest_frame(fields)
+
+    def window(self, symbols: List[str], field: str = 'price', n: int = 20) -> pd.DataFrame:
+        """指定股票最近n次快照的日内窗口，索引为快照时间，列为股票代码"""
+        if self.buffer is None:
+            return pd.DataFrame(columns=list(symbols))
+        return self.buffer.window_frame(field, n, symbols)
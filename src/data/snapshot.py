@@ -0,0 +1,167 @@
+"""
+数据集快照 - 以内容哈希标识的不可变数据集版本
+
+快照记录创建时分区数据集各分区文件的内容哈希，分区文件按哈希保存一份不可变副本：
+- _snapshots/objects/<sha256>.parquet: 分区文件副本，内容不变的分区在多个快照间共享
+- _snapshots/<快照id>.json: 快照清单，快照id由各分区的内容哈希计算，相同数据得到相同id
+
+数据集之后的写入不影响已有快照。下游计算（因子、回测）以 (快照id, 参数) 为键缓存结果，
+可以跨进程、跨天安全复用。
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+
+from .partitioned_store import PartitionedStore, file_digest
+
+SNAPSHOT_DIR = '_snapshots'
+
+def snapshot_id_of(partitions: Dict[str, Dict]) -> str:
+    """由各分区的内容哈希计算快照id"""
+    content = json.dumps({key: info['sha256'] for key, info in partitions.items()}, sort_keys=True)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+class DatasetSnapshot(PartitionedStore):
+    """只读的数据集快照，查询接口与分区数据集相同"""
+
+    def __init__(self, root: Union[str, Path], snapshot_id: str):
+        """
+        打开快照
+
+        Args:
+            root: 快照目录（数据集根目录下的 _snapshots）
+            snapshot_id: 快照id
+
+        Raises:
+            FileNotFoundError: 快照不存在
+        """
+        self.snapshot_id = snapshot_id
+        self.created_at: Optional[str] = None
+        super().__init__(root)
+        if not self.index_path.exists():
+            raise FileNotFoundError(f"快照不存在: {snapshot_id}")
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / f"{self.snapshot_id}.json"
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.partitions = manifest['partitions']
+        self.created_at = manifest.get('created_at')
+
+    def partition_path(self, key: str) -> Path:
+        return self.root / 'objects' / f"{self.partitions[key]['sha256']}.parquet"
+
+    def write(self, bars: pd.DataFrame) -> int:
+        raise TypeError(f"快照{self.snapshot_id}只读")
+
+    @classmethod
+    def create(cls, store: PartitionedStore) -> 'DatasetSnapshot':
+        """
+        为分区数据集的当前内容创建快照（内容未变时返回已有快照）
+
+        Args:
+            store: 分区数据集
+        """
+        root = store.root / SNAPSHOT_DIR
+        objects = root / 'objects'
+        objects.mkdir(parents=True, exist_ok=True)
+
+        with store._lock:
+            partitions = {}
+            for key, info in sorted(store.partitions.items()):
+                path = store.partition_path(key)
+                info = dict(info, sha256=info.get('sha256') or file_digest(path))
+                target = objects / f"{info['sha256']}.parquet"
+                if not target.exists():
+                    # 分区文件写入时整体替换，硬链接不会被之后的写入修改
+                    tmp_path = target.with_suffix('.tmp')
+                    try:
+                        os.link(path, tmp_path)
+                    except OSError:
+                        shutil.copyfile(path, tmp_path)
+                    os.replace(tmp_path, target)
+                partitions[key] = info
+
+        snapshot_id = snapshot_id_of(partitions)
+        manifest_path = root / f"{snapshot_id}.json"
+        if not manifest_path.exists():
+            tmp_path = manifest_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'id': snapshot_id,
+                    'created_at': datetime.now().isoformat(),
+                    'partitions': partitions
+                }, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_path, manifest_path)
+        return cls(root, snapshot_id)
+
+    @classmethod
+    def open(cls, store: PartitionedStore, snapshot_id: str) -> 'DatasetSnapshot':
+        """打开分区数据集的已有快照"""
+        return cls(store.root / SNAPSHOT_DIR, snapshot_id)
+
+    @staticmethod
+    def available(store: PartitionedStore) -> List[str]:
+        """分区数据集已有的快照id"""
+        root = store.root / SNAPSHOT_DIR
+        return sorted(path.stem for path in root.glob('*.json'))
+
+    def cache_key(self, namespace: str, params: Dict[str, Any] = None) -> str:
+        """
+        下游结果的缓存键，由快照id、结果类型和参数决定
+
+        Args:
+            namespace: 结果类型，如 'factors'、'backtest'
+            params: 计算参数（可JSON序列化，其余类型按字符串处理）
+        """
+        content = json.dumps([self.snapshot_id, namespace, params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+class ResultCache:
+    """以快照缓存键保存的下游计算结果，DataFrame存为parquet，其余用pickle保存"""
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Args:
+            root: 结果目录
+        """
+        self.root = Path(root)
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取结果，不存在返回None"""
+        frame_path = self.root / f"{key}.parquet"
+        if frame_path.exists():
+            return pd.read_parquet(frame_path, engine='pyarrow')
+        pickle_path = self.root / f"{key}.pkl"
+        if pickle_path.exists():
+            with open(pickle_path, 'rb') as f:
+                return pickle.load(f)
+        return None
+
+    def set(self, key: str, value: Any):
+        """保存结果（先写临时文件再替换）"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        if isinstance(value, pd.DataFrame):
+            path = self.root / f"{key}.parquet"
+            tmp_path = path.with_suffix('.tmp')
+            value.to_parquet(tmp_path, engine='pyarrow')
+        else:
+            # numpy标量、Series、Timestamp等经JSON会变为字符串，使用pickle保持原类型
+            path = self.root / f"{key}.pkl"
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
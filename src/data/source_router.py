@@ -0,0 +1,479 @@
+"""
+数据源路由 - 多数据源统一格式、故障切换与对冲请求
+
+- 各数据源的日线、日线截面、交易日历、复权因子、指数日线、分钟线和股票列表统一为Tushare字段格式
+- 数据源不提供的接口抛出NotImplementedError，路由直接跳过，不计为失败
+- 按优先级依次尝试，出错时切换到下一个数据源；被限流的数据源暂停使用一段时间
+- 可选对冲请求：首选数据源耗时超过其历史延迟的分位数时，向下一个数据源并发发送相同请求，
+  取先成功返回的结果，限制冷门股票的长尾延迟
+"""
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DAILY_COLUMNS = ['ts_code', 'trade_date', 'open', 'high', 'low', 'close', 'pre_close',
+                 'change', 'pct_chg', 'vol', 'amount']
+
+STOCK_BASIC_COLUMNS = ['ts_code', 'symbol', 'name', 'area', 'industry', 'list_date']
+
+INDEX_DAILY_COLUMNS = ['ts_code', 'trade_date', 'close', 'open', 'high', 'low', 'pre_close',
+                       'change', 'pct_chg', 'vol', 'amount']
+
+MINUTE_COLUMNS = ['ts_code', 'trade_time', 'open', 'high', 'low', 'close', 'vol', 'amount']
+
+# 限流错误信息中的关键字（Tushare: "每分钟最多访问该接口"）
+THROTTLE_KEYWORDS = ('每分钟', '频率', 'rate limit', '429')
+
+class DataSource(ABC):
+    """数据源基类，返回统一为Tushare字段格式的数据"""
+
+    name = ''
+
+    @abstractmethod
+    def daily(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """日线数据，列为DAILY_COLUMNS，trade_date为YYYYMMDD字符串"""
+        pass
+
+    @abstractmethod
+    def stock_basic(self) -> pd.DataFrame:
+        """上市股票列表，列为STOCK_BASIC_COLUMNS"""
+        pass
+
+    def daily_by_date(self, trade_date: str) -> pd.DataFrame:
+        """某个交易日全市场的日线截面，列为DAILY_COLUMNS"""
+        raise NotImplementedError(f"数据源{self.name}不提供日线截面")
+
+    def trade_cal(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """区间内的交易日，cal_date列为YYYYMMDD字符串"""
+        raise NotImplementedError(f"数据源{self.name}不提供交易日历")
+
+    def adj_factor(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """单只股票逐交易日的复权因子，列为ts_code、trade_date、adj_factor"""
+        raise NotImplementedError(f"数据源{self.name}不提供复权因子")
+
+    def adj_factor_by_date(self, trade_date: str) -> pd.DataFrame:
+        """某个交易日全市场的复权因子，列为ts_code、trade_date、adj_factor"""
+        raise NotImplementedError(f"数据源{self.name}不提供复权因子截面")
+
+    def index_daily(self, index_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """指数日线，列为INDEX_DAILY_COLUMNS"""
+        raise NotImplementedError(f"数据源{self.name}不提供指数日线")
+
+    def minute(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """1分钟线，列为MINUTE_COLUMNS，trade_time为K线结束时间，vol单位为股、amount单位为元"""
+        raise NotImplementedError(f"数据源{self.name}不提供分钟线")
+
+class TushareSource(DataSource):
+    """Tushare数据源"""
+
+    name = 'tushare'
+
+    def __init__(self, call_api: Callable[..., pd.DataFrame]):
+        """
+        Args:
+            call_api: 接口调用函数 call_api(api_name, **kwargs)，如 DataManager._call_api
+        """
+        self.call_api = call_api
+
+    def daily(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        return self.call_api('daily', ts_code=stock_code, start_date=start_date, end_date=end_date)
+
+    def stock_basic(self) -> pd.DataFrame:
+        return self.call_api('stock_basic', exchange='', list_status='L',
+                             fields='ts_code,symbol,name,area,industry,list_date')
+
+    def daily_by_date(self, trade_date: str) -> pd.DataFrame:
+        return self.call_api('daily', trade_date=trade_date)
+
+    def trade_cal(self, start_date: str, end_date: str) -> pd.DataFrame:
+        return self.call_api('trade_cal', exchange='SSE', start_date=start_date, end_date=end_date, is_open='1')
+
+    def adj_factor(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        return self.call_api('adj_factor', ts_code=stock_code, start_date=start_date, end_date=end_date)
+
+    def adj_factor_by_date(self, trade_date: str) -> pd.DataFrame:
+        return self.call_api('adj_factor', trade_date=trade_date)
+
+    def index_daily(self, index_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        return self.call_api('index_daily', ts_code=index_code, start_date=start_date, end_date=end_date)
+
+    # stk_mins单次最多返回8000行（约33个交易日的1分钟线），按自然日分段请求
+    MINUTE_BATCH_DAYS = 30
+
+    def minute(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        frames = []
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        while start <= end:
+            batch_end = min(start + pd.Timedelta(days=self.MINUTE_BATCH_DAYS - 1), end)
+            frames.append(self.call_api('stk_mins', ts_code=stock_code, freq='1min',
+                                        start_date=f"{start:%Y-%m-%d} 09:00:00",
+                                        end_date=f"{batch_end:%Y-%m-%d} 15:00:00"))
+            start = batch_end + pd.Timedelta(days=1)
+
+        frames = [frame for frame in frames if frame is not None and not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=MINUTE_COLUMNS)
+        bars = pd.concat(frames, ignore_index=True).reindex(columns=MINUTE_COLUMNS)
+        return bars.drop_duplicates('trade_time', keep='last').reset_index(drop=True)
+
+class AkShareSource(DataSource):
+    """AkShare数据源（东方财富行情），字段换算为Tushare口径"""
+
+    name = 'akshare'
+
+    DAILY_FIELDS = {
+        '日期': 'trade_date', '开盘': 'open', '最高': 'high', '最低': 'low', '收盘': 'close',
+        '涨跌额': 'change', '涨跌幅': 'pct_chg', '成交量': 'vol', '成交额': 'amount'
+    }
+
+    def __init__(self, ak=None):
+        """
+        Args:
+            ak: akshare模块或提供相同函数的对象，默认首次使用时导入akshare
+        """
+        self._ak = ak
+
+    @property
+    def ak(self):
+        if self._ak is None:
+            import akshare
+            self._ak = akshare
+        return self._ak
+
+    @staticmethod
+    def to_ts_code(symbol: str) -> str:
+        """6位代码补全交易所后缀"""
+        symbol = str(symbol).zfill(6)
+        if symbol.startswith(('6', '9')):
+            return f"{symbol}.SH"
+        if symbol.startswith(('4', '8')):
+            return f"{symbol}.BJ"
+        return f"{symbol}.SZ"
+
+    def daily(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        raw = self.ak.stock_zh_a_hist(symbol=stock_code.split('.')[0], period='daily',
+                                      start_date=start_date, end_date=end_date, adjust='')
+        if raw is None or raw.empty:
+            return pd.DataFrame(columns=DAILY_COLUMNS)
+
+        daily = raw.rename(columns=self.DAILY_FIELDS)
+        daily['ts_code'] = stock_code
+        daily['trade_date'] = pd.to_datetime(daily['trade_date']).dt.strftime('%Y%m%d')
+        daily['pre_close'] = daily['close'] - daily['change']
+        # AkShare成交额单位为元，Tushare为千元
+        daily['amount'] = daily['amount'] / 1000
+        return daily[DAILY_COLUMNS]
+
+    @staticmethod
+    def to_ak_symbol(ts_code: str) -> str:
+        """Tushare代码转为新浪/东方财富带交易所前缀的代码，如 000300.SH -> sh000300"""
+        code, exchange = ts_code.split('.')
+        return f"{exchange.lower()}{code}"
+
+    def stock_basic(self) -> pd.DataFrame:
+        raw = self.ak.stock_info_a_code_name()
+        stock_list = pd.DataFrame({
+            'ts_code': raw['code'].map(self.to_ts_code),
+            'symbol': raw['code'].astype(str).str.zfill(6),
+            'name': raw['name']
+        })
+        # 上市日期和行业来自各交易所的股票列表（area不提供）
+        listing = self._exchange_listing()
+        stock_list = stock_list.merge(listing, on='symbol', how='left')
+        return stock_list.reindex(columns=STOCK_BASIC_COLUMNS)
+
+    def _exchange_listing(self) -> pd.DataFrame:
+        """沪深北交易所股票列表中的上市日期和行业，列为symbol、list_date、industry"""
+        frames = []
+        for board in ['主板A股', '科创板']:
+            sh = self.ak.stock_info_sh_name_code(symbol=board)
+            frames.append(pd.DataFrame({'symbol': sh['证券代码'], 'list_date': sh['上市日期']}))
+        sz = self.ak.stock_info_sz_name_code(symbol='A股列表')
+        frames.append(pd.DataFrame({'symbol': sz['A股代码'], 'list_date': sz['A股上市日期'],
+                                    'industry': sz['所属行业']}))
+        bj = self.ak.stock_info_bj_name_code()
+        frames.append(pd.DataFrame({'symbol': bj['证券代码'], 'list_date': bj['上市日期'],
+                                    'industry': bj['所属行业']}))
+
+        listing = pd.concat(frames, ignore_index=True).reindex(columns=['symbol', 'list_date', 'industry'])
+        listing['symbol'] = listing['symbol'].astype(str).str.zfill(6)
+        listing['list_date'] = pd.to_datetime(listing['list_date'], errors='coerce').dt.strftime('%Y%m%d')
+        return listing.drop_duplicates('symbol', keep='last')
+
+    SPOT_FIELDS = {
+        '代码': 'symbol', '今开': 'open', '最高': 'high', '最低': 'low', '最新价': 'close', '昨收': 'pre_close',
+        '涨跌额': 'change', '涨跌幅': 'pct_chg', '成交量': 'vol', '成交额': 'amount'
+    }
+
+    # 收盘后实时行情即为当日日线
+    CLOSE_TIME = '15:05'
+
+    def daily_by_date(self, trade_date: str) -> pd.DataFrame:
+        now = datetime.now()
+        if trade_date != now.strftime('%Y%m%d') or now.strftime('%H:%M') < self.CLOSE_TIME:
+            raise NotImplementedError(f"数据源{self.name}只提供当日收盘后的日线截面")
+
+        raw = self.ak.stock_zh_a_spot_em()
+        if raw is None or raw.empty:
+            return pd.DataFrame(columns=DAILY_COLUMNS)
+
+        daily = raw.rename(columns=self.SPOT_FIELDS)
+        daily['ts_code'] = daily['symbol'].map(self.to_ts_code)
+        daily['trade_date'] = trade_date
+        numeric = DAILY_COLUMNS[2:]
+        daily[numeric] = daily[numeric].apply(pd.to_numeric, errors='coerce')
+        # 停牌股票没有成交
+        daily = daily[daily['vol'] > 0]
+        daily['amount'] = daily['amount'] / 1000
+        return daily[DAILY_COLUMNS].reset_index(drop=True)
+
+    def trade_cal(self, start_date: str, end_date: str) -> pd.DataFrame:
+        raw = self.ak.tool_trade_date_hist_sina()
+        cal_date = pd.to_datetime(raw['trade_date']).dt.strftime('%Y%m%d')
+        cal_date = cal_date[(cal_date >= start_date) & (cal_date <= end_date)]
+        return pd.DataFrame({'cal_date': cal_date.to_numpy()})
+
+    def adj_factor(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        # 新浪后复权因子只在除权除息日有记录，按交易日向前填充
+        raw = self.ak.stock_zh_a_daily(symbol=self.to_ak_symbol(stock_code), adjust='hfq-factor')
+        trade_dates = pd.to_datetime(self.trade_cal(start_date, end_date)['cal_date'])
+        if raw is None or raw.empty or trade_dates.empty:
+            return pd.DataFrame(columns=['ts_code', 'trade_date', 'adj_factor'])
+
+        factors = pd.Series(pd.to_numeric(raw['hfq_factor']).to_numpy(), index=pd.to_datetime(raw['date']))
+        factors = factors.sort_index()
+        factors = factors[~factors.index.duplicated(keep='last')]
+        factors = factors.reindex(factors.index.union(trade_dates)).ffill().reindex(trade_dates)
+        return pd.DataFrame({
+            'ts_code': stock_code,
+            'trade_date': trade_dates.dt.strftime('%Y%m%d').to_numpy(),
+            'adj_factor': factors.to_numpy()
+        }).dropna(subset=['adj_factor'])
+
+    INDEX_FIELDS = {'date': 'trade_date', 'volume': 'vol'}
+
+    def index_daily(self, index_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        raw = self.ak.stock_zh_index_daily_em(symbol=self.to_ak_symbol(index_code),
+                                              start_date=start_date, end_date=end_date)
+        if raw is None or raw.empty:
+            return pd.DataFrame(columns=INDEX_DAILY_COLUMNS)
+
+        index_daily = raw.rename(columns=self.INDEX_FIELDS)
+        index_daily['ts_code'] = index_code
+        index_daily['trade_date'] = pd.to_datetime(index_daily['trade_date']).dt.strftime('%Y%m%d')
+        index_daily = index_daily.sort_values('trade_date')
+        index_daily['pre_close'] = index_daily['close'].shift(1)
+        index_daily['change'] = index_daily['close'] - index_daily['pre_close']
+        index_daily['pct_chg'] = index_daily['change'] / index_daily['pre_close'] * 100
+        index_daily['amount'] = index_daily['amount'] / 1000
+        return index_daily[INDEX_DAILY_COLUMNS].reset_index(drop=True)
+
+    MINUTE_FIELDS = {
+        '时间': 'trade_time', '开盘': 'open', '最高': 'high', '最低': 'low', '收盘': 'close',
+        '成交量': 'vol', '成交额': 'amount'
+    }
+
+    def minute(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        raw = self.ak.stock_zh_a_hist_min_em(symbol=stock_code.split('.')[0],
+                                             start_date=f"{pd.Timestamp(start_date):%Y-%m-%d} 09:00:00",
+                                             end_date=f"{pd.Timestamp(end_date):%Y-%m-%d} 15:00:00",
+                                             period='1', adjust='')
+        if raw is None or raw.empty:
+            return pd.DataFrame(columns=MINUTE_COLUMNS)
+
+        bars = raw.rename(columns=self.MINUTE_FIELDS)
+        bars['ts_code'] = stock_code
+        # AkShare成交量单位为手，Tushare分钟线为股
+        bars['vol'] = bars['vol'] * 100
+        return bars[MINUTE_COLUMNS]
+
+class AllSourcesFailed(Exception):
+    """所有数据源都失败"""
+
+class _HedgeFailed(Exception):
+    """对冲请求的首选和备用数据源都失败"""
+
+class SourceRouter:
+    """多数据源路由"""
+
+    def __init__(self,
+                 sources: List[DataSource],
+                 cooldown: float = 60.0,
+                 hedge: bool = False,
+                 hedge_quantile: float = 0.95,
+                 hedge_min_samples: int = 20,
+                 latency_window: int = 200):
+        """
+        初始化数据源路由
+
+        Args:
+            sources: 按优先级排列的数据源
+            cooldown: 数据源被限流后暂停使用的秒数
+            hedge: 是否启用对冲请求
+            hedge_quantile: 触发对冲的延迟分位数
+            hedge_min_samples: 首选数据源至少有多少次延迟记录后才启用对冲
+            latency_window: 每个数据源保留的最近延迟记录数
+        """
+        if not sources:
+            raise ValueError("至少需要一个数据源")
+
+        self.sources = list(sources)
+        self.cooldown = cooldown
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.logger = logging.getLogger(__name__)
+
+        self._latencies: Dict[str, Deque[float]] = {s.name: deque(maxlen=latency_window) for s in self.sources}
+        self._paused_until: Dict[str, float] = {}
+        self._stats = {s.name: {'requests': 0, 'failures': 0, 'throttled': 0, 'hedges': 0, 'hedge_wins': 0}
+                       for s in self.sources}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_config(cls, config: Dict, sources: Dict[str, DataSource]) -> 'SourceRouter':
+        """
+        由 data_sources 配置创建
+
+        Args:
+            config: data_sources 配置，读取各数据源的enabled、priority 和 routing 下的对冲参数
+            sources: {名称: 数据源实例}，只使用配置中启用的数据源
+        """
+        priority = config.get('priority', list(sources))
+        enabled = [sources[name] for name in priority
+                   if name in sources and (config.get(name) or {}).get('enabled', name == priority[0])]
+        routing = config.get('routing', {}) or {}
+        return cls(
+            enabled or [sources[priority[0]]],
+            cooldown=routing.get('cooldown', 60.0),
+            hedge=routing.get('hedge', False),
+            hedge_quantile=routing.get('hedge_quantile', 0.95),
+            hedge_min_samples=routing.get('hedge_min_samples', 20)
+        )
+
+    def available_sources(self) -> List[DataSource]:
+        """未处于限流暂停期的数据源（全部暂停时返回全部）"""
+        now = time.monotonic()
+        with self._lock:
+            available = [s for s in self.sources if self._paused_until.get(s.name, 0) <= now]
+        return available or list(self.sources)
+
+    def hedge_delay(self, source: DataSource) -> Optional[float]:
+        """数据源的对冲等待时间（延迟分位数），记录不足时返回None"""
+        with self._lock:
+            latencies = list(self._latencies[source.name])
+        if len(latencies) < self.hedge_min_samples:
+            return None
+        return float(np.quantile(latencies, self.hedge_quantile))
+
+    def _call(self, source: DataSource, method: str, args: tuple) -> pd.DataFrame:
+        """调用数据源并记录延迟和失败（不提供该接口时不计入统计）"""
+        start = time.monotonic()
+        try:
+            result = getattr(source, method)(*args)
+        except NotImplementedError:
+            raise
+        except Exception as e:
+            with self._lock:
+                self._stats[source.name]['requests'] += 1
+                self._stats[source.name]['failures'] += 1
+                if any(keyword in str(e) for keyword in THROTTLE_KEYWORDS):
+                    self._stats[source.name]['throttled'] += 1
+                    self._paused_until[source.name] = time.monotonic() + self.cooldown
+            raise
+        with self._lock:
+            self._stats[source.name]['requests'] += 1
+            self._latencies[source.name].append(time.monotonic() - start)
+        return result
+
+    def _submit(self, source: DataSource, method: str, args: tuple) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix='source-router')
+        return self._executor.submit(self._call, source, method, args)
+
+    def _call_hedged(self, primary: DataSource, backup: DataSource, delay: float,
+                     method: str, args: tuple) -> pd.DataFrame:
+        """
+        首选数据源超过delay未返回时向备用数据源发出相同请求，取先成功的结果
+
+        首选数据源在delay内失败时直接抛出其异常，由调用方正常切换；
+        两个请求都发出且都失败时抛出_HedgeFailed。
+        """
+        futures = {self._submit(primary, method, args): primary}
+        done, _ = wait(futures, timeout=delay)
+        if done:
+            return next(iter(done)).result()
+
+        with self._lock:
+            self._stats[backup.name]['hedges'] += 1
+        futures[self._submit(backup, method, args)] = backup
+
+        errors = []
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if futures[future] is backup:
+                        with self._lock:
+                            self._stats[backup.name]['hedge_wins'] += 1
+                    return future.result()
+                errors.append(f"{futures[future].name}: {future.exception()}")
+        raise _HedgeFailed('; '.join(errors))
+
+    def fetch(self, method: str, *args) -> pd.DataFrame:
+        """
+        按优先级从数据源获取数据，失败时切换到下一个
+
+        Args:
+            method: 数据源方法名，如 'daily'、'stock_basic'
+            *args: 方法参数
+
+        Raises:
+            AllSourcesFailed: 所有数据源都失败
+        """
+        sources = self.available_sources()
+        errors = []
+        tried = set()
+        for i, source in enumerate(sources):
+            if source.name in tried:
+                continue
+            backup = sources[i + 1] if i + 1 < len(sources) else None
+            delay = self.hedge_delay(source) if self.hedge and backup is not None else None
+            try:
+                if delay is not None:
+                    return self._call_hedged(source, backup, delay, method, args)
+                return self._call(source, method, args)
+            except NotImplementedError as e:
+                self.logger.debug(str(e))
+                errors.append(f"{source.name}: {e}")
+            except _HedgeFailed as e:
+                # 备用数据源已经在对冲中失败，不再重试
+                self.logger.warning(f"对冲获取{method}{args}失败: {e}")
+                errors.append(str(e))
+                tried.add(backup.name)
+            except Exception as e:
+                self.logger.warning(f"数据源{source.name}获取{method}{args}失败: {e}")
+                errors.append(f"{source.name}: {e}")
+        raise AllSourcesFailed('; '.join(errors))
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各数据源的请求、失败、限流、对冲次数和延迟分位数"""
+        with self._lock:
+            stats = {name: dict(values) for name, values in self._stats.items()}
+            for name, latencies in self._latencies.items():
+                if latencies:
+                    stats[name]['p50'] = float(np.quantile(latencies, 0.5))
+                    stats[name]['p95'] = float(np.quantile(latencies, 0.95))
+        return stats
@@ -0,0 +1,255 @@
+"""
+行情数据库存储 - 带索引的日线、股票列表和财务指标表
+
+MarketDataStore 定义统一接口，SQLiteStore 为默认实现：
+- daily_bar: 主键 (ts_code, trade_date)，另建 (trade_date, ts_code) 索引支持按日截面查询
+- index_bar: 指数日线，主键 (ts_code, trade_date)，与股票日线分表，不进入全市场截面
+- stock_basic: 主键 ts_code
+- fina_indicator: 主键 (ts_code, end_date, ann_date)
+
+MySQL/PostgreSQL 可通过 SQLAlchemy 实现同一接口后接入 create_market_store。
+"""
+
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+DAILY_BAR_COLUMNS = ['ts_code', 'trade_date', 'open', 'high', 'low', 'close',
+                     'pre_close', 'change', 'pct_chg', 'vol', 'amount']
+STOCK_BASIC_COLUMNS = ['ts_code', 'symbol', 'name', 'area', 'industry', 'list_date']
+FINA_INDICATOR_COLUMNS = ['ts_code', 'ann_date', 'end_date', 'eps', 'bps', 'roe', 'roa',
+                          'grossprofit_margin', 'netprofit_margin', 'debt_to_assets',
+                          'netprofit_yoy', 'or_yoy']
+
+class MarketDataStore(ABC):
+    """行情数据库存储接口"""
+
+    @abstractmethod
+    def upsert_daily_bars(self, bars: pd.DataFrame) -> int:
+        """批量写入日线数据（已存在则更新），返回写入行数"""
+        pass
+
+    @abstractmethod
+    def get_daily_bars(self,
+                       ts_code: str,
+                       start_date: str = None,
+                       end_date: str = None) -> pd.DataFrame:
+        """查询单只股票区间日线，以trade_date为索引"""
+        pass
+
+    @abstractmethod
+    def get_cross_section(self, trade_date: str) -> pd.DataFrame:
+        """查询某交易日全市场日线，以ts_code为索引"""
+        pass
+
+    @abstractmethod
+    def upsert_index_bars(self, bars: pd.DataFrame) -> int:
+        """批量写入指数日线（已存在则更新），返回写入行数"""
+        pass
+
+    @abstractmethod
+    def get_index_bars(self,
+                       ts_code: str,
+                       start_date: str = None,
+                       end_date: str = None) -> pd.DataFrame:
+        """查询单个指数区间日线，以trade_date为索引"""
+        pass
+
+    @abstractmethod
+    def upsert_stock_basic(self, stock_list: pd.DataFrame) -> int:
+        """批量写入股票列表"""
+        pass
+
+    @abstractmethod
+    def get_stock_basic(self) -> pd.DataFrame:
+        """查询股票列表"""
+        pass
+
+    @abstractmethod
+    def upsert_fina_indicator(self, indicators: pd.DataFrame) -> int:
+        """批量写入财务指标"""
+        pass
+
+    @abstractmethod
+    def get_fina_indicator(self,
+                           ts_code: str = None,
+                           start_date: str = None,
+                           end_date: str = None) -> pd.DataFrame:
+        """按公告日期区间查询财务指标"""
+        pass
+
+class SQLiteStore(MarketDataStore):
+    """SQLite行情数据库"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS daily_bar (
+            ts_code TEXT NOT NULL,
+            trade_date TEXT NOT NULL,
+            open REAL, high REAL, low REAL, close REAL, pre_close REAL,
+            change REAL, pct_chg REAL, vol REAL, amount REAL,
+            PRIMARY KEY (ts_code, trade_date)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_daily_bar_date ON daily_bar (trade_date, ts_code);
+
+        CREATE TABLE IF NOT EXISTS index_bar (
+            ts_code TEXT NOT NULL,
+            trade_date TEXT NOT NULL,
+            open REAL, high REAL, low REAL, close REAL, pre_close REAL,
+            change REAL, pct_chg REAL, vol REAL, amount REAL,
+            PRIMARY KEY (ts_code, trade_date)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS stock_basic (
+            ts_code TEXT PRIMARY KEY,
+            symbol TEXT, name TEXT, area TEXT, industry TEXT, list_date TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS fina_indicator (
+            ts_code TEXT NOT NULL,
+            ann_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            eps REAL, bps REAL, roe REAL, roa REAL,
+            grossprofit_margin REAL, netprofit_margin REAL, debt_to_assets REAL,
+            netprofit_yoy REAL, or_yoy REAL,
+            PRIMARY KEY (ts_code, end_date, ann_date)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_fina_indicator_ann ON fina_indicator (ann_date, ts_code);
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        初始化SQLite存储
+
+        Args:
+            path: 数据库文件路径
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+        self.connection.executescript(self.SCHEMA)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """每个线程使用独立连接，WAL模式下读不阻塞写"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """关闭当前线程的连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _upsert(self, table: str, columns: List[str], keys: List[str], data: pd.DataFrame) -> int:
+        """INSERT ... ON CONFLICT DO UPDATE 批量写入"""
+        if data.empty:
+            return 0
+
+        rows = data.reindex(columns=columns)
+        for key in keys:
+            if key.endswith('date'):
+                rows[key] = _to_date_str(rows[key])
+        rows = rows.astype(object).where(rows.notna(), None)
+
+        updates = ', '.join(f"{col}=excluded.{col}" for col in columns if col not in keys)
+        sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' * len(columns))}) "
+               f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}")
+
+        with self.connection as conn:
+            conn.executemany(sql, rows.itertuples(index=False, name=None))
+        return len(rows)
+
+    def _query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def upsert_daily_bars(self, bars: pd.DataFrame) -> int:
+        # 兼容以trade_date为索引的日线数据
+        if 'trade_date' not in bars.columns and bars.index.name == 'trade_date':
+            bars = bars.reset_index()
+        return self._upsert('daily_bar', DAILY_BAR_COLUMNS, ['ts_code', 'trade_date'], bars)
+
+    def get_daily_bars(self,
+                       ts_code: str,
+                       start_date: str = None,
+                       end_date: str = None) -> pd.DataFrame:
+        return self._query_bars('daily_bar', ts_code, start_date, end_date)
+
+    def _query_bars(self, table: str, ts_code: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+        bars = self._query(
+            f"SELECT * FROM {table} WHERE ts_code = ? AND trade_date BETWEEN ? AND ? ORDER BY trade_date",
+            (ts_code, start_date or '00000000', end_date or '99999999')
+        )
+        bars['trade_date'] = pd.to_datetime(bars['trade_date'])
+        return bars.set_index('trade_date')
+
+    def get_cross_section(self, trade_date: str) -> pd.DataFrame:
+        bars = self._query(
+            "SELECT * FROM daily_bar WHERE trade_date = ? ORDER BY ts_code",
+            (_to_date_str(pd.Series([trade_date])).iloc[0],)
+        )
+        return bars.set_index('ts_code')
+
+    def upsert_index_bars(self, bars: pd.DataFrame) -> int:
+        if 'trade_date' not in bars.columns and bars.index.name == 'trade_date':
+            bars = bars.reset_index()
+        return self._upsert('index_bar', DAILY_BAR_COLUMNS, ['ts_code', 'trade_date'], bars)
+
+    def get_index_bars(self,
+                       ts_code: str,
+                       start_date: str = None,
+                       end_date: str = None) -> pd.DataFrame:
+        return self._query_bars('index_bar', ts_code, start_date, end_date)
+
+    def upsert_stock_basic(self, stock_list: pd.DataFrame) -> int:
+        return self._upsert('stock_basic', STOCK_BASIC_COLUMNS, ['ts_code'], stock_list)
+
+    def get_stock_basic(self) -> pd.DataFrame:
+        return self._query("SELECT * FROM stock_basic ORDER BY ts_code")
+
+    def upsert_fina_indicator(self, indicators: pd.DataFrame) -> int:
+        return self._upsert('fina_indicator', FINA_INDICATOR_COLUMNS,
+                            ['ts_code', 'end_date', 'ann_date'], indicators.dropna(subset=['ann_date']))
+
+    def get_fina_indicator(self,
+                           ts_code: str = None,
+                           start_date: str = None,
+                           end_date: str = None) -> pd.DataFrame:
+        sql = "SELECT * FROM fina_indicator WHERE ann_date BETWEEN ? AND ?"
+        params = [start_date or '00000000', end_date or '99999999']
+        if ts_code is not None:
+            sql += " AND ts_code = ?"
+            params.append(ts_code)
+        return self._query(sql + " ORDER BY ts_code, ann_date", tuple(params))
+
+def _to_date_str(dates: pd.Series) -> pd.Series:
+    """统一日期为YYYYMMDD字符串，保证按字典序即时间序"""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates.dt.strftime('%Y%m%d')
+    return pd.to_datetime(dates.astype(str)).dt.strftime('%Y%m%d')
+
+def create_market_store(db_config: Dict, data_dir: Union[str, Path] = 'data') -> MarketDataStore:
+    """
+    按 database 配置创建行情数据库存储
+
+    Args:
+        db_config: config.yaml 中的 database 配置
+        data_dir: 未配置路径时数据库文件所在目录
+    """
+    db_type = db_config.get('type', 'sqlite')
+    if db_type == 'sqlite':
+        path = db_config.get('sqlite', {}).get('path') or Path(data_dir) / 'quantstock.db'
+        return SQLiteStore(path)
+    raise ValueError(f"不支持的数据库类型: {db_type}，请基于SQLAlchemy实现MarketDataStore接口")
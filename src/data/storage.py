@@ -0,0 +1,174 @@
+"""
+本地存储后端 - 数据文件的读写
+
+支持的格式：
+- parquet: 列式压缩存储（默认），保留索引和数据类型，支持按列读取；
+  追加的数据写入 <名称>.parts/ 下的新文件，不重写已有文件
+- csv: 文本格式，仅用于导出或读取旧版缓存
+"""
+
+import logging
+import shutil
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Union
+
+import pandas as pd
+
+class FileStorage(ABC):
+    """文件存储基类"""
+
+    suffix = ''
+
+    def __init__(self, data_dir: Union[str, Path]):
+        """
+        初始化存储后端
+
+        Args:
+            data_dir: 数据目录
+        """
+        self.data_dir = Path(data_dir)
+        self.logger = logging.getLogger(__name__)
+
+    def path(self, name: str) -> Path:
+        """获取数据文件路径"""
+        return self.data_dir / f"{name}{self.suffix}"
+
+    def exists(self, name: str) -> bool:
+        """数据文件是否存在"""
+        return self.path(name).exists()
+
+    @abstractmethod
+    def save(self, data: pd.DataFrame, name: str) -> Path:
+        """保存数据，返回文件路径"""
+        pass
+
+    @abstractmethod
+    def load(self, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        加载数据
+
+        Args:
+            name: 数据名称
+            columns: 只读取的列，None表示全部
+        """
+        pass
+
+    def append(self, data: pd.DataFrame, name: str) -> Path:
+        """追加数据，默认实现为读出后合并重写，新增的列保留（旧行为空值）"""
+        if self.exists(name):
+            data = pd.concat([self.load(name), data])
+        return self.save(data, name)
+
+class ParquetStorage(FileStorage):
+    """Parquet列式存储"""
+
+    suffix = '.parquet'
+
+    def __init__(self, data_dir: Union[str, Path], compression: str = 'zstd', max_parts: int = 32):
+        """
+        初始化存储后端
+
+        Args:
+            data_dir: 数据目录
+            compression: 压缩算法
+            max_parts: 追加文件数达到该值时合并为单个文件
+        """
+        super().__init__(data_dir)
+        self.compression = compression
+        self.max_parts = max_parts
+
+    def parts_dir(self, name: str) -> Path:
+        """追加数据文件所在目录"""
+        return self.data_dir / f"{name}.parts"
+
+    def _parts(self, name: str) -> List[Path]:
+        parts_dir = self.parts_dir(name)
+        return sorted(parts_dir.glob(f"*{self.suffix}")) if parts_dir.exists() else []
+
+    def exists(self, name: str) -> bool:
+        return self.path(name).exists() or bool(self._parts(name))
+
+    def _write(self, data: pd.DataFrame, file_path: Path) -> Path:
+        data.to_parquet(file_path, engine='pyarrow', compression=self.compression, index=True)
+        return file_path
+
+    def save(self, data: pd.DataFrame, name: str) -> Path:
+        """保存数据，索引和dtype写入parquet的pandas元数据，覆盖之前追加的文件"""
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        file_path = self._write(data, self.path(name))
+        shutil.rmtree(self.parts_dir(name), ignore_errors=True)
+        return file_path
+
+    def append(self, data: pd.DataFrame, name: str) -> Path:
+        """追加数据写入新文件；文件数达到max_parts时合并重写"""
+        parts = self._parts(name)
+        if not self.path(name).exists() and not parts:
+            return self.save(data, name)
+        if len(parts) + 1 >= self.max_parts:
+            return self.save(pd.concat([self.load(name), data]), name)
+
+        parts_dir = self.parts_dir(name)
+        parts_dir.mkdir(parents=True, exist_ok=True)
+        sequence = int(parts[-1].stem) + 1 if parts else 1
+        return self._write(data, parts_dir / f"{sequence:06d}{self.suffix}")
+
+    def load(self, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """加载数据，指定columns时只解码这些列（索引始终保留）；各文件的列取并集"""
+        paths = [path for path in [self.path(name)] if path.exists()] + self._parts(name)
+        if not paths:
+            raise FileNotFoundError(self.path(name))
+        frames = [self._read(path, columns) for path in paths]
+        data = frames[0] if len(frames) == 1 else pd.concat(frames)
+        return data if columns is None else data.reindex(columns=columns)
+
+    def _read(self, file_path: Path, columns: Optional[List[str]]) -> pd.DataFrame:
+        if columns is not None:
+            import pyarrow.parquet as pq
+
+            # 较早写入的文件可能没有后来新增的列
+            available = set(pq.read_schema(file_path).names)
+            columns = [column for column in columns if column in available]
+        return pd.read_parquet(file_path, engine='pyarrow', columns=columns)
+
+class CsvStorage(FileStorage):
+    """CSV文本存储，仅用于导出和兼容旧版缓存"""
+
+    suffix = '.csv'
+
+    def save(self, data: pd.DataFrame, name: str) -> Path:
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        file_path = self.path(name)
+        data.to_csv(file_path, index=True)
+        return file_path
+
+    def load(self, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        data = pd.read_csv(self.path(name), index_col=0)
+        if columns is not None:
+            data = data[columns]
+        return data
+
+    def append(self, data: pd.DataFrame, name: str) -> Path:
+        """CSV可直接在文件末尾追加行，出现新列时合并重写"""
+        if not self.exists(name):
+            return self.save(data, name)
+        file_path = self.path(name)
+        columns = pd.read_csv(file_path, index_col=0, nrows=0).columns
+        if not set(data.columns) <= set(columns):
+            return super().append(data, name)
+        data.reindex(columns=columns).to_csv(file_path, mode='a', header=False, index=True)
+        return file_path
+
+def create_storage(storage_format: str, data_dir: Union[str, Path]) -> FileStorage:
+    """
+    按格式创建存储后端
+
+    Args:
+        storage_format: 存储格式，parquet 或 csv
+        data_dir: 数据目录
+    """
+    if storage_format == 'parquet':
+        return ParquetStorage(data_dir)
+    if storage_format == 'csv':
+        return CsvStorage(data_dir)
+    raise ValueError(f"不支持的存储格式: {storage_format}")
@@ -0,0 +1,218 @@
+"""
+交易日历 - 交易所交易日轴与日期序号索引
+
+所有按窗口计算的逻辑共用同一条交易日轴：
+- 日期 -> 序号为字典查找，O(1)
+- "N个交易日之前" 直接在序号上加减，不受周末、节假日影响
+- 按股票的不规则序列对齐到公共日期轴，停牌日为NaN并给出掩码
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+DateLike = Union[str, pd.Timestamp, np.datetime64]
+
+def _to_timestamp(date: DateLike) -> pd.Timestamp:
+    """YYYYMMDD字符串、Timestamp或datetime64统一转换为Timestamp"""
+    return pd.Timestamp(str(date) if isinstance(date, (int, np.integer)) else date)
+
+def _to_datetime_index(dates: Iterable[DateLike]) -> pd.DatetimeIndex:
+    """批量转换为纳秒精度的DatetimeIndex"""
+    if isinstance(dates, pd.Index):
+        index = dates
+    elif isinstance(dates, (pd.Series, np.ndarray, list, tuple)):
+        index = pd.Index(dates)
+    else:
+        index = pd.Index(list(dates))
+    if not isinstance(index, pd.DatetimeIndex):
+        index = pd.to_datetime(index.astype(str))
+    return index.astype('datetime64[ns]')
+
+@dataclass
+class AlignedPanel:
+    """对齐到交易日轴的 日期 × 股票 矩阵"""
+
+    dates: pd.DatetimeIndex
+    symbols: List[str]
+    values: np.ndarray
+    mask: np.ndarray
+
+    def to_frame(self) -> pd.DataFrame:
+        """转换为以交易日为索引、股票代码为列的宽表"""
+        return pd.DataFrame(self.values, index=self.dates, columns=self.symbols)
+
+class TradingCalendar:
+    """交易日历类"""
+
+    def __init__(self,
+                 dates: Iterable[DateLike],
+                 start: DateLike = None,
+                 end: DateLike = None):
+        """
+        初始化交易日历
+
+        Args:
+            dates: 交易日（YYYYMMDD字符串或日期），无需有序
+            start: 日历覆盖的起始日期，默认第一个交易日
+            end: 日历覆盖的结束日期，默认最后一个交易日
+        """
+        self.dates = pd.DatetimeIndex(np.unique(_to_datetime_index(dates).values))
+        self._ordinals: Dict[int, int] = {value: i for i, value in enumerate(self.dates.asi8)}
+
+        self.start = _to_timestamp(start) if start is not None else (
+            self.dates[0] if len(self.dates) else None
+        )
+        self.end = _to_timestamp(end) if end is not None else (
+            self.dates[-1] if len(self.dates) else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __contains__(self, date: DateLike) -> bool:
+        return self.is_trading_day(date)
+
+    def covers(self, start: DateLike, end: DateLike) -> bool:
+        """日历是否覆盖 [start, end] 区间"""
+        if self.start is None:
+            return False
+        return self.start <= _to_timestamp(start) and _to_timestamp(end) <= self.end
+
+    def is_trading_day(self, date: DateLike) -> bool:
+        """是否为交易日"""
+        return _to_timestamp(date).value in self._ordinals
+
+    def ordinal(self, date: DateLike) -> int:
+        """
+        交易日的序号
+
+        Raises:
+            KeyError: 日期不是交易日
+        """
+        try:
+            return self._ordinals[_to_timestamp(date).value]
+        except KeyError:
+            raise KeyError(f"{date} 不是交易日") from None
+
+    def ordinals(self, dates: Sequence[DateLike]) -> np.ndarray:
+        """批量获取交易日序号，非交易日为-1"""
+        return self.dates.get_indexer(_to_datetime_index(dates))
+
+    def locate(self, date: DateLike, side: str = 'left') -> int:
+        """
+        日期在交易日轴上的位置，非交易日按side取相邻交易日
+
+        Args:
+            date: 日期
+            side: left 取不晚于date的最近交易日，right 取不早于date的最近交易日
+
+        Returns:
+            交易日序号，可能为-1（早于第一个交易日）或len（晚于最后一个交易日）
+        """
+        timestamp = _to_timestamp(date)
+        position = self._ordinals.get(timestamp.value)
+        if position is not None:
+            return position
+        position = int(self.dates.searchsorted(timestamp, side='left'))
+        return position - 1 if side == 'left' else position
+
+    def previous_trading_day(self, date: DateLike) -> Optional[pd.Timestamp]:
+        """不晚于date的最近交易日"""
+        position = self.locate(date, 'left')
+        return self.dates[position] if position >= 0 else None
+
+    def next_trading_day(self, date: DateLike) -> Optional[pd.Timestamp]:
+        """不早于date的最近交易日"""
+        position = self.locate(date, 'right')
+        return self.dates[position] if position < len(self.dates) else None
+
+    def shift(self, date: DateLike, n: int) -> pd.Timestamp:
+        """
+        从date起移动n个交易日
+
+        非交易日先归到之前最近的交易日；超出日历范围时截断到首尾交易日。
+
+        Args:
+            date: 起始日期
+            n: 交易日数，负数向前
+        """
+        if not len(self.dates):
+            raise ValueError("交易日历为空")
+        position = max(self.locate(date, 'left'), 0)
+        return self.dates[min(max(position + n, 0), len(self.dates) - 1)]
+
+    def window_start(self, end: DateLike, periods: int) -> pd.Timestamp:
+        """以end结束、包含periods个交易日的窗口的第一个交易日"""
+        return self.shift(end, -(periods - 1))
+
+    def range(self, start: DateLike = None, end: DateLike = None) -> pd.DatetimeIndex:
+        """[start, end] 区间内的交易日"""
+        left = 0 if start is None else self.locate(start, 'right')
+        right = len(self.dates) if end is None else self.locate(end, 'left') + 1
+        return self.dates[left:max(right, left)]
+
+    def count(self, start: DateLike, end: DateLike) -> int:
+        """[start, end] 区间内的交易日数"""
+        return len(self.range(start, end))
+
+    def align(self,
+              data: Union[pd.Series, pd.DataFrame],
+              start: DateLike = None,
+              end: DateLike = None) -> Tuple[Union[pd.Series, pd.DataFrame], pd.Series]:
+        """
+        将单只股票以日期为索引的数据对齐到交易日轴
+
+        Args:
+            data: 以trade_date为索引的序列或日线数据
+            start: 开始日期，默认数据的第一天
+            end: 结束日期，默认数据的最后一天
+
+        Returns:
+            (对齐后的数据，停牌日为NaN, 有数据的交易日掩码)
+        """
+        index = _to_datetime_index(data.index)
+        axis = self.range(start if start is not None else index.min(),
+                          end if end is not None else index.max())
+        aligned = data.set_axis(index).reindex(axis)
+        mask = pd.Series(axis.isin(index), index=axis)
+        return aligned, mask
+
+    def align_panel(self,
+                    frames: Mapping[str, pd.DataFrame],
+                    field: str,
+                    start: DateLike = None,
+                    end: DateLike = None,
+                    dtype: str = 'float64') -> AlignedPanel:
+        """
+        将多只股票的日线数据对齐为 日期 × 股票 矩阵
+
+        每只股票只做一次序号查找和一次赋值，不产生中间DataFrame。
+
+        Args:
+            frames: {ts_code: 以trade_date为索引的日线数据}
+            field: 取值字段，如 close
+            start: 开始日期，默认日历覆盖的第一个交易日
+            end: 结束日期，默认日历覆盖的最后一个交易日
+            dtype: 矩阵数据类型
+
+        Returns:
+            对齐的面板，停牌或未上市的位置为NaN，mask为False
+        """
+        axis = self.range(start, end)
+        symbols = sorted(frames)
+        values = np.full((len(axis), len(symbols)), np.nan, dtype=dtype)
+        mask = np.zeros((len(axis), len(symbols)), dtype=bool)
+
+        for j, stock_code in enumerate(symbols):
+            frame = frames[stock_code]
+            if frame.empty or field not in frame.columns:
+                continue
+            rows = axis.get_indexer(_to_datetime_index(frame.index))
+            found = rows >= 0
+            values[rows[found], j] = frame[field].to_numpy()[found]
+            mask[rows[found], j] = True
+
+        return AlignedPanel(dates=axis, symbols=symbols, values=values, mask=mask)
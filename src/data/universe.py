@@ -0,0 +1,364 @@
+"""
+股票池位图索引 - 按交易日预先计算每只股票是否满足股票池条件
+
+每个条件一个 交易日 × 股票 的位图，按位压缩存储（每字节8只股票）：
+- listed: 上市满 min_listing_days 个交易日
+- trading: 当日有成交（未停牌）
+- not_st: 非ST/*ST
+- market_cap: 总市值不低于 min_market_cap（亿元）
+- price: 收盘价不低于 price_min
+- turnover: 成交额不低于 turnover_min（元）
+
+多个条件在压缩的字节上按位与，再展开为整个截面的布尔掩码，选股、因子和回测代码
+用一次数组运算即可过滤全市场截面。索引每个交易日追加一行，股票轴只追加新股票；
+内存中的位图按倍数预留行和列，追加不复制已有数据，保存时截去预留部分。
+
+ST状态按名称变更历史（Tushare namechange）取当日使用的名称判断，没有历史记录的股票
+使用当前股票列表中的名称。
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .trading_calendar import DateLike, TradingCalendar, _to_timestamp
+
+CRITERIA = ['listed', 'trading', 'not_st', 'market_cap', 'price', 'turnover']
+
+def names_as_of(name_history: pd.DataFrame, trade_date: DateLike) -> pd.Series:
+    """
+    各股票在某交易日使用的名称
+
+    Args:
+        name_history: 名称变更历史（ts_code、name、start_date、end_date，end_date为空表示至今）
+        trade_date: 交易日
+
+    Returns:
+        以ts_code为索引的名称，当日没有有效记录的股票不在结果中
+    """
+    timestamp = _to_timestamp(trade_date)
+    start = pd.to_datetime(name_history['start_date'].astype(str), format='%Y%m%d', errors='coerce')
+    end = pd.to_datetime(name_history['end_date'].astype(str), format='%Y%m%d', errors='coerce')
+    active = name_history[(start <= timestamp) & (end.isna() | (end >= timestamp))]
+    active = active.assign(ts_code=active['ts_code'].astype(str), start_date=start[active.index])
+    return active.sort_values('start_date').drop_duplicates('ts_code', keep='last').set_index('ts_code')['name']
+
+def universe_flags(daily: pd.DataFrame,
+                   daily_basic: pd.DataFrame,
+                   stock_list: pd.DataFrame,
+                   symbols: Sequence[str],
+                   trade_date: DateLike,
+                   calendar: TradingCalendar,
+                   params: Dict,
+                   name_history: Optional[pd.DataFrame] = None) -> Dict[str, np.ndarray]:
+    """
+    计算一个交易日各股票是否满足各条件
+
+    Args:
+        daily: 当日全市场日线（ts_code、close、vol、amount）
+        daily_basic: 当日全市场每日指标（ts_code、total_mv），可为空
+        stock_list: 股票列表（ts_code、name、list_date）
+        symbols: 股票轴
+        trade_date: 交易日
+        calendar: 交易日历，用于计算上市交易日数
+        params: 阈值 min_listing_days、min_market_cap、price_min、turnover_min
+        name_history: 名称变更历史，用于判断当日是否为ST，None表示使用当前名称
+
+    Returns:
+        {条件: 按symbols顺序的布尔数组}，数据缺失的股票视为不满足
+    """
+    symbols = pd.Index(symbols)
+
+    def by_code(data: pd.DataFrame, field: str) -> pd.Series:
+        """字段按symbols顺序排列，缺失为NaN"""
+        if data.empty or field not in data.columns:
+            return pd.Series(np.nan, index=symbols)
+        data = data.assign(ts_code=data['ts_code'].astype(str)).drop_duplicates('ts_code', keep='last')
+        return data.set_index('ts_code')[field].reindex(symbols)
+
+    def column(data: pd.DataFrame, field: str) -> np.ndarray:
+        return by_code(data, field).to_numpy(dtype=float)
+
+    flags = {}
+
+    # 上市交易日数：上市日起第一个交易日到当日的交易日数，上市早于日历起点的视为足够
+    list_dates = pd.DatetimeIndex(pd.to_datetime(by_code(stock_list, 'list_date').astype(str),
+                                                 format='%Y%m%d', errors='coerce'))
+    listed = np.asarray(list_dates.notna())
+    first_positions = calendar.dates.searchsorted(list_dates.fillna(pd.Timestamp.max), side='left')
+    ages = calendar.locate(trade_date, 'left') - first_positions + 1
+    before_calendar = np.asarray(list_dates < calendar.start) if calendar.start is not None else listed
+    flags['listed'] = listed & ((ages >= params['min_listing_days']) | before_calendar)
+
+    with np.errstate(invalid='ignore'):
+        flags['trading'] = column(daily, 'vol') > 0
+
+        names = by_code(stock_list, 'name')
+        if name_history is not None and not name_history.empty:
+            names = names_as_of(name_history, trade_date).reindex(symbols).fillna(names)
+        flags['not_st'] = (names.notna() & ~names.astype(str).str.upper().str.contains('ST')).to_numpy()
+
+        # total_mv单位万元，阈值单位亿元；amount单位千元，阈值单位元
+        flags['market_cap'] = column(daily_basic, 'total_mv') / 1e4 >= params['min_market_cap']
+        flags['price'] = column(daily, 'close') >= params['price_min']
+        flags['turnover'] = column(daily, 'amount') * 1000 >= params['turnover_min']
+    return flags
+
+class UniverseIndex:
+    """股票池位图索引类"""
+
+    VERSION = 1
+
+    def __init__(self,
+                 root: Union[str, Path] = None,
+                 min_listing_days: int = 252,
+                 min_market_cap: float = 50.0,
+                 price_min: float = 2.0,
+                 turnover_min: float = 1e6):
+        """
+        打开位图索引（目录不存在时为空索引）
+
+        Args:
+            root: 索引目录，None表示只在内存中
+            min_listing_days: 最小上市交易日数
+            min_market_cap: 最小总市值（亿元）
+            price_min: 最低收盘价
+            turnover_min: 最小成交额（元）
+        """
+        self.root = Path(root) if root is not None else None
+        self.params = {
+            'min_listing_days': min_listing_days,
+            'min_market_cap': min_market_cap,
+            'price_min': price_min,
+            'turnover_min': turnover_min
+        }
+        self.logger = logging.getLogger(__name__)
+
+        self.symbols: List[str] = []
+        self._rows: Dict[int, int] = {}
+        self._columns: Dict[str, int] = {}
+        # 已写入的交易日数为_length，_date_values和_bits的行数为预留容量
+        self._length = 0
+        self._date_values = np.zeros(0, dtype=np.int64)
+        self._dates: Optional[pd.DatetimeIndex] = None
+        self._bits: Dict[str, np.ndarray] = {name: np.zeros((0, 0), dtype=np.uint8) for name in CRITERIA}
+        self._load()
+
+    @classmethod
+    def from_config(cls, root: Union[str, Path], selection_config: Dict) -> 'UniverseIndex':
+        """由 stock_selection 配置创建，读取 universe 和 filters 中的阈值"""
+        universe = selection_config.get('universe', {}) or {}
+        filters = selection_config.get('filters', {}) or {}
+        return cls(
+            root,
+            min_listing_days=universe.get('min_listing_days', 252),
+            min_market_cap=universe.get('min_market_cap', 50.0),
+            price_min=filters.get('price_min', 2.0),
+            turnover_min=filters.get('turnover_min', 1e6)
+        )
+
+    @property
+    def meta_path(self) -> Optional[Path]:
+        return self.root / 'meta.json' if self.root is not None else None
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        """索引中的交易日"""
+        if self._dates is None:
+            self._dates = pd.DatetimeIndex(self._date_values[:self._length].copy()).rename(None)
+        return self._dates
+
+    @property
+    def shape(self):
+        return self._length, len(self.symbols)
+
+    @property
+    def _width(self) -> int:
+        """股票轴压缩后的字节数"""
+        return (len(self.symbols) + 7) // 8
+
+    def packed_bits(self) -> Dict[str, np.ndarray]:
+        """各条件的压缩位图（交易日 × 字节），不含预留的行和列"""
+        return {name: bits[:self._length, :self._width] for name, bits in self._bits.items()}
+
+    def _load(self):
+        """读取索引，阈值与当前配置不同时丢弃旧索引"""
+        if self.meta_path is None or not self.meta_path.exists():
+            return
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('params') != self.params:
+                self.logger.warning(f"股票池阈值已变化，重新构建位图索引: {meta.get('params')} -> {self.params}")
+                return
+            with np.load(self.root / 'bits.npz') as bits:
+                loaded = {name: bits[name] for name in CRITERIA}
+            dates = pd.DatetimeIndex(pd.to_datetime(meta['dates'], format='%Y%m%d')).astype('datetime64[ns]')
+        except Exception as e:
+            self.logger.warning(f"股票池位图索引读取失败: {e}")
+            return
+        self._bits = loaded
+        self._length = len(dates)
+        self._date_values = dates.asi8.copy()
+        self._dates = None
+        self.symbols = list(meta['symbols'])
+        self._rows = {value: i for i, value in enumerate(self._date_values)}
+        self._columns = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    def save(self):
+        """保存索引（先写临时文件再替换）"""
+        if self.root is None:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_bits = self.root / 'bits.tmp.npz'
+        np.savez(tmp_bits, **self.packed_bits())
+        os.replace(tmp_bits, self.root / 'bits.npz')
+
+        tmp_meta = self.meta_path.with_suffix('.tmp')
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': self.VERSION,
+                'params': self.params,
+                'dates': list(self.dates.strftime('%Y%m%d')),
+                'symbols': self.symbols
+            }, f, ensure_ascii=False)
+        os.replace(tmp_meta, self.meta_path)
+
+    def _extend_symbols(self, symbols: Sequence[str]):
+        """股票轴追加新股票，已有列位置不变"""
+        new = [symbol for symbol in dict.fromkeys(symbols) if symbol not in self._columns]
+        if not new:
+            return
+        for symbol in new:
+            self._columns[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+        width = self._width
+        for name, bits in self._bits.items():
+            if bits.shape[1] < width:
+                self._bits[name] = np.pad(bits, ((0, 0), (0, max(width, 2 * bits.shape[1]) - bits.shape[1])))
+
+    def _append_row(self, timestamp: pd.Timestamp) -> int:
+        """交易日轴追加一行，容量不足时按倍数扩大"""
+        row = self._length
+        if row == len(self._date_values):
+            capacity = max(16, 2 * row)
+            self._date_values = np.resize(self._date_values, capacity)
+            for name, bits in self._bits.items():
+                self._bits[name] = np.pad(bits, ((0, capacity - bits.shape[0]), (0, 0)))
+        self._date_values[row] = timestamp.value
+        self._length = row + 1
+        self._dates = None
+        self._rows[timestamp.value] = row
+        return row
+
+    def update(self,
+               trade_date: DateLike,
+               daily: pd.DataFrame,
+               daily_basic: pd.DataFrame,
+               stock_list: pd.DataFrame,
+               calendar: TradingCalendar,
+               name_history: Optional[pd.DataFrame] = None):
+        """
+        写入一个交易日的位图（已有的交易日覆盖，否则只能追加在最后一个交易日之后）
+
+        Args:
+            trade_date: 交易日
+            daily: 当日全市场日线
+            daily_basic: 当日全市场每日指标
+            stock_list: 股票列表
+            calendar: 交易日历
+            name_history: 名称变更历史，None表示按当前名称判断ST
+
+        Raises:
+            ValueError: 日期早于索引中的最后一个交易日且不在索引中
+        """
+        timestamp = _to_timestamp(trade_date)
+        row = self._rows.get(timestamp.value)
+        if row is None and self._length and timestamp.value < self._date_values[self._length - 1]:
+            last = pd.Timestamp(self._date_values[self._length - 1])
+            raise ValueError(f"位图索引只能按交易日顺序追加: {timestamp.date()} 早于 {last.date()}")
+
+        codes = [code for frame in (stock_list, daily) if 'ts_code' in frame.columns
+                 for code in frame['ts_code'].astype(str)]
+        self._extend_symbols(sorted(set(codes)))
+
+        flags = universe_flags(daily, daily_basic, stock_list, self.symbols, timestamp, calendar, self.params,
+                               name_history)
+        packed = {name: np.packbits(flags[name]) for name in CRITERIA}
+
+        if row is None:
+            row = self._append_row(timestamp)
+        for name in CRITERIA:
+            self._bits[name][row, :len(packed[name])] = packed[name]
+
+    def _packed(self, rows, criteria: Optional[Sequence[str]]) -> np.ndarray:
+        """所选条件按位与后的压缩位图"""
+        criteria = CRITERIA if criteria is None else list(criteria)
+        unknown = set(criteria) - set(CRITERIA)
+        if unknown:
+            raise ValueError(f"未知的股票池条件: {sorted(unknown)}")
+        combined = self._bits[criteria[0]][rows]
+        for name in criteria[1:]:
+            combined = combined & self._bits[name][rows]
+        return combined
+
+    def _select_columns(self, mask: np.ndarray, symbols: Optional[Sequence[str]]) -> np.ndarray:
+        """按指定股票顺序取掩码列，不在索引中的股票为False"""
+        if symbols is None:
+            return mask
+        positions = np.array([self._columns.get(symbol, -1) for symbol in symbols], dtype=np.int64)
+        selected = mask[..., np.maximum(positions, 0)]
+        selected[..., positions < 0] = False
+        return selected
+
+    def mask(self,
+             trade_date: DateLike,
+             criteria: Optional[Sequence[str]] = None,
+             symbols: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        某交易日的股票池掩码
+
+        Args:
+            trade_date: 交易日
+            criteria: 使用的条件，默认全部
+            symbols: 掩码对应的股票顺序，默认索引的股票轴
+
+        Raises:
+            KeyError: 交易日不在索引中
+        """
+        row = self._rows.get(_to_timestamp(trade_date).value)
+        if row is None:
+            raise KeyError(f"{trade_date} 不在股票池索引中")
+        mask = np.unpackbits(self._packed(row, criteria), count=len(self.symbols)).astype(bool)
+        return self._select_columns(mask, symbols)
+
+    def masks(self,
+              start_date: DateLike = None,
+              end_date: DateLike = None,
+              criteria: Optional[Sequence[str]] = None,
+              symbols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        区间内的股票池掩码宽表
+
+        Returns:
+            以交易日为索引、股票代码为列的布尔宽表
+        """
+        left = 0 if start_date is None else int(self.dates.searchsorted(_to_timestamp(start_date), side='left'))
+        right = len(self.dates) if end_date is None else int(
+            self.dates.searchsorted(_to_timestamp(end_date), side='right'))
+        mask = np.unpackbits(self._packed(slice(left, right), criteria), axis=1,
+                             count=len(self.symbols)).astype(bool)
+        return pd.DataFrame(self._select_columns(mask, symbols),
+                            index=self.dates[left:right].rename('trade_date'),
+                            columns=pd.Index(self.symbols if symbols is None else list(symbols), name='ts_code'))
+
+    def members(self, trade_date: DateLike, criteria: Optional[Sequence[str]] = None) -> List[str]:
+        """某交易日满足条件的股票代码"""
+        mask = self.mask(trade_date, criteria)
+        return [symbol for symbol, member in zip(self.symbols, mask) if member]
@@ -9,14 +9,31 @@
 - 因子风险模型
 """
 
-from .factor_engine import FactorEngine
-from .factor_calculator import FactorCalculator
-from .factor_analyzer import FactorAnalyzer
-from .factor_model import FactorModel
+import importlib
+
+# 名称 -> 所在模块，按需导入
+_LAZY_IMPORTS = {
+    'FactorEngine': '.factor_engine',
+    'FactorCalculator': '.factor_calculator',
+    'FactorAnalyzer': '.factor_analyzer',
+    'FactorModel': '.factor_model'
+}
 
 __all__ = [
     'FactorEngine',
     'FactorCalculator', 
     'FactorAnalyzer',
     'FactorModel'
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    """首次访问时导入对应模块，避免导入包时加载全部依赖"""
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -9,6 +9,8 @@ from typing import Dict, List, Optional, Tuple
 import logging
 from abc import ABC, abstractmethod
 
+from ..data.snapshot import DatasetSnapshot, ResultCache
+
 class Factor(ABC):
     """因子基类"""
     
@@ -49,6 +51,10 @@ class FactorEngine:
         # 因子数据缓存
         self.factor_data = {}
         
+        # 快照上的因子结果按 (快照id, 参数) 持久化，跨进程复用
+        cache_dir = self.config.get('result_cache_dir')
+        self.result_cache = ResultCache(cache_dir) if cache_dir else None
+        
         self.logger.info("因子引擎初始化完成")
     
     def register_factor(self, factor: Factor):
@@ -74,6 +80,73 @@ class FactorEngine:
         self.factor_data = factor_data
         return factor_data
     
+    def calculate_factors(self, data: pd.DataFrame, factor_names: List[str] = None) -> pd.DataFrame:
+        """
+        计算指定的已注册因子
+        
+        Args:
+            data: 单只股票以trade_date为索引的数据，或以(trade_date, ts_code)为索引的多股票长表（按股票分别计算）
+            factor_names: 因子名称列表，None表示全部已注册因子
+            
+        Raises:
+            KeyError: 因子未注册
+        """
+        names = list(dict.fromkeys(factor_names)) if factor_names else list(self.factors)
+        unknown = [name for name in names if name not in self.factors]
+        if unknown:
+            raise KeyError(f"未注册的因子: {unknown}")
+        
+        if isinstance(data.index, pd.MultiIndex) and 'ts_code' in data.index.names:
+            frames = [
+                pd.DataFrame({name: self.factors[name].calculate(group) for name in names}, index=group.index)
+                for _, group in data.groupby(level='ts_code', sort=False)
+            ]
+            if not frames:
+                return pd.DataFrame(columns=names)
+            return pd.concat(frames).sort_index()
+        return pd.DataFrame({name: self.factors[name].calculate(data) for name in names}, index=data.index)
+    
+    def calculate_snapshot_factors(self,
+                                   snapshot: DatasetSnapshot,
+                                   start_date: str = None,
+                                   end_date: str = None,
+                                   symbols: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        在数据集快照上计算所有因子
+        
+        快照内容不可变，结果由快照id、查询条件和因子参数唯一确定，
+        配置了result_cache_dir时直接复用已有结果。
+        
+        Args:
+            snapshot: 数据集快照
+            start_date: 开始日期，格式YYYYMMDD
+            end_date: 结束日期，格式YYYYMMDD
+            symbols: 股票代码列表，None表示全部
+        """
+        key = snapshot.cache_key('factors', {
+            'start_date': start_date,
+            'end_date': end_date,
+            'symbols': sorted(symbols) if symbols is not None else None,
+            'factors': {name: self.factor_params(factor) for name, factor in self.factors.items()}
+        })
+        if self.result_cache is not None:
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                self.logger.info(f"复用快照{snapshot.snapshot_id}的因子结果: {key[:12]}")
+                self.factor_data = cached
+                return cached
+        
+        factor_data = self.calculate_all_factors(snapshot.query(start_date, end_date, symbols))
+        if self.result_cache is not None and not factor_data.empty:
+            self.result_cache.set(key, factor_data)
+        return factor_data
+    
+    @staticmethod
+    def factor_params(factor: Factor) -> Dict:
+        """因子类名和参数，用于结果缓存键"""
+        params = {k: v for k, v in vars(factor).items() if not k.startswith('_')}
+        return {'class': type(factor).__name__, **params}
+    
     def get_factor_data(self, factor_name: str = None) -> pd.DataFrame:
         """获取因子数据"""
         if factor_name:
@@ -205,4 +278,38 @@ class GrowthFactor(Factor):
         return growth_factor
     
     def get_name(self) -> str:
-        return "growth_factor"
\ No newline at end of file
+        return "growth_factor"
+
+class RSIFactor(Factor):
+    """相对强弱指标"""
+    
+    def __init__(self, window: int = 14):
+        self.window = window
+    
+    def calculate(self, data: pd.DataFrame) -> pd.Series:
+        """计算RSI"""
+        delta = data['close'].diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=self.window).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=self.window).mean()
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+    
+    def get_name(self) -> str:
+        return "rsi"
+
+class MACDFactor(Factor):
+    """MACD指标"""
+    
+    def __init__(self, fast_period: int = 12, slow_period: int = 26):
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+    
+    def calculate(self, data: pd.DataFrame) -> pd.Series:
+        """计算MACD（DIF：快慢指数移动平均之差）"""
+        close = data['close']
+        fast = close.ewm(span=self.fast_period, adjust=False).mean()
+        slow = close.ewm(span=self.slow_period, adjust=False).mean()
+        return fast - slow
+    
+    def get_name(self) -> str:
+        return "macd"
@@ -7,21 +7,48 @@
 3. 缓存管理
 4. 数据验证
 5. 性能监控
+6. 接口限流与重试
+7. 并发请求合并
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "QuantStock Team"
 
-from .logger import setup_logger
-from .config_manager import ConfigManager
-from .cache_manager import CacheManager
-from .data_validator import DataValidator
-from .performance_monitor import PerformanceMonitor
+# 名称 -> 所在模块，按需导入
+_LAZY_IMPORTS = {
+    'setup_logger': '.logger',
+    'ConfigManager': '.config_manager',
+    'CacheManager': '.cache_manager',
+    'RedisCache': '.redis_cache',
+    'DataValidator': '.data_validator',
+    'PerformanceMonitor': '.performance_monitor',
+    'TokenBucket': '.rate_limiter',
+    'retry_with_backoff': '.rate_limiter',
+    'SingleFlight': '.single_flight'
+}
 
 __all__ = [
     'setup_logger',
     'ConfigManager',
     'CacheManager',
+    'RedisCache',
     'DataValidator',
-    'PerformanceMonitor'
-]
\ No newline at end of file
+    'PerformanceMonitor',
+    'TokenBucket',
+    'retry_with_backoff',
+    'SingleFlight'
+]
+
+def __getattr__(name):
+    """首次访问时导入对应模块，避免导入包时加载全部依赖"""
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
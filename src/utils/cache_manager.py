@@ -0,0 +1,223 @@
+"""
+缓存管理模块
+
+提供进程内的TTL + LRU缓存，按对象实际占用的内存字节数控制容量：
+- DataFrame/Series 使用 memory_usage(deep=True)
+- numpy 数组使用 nbytes
+- 其它对象使用 sys.getsizeof
+
+可选配置二级缓存（如RedisCache），一级未命中时回查二级并回填。
+"""
+
+import re
+import sys
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+
+def parse_size(size: Union[str, int, float]) -> int:
+    """
+    解析容量配置
+
+    Args:
+        size: 字节数或带单位的字符串，如 "512MB"、"1GB"
+
+    Returns:
+        字节数
+    """
+    if isinstance(size, (int, float)):
+        return int(size)
+
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMGT]?B)?\s*', str(size).upper())
+    if not match:
+        raise ValueError(f"无法解析的容量配置: {size}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2) or 'B'])
+
+def sizeof(value: Any) -> int:
+    """估算对象占用的内存字节数"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+class CacheManager:
+    """按字节容量淘汰的TTL/LRU缓存"""
+
+    def __init__(self,
+                 max_size: Union[str, int] = '1GB',
+                 ttl: float = 3600,
+                 enabled: bool = True,
+                 backend=None):
+        """
+        初始化缓存管理器
+
+        Args:
+            max_size: 最大占用内存，如 "1GB"
+            ttl: 缓存有效期（秒），None或0表示不过期
+            enabled: 是否启用缓存
+            backend: 二级缓存，需提供get(key)和set(key, value, ttl)
+        """
+        self.max_bytes = parse_size(max_size)
+        self.ttl = ttl
+        self.enabled = enabled
+        self.backend = backend
+
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.backend_hits = 0
+
+    @classmethod
+    def from_config(cls, cache_config: Dict = None, backend=None) -> 'CacheManager':
+        """
+        由 performance.cache 配置创建
+
+        配置了 redis.enabled 且未传入backend时，创建RedisCache作为二级缓存。
+        """
+        cache_config = cache_config or {}
+        ttl = cache_config.get('ttl', 3600)
+        redis_config = cache_config.get('redis', {})
+        if backend is None and redis_config.get('enabled', False):
+            from .redis_cache import RedisCache
+            backend = RedisCache.from_config(redis_config, ttl=ttl)
+
+        return cls(
+            max_size=cache_config.get('max_size', '1GB'),
+            ttl=ttl,
+            enabled=cache_config.get('enabled', True),
+            backend=backend
+        )
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """获取缓存值，未命中或已过期返回default"""
+        if not self.enabled:
+            return default
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, size, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+                self.expirations += 1
+
+        # 一级未命中，回查二级缓存并回填
+        if self.backend is not None:
+            value = self.backend.get(key)
+            if value is not None:
+                self._store(key, value, self.ttl)
+                with self._lock:
+                    self.hits += 1
+                    self.backend_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            ttl: 本条目的有效期（秒），默认使用全局ttl
+
+        Returns:
+            是否写入成功（超过总容量的对象不缓存）
+        """
+        if not self.enabled:
+            return False
+
+        ttl = self.ttl if ttl is None else ttl
+        if self.backend is not None:
+            self.backend.set(key, value, ttl)
+        return self._store(key, value, ttl)
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float]) -> bool:
+        """写入一级缓存并按容量淘汰"""
+        size = sizeof(value)
+        if size > self.max_bytes:
+            logger.debug(f"缓存对象过大({size}字节)，跳过: {key}")
+            return False
+
+        expires_at = time.monotonic() + ttl if ttl else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self.current_bytes += size
+
+            # 按最近最少使用顺序淘汰，直到回到容量以内
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """获取缓存值，未命中时调用loader加载并写入缓存"""
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, key: Hashable):
+        """删除缓存条目"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+        if self.backend is not None:
+            self.backend.delete(key)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'size_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'backend_hits': self.backend_hits,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
@@ -0,0 +1,209 @@
+"""
+数据校验模块
+
+对入库的日线数据按 交易日×股票 整体做向量化质量检查，每个单元格得到一个uint8质量位掩码：
+- missing: 开高低收缺失
+- non_positive: 价格小于等于0
+- high_low: 最高价低于最低价，或开盘/收盘价超出最高最低价区间
+- duplicate: 同一股票同一交易日的重复行（保留最后一行）
+- negative_volume: 成交量或成交额为负
+- volume_spike: 成交量超过该股票前volume_window个交易日中位数的volume_spike倍
+
+前五项为数据错误，默认从入库数据中剔除；成交量异常可能是真实行情，只做标记。
+增量入库时只有最近几个交易日的新数据，成交量检查以之前交易日的成交量宽表（volume_history）
+作为回看基准。
+"""
+
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# 检查项 -> 质量位
+CHECKS = {
+    'missing': 1,
+    'non_positive': 2,
+    'high_low': 4,
+    'duplicate': 8,
+    'negative_volume': 16,
+    'volume_spike': 32
+}
+
+DEFAULT_REJECT = ('missing', 'non_positive', 'high_low', 'duplicate', 'negative_volume')
+
+PRICE_FIELDS = ['open', 'high', 'low', 'close']
+
+class DataValidator:
+    """日线数据质量校验器"""
+
+    def __init__(self,
+                 volume_window: int = 20,
+                 volume_spike: float = 10.0,
+                 reject: Sequence[str] = DEFAULT_REJECT):
+        """
+        初始化校验器
+
+        Args:
+            volume_window: 成交量异常检查的回看交易日数
+            volume_spike: 成交量超过回看中位数的倍数视为异常
+            reject: 需要剔除的检查项
+        """
+        unknown = set(reject) - set(CHECKS)
+        if unknown:
+            raise ValueError(f"未知的检查项: {sorted(unknown)}")
+
+        self.volume_window = int(volume_window)
+        self.volume_spike = float(volume_spike)
+        self.reject = tuple(reject)
+        self.reject_mask = np.uint8(sum(CHECKS[check] for check in self.reject))
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'DataValidator':
+        """从配置（volume_window、volume_spike、reject）创建校验器"""
+        config = config or {}
+        return cls(
+            volume_window=config.get('volume_window', 20),
+            volume_spike=config.get('volume_spike', 10.0),
+            reject=config.get('reject', DEFAULT_REJECT)
+        )
+
+    @staticmethod
+    def _keys(bars: pd.DataFrame):
+        """取出每行的交易日和股票代码（列或索引层均可，缺少股票代码时视为单只股票）"""
+        def column(name):
+            if name in bars.columns:
+                return bars[name].to_numpy()
+            if name in (bars.index.names or []):
+                return bars.index.get_level_values(name).to_numpy()
+            return None
+
+        dates = column('trade_date')
+        if dates is None:
+            dates = bars.index.to_numpy()
+        codes = column('ts_code')
+        if codes is None:
+            codes = np.zeros(len(bars), dtype=np.int8)
+        return pd.to_datetime(dates).to_numpy(), codes
+
+    def validate(self, bars: pd.DataFrame, volume_history: Optional[pd.DataFrame] = None) -> pd.Series:
+        """
+        检查日线数据
+
+        Args:
+            bars: 日线长表，交易日和股票代码为列或索引，包含开高低收和vol字段
+            volume_history: 之前交易日的成交量宽表（交易日×股票），作为成交量异常检查的回看基准
+
+        Returns:
+            与bars行对齐的uint8质量位掩码，0表示通过全部检查
+        """
+        flags = np.zeros(len(bars), dtype=np.uint8)
+        if bars.empty:
+            return pd.Series(flags, index=bars.index, name='quality')
+
+        fields = [field for field in PRICE_FIELDS if field in bars.columns]
+        prices = bars[fields].to_numpy(dtype=np.float64)
+        flags[np.isnan(prices).any(axis=1)] |= CHECKS['missing']
+        with np.errstate(invalid='ignore'):
+            flags[(prices <= 0).any(axis=1)] |= CHECKS['non_positive']
+
+            if 'high' in bars.columns and 'low' in bars.columns:
+                high = bars['high'].to_numpy(dtype=np.float64)
+                low = bars['low'].to_numpy(dtype=np.float64)
+                outside = high < low
+                for field in ('open', 'close'):
+                    if field in bars.columns:
+                        price = bars[field].to_numpy(dtype=np.float64)
+                        outside |= (price > high) | (price < low)
+                flags[outside] |= CHECKS['high_low']
+
+            volumes = [bars[field].to_numpy(dtype=np.float64) for field in ('vol', 'amount') if field in bars.columns]
+            for volume in volumes:
+                flags[volume < 0] |= CHECKS['negative_volume']
+
+        dates, codes = self._keys(bars)
+        date_index, unique_dates = pd.factorize(dates, sort=True)
+        code_index, unique_codes = pd.factorize(codes, sort=True)
+        cell = date_index.astype(np.int64) * len(unique_codes) + code_index
+        duplicate = pd.Series(cell).duplicated(keep='last').to_numpy()
+        flags[duplicate] |= CHECKS['duplicate']
+
+        if 'vol' in bars.columns and self.volume_window > 0:
+            flags[self._volume_spikes(bars['vol'].to_numpy(dtype=np.float64), date_index, code_index,
+                                      unique_dates, unique_codes, ~duplicate, volume_history)] |= CHECKS['volume_spike']
+
+        return pd.Series(flags, index=bars.index, name='quality')
+
+    def _volume_spikes(self,
+                       vol: np.ndarray,
+                       date_index: np.ndarray,
+                       code_index: np.ndarray,
+                       unique_dates: np.ndarray,
+                       unique_codes: np.ndarray,
+                       keep: np.ndarray,
+                       volume_history: Optional[pd.DataFrame] = None) -> np.ndarray:
+        """在 交易日×股票 成交量矩阵上计算前volume_window日滚动中位数，标记超过倍数的单元格"""
+        matrix = np.full((len(unique_dates), len(unique_codes)), np.nan)
+        matrix[date_index[keep], code_index[keep]] = vol[keep]
+        matrix = pd.DataFrame(matrix, index=pd.DatetimeIndex(unique_dates), columns=unique_codes)
+
+        # 新数据之前的交易日作为回看窗口的开头
+        prior = 0
+        if volume_history is not None and not volume_history.empty:
+            history = volume_history[pd.DatetimeIndex(volume_history.index) < matrix.index[0]]
+            history = history.reindex(columns=unique_codes).tail(self.volume_window)
+            prior = len(history)
+            matrix = pd.concat([history.set_axis(pd.DatetimeIndex(history.index)), matrix])
+
+        # 停牌日为NaN，不计入窗口
+        median = (matrix
+                  .rolling(self.volume_window, min_periods=max(1, self.volume_window // 2))
+                  .median()
+                  .shift(1)
+                  .to_numpy()[prior:])
+        baseline = median[date_index, code_index]
+        with np.errstate(invalid='ignore'):
+            return (baseline > 0) & (vol > self.volume_spike * baseline)
+
+    def volume_history(self, bars: pd.DataFrame, history: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        合并已有基准与新数据的成交量宽表，只保留最近volume_window个交易日
+
+        Args:
+            bars: 已校验的日线长表
+            history: 已有的成交量宽表（交易日×股票）
+
+        Returns:
+            供下次增量校验使用的成交量宽表
+        """
+        if 'vol' not in bars.columns:
+            return history if history is not None else pd.DataFrame()
+        dates, codes = self._keys(bars)
+        latest = pd.DataFrame({'trade_date': dates, 'ts_code': codes, 'vol': bars['vol'].to_numpy(dtype=np.float64)})
+        latest = latest.pivot_table(index='trade_date', columns='ts_code', values='vol', aggfunc='last')
+        if history is not None and not history.empty:
+            latest = latest.combine_first(history.set_axis(pd.DatetimeIndex(history.index)))
+        return latest.sort_index().tail(self.volume_window)
+
+    def is_valid(self, flags: pd.Series) -> np.ndarray:
+        """未触发任何剔除检查项的行"""
+        return (flags.to_numpy() & self.reject_mask) == 0
+
+    def clean(self, bars: pd.DataFrame, flags: pd.Series = None) -> pd.DataFrame:
+        """剔除触发剔除检查项的行"""
+        if flags is None:
+            flags = self.validate(bars)
+        return bars[self.is_valid(flags)]
+
+    @staticmethod
+    def summary(flags: pd.Series, checks: Iterable[str] = None) -> Dict[str, int]:
+        """
+        各检查项的触发行数
+
+        Returns:
+            {'rows': 总行数, 'flagged': 任一检查项触发的行数, 检查项: 触发行数}
+        """
+        values = flags.to_numpy()
+        result = {'rows': int(len(values)), 'flagged': int(np.count_nonzero(values))}
+        for check in (checks or CHECKS):
+            result[check] = int(np.count_nonzero(values & CHECKS[check]))
+        return result
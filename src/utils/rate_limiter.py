@@ -0,0 +1,131 @@
+"""
+限流与重试模块
+
+提供线程安全的令牌桶限流器和指数退避重试函数，
+用于控制对Tushare等数据源的调用频率
+"""
+
+import asyncio
+import time
+import random
+import threading
+import logging
+from typing import Any, Callable, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """令牌桶限流器"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数（即平均调用频率）
+            capacity: 桶容量（允许的突发调用数），默认等于rate
+        """
+        if rate <= 0:
+            raise ValueError("rate必须大于0")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, calls_per_minute: float, capacity: float = None) -> 'TokenBucket':
+        """按每分钟调用次数创建限流器（Tushare积分额度以分钟计）"""
+        return cls(calls_per_minute / 60.0, capacity)
+
+    def _refill(self):
+        """按流逝时间补充令牌"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _try_acquire(self, tokens: float) -> float:
+        """尝试取出令牌，成功返回0，否则返回需要等待的秒数"""
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0):
+        """
+        获取令牌，不足时阻塞等待
+
+        Args:
+            tokens: 需要的令牌数
+        """
+        while True:
+            wait = self._try_acquire(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """获取令牌，不足时让出事件循环等待"""
+        while True:
+            wait = self._try_acquire(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+def retry_with_backoff(func: Callable[..., Any],
+                       *args,
+                       retry_count: int = 3,
+                       base_delay: float = 0.5,
+                       max_delay: float = 10.0,
+                       exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+                       **kwargs) -> Any:
+    """
+    带指数退避的重试调用
+
+    Args:
+        func: 被调用的函数
+        retry_count: 失败后的最大重试次数
+        base_delay: 首次重试前的等待时间（秒）
+        max_delay: 单次等待的上限（秒）
+        exceptions: 需要重试的异常类型
+
+    Returns:
+        func的返回值，重试耗尽后抛出最后一次的异常
+    """
+    attempt = 0
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except exceptions as e:
+            if attempt >= retry_count:
+                raise
+            # 指数退避并加入随机抖动，避免并发线程同时重试
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            delay *= 0.5 + random.random() / 2
+            attempt += 1
+            logger.warning(f"调用失败({e})，{delay:.2f}秒后第{attempt}次重试")
+            time.sleep(delay)
+
+async def retry_with_backoff_async(func: Callable[..., Any],
+                                   *args,
+                                   retry_count: int = 3,
+                                   base_delay: float = 0.5,
+                                   max_delay: float = 10.0,
+                                   exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+                                   **kwargs) -> Any:
+    """retry_with_backoff 的协程版本，func为返回协程的函数，等待期间不阻塞事件循环"""
+    attempt = 0
+    while True:
+        try:
+            return await func(*args, **kwargs)
+        except exceptions as e:
+            if attempt >= retry_count:
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            delay *= 0.5 + random.random() / 2
+            attempt += 1
+            logger.warning(f"调用失败({e})，{delay:.2f}秒后第{attempt}次重试")
+            await asyncio.sleep(delay)
@@ -0,0 +1,117 @@
+"""
+Redis共享缓存模块
+
+作为进程内缓存之后的二级缓存，供多个API进程和Streamlit会话共享：
+- DataFrame以Arrow IPC二进制格式存储，保留索引和数据类型
+- 键带命名空间、数据版本和格式版本，如 quantstock:v1.1:daily:000001.SZ:20240101:20240131
+- 过期时间与 performance.cache.ttl 一致
+"""
+
+import os
+import logging
+from typing import Any, Dict, Hashable, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+class RedisCache:
+    """Redis二级缓存"""
+
+    # 序列化格式版本，格式变化时递增使旧数据自然失效
+    FORMAT_VERSION = 1
+
+    def __init__(self,
+                 client=None,
+                 url: str = None,
+                 namespace: str = 'quantstock',
+                 version: str = '1',
+                 ttl: float = 3600):
+        """
+        初始化Redis缓存
+
+        Args:
+            client: Redis客户端（需支持get/set/delete/scan_iter），默认按url创建
+            url: Redis地址，默认读取环境变量REDIS_URL
+            namespace: 键命名空间
+            version: 数据版本号，升级数据格式或口径时修改
+            ttl: 过期时间（秒）
+        """
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url or os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+
+        self.client = client
+        self.prefix = f"{namespace}:v{version}.{self.FORMAT_VERSION}:"
+        self.ttl = ttl
+
+    @classmethod
+    def from_config(cls, redis_config: Dict, ttl: float = 3600, client=None) -> 'RedisCache':
+        """由 performance.cache.redis 配置创建"""
+        return cls(
+            client=client,
+            url=redis_config.get('url'),
+            namespace=redis_config.get('namespace', 'quantstock'),
+            version=str(redis_config.get('version', '1')),
+            ttl=redis_config.get('ttl', ttl)
+        )
+
+    def make_key(self, key: Hashable) -> str:
+        """将缓存键转换为带命名空间的Redis键"""
+        parts = key if isinstance(key, tuple) else (key,)
+        return self.prefix + ':'.join(str(part) for part in parts)
+
+    @staticmethod
+    def serialize(data: pd.DataFrame) -> bytes:
+        """DataFrame序列化为Arrow IPC流"""
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    @staticmethod
+    def deserialize(payload: bytes) -> pd.DataFrame:
+        """Arrow IPC流还原为DataFrame"""
+        return pa.ipc.open_stream(payload).read_all().to_pandas()
+
+    def get(self, key: Hashable) -> Optional[pd.DataFrame]:
+        """读取缓存，未命中或Redis不可用时返回None"""
+        try:
+            payload = self.client.get(self.make_key(key))
+            if payload is None:
+                return None
+            return self.deserialize(payload)
+        except Exception as e:
+            logger.warning(f"读取Redis缓存失败: {e}")
+            return None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """写入缓存，只缓存DataFrame"""
+        if not isinstance(value, pd.DataFrame):
+            return False
+
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            self.client.set(self.make_key(key), self.serialize(value), px=int(ttl * 1000) if ttl else None)
+            return True
+        except Exception as e:
+            logger.warning(f"写入Redis缓存失败: {e}")
+            return False
+
+    def delete(self, key: Hashable):
+        """删除缓存"""
+        try:
+            self.client.delete(self.make_key(key))
+        except Exception as e:
+            logger.warning(f"删除Redis缓存失败: {e}")
+
+    def clear(self):
+        """删除当前命名空间和版本下的全部键"""
+        try:
+            keys = list(self.client.scan_iter(match=self.prefix + '*'))
+            if keys:
+                self.client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"清空Redis缓存失败: {e}")
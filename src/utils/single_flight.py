@@ -0,0 +1,66 @@
+"""
+请求合并模块
+
+同一个键同时只执行一次加载，其余并发调用等待并共享同一结果，
+避免多个请求同时为相同数据重复调用数据源接口。
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+class _Call:
+    """一次进行中的调用"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """单飞请求合并器"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        执行或等待同键的调用
+
+        Args:
+            key: 调用键，如 (接口, 股票代码, 开始日期, 结束日期)
+            func: 无参加载函数
+
+        Returns:
+            func的返回值；func抛出异常时所有等待者都会收到同一异常
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self, key: Hashable) -> bool:
+        """该键是否有进行中的调用"""
+        with self._lock:
+            return key in self._calls
@@ -0,0 +1,57 @@
+"""
+测试共用的本地数据源替身与回放数据
+"""
+
+import pandas as pd
+
+class ReplayPro:
+    """回放录制数据的本地Tushare接口替身"""
+    
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars
+        self.calls = []
+    
+    def trade_cal(self, exchange='', start_date=None, end_date=None, is_open='1'):
+        dates = sorted(self.bars['trade_date'].unique())
+        dates = [d for d in dates if start_date <= d <= end_date]
+        return pd.DataFrame({'exchange': exchange, 'cal_date': dates, 'is_open': 1})
+    
+    def daily(self, ts_code=None, trade_date=None, start_date=None, end_date=None):
+        self.calls.append({'ts_code': ts_code, 'trade_date': trade_date})
+        bars = self.bars
+        if trade_date is not None:
+            bars = bars[bars['trade_date'] == trade_date]
+        if ts_code is not None:
+            bars = bars[bars['ts_code'] == ts_code]
+        if start_date is not None:
+            bars = bars[(bars['trade_date'] >= start_date) & (bars['trade_date'] <= end_date)]
+        return bars.reset_index(drop=True)
+    
+    def adj_factor(self, ts_code=None, trade_date=None, start_date=None, end_date=None):
+        bars = self.daily(ts_code=ts_code, trade_date=trade_date, start_date=start_date, end_date=end_date)
+        self.calls.pop()
+        factors = bars[['ts_code', 'trade_date']].copy()
+        factors['adj_factor'] = bars['adj_factor'] if 'adj_factor' in bars.columns else 1.0
+        return factors
+    
+    def stock_basic(self, **kwargs):
+        return pd.DataFrame({'ts_code': sorted(self.bars['ts_code'].unique())})
+
+def make_replay_bars(symbols, dates):
+    """生成回放用的全市场日线数据"""
+    rows = []
+    for i, trade_date in enumerate(dates):
+        for j, ts_code in enumerate(symbols):
+            price = 10.0 + j + i * 0.1
+            rows.append({
+                'ts_code': ts_code,
+                'trade_date': trade_date,
+                'open': price,
+                'high': price + 0.5,
+                'low': price - 0.5,
+                'close': price + 0.2,
+                'vol': 1000.0 * (j + 1),
+                'amount': 10000.0 * (j + 1)
+            })
+    # 接口返回的截面数据不保证有序
+    return pd.DataFrame(rows).sample(frac=1, random_state=0).reset_index(drop=True)
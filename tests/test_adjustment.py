@@ -0,0 +1,123 @@
+"""
+复权计算测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.adjustment import adj_factor_from_pre_close, adjust_prices
+from src.data.data_manager import DataManager
+from src.factor.factor_engine import MomentumFactor
+from tests.helpers import ReplayPro
+
+def make_split_bars():
+    """两只股票，000001.SZ 在第3个交易日10送10（价格减半）"""
+    dates = ['20240102', '20240103', '20240104', '20240105']
+    close_a = [10.0, 10.2, 5.2, 5.3]
+    pre_close_a = [10.0, 10.0, 5.1, 5.2]
+    close_b = [20.0, 20.5, 21.0, 21.5]
+    pre_close_b = [19.8, 20.0, 20.5, 21.0]
+    rows = []
+    for ts_code, closes, pre_closes, factors in [
+        ('000001.SZ', close_a, pre_close_a, [1.0, 1.0, 2.0, 2.0]),
+        ('000002.SZ', close_b, pre_close_b, [3.0, 3.0, 3.0, 3.0]),
+    ]:
+        for date, close, pre_close, factor in zip(dates, closes, pre_closes, factors):
+            rows.append({'ts_code': ts_code, 'trade_date': date, 'open': close, 'high': close,
+                         'low': close, 'close': close, 'pre_close': pre_close, 'adj_factor': factor})
+    bars = pd.DataFrame(rows)
+    bars['trade_date'] = pd.to_datetime(bars['trade_date'])
+    return bars.sort_values(['trade_date', 'ts_code']).set_index(['trade_date', 'ts_code'])
+
+class TestAdjustment:
+    """复权计算测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.bars = make_split_bars()
+    
+    def test_factor_from_pre_close(self):
+        """测试由pre_close累乘推算复权因子"""
+        factor = adj_factor_from_pre_close(self.bars)
+        split = factor.xs('000001.SZ', level='ts_code')
+        
+        assert split.tolist() == pytest.approx([1.0, 1.0, 2.0, 2.0])
+        assert factor.xs('000002.SZ', level='ts_code').tolist() == pytest.approx([1.0] * 4)
+    
+    def test_qfq_removes_split_jump(self):
+        """测试前复权消除送转造成的价格跳空"""
+        adjusted = adjust_prices(self.bars, how='qfq').xs('000001.SZ', level='ts_code')
+        
+        assert adjusted['close_qfq'].tolist() == pytest.approx([5.0, 5.1, 5.2, 5.3])
+        returns = adjusted['close_qfq'].pct_change().dropna()
+        assert (returns.abs() < 0.05).all()
+    
+    def test_hfq(self):
+        """测试后复权以上市首日为基准"""
+        adjusted = adjust_prices(self.bars, how='hfq').xs('000001.SZ', level='ts_code')
+        assert adjusted['close_hfq'].tolist() == pytest.approx([10.0, 10.2, 10.4, 10.6])
+    
+    def test_pre_close_fallback_matches_factor_table(self):
+        """测试无adj_factor列时的推算结果与因子表一致"""
+        with_table = adjust_prices(self.bars, how='qfq')
+        derived = adjust_prices(self.bars.drop(columns='adj_factor'), how='qfq')
+        
+        np.testing.assert_allclose(with_table['close_qfq'], derived['close_qfq'])
+    
+    def test_new_factor_readjusts_history(self):
+        """测试新因子到达后前复权历史随之调整"""
+        history = self.bars.xs('000001.SZ', level='ts_code')
+        old = adjust_prices(history.iloc[:2], how='qfq')['close_qfq']
+        full = adjust_prices(history, how='qfq')['close_qfq']
+        
+        np.testing.assert_allclose(old, [10.0, 10.2])
+        np.testing.assert_allclose(full.iloc[:2], [5.0, 5.1])
+    
+    def test_momentum_on_adjusted_close(self):
+        """测试动量因子使用复权价格后不再出现假跳空"""
+        adjusted = adjust_prices(self.bars, how='qfq').xs('000001.SZ', level='ts_code')
+        raw = MomentumFactor(lookback_period=1).calculate(adjusted)
+        fixed = MomentumFactor(lookback_period=1).calculate(adjusted.assign(close=adjusted['close_qfq']))
+        
+        assert raw.min() < -0.4
+        assert fixed.min() > -0.05
+    
+    def test_data_manager_adjusted_data(self):
+        """测试DataManager获取复权日线"""
+        bars = make_split_bars().reset_index()
+        bars['trade_date'] = bars['trade_date'].dt.strftime('%Y%m%d')
+        data_manager = DataManager({'tushare_token': 'test_token', 'cache_enabled': False})
+        data_manager.pro = ReplayPro(bars)
+        
+        adjusted = data_manager.get_adjusted_data('000001.SZ', '20240101', '20240131')
+        assert adjusted['close_qfq'].tolist() == pytest.approx([5.0, 5.1, 5.2, 5.3])
+    
+    def test_adjusted_data_from_cached_factors(self, tmp_path):
+        """测试使用随日线缓存的复权因子，新因子追加后不重新获取历史行情"""
+        bars = make_split_bars().reset_index()
+        bars['trade_date'] = bars['trade_date'].dt.strftime('%Y%m%d')
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        data_manager.pro = ReplayPro(bars)
+        
+        cached = data_manager.get_daily_data_by_dates('20240102', '20240104')['000001.SZ']
+        data_manager.save_data(cached, 'daily_000001.SZ')
+        data_manager.pro.calls.clear()
+        adjusted = data_manager.get_adjusted_data('000001.SZ', '20240102', '20240103')
+        assert adjusted['close_qfq'].tolist() == pytest.approx([10.0, 10.2])
+        
+        # 追加除权日之后的日线和因子，历史前复权按缓存的因子重新计算
+        newer = data_manager.get_daily_data_by_dates('20240105', '20240105')['000001.SZ']
+        data_manager.append_data(newer, 'daily_000001.SZ')
+        data_manager.pro.calls.clear()
+        adjusted = data_manager.get_adjusted_data('000001.SZ', '20240102', '20240105')
+        assert adjusted['close_qfq'].tolist() == pytest.approx([5.0, 5.1, 5.2, 5.3])
+        assert data_manager.pro.calls == []
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,253 @@
+"""
+异步数据获取测试
+
+在本地启动模拟Tushare HTTP协议的aiohttp服务，注入延迟和限流错误。
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import asyncio
+import threading
+import time
+
+from aiohttp import web
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.async_fetcher import AsyncFetcher, run_sync
+from src.data.data_manager import DataManager
+from src.data.source_router import DataSource, SourceRouter, TushareSource
+from src.data.trading_calendar import TradingCalendar
+from tests.helpers import make_replay_bars
+
+class FakeTushareServer:
+    """在后台线程运行的本地Tushare接口服务"""
+    
+    def __init__(self, bars: pd.DataFrame, latency: float = 0.02, rate_limited: int = 0, http_429: int = 0,
+                 blocked=()):
+        self.bars = bars
+        self.blocked = set(blocked)
+        self.latency = latency
+        self.rate_limited = rate_limited
+        self.http_429 = http_429
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    async def handle(self, request):
+        api_name = request.match_info['api_name']
+        payload = await request.json()
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.http_429 > 0:
+                self.http_429 -= 1
+                return web.Response(status=429)
+            if self.rate_limited > 0 or payload['params'].get('ts_code') in self.blocked:
+                self.rate_limited = max(0, self.rate_limited - 1)
+                return web.json_response({'code': 40203, 'msg': '抱歉，您每分钟最多访问该接口500次', 'data': None})
+            
+            params = payload['params']
+            bars = self.bars
+            if params.get('ts_code'):
+                bars = bars[bars['ts_code'] == params['ts_code']]
+            if params.get('trade_date'):
+                bars = bars[bars['trade_date'] == params['trade_date']]
+            if params.get('start_date'):
+                bars = bars[(bars['trade_date'] >= params['start_date']) & (bars['trade_date'] <= params['end_date'])]
+            if api_name == 'adj_factor':
+                bars = bars[['ts_code', 'trade_date']].assign(adj_factor=2.0)
+            return web.json_response({'code': 0, 'msg': '', 'data': {
+                'fields': list(bars.columns), 'items': bars.values.tolist()
+            }})
+        finally:
+            self.in_flight -= 1
+    
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_post('/{api_name}', self.handle)
+        self._runner = web.AppRunner(app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        self._loop.run_until_complete(site.start())
+        self.url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+        self._started.set()
+        self._loop.run_forever()
+    
+    def start(self) -> 'FakeTushareServer':
+        self._thread.start()
+        self._started.wait()
+        return self
+    
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+SYMBOLS = [f"{i:06d}.SZ" for i in range(1, 41)]
+DATES = ['20240102', '20240103', '20240104']
+
+def make_config(url, **tushare):
+    config = {'url': url, 'retry_delay': 0.01, 'rate_limit': 60000, 'max_concurrency': 5}
+    config.update(tushare)
+    return {'tushare_token': 'test_token', 'data_sources': {'tushare': config}}
+
+class TestAsyncFetcher:
+    """异步数据获取测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.bars = make_replay_bars(SYMBOLS, DATES)
+    
+    def _server(self, **kwargs):
+        self.server = FakeTushareServer(self.bars, **kwargs).start()
+        return self.server
+    
+    def teardown_method(self):
+        """每个测试方法后运行"""
+        if getattr(self, 'server', None) is not None:
+            self.server.stop()
+    
+    def test_bounded_concurrency(self):
+        """测试并发数不超过信号量限制，且比串行快"""
+        server = self._server(latency=0.05)
+        fetcher = AsyncFetcher(make_config(server.url))
+        
+        start = time.perf_counter()
+        daily = fetcher.get_daily_many(SYMBOLS, DATES[0], DATES[-1])
+        elapsed = time.perf_counter() - start
+        
+        assert sorted(daily) == SYMBOLS
+        assert all(len(frame) == len(DATES) for frame in daily.values())
+        assert 2 <= server.max_in_flight <= 5
+        assert elapsed < len(SYMBOLS) * 0.05 / 2
+    
+    def test_rate_limit_errors_retried(self):
+        """测试限流错误码和HTTP 429按退避重试后成功"""
+        server = self._server(rate_limited=3, http_429=2)
+        fetcher = AsyncFetcher(make_config(server.url, max_concurrency=1))
+        
+        daily = fetcher.get_daily_many(SYMBOLS[:4], DATES[0], DATES[-1])
+        
+        assert sorted(daily) == SYMBOLS[:4]
+        assert server.requests == 4 + 5
+    
+    def test_exhausted_retries_return_empty(self):
+        """测试重试耗尽的请求返回空数据，其它请求不受影响"""
+        server = self._server(blocked=[SYMBOLS[0]])
+        fetcher = AsyncFetcher(make_config(server.url, retry_count=1))
+        
+        frames = fetcher.get_tushare_many([('daily', {'ts_code': SYMBOLS[0]}), ('daily', {'ts_code': SYMBOLS[1]})])
+        
+        assert frames[0].empty
+        assert len(frames[1]) == len(DATES)
+        assert server.requests == 2 + 1
+    
+    def test_sync_facade_inside_event_loop(self):
+        """测试在已有事件循环中调用同步门面"""
+        server = self._server()
+        fetcher = AsyncFetcher(make_config(server.url))
+        
+        async def caller():
+            return fetcher.get_cross_sections(DATES)
+        
+        cross_sections = asyncio.run(caller())
+        assert list(cross_sections) == DATES
+        assert len(cross_sections[DATES[0]]) == len(SYMBOLS)
+    
+    def test_run_sync_propagates_errors(self):
+        """测试同步门面抛出协程中的异常"""
+        async def fail():
+            raise ValueError('boom')
+        
+        with pytest.raises(ValueError):
+            run_sync(fail())
+
+class ReplayDailySource(DataSource):
+    """回放日线的备用数据源，记录请求的股票"""
+    
+    name = 'akshare'
+    
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars
+        self.calls = []
+    
+    def daily(self, stock_code, start_date, end_date):
+        self.calls.append(stock_code)
+        bars = self.bars[self.bars['ts_code'] == stock_code]
+        return bars[(bars['trade_date'] >= start_date) & (bars['trade_date'] <= end_date)].reset_index(drop=True)
+    
+    def stock_basic(self):
+        return pd.DataFrame()
+
+class TestDataManagerAsync:
+    """DataManager异步获取测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.server = FakeTushareServer(make_replay_bars(SYMBOLS, DATES)).start()
+        config = make_config(self.server.url)
+        config['performance'] = {'parallel': {'async_fetch': True}}
+        self.data_manager = DataManager(config)
+    
+    def teardown_method(self):
+        """每个测试方法后运行"""
+        self.server.stop()
+    
+    def test_multiple_stocks_async(self):
+        """测试批量获取走异步路径并写入缓存"""
+        panel = self.data_manager.get_multiple_stocks(SYMBOLS, DATES[0], DATES[-1])
+        assert len(panel) == len(SYMBOLS) * len(DATES)
+        assert panel.index.names == ['trade_date', 'ts_code']
+        # 异步获取的数据同样经过入库校验
+        assert (panel['quality'] == 0).all()
+        requests = self.server.requests
+        
+        # 第二次全部命中缓存
+        again = self.data_manager.get_multiple_stocks(SYMBOLS, DATES[0], DATES[-1])
+        assert self.server.requests == requests
+        pd.testing.assert_frame_equal(panel, again)
+        
+        single = self.data_manager.get_daily_data(SYMBOLS[3], DATES[0], DATES[-1])
+        assert self.server.requests == requests
+        assert len(single) == len(DATES)
+    
+    def test_failed_codes_routed(self):
+        """测试异步获取失败的股票经数据源路由重新获取"""
+        self.server.stop()
+        self.server = FakeTushareServer(make_replay_bars(SYMBOLS, DATES), blocked=SYMBOLS[:2]).start()
+        config = make_config(self.server.url, retry_count=1)
+        config['performance'] = {'parallel': {'async_fetch': True}}
+        self.data_manager = DataManager(config)
+        backup = ReplayDailySource(make_replay_bars(SYMBOLS, DATES))
+        self.data_manager.router = SourceRouter([backup, TushareSource(self.data_manager._call_api)])
+        
+        panel = self.data_manager.get_multiple_stocks(SYMBOLS, DATES[0], DATES[-1])
+        assert len(panel) == len(SYMBOLS) * len(DATES)
+        assert sorted(backup.calls) == SYMBOLS[:2]
+        
+        # 重新获取的结果同样写入缓存
+        self.data_manager.get_multiple_stocks(SYMBOLS, DATES[0], DATES[-1])
+        assert sorted(backup.calls) == SYMBOLS[:2]
+    
+    def test_daily_data_by_dates_async(self):
+        """测试按交易日批量获取并发请求截面和复权因子"""
+        self.data_manager._calendar = TradingCalendar(DATES, '20100101', '20991231')
+        daily_by_symbol = self.data_manager.get_daily_data_by_dates(DATES[0], DATES[-1])
+        
+        assert sorted(daily_by_symbol) == SYMBOLS
+        assert (daily_by_symbol[SYMBOLS[0]]['adj_factor'] == 2.0).all()
+        assert self.server.requests == 2 * len(DATES)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
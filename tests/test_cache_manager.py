@@ -0,0 +1,192 @@
+"""
+缓存管理器测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import time
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.cache_manager import CacheManager, parse_size, sizeof
+from src.utils.redis_cache import RedisCache
+from src.data.data_manager import DataManager
+from tests.helpers import ReplayPro, make_replay_bars
+
+class TestCacheManager:
+    """缓存管理器测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.frame = pd.DataFrame({'close': np.arange(1000, dtype=float), 'ts_code': pd.Series(['000001.SZ'] * 1000, dtype=object)})
+        self.frame_size = sizeof(self.frame)
+    
+    def test_parse_size(self):
+        """测试容量配置解析"""
+        assert parse_size('1GB') == 1024 ** 3
+        assert parse_size('512 MB') == 512 * 1024 ** 2
+        assert parse_size(2048) == 2048
+        with pytest.raises(ValueError):
+            parse_size('lots')
+    
+    def test_sizeof_counts_object_columns(self):
+        """测试按deep内存占用计算大小"""
+        assert self.frame_size == self.frame.memory_usage(deep=True).sum()
+        assert self.frame_size > self.frame.memory_usage(deep=False).sum()
+    
+    def test_evicts_by_bytes(self):
+        """测试按字节容量淘汰最久未使用的条目"""
+        cache = CacheManager(max_size=int(self.frame_size * 2.5), ttl=None)
+        cache.set('a', self.frame)
+        cache.set('b', self.frame)
+        cache.get('a')
+        cache.set('c', self.frame)
+        
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get_stats()['evictions'] == 1
+        assert cache.current_bytes <= cache.max_bytes
+    
+    def test_oversized_value_not_cached(self):
+        """测试超过总容量的对象不缓存"""
+        cache = CacheManager(max_size=100)
+        assert not cache.set('a', self.frame)
+        assert len(cache) == 0
+    
+    def test_ttl_expiry(self):
+        """测试过期条目失效"""
+        cache = CacheManager(ttl=0.05)
+        cache.set('a', self.frame)
+        assert cache.get('a') is not None
+        time.sleep(0.1)
+        
+        assert cache.get('a') is None
+        stats = cache.get_stats()
+        assert stats['expirations'] == 1
+        assert stats['size_bytes'] == 0
+    
+    def test_disabled(self):
+        """测试关闭缓存"""
+        cache = CacheManager(enabled=False)
+        cache.set('a', self.frame)
+        assert cache.get('a') is None
+
+class FakeRedis:
+    """本地Redis替身，支持get/set(px)/delete/scan_iter"""
+    
+    def __init__(self):
+        self.store = {}
+    
+    def get(self, key):
+        value, expires_at = self.store.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.store[key]
+            return None
+        return value
+    
+    def set(self, key, value, px=None):
+        self.store[key] = (value, time.monotonic() + px / 1000 if px else None)
+    
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+    
+    def scan_iter(self, match='*'):
+        prefix = match.rstrip('*')
+        return [key for key in list(self.store) if key.startswith(prefix)]
+
+class TestRedisCache:
+    """Redis二级缓存测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.redis = FakeRedis()
+        self.frame = pd.DataFrame(
+            {'close': np.linspace(10, 11, 5).astype('float32'), 'vol': np.arange(5)},
+            index=pd.bdate_range('2024-01-02', periods=5, name='trade_date')
+        )
+    
+    def test_arrow_round_trip(self):
+        """测试Arrow IPC序列化保留索引和类型"""
+        restored = RedisCache.deserialize(RedisCache.serialize(self.frame))
+        pd.testing.assert_frame_equal(restored, self.frame, check_freq=False)
+    
+    def test_namespaced_versioned_keys(self):
+        """测试键带命名空间和版本，版本变化后不再命中"""
+        v1 = RedisCache(client=self.redis, namespace='qs', version='1', ttl=60)
+        v1.set(('daily', '000001.SZ', '20240101', '20240131'), self.frame)
+        
+        assert list(self.redis.store) == ['qs:v1.1:daily:000001.SZ:20240101:20240131']
+        assert RedisCache(client=self.redis, namespace='qs', version='2').get(
+            ('daily', '000001.SZ', '20240101', '20240131')) is None
+    
+    def test_ttl_follows_config(self):
+        """测试Redis过期时间与缓存ttl一致"""
+        cache = CacheManager.from_config(
+            {'ttl': 0.05}, backend=RedisCache(client=self.redis, ttl=0.05)
+        )
+        cache.set('a', self.frame)
+        time.sleep(0.1)
+        
+        assert cache.get('a') is None
+    
+    def test_shared_between_processes(self):
+        """测试两个进程内缓存通过Redis共享数据"""
+        worker_a = CacheManager(backend=RedisCache(client=self.redis))
+        worker_b = CacheManager(backend=RedisCache(client=self.redis))
+        worker_a.set(('daily', '000001.SZ'), self.frame)
+        
+        shared = worker_b.get(('daily', '000001.SZ'))
+        pd.testing.assert_frame_equal(shared, self.frame, check_freq=False)
+        assert worker_b.get_stats()['backend_hits'] == 1
+        
+        # 回填一级缓存后不再访问Redis
+        self.redis.store.clear()
+        assert worker_b.get(('daily', '000001.SZ')) is not None
+    
+    def test_redis_unavailable(self):
+        """测试Redis不可用时退化为一级缓存"""
+        class BrokenRedis:
+            def get(self, key):
+                raise ConnectionError("redis down")
+            set = get
+        
+        cache = CacheManager(backend=RedisCache(client=BrokenRedis()))
+        cache.set('a', self.frame)
+        assert cache.get('a') is not None
+        assert cache.get('b') is None
+
+class TestDataManagerCache:
+    """DataManager缓存集成测试类"""
+    
+    def test_repeated_request_hits_cache(self):
+        """测试相同股票和区间的重复请求不再访问数据源"""
+        data_manager = DataManager({
+            'tushare_token': 'test_token',
+            'performance': {'cache': {'enabled': True, 'ttl': 3600, 'max_size': '64MB'}}
+        })
+        data_manager.pro = ReplayPro(make_replay_bars(['000001.SZ'], ['20240102', '20240103']))
+        
+        first = data_manager.get_daily_data('000001.SZ', '20240101', '20240131')
+        first['close'] = 0.0
+        second = data_manager.get_daily_data('000001.SZ', '20240101', '20240131')
+        
+        assert len(data_manager.pro.calls) == 1
+        assert (second['close'] > 0).all()
+        assert data_manager.cache.get_stats()['hits'] == 1
+    
+    def test_empty_result_not_cached(self):
+        """测试失败或空结果不缓存"""
+        data_manager = DataManager({'tushare_token': 'test_token'})
+        data_manager.pro = ReplayPro(make_replay_bars(['000001.SZ'], ['20240102']))
+        
+        data_manager.get_daily_data('999999.SZ', '20240101', '20240131')
+        data_manager.get_daily_data('999999.SZ', '20240101', '20240131')
+        assert len(data_manager.pro.calls) == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,124 @@
+"""
+紧凑数据类型测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.compact import (CategoryDictionary, compact_frame, compact_report,
+                              from_date_ordinals, to_date_ordinals)
+from src.data.data_manager import DataManager
+from src.data.trading_calendar import TradingCalendar
+from src.factor.factor_engine import MomentumFactor
+from tests.helpers import ReplayPro, make_replay_bars
+
+SYMBOLS = ['000001.SZ', '000002.SZ', '600519.SH']
+DATES = ['20240102', '20240103', '20240104', '20240105']
+
+class TestCompactFrame:
+    """紧凑数据类型转换测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.bars = make_replay_bars(SYMBOLS, DATES).astype({'ts_code': object})
+    
+    def test_dtypes(self):
+        """测试浮点列转为float32、代码转为分类类型"""
+        compact = compact_frame(self.bars)
+        
+        assert compact['close'].dtype == np.float32
+        assert compact['vol'].dtype == np.float32
+        assert isinstance(compact['ts_code'].dtype, pd.CategoricalDtype)
+        assert compact['trade_date'].dtype == self.bars['trade_date'].dtype
+        assert compact.memory_usage(deep=True).sum() < self.bars.memory_usage(deep=True).sum()
+        np.testing.assert_allclose(compact['close'], self.bars['close'], rtol=1e-6)
+    
+    def test_shared_dictionary(self):
+        """测试不同数据共享同一套分类编码，拼接后仍为分类类型"""
+        categories = CategoryDictionary()
+        first = compact_frame(self.bars[self.bars['ts_code'] == '600519.SH'], categories)
+        second = compact_frame(self.bars[self.bars['ts_code'] != '600519.SH'], categories)
+        first = categories.encode(first)
+        
+        combined = pd.concat([first, second])
+        assert isinstance(combined['ts_code'].dtype, pd.CategoricalDtype)
+        # 已有编码不变，新值追加在末尾
+        assert list(categories.dtype('ts_code').categories) == ['600519.SH', '000001.SZ', '000002.SZ']
+    
+    def test_date_ordinals_round_trip(self):
+        """测试交易日与int32序号互相转换"""
+        calendar = TradingCalendar(DATES)
+        compact = compact_frame(self.bars, calendar=calendar)
+        assert compact['trade_date'].dtype == np.int32
+        assert compact['trade_date'].max() == len(DATES) - 1
+        
+        restored = from_date_ordinals(compact, calendar)
+        expected = pd.to_datetime(self.bars['trade_date'])
+        assert (restored['trade_date'].values == expected.values).all()
+        
+        panel = DataManager._normalize_daily(self.bars).set_index('ts_code', append=True)
+        ordinal_panel = to_date_ordinals(panel, calendar)
+        assert ordinal_panel.index.levels[0].dtype == np.int32
+        assert from_date_ordinals(ordinal_panel, calendar).index.equals(panel.index)
+        
+        # 非交易日没有序号
+        with pytest.raises(ValueError):
+            to_date_ordinals(panel, TradingCalendar(DATES[1:]))
+    
+    def test_report(self):
+        """测试内存和因子差异报告"""
+        daily = DataManager._normalize_daily(self.bars[self.bars['ts_code'] == '000001.SZ'])
+        report = compact_report(daily, factors={'momentum': MomentumFactor(lookback_period=1).calculate})
+        
+        assert report['memory'].loc['total', 'ratio'] < 1
+        assert report['factors']['momentum']['max_rel_diff'] < 1e-5
+        assert report['factors']['momentum']['nan_mismatch'] == 0
+
+class TestDataManagerCompact:
+    """DataManager紧凑模式测试类"""
+    
+    def test_compact_mode(self):
+        """测试开启compact_dtypes后返回紧凑数据"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'cache_enabled': False,
+                                    'compact_dtypes': True})
+        data_manager.pro = ReplayPro(make_replay_bars(SYMBOLS, DATES))
+        
+        daily = data_manager.get_daily_data('000002.SZ', DATES[0], DATES[-1])
+        assert daily['close'].dtype == np.float32
+        assert daily['ts_code'].dtype == data_manager.categories.dtype('ts_code')
+        
+        panel = data_manager.get_multiple_stocks(SYMBOLS, DATES[0], DATES[-1])
+        assert panel['close'].dtype == np.float32
+        assert len(panel) == len(SYMBOLS) * len(DATES)
+    
+    def test_panel_date_ordinals(self):
+        """测试日历已加载时紧凑面板使用int32交易日序号，可还原为日期"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'cache_enabled': False,
+                                    'compact_dtypes': True})
+        data_manager.pro = ReplayPro(make_replay_bars(SYMBOLS, DATES))
+        calendar = data_manager.get_trading_calendar(DATES[0], DATES[-1])
+        
+        panel = data_manager.get_multiple_stocks(SYMBOLS, DATES[0], DATES[-1])
+        assert panel.index.levels[0].dtype == np.int32
+        assert list(panel.index.levels[0]) == list(calendar.ordinals(DATES))
+        
+        restored = data_manager.restore_dates(panel)
+        assert list(restored.index.levels[0].strftime('%Y%m%d')) == DATES
+        assert data_manager.restore_dates(restored) is restored
+    
+    def test_default_keeps_float64(self):
+        """测试默认不改变数据类型"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'cache_enabled': False})
+        data_manager.pro = ReplayPro(make_replay_bars(SYMBOLS, DATES))
+        
+        daily = data_manager.get_daily_data('000002.SZ', DATES[0], DATES[-1])
+        assert daily['close'].dtype == np.float64
+
+if __name__ == "__main__":
+    pytest.main([__file__])
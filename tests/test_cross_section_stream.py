@@ -0,0 +1,155 @@
+"""
+截面数据流测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import threading
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.cross_section_stream import CrossSectionStream
+from src.data.data_manager import DataManager
+from src.data.panel_store import PanelStore
+from src.data.sql_store import SQLiteStore
+from tests.helpers import make_replay_bars
+
+class TestCrossSectionStream:
+    """截面数据流测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.dates = pd.bdate_range('2024-01-02', periods=12, name='trade_date')
+        self.frames = {}
+        for j, ts_code in enumerate(['600519.SH', '000001.SZ', '000002.SZ']):
+            close = np.arange(12, dtype=float) + 10 * (j + 1)
+            self.frames[ts_code] = pd.DataFrame({
+                'open': close, 'high': close + 1, 'low': close - 1,
+                'close': close, 'vol': close * 100, 'amount': close * 1000
+            }, index=self.dates)
+        # 000002.SZ 停牌三天
+        self.frames['000002.SZ'] = self.frames['000002.SZ'].drop(self.dates[4:7])
+    
+    def _build(self, tmp_path):
+        return PanelStore.build(tmp_path / 'panel', self.frames.items(), self.dates, list(self.frames))
+    
+    def test_yields_every_trade_date(self, tmp_path):
+        """测试按交易日逐个输出与面板一致的截面"""
+        panel = self._build(tmp_path)
+        stream = CrossSectionStream.from_panel(panel, fields=['close', 'vol'], chunk_size=5)
+        close = panel.to_frame('close')
+        
+        dates = []
+        for cross_section in stream:
+            dates.append(cross_section.trade_date)
+            np.testing.assert_array_equal(cross_section.values('close'), close.loc[cross_section.trade_date])
+        
+        assert len(stream) == len(self.dates)
+        assert pd.DatetimeIndex(dates).equals(self.dates.rename(None))
+    
+    def test_suspended_symbols_dropped(self, tmp_path):
+        """测试停牌股票不出现在当日截面"""
+        stream = CrossSectionStream.from_panel(self._build(tmp_path), '2024-01-08', '2024-01-08')
+        frame = next(iter(stream)).to_frame()
+        
+        assert list(frame.index) == ['000001.SZ', '600519.SH']
+        assert frame.loc['600519.SH', 'close'] == 14.0
+    
+    def test_lookback_window_across_chunks(self, tmp_path):
+        """测试回看窗口跨越分块边界时连续"""
+        panel = self._build(tmp_path)
+        close = panel.to_frame('close')
+        stream = CrossSectionStream.from_panel(panel, fields=['close'], lookback=3, chunk_size=4)
+        
+        for i, cross_section in enumerate(stream):
+            window = cross_section.window('close')
+            expected = close.iloc[max(0, i - 3):i + 1]
+            np.testing.assert_array_equal(window, expected.values)
+            assert cross_section.window_frame('close').index.equals(expected.index)
+        
+        with pytest.raises(ValueError):
+            cross_section.window('close', length=5)
+    
+    def test_buffer_bounded(self, tmp_path):
+        """测试缓冲只保留回看窗口和当前分块"""
+        stream = CrossSectionStream.from_panel(self._build(tmp_path), fields=['close'], lookback=2, chunk_size=3)
+        sizes = {len(cross_section._buffer_dates) for cross_section in stream}
+        
+        assert max(sizes) <= 2 + 3
+    
+    def test_prefetch_overlaps_compute(self):
+        """测试后台线程在消费当前块时读取下一块"""
+        load_threads = []
+        
+        def load_chunk(chunk_dates):
+            load_threads.append(threading.current_thread().name)
+            time.sleep(0.05)
+            return {'close': np.ones((len(chunk_dates), 2))}
+        
+        def run(prefetch):
+            stream = CrossSectionStream(load_chunk, self.dates[:8], ['A', 'B'], ['close'],
+                                        chunk_size=2, prefetch=prefetch)
+            start = time.perf_counter()
+            for cross_section in stream:
+                time.sleep(0.025)
+            return time.perf_counter() - start
+        
+        sequential = run(0)
+        prefetched = run(1)
+        
+        assert 'cross-section-prefetch' in load_threads
+        assert prefetched < sequential * 0.85
+    
+    def test_loader_error_raised(self):
+        """测试后台读取的异常在迭代方抛出"""
+        def load_chunk(chunk_dates):
+            if chunk_dates[0] > self.dates[0]:
+                raise IOError('磁盘读取失败')
+            return {'close': np.ones((len(chunk_dates), 1))}
+        
+        stream = CrossSectionStream(load_chunk, self.dates, ['A'], ['close'], chunk_size=4)
+        with pytest.raises(IOError):
+            list(stream)
+    
+    def test_early_stop_releases_thread(self, tmp_path):
+        """测试提前结束迭代时预取线程退出"""
+        stream = CrossSectionStream.from_panel(self._build(tmp_path), chunk_size=1, prefetch=2)
+        iterator = iter(stream)
+        next(iterator)
+        iterator.close()
+        
+        time.sleep(0.2)
+        assert not any(t.name == 'cross-section-prefetch' for t in threading.enumerate())
+    
+    def test_from_store(self, tmp_path):
+        """测试从行情数据库逐日读取"""
+        symbols = ['000001.SZ', '000002.SZ']
+        dates = ['20240102', '20240103', '20240104']
+        store = SQLiteStore(tmp_path / 'test.db')
+        store.upsert_daily_bars(make_replay_bars(symbols, dates))
+        
+        stream = CrossSectionStream.from_store(store, pd.to_datetime(dates), symbols, ['close'], lookback=1)
+        sections = list(stream)
+        
+        assert len(sections) == 3
+        np.testing.assert_allclose(sections[2].values('close'), [10.4, 11.4])
+        assert sections[2].window('close').shape == (2, 2)
+    
+    def test_data_manager_uses_panel(self, tmp_path):
+        """测试DataManager优先从面板读取"""
+        self._build(tmp_path)
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        stream = data_manager.iter_cross_sections('2024-01-03', '2024-01-05', fields=['close'])
+        
+        assert [cs.trade_date.strftime('%Y%m%d') for cs in stream] == ['20240103', '20240104', '20240105']
+        
+        with pytest.raises(FileNotFoundError):
+            data_manager.iter_cross_sections(panel_dir=tmp_path / 'missing')
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -8,11 +8,16 @@ import numpy as np
 from datetime import datetime, timedelta
 import sys
 import os
+import threading
+import time
 
 # 添加项目路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.data.data_manager import DataManager
+from src.data.cache_manifest import CacheManifest
+from src.data.storage import CsvStorage, ParquetStorage
+from tests.helpers import ReplayPro, make_replay_bars
 
 class TestDataManager:
     """数据管理器测试类"""
@@ -30,6 +35,17 @@ class TestDataManager:
         assert self.data_manager.config == self.config
         assert hasattr(self.data_manager, 'logger')
     
+    def test_lazy_provider_import(self):
+        """测试导入和创建DataManager不会加载tushare/akshare"""
+        import subprocess
+        code = (
+            "import sys; from src.data.data_manager import DataManager; DataManager(); "
+            "print('tushare' in sys.modules, 'akshare' in sys.modules)"
+        )
+        root = os.path.join(os.path.dirname(__file__), '..')
+        result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True)
+        assert result.stdout.split() == ['False', 'False']
+    
     def test_get_stock_list_mock(self):
         """测试获取股票列表（模拟）"""
         # 由于无法真实调用API，测试异常处理
@@ -55,22 +71,318 @@ class TestDataManager:
         # 加载数据
         loaded_data = self.data_manager.load_data('test_data')
         assert isinstance(loaded_data, pd.DataFrame)
+        pd.testing.assert_frame_equal(loaded_data, test_data)
         
         # 清理测试文件
         import os
         try:
-            os.remove('data/test_data.csv')
+            os.remove('data/test_data.parquet')
         except:
             pass
     
-    def test_update_cache(self):
+    def test_update_cache(self, tmp_path):
         """测试缓存更新"""
+        data_manager = DataManager(dict(self.config, data_dir=str(tmp_path)))
         # 测试异常处理
         try:
-            self.data_manager.update_cache()
+            data_manager.update_cache()
         except Exception as e:
             # 期望有异常，因为API无法连接
             assert True
+        
+        # 没有获取到数据时不写缓存清单
+        assert not (tmp_path / 'cache_manifest.json').exists()
+
+class TestCrossSectionFetch:
+    """按交易日获取全市场截面测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.symbols = [f"{i:06d}.SZ" for i in range(1, 151)]
+        # 取最近的交易日，保证落在update_cache的默认区间内
+        self.dates = list(pd.bdate_range(end=datetime.now() - timedelta(days=1), periods=3).strftime('%Y%m%d'))
+        self.replay = ReplayPro(make_replay_bars(self.symbols, self.dates))
+    
+    def _make_manager(self, tmp_path):
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        data_manager.pro = self.replay
+        return data_manager
+    
+    def test_one_call_per_trade_date(self, tmp_path):
+        """测试每个交易日只调用一次接口"""
+        data_manager = self._make_manager(tmp_path)
+        result = data_manager.get_daily_data_by_dates(self.dates[0], self.dates[-1])
+        
+        assert len(self.replay.calls) == len(self.dates)
+        assert all(call['ts_code'] is None for call in self.replay.calls)
+        assert sorted(result) == self.symbols
+    
+    def test_split_matches_per_symbol_fetch(self, tmp_path):
+        """测试截面拆分结果与逐只获取一致"""
+        data_manager = self._make_manager(tmp_path)
+        by_date = data_manager.get_daily_data_by_dates(self.dates[0], self.dates[-1])
+        by_symbol = data_manager.get_daily_data('000007.SZ', self.dates[0], self.dates[-1])
+        
+        assert (by_date['000007.SZ']['adj_factor'] == 1.0).all()
+        pd.testing.assert_frame_equal(by_date['000007.SZ'].drop(columns='adj_factor'), by_symbol)
+        assert by_symbol.index.is_monotonic_increasing
+    
+    def test_update_cache_covers_whole_market(self, tmp_path):
+        """测试缓存更新不再限制为前100只股票"""
+        data_manager = self._make_manager(tmp_path)
+        data_manager.update_cache()
+        
+        cached = sorted(tmp_path.glob('daily_*'))
+        assert len(cached) == len(self.symbols)
+
+class TestColumnarStorage:
+    """列式存储测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        bars = make_replay_bars(['000001.SZ'], ['20240102', '20240103', '20240104'])
+        self.daily = DataManager._normalize_daily(bars)
+        self.daily['vol'] = self.daily['vol'].astype('float32')
+        self.daily['ts_code'] = self.daily['ts_code'].astype('category')
+    
+    def test_round_trip_index_and_dtypes(self, tmp_path):
+        """测试日期索引和数据类型完整保留"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        data_manager.save_data(self.daily, 'daily_000001.SZ')
+        loaded = data_manager.load_data('daily_000001.SZ')
+        
+        assert (tmp_path / 'daily_000001.SZ.parquet').exists()
+        assert isinstance(loaded.index, pd.DatetimeIndex)
+        assert loaded.index.name == 'trade_date'
+        pd.testing.assert_frame_equal(loaded, self.daily)
+    
+    def test_column_projection(self, tmp_path):
+        """测试只读取指定列"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        data_manager.save_data(self.daily, 'daily_000001.SZ')
+        loaded = data_manager.load_data('daily_000001.SZ', columns=['close'])
+        
+        assert list(loaded.columns) == ['close']
+        pd.testing.assert_index_equal(loaded.index, self.daily.index)
+    
+    def test_append(self, tmp_path):
+        """测试追加数据"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        data_manager.save_data(self.daily.iloc[:2], 'daily_000001.SZ')
+        data_manager.append_data(self.daily.iloc[2:], 'daily_000001.SZ')
+        
+        pd.testing.assert_frame_equal(data_manager.load_data('daily_000001.SZ'), self.daily)
+    
+    def test_append_writes_new_file(self, tmp_path):
+        """测试追加写入新文件而不重写已有文件，新增的列保留"""
+        storage = ParquetStorage(tmp_path, max_parts=2)
+        storage.save(self.daily.iloc[:1], 'daily')
+        base_mtime = storage.path('daily').stat().st_mtime_ns
+        
+        storage.append(self.daily.iloc[1:2].assign(quality=1), 'daily')
+        assert storage.path('daily').stat().st_mtime_ns == base_mtime
+        assert len(list(storage.parts_dir('daily').iterdir())) == 1
+        
+        loaded = storage.load('daily')
+        assert len(loaded) == 2
+        assert np.isnan(loaded['quality'].iloc[0])
+        assert loaded['quality'].iloc[1] == 1
+        assert list(storage.load('daily', columns=['close', 'quality']).columns) == ['close', 'quality']
+        
+        # 文件数达到max_parts时合并为单个文件
+        storage.append(self.daily.iloc[2:], 'daily')
+        assert not storage.parts_dir('daily').exists()
+        assert len(storage.load('daily')) == len(self.daily)
+    
+    def test_csv_append_new_column(self, tmp_path):
+        """测试CSV追加出现新列时保留该列"""
+        storage = CsvStorage(tmp_path)
+        storage.save(self.daily.iloc[:2], 'daily')
+        storage.append(self.daily.iloc[2:].assign(quality=1), 'daily')
+        
+        loaded = storage.load('daily')
+        assert len(loaded) == len(self.daily)
+        assert loaded['quality'].iloc[-1] == 1
+    
+    def test_legacy_csv_and_export(self, tmp_path):
+        """测试兼容读取旧版CSV缓存，CSV仅作为导出格式"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        self.daily.to_csv(tmp_path / 'legacy.csv')
+        assert len(data_manager.load_data('legacy')) == len(self.daily)
+        
+        file_path = data_manager.export_csv(self.daily, 'daily_000001.SZ')
+        assert file_path == tmp_path / 'export' / 'daily_000001.SZ.csv'
+        assert not (tmp_path / 'daily_000001.SZ.csv').exists()
+
+class TestIncrementalUpdate:
+    """基于水位的增量缓存更新测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.symbols = ['000001.SZ', '000002.SZ', '600519.SH']
+        self.dates = list(pd.bdate_range(end=datetime.now() - timedelta(days=1), periods=4).strftime('%Y%m%d'))
+        self.bars = make_replay_bars(self.symbols, self.dates)
+    
+    def _make_manager(self, tmp_path, dates):
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        data_manager.pro = ReplayPro(self.bars[self.bars['trade_date'].isin(dates)])
+        return data_manager
+    
+    def _daily_calls(self, data_manager):
+        return [call['trade_date'] for call in data_manager.pro.calls]
+    
+    def test_only_missing_days_fetched(self, tmp_path):
+        """测试第二次更新只获取新增交易日并追加"""
+        self._make_manager(tmp_path, self.dates[:3]).update_cache()
+        
+        data_manager = self._make_manager(tmp_path, self.dates)
+        data_manager.update_cache()
+        
+        assert self._daily_calls(data_manager) == [self.dates[-1]]
+        cached = data_manager.load_data('daily_600519.SH')
+        assert len(cached) == len(self.dates)
+        assert not cached.index.duplicated().any()
+    
+    def test_no_new_days(self, tmp_path):
+        """测试没有新交易日时不重复写入"""
+        self._make_manager(tmp_path, self.dates).update_cache()
+        data_manager = self._make_manager(tmp_path, self.dates)
+        data_manager.update_cache()
+        
+        assert self._daily_calls(data_manager) == []
+        assert len(data_manager.load_data('daily_000001.SZ')) == len(self.dates)
+    
+    def test_force_update_rebuilds(self, tmp_path):
+        """测试force_update忽略水位全量重建"""
+        self._make_manager(tmp_path, self.dates).update_cache()
+        data_manager = self._make_manager(tmp_path, self.dates)
+        data_manager.update_cache(force_update=True)
+        
+        assert self._daily_calls(data_manager) == self.dates
+        assert len(data_manager.load_data('daily_000002.SZ')) == len(self.dates)
+    
+    def test_manifest_watermarks(self, tmp_path):
+        """测试清单记录每只股票的水位"""
+        self._make_manager(tmp_path, self.dates).update_cache()
+        
+        manifest = CacheManifest(tmp_path / 'cache_manifest.json')
+        assert manifest.last_trade_date == self.dates[-1]
+        assert all(manifest.get_watermark(code) == self.dates[-1] for code in self.symbols)
+    
+    def test_failed_day_refetched(self, tmp_path):
+        """测试中间某个交易日获取失败时水位停在其前一交易日，下次更新重新获取"""
+        data_manager = self._make_manager(tmp_path, self.dates)
+        data_manager.retry_count = 1
+        data_manager.pro = FailingDatePro(self.bars, self.dates[2])
+        data_manager.update_cache()
+        
+        manifest = CacheManifest(tmp_path / 'cache_manifest.json')
+        assert manifest.last_trade_date == self.dates[1]
+        assert all(manifest.get_watermark(code) == self.dates[1] for code in self.symbols)
+        assert len(data_manager.load_data('daily_000001.SZ')) == 2
+        
+        data_manager = self._make_manager(tmp_path, self.dates)
+        data_manager.update_cache()
+        assert self._daily_calls(data_manager) == self.dates[2:]
+        cached = data_manager.load_data('daily_000001.SZ')
+        assert list(cached.index.strftime('%Y%m%d')) == self.dates
+
+class FailingDatePro(ReplayPro):
+    """指定交易日的截面请求总是失败的本地接口替身"""
+    
+    def __init__(self, bars: pd.DataFrame, failing_date: str):
+        super().__init__(bars)
+        self.failing_date = failing_date
+    
+    def daily(self, ts_code=None, trade_date=None, start_date=None, end_date=None):
+        if trade_date == self.failing_date:
+            raise ConnectionError(f"{trade_date} 请求失败")
+        return super().daily(ts_code=ts_code, trade_date=trade_date, start_date=start_date, end_date=end_date)
+
+class LatencyPro(ReplayPro):
+    """带注入延迟和失败的本地接口替身，并记录最大并发数"""
+    
+    def __init__(self, bars: pd.DataFrame, latency: float = 0.05, failures: int = 0):
+        super().__init__(bars)
+        self.latency = latency
+        self.failures = failures
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+    
+    def daily(self, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            fail = self.failures > 0
+            if fail:
+                self.failures -= 1
+        try:
+            time.sleep(self.latency)
+            if fail:
+                raise ConnectionError("模拟接口超时")
+            return super().daily(**kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+class TestMultipleStocks:
+    """多股票并发加载测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.symbols = [f"{i:06d}.SZ" for i in range(1, 21)]
+        self.dates = ['20240102', '20240103', '20240104']
+        self.config = {
+            'tushare_token': 'test_token',
+            'data_sources': {'tushare': {'retry_count': 2, 'retry_delay': 0.01, 'rate_limit': 60000}},
+            'performance': {'parallel': {'max_workers': 4}}
+        }
+    
+    def _make_manager(self, provider):
+        data_manager = DataManager(self.config)
+        data_manager.pro = provider
+        return data_manager
+    
+    def test_returns_long_panel(self):
+        """测试返回(trade_date, ts_code)长表"""
+        provider = LatencyPro(make_replay_bars(self.symbols, self.dates), latency=0)
+        panel = self._make_manager(provider).get_multiple_stocks(self.symbols, '20240101', '20240131')
+        
+        assert panel.index.names == ['trade_date', 'ts_code']
+        assert len(panel) == len(self.symbols) * len(self.dates)
+        assert panel.index.is_monotonic_increasing
+        assert panel.loc[(pd.Timestamp('20240103'), '000005.SZ'), 'close'] == pytest.approx(14.3)
+    
+    def test_bounded_concurrency(self):
+        """测试并发数受线程池上限约束"""
+        provider = LatencyPro(make_replay_bars(self.symbols, self.dates), latency=0.05)
+        self._make_manager(provider).get_multiple_stocks(self.symbols, '20240101', '20240131')
+        
+        assert len(provider.calls) == len(self.symbols)
+        assert 1 < provider.max_active <= 4
+    
+    def test_retry_on_transient_failure(self):
+        """测试临时失败按配置重试"""
+        provider = LatencyPro(make_replay_bars(self.symbols, self.dates), latency=0, failures=2)
+        panel = self._make_manager(provider).get_multiple_stocks(['000001.SZ'], '20240101', '20240131')
+        
+        assert len(panel) == len(self.dates)
+        assert provider.failures == 0
+        assert len(provider.calls) == 1
+    
+    def test_rate_limit(self):
+        """测试令牌桶限制调用频率"""
+        self.config['data_sources']['tushare']['rate_limit'] = 600  # 每秒10次
+        provider = LatencyPro(make_replay_bars(self.symbols, self.dates), latency=0)
+        data_manager = self._make_manager(provider)
+        
+        start = time.perf_counter()
+        data_manager.get_multiple_stocks(self.symbols, '20240101', '20240131')
+        elapsed = time.perf_counter() - start
+        
+        # 桶内初始10个令牌，剩余10次调用至少需要约1秒
+        assert elapsed >= 0.9
 
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+数据校验测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.data_manager import DataManager
+from src.utils.data_validator import CHECKS, DataValidator
+from tests.helpers import ReplayPro, make_replay_bars
+
+SYMBOLS = ['000001.SZ', '000002.SZ', '600519.SH']
+
+class TestDataValidator:
+    """数据校验器测试类"""
+
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.dates = list(pd.bdate_range('2024-01-02', periods=30).strftime('%Y%m%d'))
+        self.bars = make_replay_bars(SYMBOLS, self.dates)
+        self.validator = DataValidator(volume_window=10, volume_spike=5.0)
+
+    def row(self, trade_date: str, ts_code: str) -> int:
+        return self.bars.index[(self.bars['trade_date'] == trade_date) & (self.bars['ts_code'] == ts_code)][0]
+
+    def test_clean_data_passes(self):
+        """测试正常数据全部通过"""
+        flags = self.validator.validate(self.bars)
+
+        assert flags.dtype == np.uint8
+        assert flags.index.equals(self.bars.index)
+        assert self.validator.summary(flags)['flagged'] == 0
+
+    def test_price_checks(self):
+        """测试缺失、非正价格和高低价倒挂"""
+        missing = self.row(self.dates[3], SYMBOLS[0])
+        zero = self.row(self.dates[4], SYMBOLS[1])
+        inverted = self.row(self.dates[5], SYMBOLS[2])
+        outside = self.row(self.dates[6], SYMBOLS[0])
+        self.bars.loc[missing, 'close'] = np.nan
+        self.bars.loc[zero, ['open', 'low']] = 0.0
+        self.bars.loc[inverted, 'high'] = self.bars.loc[inverted, 'low'] - 1
+        self.bars.loc[outside, 'close'] = self.bars.loc[outside, 'high'] + 1
+
+        flags = self.validator.validate(self.bars)
+        assert flags[missing] == CHECKS['missing']
+        assert flags[zero] == CHECKS['non_positive']
+        assert flags[inverted] & CHECKS['high_low']
+        assert flags[outside] == CHECKS['high_low']
+        assert self.validator.summary(flags)['flagged'] == 4
+
+    def test_duplicates_keep_last(self):
+        """测试重复行只保留最后一行"""
+        duplicate = self.bars.iloc[[0]].assign(vol=1.0)
+        bars = pd.concat([self.bars, duplicate], ignore_index=True)
+
+        flags = self.validator.validate(bars)
+        assert flags[0] == CHECKS['duplicate']
+        assert flags[len(bars) - 1] == 0
+
+        cleaned = self.validator.clean(bars, flags)
+        assert len(cleaned) == len(self.bars)
+        assert not cleaned.duplicated(['trade_date', 'ts_code']).any()
+
+    def test_volume_spike_flagged_not_rejected(self):
+        """测试成交量异常只标记不剔除"""
+        spike = self.row(self.dates[20], SYMBOLS[1])
+        self.bars.loc[spike, 'vol'] *= 10
+        negative = self.row(self.dates[21], SYMBOLS[2])
+        self.bars.loc[negative, 'vol'] = -1.0
+
+        flags = self.validator.validate(self.bars)
+        assert flags[spike] == CHECKS['volume_spike']
+        assert flags[negative] == CHECKS['negative_volume']
+
+        cleaned = self.validator.clean(self.bars, flags)
+        assert spike in cleaned.index
+        assert negative not in cleaned.index
+
+    def test_volume_spike_needs_history(self):
+        """测试回看窗口不足时不判断成交量异常"""
+        first = self.row(self.dates[1], SYMBOLS[0])
+        self.bars.loc[first, 'vol'] *= 100
+
+        assert self.validator.validate(self.bars)[first] == 0
+
+    def test_volume_spike_against_history(self):
+        """测试增量校验以之前交易日的成交量为基准"""
+        spike = self.row(self.dates[-1], SYMBOLS[1])
+        self.bars.loc[spike, 'vol'] *= 10
+        history_bars = self.bars[self.bars['trade_date'] < self.dates[-1]]
+        latest = self.bars[self.bars['trade_date'] == self.dates[-1]]
+
+        # 只有一个交易日的新数据时没有回看窗口
+        assert self.validator.validate(latest).max() == 0
+
+        history = self.validator.volume_history(history_bars)
+        assert history.shape == (self.validator.volume_window, len(SYMBOLS))
+        flags = self.validator.validate(latest, history)
+        assert flags[spike] == CHECKS['volume_spike']
+        assert self.validator.summary(flags)['flagged'] == 1
+
+    def test_single_symbol_indexed_by_date(self):
+        """测试以trade_date为索引的单只股票数据"""
+        daily = self.bars[self.bars['ts_code'] == SYMBOLS[0]].copy()
+        daily['trade_date'] = pd.to_datetime(daily['trade_date'])
+        daily = daily.set_index('trade_date').drop(columns='ts_code').sort_index()
+        daily.iloc[25, daily.columns.get_loc('vol')] *= 10
+
+        flags = self.validator.validate(daily)
+        assert list(np.flatnonzero(flags.to_numpy())) == [25]
+
+    def test_from_config(self):
+        """测试从配置创建及未知检查项"""
+        validator = DataValidator.from_config({'volume_spike': 3, 'reject': ['missing']})
+        assert validator.volume_spike == 3.0
+        assert validator.reject_mask == CHECKS['missing']
+
+        with pytest.raises(ValueError):
+            DataValidator(reject=['unknown'])
+
+class TestDataManagerValidation:
+    """DataManager入库校验测试类"""
+
+    def test_invalid_rows_dropped_at_ingest(self, tmp_path):
+        """测试按交易日获取的数据剔除错误行并记录计数"""
+        dates = list(pd.bdate_range('2024-01-02', periods=5).strftime('%Y%m%d'))
+        bars = make_replay_bars(SYMBOLS, dates)
+        bad = bars.index[(bars['trade_date'] == dates[2]) & (bars['ts_code'] == SYMBOLS[0])][0]
+        bars.loc[bad, 'close'] = 0.0
+
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        data_manager.pro = ReplayPro(bars)
+        by_symbol = data_manager.get_daily_data_by_dates(dates[0], dates[-1])
+
+        assert len(by_symbol[SYMBOLS[0]]) == len(dates) - 1
+        assert len(by_symbol[SYMBOLS[1]]) == len(dates)
+        assert data_manager.quality_summary['non_positive'] == 1
+
+    def test_quality_persisted_and_incremental_spike(self, tmp_path):
+        """测试保留行记录quality列，增量更新以缓存的成交量为基准"""
+        dates = list(pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=25).strftime('%Y%m%d'))
+        bars = make_replay_bars(SYMBOLS, dates)
+        spike = bars.index[(bars['trade_date'] == dates[-1]) & (bars['ts_code'] == SYMBOLS[2])][0]
+        bars.loc[spike, 'vol'] *= 20
+
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path), 'cache_days': 24,
+                                    'with_adj_factor': False})
+        data_manager.pro = ReplayPro(bars[bars['trade_date'] < dates[-1]])
+        data_manager.update_cache()
+        assert (data_manager.load_data(f"daily_{SYMBOLS[2]}")['quality'] == 0).all()
+
+        # 第二天只获取一个交易日
+        data_manager.pro = ReplayPro(bars)
+        data_manager._calendar = None
+        data_manager.update_cache()
+        assert data_manager.pro.calls == [{'ts_code': None, 'trade_date': dates[-1]}]
+
+        cached = data_manager.load_data(f"daily_{SYMBOLS[2]}")
+        assert len(cached) == len(dates)
+        assert cached['quality'].iloc[-1] == CHECKS['volume_spike']
+        assert data_manager.quality_summary['volume_spike'] == 1
+
+    def test_validation_disabled(self, tmp_path):
+        """测试关闭校验时原样保留"""
+        dates = list(pd.bdate_range('2024-01-02', periods=5).strftime('%Y%m%d'))
+        bars = make_replay_bars(SYMBOLS, dates)
+        bars.loc[0, 'close'] = 0.0
+
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path),
+                                    'data_validation': {'enabled': False}})
+        data_manager.pro = ReplayPro(bars)
+        by_symbol = data_manager.get_daily_data_by_dates(dates[0], dates[-1])
+
+        assert sum(len(daily) for daily in by_symbol.values()) == len(bars)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -12,7 +12,8 @@ import os
 # 添加项目路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.factor.factor_engine import FactorEngine, ValueFactor, MomentumFactor, QualityFactor
+from src.factor.factor_engine import (FactorEngine, ValueFactor, MomentumFactor, QualityFactor,
+                                      RSIFactor, MACDFactor)
 
 class TestFactorEngine:
     """因子引擎测试类"""
@@ -89,6 +90,28 @@ class TestFactorEngine:
         assert isinstance(factor_data, pd.DataFrame)
         assert len(factor_data.columns) >= 3
     
+    def test_calculate_factors_per_stock(self):
+        """测试多股票长表按股票分别计算指定因子"""
+        self.engine.register_factor(RSIFactor(window=3))
+        self.engine.register_factor(MACDFactor())
+        self.engine.register_factor(MomentumFactor(lookback_period=1))
+        
+        dates = pd.bdate_range('2024-01-02', periods=6)
+        panel = pd.DataFrame({
+            'close': [10.0, 100.0, 11.0, 99.0, 12.0, 98.0, 11.0, 97.0, 12.0, 96.0, 13.0, 95.0]
+        }, index=pd.MultiIndex.from_product([dates, ['000001.SZ', '600519.SH']], names=['trade_date', 'ts_code']))
+        
+        factor_data = self.engine.calculate_factors(panel, ['rsi', 'momentum_factor'])
+        assert list(factor_data.columns) == ['rsi', 'momentum_factor']
+        assert factor_data.index.equals(panel.index)
+        # 第一个交易日没有上一日价格，不与其他股票混算
+        assert factor_data['momentum_factor'].xs(dates[0], level='trade_date').isna().all()
+        assert factor_data['momentum_factor'].xs('000001.SZ', level='ts_code').iloc[1] == pytest.approx(0.1)
+        assert factor_data['rsi'].xs('600519.SH', level='ts_code').iloc[-1] == 0
+        
+        with pytest.raises(KeyError):
+            self.engine.calculate_factors(panel, ['pe_ratio'])
+    
     def test_factor_names(self):
         """测试因子名称"""
         value_factor = ValueFactor()
@@ -0,0 +1,120 @@
+"""
+时点财务数据测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.fundamentals import PointInTimeFundamentals, report_periods
+from src.data.data_manager import DataManager
+from src.factor.factor_engine import ValueFactor, QualityFactor, GrowthFactor
+
+class PeriodPro:
+    """按报告期返回全市场财务指标的接口替身"""
+    
+    def __init__(self, indicators: pd.DataFrame):
+        self.indicators = indicators
+        self.calls = []
+    
+    def fina_indicator_vip(self, period=None, fields=None):
+        self.calls.append(period)
+        return self.indicators[self.indicators['end_date'] == period].reset_index(drop=True)
+    
+    def fina_indicator(self, ts_code=None, start_date=None, end_date=None):
+        indicators = self.indicators[self.indicators['ts_code'] == ts_code]
+        return indicators[(indicators['ann_date'] >= start_date) & (indicators['ann_date'] <= end_date)]
+
+class TestPointInTimeFundamentals:
+    """时点财务指标测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.indicators = pd.DataFrame({
+            'ts_code': ['000001.SZ', '000001.SZ', '000001.SZ', '600519.SH'],
+            'ann_date': ['20240315', '20240420', '20240425', '20240402'],
+            'end_date': ['20231231', '20240331', '20231231', '20231231'],
+            'eps': [2.0, 0.6, 2.1, 50.0],
+            'roe': [10.0, 2.5, 10.5, 30.0],
+            'netprofit_yoy': [5.0, 8.0, 5.5, 19.0]
+        })
+        dates = pd.bdate_range('2024-03-14', '2024-04-30', name='trade_date')
+        self.panel = pd.DataFrame(
+            {'close': 20.0},
+            index=pd.MultiIndex.from_product([dates, ['000001.SZ', '600519.SH']], names=['trade_date', 'ts_code'])
+        )
+    
+    def test_report_periods(self):
+        """测试报告期列表"""
+        assert report_periods('20230101', '20231231') == ['20230331', '20230630', '20230930', '20231231']
+        assert report_periods('20230215', '20230331') == ['20230331']
+        assert report_periods('20230401', '20230410') == []
+    
+    def test_no_look_ahead(self):
+        """测试公告日之前不可见，次日生效"""
+        merged = PointInTimeFundamentals(self.indicators).asof_join(self.panel)
+        
+        assert np.isnan(merged.loc[(pd.Timestamp('2024-03-15'), '000001.SZ'), 'roe'])
+        assert merged.loc[(pd.Timestamp('2024-03-18'), '000001.SZ'), 'roe'] == 10.0
+        assert np.isnan(merged.loc[(pd.Timestamp('2024-04-02'), '600519.SH'), 'roe'])
+        assert merged.loc[(pd.Timestamp('2024-04-03'), '600519.SH'), 'net_profit_growth'] == 19.0
+    
+    def test_stale_restatement_ignored(self):
+        """测试旧报告期的更正不覆盖已公布的新报告期"""
+        merged = PointInTimeFundamentals(self.indicators).asof_join(self.panel)
+        
+        assert merged.loc[(pd.Timestamp('2024-04-30'), '000001.SZ'), 'roe'] == 2.5
+    
+    def test_pe_ratio_uses_annualized_eps(self):
+        """测试市盈率使用年化EPS"""
+        merged = PointInTimeFundamentals(self.indicators).asof_join(self.panel)
+        
+        assert merged.loc[(pd.Timestamp('2024-03-18'), '000001.SZ'), 'pe_ratio'] == pytest.approx(10.0)
+        assert merged.loc[(pd.Timestamp('2024-04-22'), '000001.SZ'), 'pe_ratio'] == pytest.approx(20 / 2.4)
+    
+    def test_preserves_panel_order(self):
+        """测试合并结果与原面板行一一对应"""
+        merged = PointInTimeFundamentals(self.indicators).asof_join(self.panel)
+        
+        pd.testing.assert_index_equal(merged.index, self.panel.index)
+    
+    def test_factor_inputs(self):
+        """测试合并结果可直接用于价值、质量、成长因子"""
+        merged = PointInTimeFundamentals(self.indicators).asof_join(self.panel).dropna()
+        
+        assert ValueFactor().calculate(merged).notna().all()
+        assert QualityFactor().calculate(merged).notna().all()
+        assert GrowthFactor().calculate(merged).notna().all()
+    
+    def test_as_of_cross_section(self):
+        """测试某日的全市场时点截面"""
+        section = PointInTimeFundamentals(self.indicators).as_of('2024-04-30')
+        
+        assert list(section.index) == ['000001.SZ', '600519.SH']
+        assert section.loc['000001.SZ', 'end_date'] == pd.Timestamp('2024-03-31')
+    
+    def test_single_stock_uses_announcement_lag(self, tmp_path):
+        """测试单只股票的基本面查询同样在公告次日才生效"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        data_manager.pro = PeriodPro(self.indicators)
+        
+        assert data_manager.get_fundamental_data('600519.SH', '20240402').empty
+        assert data_manager.get_fundamental_data('600519.SH', '20240403')['roe'].tolist() == [30.0]
+    
+    def test_bulk_update_by_period(self, tmp_path):
+        """测试按报告期批量更新，每个报告期调用一次"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        data_manager.pro = PeriodPro(self.indicators)
+        data_manager.update_fundamentals('20231001', '20240430')
+        
+        assert data_manager.pro.calls == ['20231231', '20240331']
+        merged = data_manager.attach_fundamentals(self.panel)
+        assert merged.loc[(pd.Timestamp('2024-04-30'), '000001.SZ'), 'roe'] == 2.5
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,146 @@
+"""
+指数日线批量加载测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.data_manager import BENCHMARK_INDICES, DataManager
+from tests.helpers import ReplayPro, make_replay_bars
+
+INDICES = ['000001.SH', '000300.SH', '399006.SZ']
+
+class IndexReplayPro(ReplayPro):
+    """同时回放指数日线的本地接口替身"""
+
+    def __init__(self, bars: pd.DataFrame, index_bars: pd.DataFrame):
+        super().__init__(bars)
+        self.index_bars = index_bars
+        self.index_calls = []
+
+    def index_daily(self, ts_code=None, start_date=None, end_date=None):
+        self.index_calls.append((ts_code, start_date, end_date))
+        bars = self.index_bars[self.index_bars['ts_code'] == ts_code]
+        return bars[(bars['trade_date'] >= start_date) & (bars['trade_date'] <= end_date)].reset_index(drop=True)
+
+class TestIndexLoader:
+    """指数加载测试类"""
+
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.dates = list(pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=30).strftime('%Y%m%d'))
+        self.index_bars = make_replay_bars(INDICES, self.dates)
+        # 创业板指缺少前5个交易日（如基日之前）
+        self.index_bars = self.index_bars[
+            (self.index_bars['ts_code'] != '399006.SZ') | (self.index_bars['trade_date'] > self.dates[4])
+        ]
+        self.start, self.end = self.dates[0], self.dates[-1]
+
+    def make_data_manager(self, tmp_path, **config) -> DataManager:
+        config = {'tushare_token': 'test_token', 'data_dir': str(tmp_path), 'index_start': self.start, **config}
+        data_manager = DataManager(config)
+        data_manager.pro = IndexReplayPro(make_replay_bars(['000001.SZ'], self.dates), self.index_bars)
+        return data_manager
+
+    def test_get_index_data(self, tmp_path):
+        """测试批量获取多个指数，名称与代码均可"""
+        data_manager = self.make_data_manager(tmp_path)
+        data = data_manager.get_index_data(['000001.SH', '沪深300', '创业板指'], self.start, self.end)
+
+        assert data.index.names == ['trade_date', 'ts_code']
+        assert set(data.index.get_level_values('ts_code')) == set(INDICES)
+        assert len(data) == len(self.index_bars)
+
+    def test_cached_in_store(self, tmp_path):
+        """测试指数写入本地存储，之后只增量获取"""
+        data_manager = self.make_data_manager(tmp_path)
+        data_manager.get_index_daily('000300.SH', self.start, self.dates[20])
+        calls = list(data_manager.pro.index_calls)
+        assert calls == [('000300.SH', self.start, self.dates[20])]
+        assert data_manager.storage.exists('index_000300.SH')
+
+        # 新的管理器没有进程内缓存，只读取本地存储并补齐水位之后的交易日
+        data_manager = self.make_data_manager(tmp_path)
+        index_daily = data_manager.get_index_daily('000300.SH', self.start, self.end)
+        assert data_manager.pro.index_calls == [('000300.SH', data_manager._next_date(self.dates[20]), self.end)]
+        assert len(index_daily) == len(self.dates)
+        assert index_daily.index.is_monotonic_increasing
+
+    def test_batched_history(self, tmp_path):
+        """测试首次获取按index_batch_years分段调用"""
+        data_manager = self.make_data_manager(tmp_path, index_start='20000101', index_batch_years=10)
+        index_daily = data_manager.get_index_daily('000001.SH', '20000101', self.end)
+
+        calls = data_manager.pro.index_calls
+        assert len(calls) == int(np.ceil((pd.Timestamp(self.end).year - 2000 + 1) / 10))
+        assert calls[0][1] == '20000101'
+        assert calls[0][2] == '20091231'
+        assert calls[-1][2] == self.end
+        assert len(index_daily) == len(self.dates)
+
+    def test_panel_aligned_to_calendar(self, tmp_path):
+        """测试宽表对齐交易日历，缺失交易日为NaN"""
+        data_manager = self.make_data_manager(tmp_path)
+        panel = data_manager.get_index_panel(list(BENCHMARK_INDICES), self.start, self.end)
+
+        assert list(panel.columns) == list(BENCHMARK_INDICES.values())
+        assert list(panel.index.strftime('%Y%m%d')) == self.dates
+        assert panel['399006.SZ'].isna().sum() == 5
+        # 回放中没有中证500
+        assert panel['000905.SH'].isna().all()
+        assert panel['000300.SH'].notna().all()
+
+    def test_get_market_data(self, tmp_path):
+        """测试市场整体数据默认为上证指数当日行情"""
+        data_manager = self.make_data_manager(tmp_path)
+        market = data_manager.get_market_data(self.dates[10])
+
+        assert len(market) == 1
+        assert market['ts_code'].iloc[0] == '000001.SH'
+        assert market['trade_date'].iloc[0] == self.dates[10]
+        # 首次只获取请求的交易日，不从index_start回补
+        assert data_manager.pro.index_calls == [('000001.SH', self.dates[10], self.dates[10])]
+
+    def test_front_fill_earlier_range(self, tmp_path):
+        """测试请求更早的区间时只补取缺少的前段"""
+        data_manager = self.make_data_manager(tmp_path)
+        data_manager.get_index_daily('000300.SH', self.dates[10], self.dates[20])
+        data_manager.get_index_daily('000300.SH', self.dates[5], self.dates[20])
+
+        before_first = (pd.Timestamp(self.dates[10]) - pd.Timedelta(days=1)).strftime('%Y%m%d')
+        assert data_manager.pro.index_calls == [('000300.SH', self.dates[10], self.dates[20]),
+                                                ('000300.SH', self.dates[5], before_first)]
+
+        data_manager = self.make_data_manager(tmp_path)
+        index_daily = data_manager.get_index_daily('000300.SH', self.dates[5], self.dates[20])
+        assert data_manager.pro.index_calls == []
+        assert list(index_daily.index.strftime('%Y%m%d')) == self.dates[5:21]
+
+    def test_index_bars_not_in_stock_table(self, tmp_path):
+        """测试指数写入单独的index_bar表，不混入股票截面"""
+        data_manager = self.make_data_manager(
+            tmp_path, database={'type': 'sqlite', 'sqlite': {'path': str(tmp_path / 'market.db')}})
+        data_manager.get_index_daily('000300.SH', self.start, self.end)
+
+        assert data_manager.load_cross_section(self.dates[10]).empty
+        assert len(data_manager.market_store.get_index_bars('000300.SH')) == len(self.dates)
+
+    def test_update_indices(self, tmp_path):
+        """测试按配置的指数更新缓存"""
+        data_manager = self.make_data_manager(tmp_path, index_codes=INDICES)
+        assert data_manager.update_indices(end_date=self.end) == len(INDICES)
+        assert all(data_manager.storage.exists(f"index_{code}") for code in INDICES)
+
+        # 已更新到end_date，不再调用接口
+        calls = len(data_manager.pro.index_calls)
+        data_manager.update_indices(end_date=self.end)
+        assert len(data_manager.pro.index_calls) == calls
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,288 @@
+"""
+分钟线存储与重采样测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.data_manager import DataManager
+from src.data.minute_bars import (
+    MinuteBarStore, MinuteResampler, bucket_labels, from_minutes, resample_minutes, to_minutes
+)
+from src.data.source_router import DataSource, MINUTE_COLUMNS, SourceRouter, TushareSource
+
+SYMBOLS = ['000001.SZ', '000002.SZ', '600519.SH']
+
+def session_times(trade_date: str) -> pd.DatetimeIndex:
+    """一个交易日的240根1分钟线结束时间"""
+    day = pd.Timestamp(trade_date)
+    morning = pd.date_range(day + pd.Timedelta('09:31:00'), day + pd.Timedelta('11:30:00'), freq='min')
+    afternoon = pd.date_range(day + pd.Timedelta('13:01:00'), day + pd.Timedelta('15:00:00'), freq='min')
+    return morning.append(afternoon)
+
+def make_minute_bars(symbols, trade_dates, seed: int = 0) -> pd.DataFrame:
+    """生成随机1分钟线"""
+    rng = np.random.default_rng(seed)
+    times = session_times(trade_dates[0])
+    for trade_date in trade_dates[1:]:
+        times = times.append(session_times(trade_date))
+    frames = []
+    for symbol in symbols:
+        close = 10 + np.cumsum(rng.normal(0, 0.01, len(times)))
+        open_ = close + rng.normal(0, 0.01, len(times))
+        frames.append(pd.DataFrame({
+            'ts_code': symbol,
+            'trade_time': times.strftime('%Y-%m-%d %H:%M:%S'),
+            'open': open_,
+            'high': np.maximum(open_, close) + 0.01,
+            'low': np.minimum(open_, close) - 0.01,
+            'close': close,
+            'vol': rng.integers(100, 10000, len(times)).astype(float),
+            'amount': rng.uniform(1e4, 1e5, len(times))
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def reference_resample(bars: pd.DataFrame, period: int) -> pd.DataFrame:
+    """逐股票按周期分组的参考实现"""
+    minutes = to_minutes(bars['trade_time'])
+    grouped = bars.assign(label=from_minutes(bucket_labels(minutes, period))).groupby(['label', 'ts_code'], sort=True)
+    result = grouped.agg(open=('open', 'first'), high=('high', 'max'), low=('low', 'min'),
+                         close=('close', 'last'), vol=('vol', 'sum'), amount=('amount', 'sum'))
+    result.index.names = ['trade_time', 'ts_code']
+    return result
+
+class ReplayMinuteSource(DataSource):
+    """回放分钟线的本地数据源"""
+
+    name = 'replay'
+
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars
+
+    def daily(self, stock_code, start_date, end_date):
+        raise NotImplementedError
+
+    def stock_basic(self):
+        raise NotImplementedError
+
+    def minute(self, stock_code, start_date, end_date):
+        bars = self.bars[self.bars['ts_code'] == stock_code]
+        dates = pd.to_datetime(bars['trade_time']).dt.strftime('%Y%m%d')
+        return bars[(dates >= start_date) & (dates <= end_date)][MINUTE_COLUMNS]
+
+class TestResample:
+    """重采样测试类"""
+
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.bars = make_minute_bars(SYMBOLS, ['20240102', '20240103'])
+
+    def test_bucket_labels(self):
+        """测试周期按交易时段对齐，集合竞价并入第一个周期"""
+        times = ['2024-01-02 09:30', '2024-01-02 09:31', '2024-01-02 09:35', '2024-01-02 09:36',
+                 '2024-01-02 11:30', '2024-01-02 13:00', '2024-01-02 13:01', '2024-01-02 15:00']
+        labels = from_minutes(bucket_labels(to_minutes(times), 5)).strftime('%H:%M')
+        assert list(labels) == ['09:35', '09:35', '09:35', '09:40', '11:30', '13:05', '13:05', '15:00']
+
+        labels = from_minutes(bucket_labels(to_minutes(times), 60)).strftime('%H:%M')
+        assert list(labels) == ['10:30', '10:30', '10:30', '10:30', '11:30', '14:00', '14:00', '15:00']
+
+    @pytest.mark.parametrize('freq,period', [('5m', 5), ('15m', 15), ('60m', 60), ('1d', 240)])
+    def test_matches_reference(self, freq, period):
+        """测试向量化重采样与逐股票分组结果一致"""
+        result = resample_minutes(self.bars, freq)
+        expected = reference_resample(self.bars, period)
+
+        assert len(result) == 2 * len(SYMBOLS) * 240 // period
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_daily_bar(self):
+        """测试日线为当日首开、最高、最低、尾收"""
+        result = resample_minutes(self.bars, '1d')
+        day = self.bars[(self.bars['ts_code'] == '600519.SH') & self.bars['trade_time'].str.startswith('2024-01-03')]
+        bar = result.loc[(pd.Timestamp('2024-01-03 15:00'), '600519.SH')]
+
+        assert bar['open'] == day['open'].iloc[0]
+        assert bar['close'] == day['close'].iloc[-1]
+        assert bar['high'] == day['high'].max()
+        assert bar['vol'] == pytest.approx(day['vol'].sum())
+
+    def test_invalid_freq(self):
+        """测试不能整除交易时段的周期"""
+        with pytest.raises(ValueError):
+            resample_minutes(self.bars, 7)
+        with pytest.raises(ValueError):
+            resample_minutes(self.bars, '2h')
+
+class TestMinuteResampler:
+    """增量重采样测试类"""
+
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.bars = make_minute_bars(SYMBOLS, ['20240102'])
+        self.bars = self.bars.sort_values(['trade_time', 'ts_code']).reset_index(drop=True)
+
+    @pytest.mark.parametrize('freq', ['5m', '15m', '60m', '1d'])
+    def test_incremental_matches_batch(self, freq):
+        """测试分批到达的分钟线增量聚合结果与一次聚合一致"""
+        resampler = MinuteResampler(freq)
+        # 每批7分钟，批次边界不与周期对齐
+        batches = np.arange(len(self.bars)) // (7 * len(SYMBOLS))
+        for _, batch in self.bars.groupby(batches):
+            resampler.update(batch)
+
+        pd.testing.assert_frame_equal(resampler.bars, resample_minutes(self.bars, freq))
+        assert resampler.rows_processed == len(self.bars)
+
+    def test_partial_bar(self):
+        """测试未结束的周期作为部分K线返回，新分钟到达后更新"""
+        resampler = MinuteResampler('5m')
+        first = self.bars[self.bars['trade_time'] <= '2024-01-02 09:33:00']
+        resampler.update(first)
+        bar = resampler.bars.loc[(pd.Timestamp('2024-01-02 09:35'), '000001.SZ')]
+        symbol = first[first['ts_code'] == '000001.SZ']
+        assert bar['close'] == symbol['close'].iloc[-1]
+        assert bar['vol'] == pytest.approx(symbol['vol'].sum())
+
+        second = self.bars[(self.bars['trade_time'] > '2024-01-02 09:33:00') &
+                           (self.bars['trade_time'] <= '2024-01-02 09:37:00')]
+        updated = resampler.update(second)
+        assert len(updated) == 2 * len(SYMBOLS)
+        assert len(resampler.bars) == 2 * len(SYMBOLS)
+
+        symbol = self.bars[(self.bars['ts_code'] == '000001.SZ') & (self.bars['trade_time'] <= '2024-01-02 09:35:00')]
+        bar = resampler.bars.loc[(pd.Timestamp('2024-01-02 09:35'), '000001.SZ')]
+        assert bar['open'] == symbol['open'].iloc[0]
+        assert bar['close'] == symbol['close'].iloc[-1]
+        assert bar['high'] == symbol['high'].max()
+        assert bar['vol'] == pytest.approx(symbol['vol'].sum())
+
+    def test_duplicates_ignored(self):
+        """测试重复推送的分钟线不重复累计"""
+        resampler = MinuteResampler('15m')
+        head = self.bars.iloc[:30]
+        resampler.update(head)
+        resampler.update(self.bars.iloc[:60])
+
+        assert resampler.rows_processed == 60
+        pd.testing.assert_frame_equal(resampler.bars, resample_minutes(self.bars.iloc[:60], '15m'))
+
+    def test_drain_and_cap(self):
+        """测试取出已结束的K线后不再保留，max_completed限制保留的数量"""
+        expected = resample_minutes(self.bars, '5m')
+        resampler = MinuteResampler('5m')
+        capped = MinuteResampler('5m', max_completed=2 * len(SYMBOLS))
+        batches = np.arange(len(self.bars)) // (7 * len(SYMBOLS))
+        drained = []
+        for _, batch in self.bars.groupby(batches):
+            resampler.update(batch)
+            capped.update(batch)
+            drained.append(resampler.drain())
+            assert len(resampler._completed) == 0
+            assert len(capped.bars) <= 3 * len(SYMBOLS)
+
+        pd.testing.assert_frame_equal(pd.concat(drained + [resampler.bars]).sort_index(), expected)
+        pd.testing.assert_frame_equal(capped.bars, expected.iloc[-2 * len(SYMBOLS):])
+
+class TestMinuteBarStore:
+    """分钟线存储测试类"""
+
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.bars = make_minute_bars(SYMBOLS, ['20240102', '20240103'])
+
+    def test_compact_layout(self, tmp_path):
+        """测试按交易日分区，时间为int32分钟数，行情字段为float32"""
+        store = MinuteBarStore(tmp_path)
+        assert store.write(self.bars) == 2
+        assert store.trade_dates() == ['20240102', '20240103']
+
+        stored = store.read('20240103', '20240103')
+        assert len(stored) == len(SYMBOLS) * 240
+        assert stored['minute'].dtype == np.int32
+        assert stored['close'].dtype == np.float32
+        assert from_minutes(stored['minute'].iloc[:1])[0] == pd.Timestamp('2024-01-03 09:31')
+
+    def test_read_filters(self, tmp_path):
+        """测试按股票和字段读取"""
+        store = MinuteBarStore(tmp_path)
+        store.write(self.bars)
+
+        stored = store.read(symbols=['600519.SH'], columns=['close'])
+        assert list(stored.columns) == ['ts_code', 'minute', 'close']
+        assert set(stored['ts_code']) == {'600519.SH'}
+        assert len(stored) == 2 * 240
+
+    def test_write_merges(self, tmp_path):
+        """测试重复写入按 (股票, 分钟) 去重，新数据优先"""
+        store = MinuteBarStore(tmp_path)
+        store.write(self.bars)
+        revised = self.bars.iloc[:10].assign(close=99.0)
+        store.write(revised)
+
+        stored = store.read()
+        assert len(stored) == len(self.bars)
+        first = stored[stored['ts_code'] == SYMBOLS[0]].iloc[:10]
+        assert (first['close'] == np.float32(99.0)).all()
+
+    def test_resample(self, tmp_path):
+        """测试读取存储的分钟线重采样"""
+        store = MinuteBarStore(tmp_path)
+        store.write(self.bars)
+
+        result = store.resample('60m', '20240102', '20240102')
+        expected = reference_resample(self.bars[self.bars['trade_time'].str.startswith('2024-01-02')], 60)
+        assert len(result) == 4 * len(SYMBOLS)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False, rtol=1e-5)
+
+class TestTushareMinute:
+    """Tushare分钟线分段请求测试类"""
+
+    def test_requests_split_by_date(self):
+        """测试长区间按MINUTE_BATCH_DAYS分段，单次返回不超过接口行数上限"""
+        trade_dates = list(pd.bdate_range('2024-01-02', '2024-03-29').strftime('%Y%m%d'))
+        bars = make_minute_bars(['000001.SZ'], trade_dates)
+        requests = []
+
+        def call_api(api_name, ts_code=None, freq=None, start_date=None, end_date=None):
+            requests.append((start_date, end_date))
+            times = pd.to_datetime(bars['trade_time'])
+            selected = bars[(times >= start_date) & (times <= end_date)]
+            assert len(selected) <= 8000
+            return selected.head(8000)
+
+        result = TushareSource(call_api).minute('000001.SZ', trade_dates[0], trade_dates[-1])
+
+        assert len(requests) == 3
+        assert requests[0] == ('2024-01-02 09:00:00', '2024-01-31 15:00:00')
+        assert requests[-1][1] == '2024-03-29 15:00:00'
+        assert len(result) == len(bars)
+        assert result['trade_time'].is_monotonic_increasing
+
+class TestDataManagerMinute:
+    """DataManager分钟线入库测试类"""
+
+    def test_ingest_and_resample(self, tmp_path):
+        """测试从数据源获取分钟线入库后重采样"""
+        bars = make_minute_bars(SYMBOLS, ['20240102', '20240103'])
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        data_manager.router = SourceRouter([ReplayMinuteSource(bars)])
+
+        assert data_manager.ingest_minute_bars(SYMBOLS + ['999999.SZ'], '20240102', '20240103') == len(bars)
+        daily = data_manager.resample_minutes('1d', stock_codes=['000002.SZ'])
+        assert len(daily) == 2
+        assert daily['vol'].sum() == pytest.approx(bars[bars['ts_code'] == '000002.SZ']['vol'].sum())
+
+        store = data_manager.minute_store
+        pd.testing.assert_frame_equal(data_manager.resample_minutes('15m'), resample_minutes(store.read(), '15m'))
+        pd.testing.assert_frame_equal(data_manager.resample_minutes('60m', '20240103', '20240103', SYMBOLS[:1]),
+                                      resample_minutes(store.read('20240103', '20240103', SYMBOLS[:1]), '60m'))
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,86 @@
+"""
+面板数据存储测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.data_manager import DataManager
+from src.data.panel_store import PanelStore
+
+class TestPanelStore:
+    """面板数据存储测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.dates = pd.bdate_range('2024-01-02', periods=5, name='trade_date')
+        self.frames = {}
+        for j, ts_code in enumerate(['600519.SH', '000001.SZ', '000002.SZ']):
+            close = np.arange(5, dtype=float) + 10 * (j + 1)
+            self.frames[ts_code] = pd.DataFrame({
+                'open': close, 'high': close + 1, 'low': close - 1,
+                'close': close, 'vol': close * 100, 'amount': close * 1000
+            }, index=self.dates)
+        # 000002.SZ 停牌两天
+        self.frames['000002.SZ'] = self.frames['000002.SZ'].drop(self.dates[1:3])
+    
+    def _build(self, tmp_path):
+        return PanelStore.build(tmp_path / 'panel', self.frames.items(), self.dates, list(self.frames))
+    
+    def test_build_and_open(self, tmp_path):
+        """测试构建后重新打开"""
+        self._build(tmp_path)
+        panel = PanelStore(tmp_path / 'panel')
+        
+        assert panel.shape == (5, 3)
+        assert list(panel.symbols) == ['000001.SZ', '000002.SZ', '600519.SH']
+        assert panel.fields == list(PanelStore.FIELDS)
+    
+    def test_values_and_missing(self, tmp_path):
+        """测试取值正确，缺失日期为NaN"""
+        panel = self._build(tmp_path)
+        close = panel.to_frame('close')
+        
+        np.testing.assert_array_equal(close['600519.SH'].values, self.frames['600519.SH']['close'].values)
+        assert list(close.index) == list(self.dates)
+        assert close['000002.SZ'].isna().sum() == 2
+    
+    def test_date_slice_is_zero_copy(self, tmp_path):
+        """测试按日期切片不复制数据"""
+        panel = self._build(tmp_path)
+        values = panel.get('close', '2024-01-03', '2024-01-05')
+        
+        assert values.shape == (3, 3)
+        assert np.shares_memory(values, panel.array('close'))
+        assert not values.flags.writeable
+    
+    def test_symbol_selection(self, tmp_path):
+        """测试按股票取列"""
+        panel = self._build(tmp_path)
+        values = panel.get('vol', symbols=['600519.SH', '000001.SZ'])
+        
+        np.testing.assert_array_equal(values[:, 0], self.frames['600519.SH']['vol'].values)
+        with pytest.raises(KeyError):
+            panel.get('vol', symbols=['999999.SZ'])
+    
+    def test_build_from_data_manager(self, tmp_path):
+        """测试由DataManager缓存构建面板"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        for ts_code, daily_data in self.frames.items():
+            data_manager.save_data(daily_data.assign(ts_code=ts_code), f"daily_{ts_code}")
+        
+        assert data_manager.list_cached_symbols() == ['000001.SZ', '000002.SZ', '600519.SH']
+        data_manager.build_panel()
+        panel = data_manager.open_panel()
+        
+        assert panel.shape == (5, 3)
+        assert panel.get('amount')[0, 0] == pytest.approx(20000)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,117 @@
+"""
+分区数据集测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.partitioned_store import PartitionedStore
+from src.data.data_manager import DataManager
+from tests.helpers import ReplayPro, make_replay_bars
+
+SYMBOLS = ['000001.SZ', '000002.SZ', '600519.SH', '600036.SH']
+DATES = ['20221229', '20221230', '20230103', '20230104', '20240102']
+
+class TestPartitionedStore:
+    """分区数据集测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.bars = make_replay_bars(SYMBOLS, DATES)
+    
+    def test_layout_and_index(self, tmp_path):
+        """测试按年份和交易所分区并记录索引"""
+        store = PartitionedStore(tmp_path / 'dataset')
+        assert store.write(self.bars) == 6
+        
+        assert (tmp_path / 'dataset' / 'year=2023' / 'exchange=SH' / 'part-0.parquet').exists()
+        info = PartitionedStore(tmp_path / 'dataset').partitions['year=2023/exchange=SZ']
+        assert info['min_date'] == '20230103'
+        assert info['max_date'] == '20230104'
+        assert info['rows'] == 4
+        assert info['symbols'] == ['000001.SZ', '000002.SZ']
+    
+    def test_plan_prunes_partitions(self, tmp_path):
+        """测试只选出与条件相交的分区"""
+        store = PartitionedStore(tmp_path / 'dataset')
+        store.write(self.bars)
+        
+        assert store.plan('20230101', '20231231') == ['year=2023/exchange=SH', 'year=2023/exchange=SZ']
+        assert store.plan('20230101', '20231231', ['600519.SH']) == ['year=2023/exchange=SH']
+        assert store.plan('20221230', '20230103', ['000002.SZ']) == [
+            'year=2022/exchange=SZ', 'year=2023/exchange=SZ'
+        ]
+        assert store.plan('20250101') == []
+    
+    def test_query_filters_rows(self, tmp_path):
+        """测试查询结果只包含满足条件的行"""
+        store = PartitionedStore(tmp_path / 'dataset')
+        store.write(self.bars)
+        
+        result = store.query('20221230', '20230103', ['000001.SZ', '600036.SH'], columns=['close'])
+        assert list(result.columns) == ['close']
+        assert result.index.names == ['trade_date', 'ts_code']
+        assert len(result) == 4
+        
+        expected = self.bars.set_index(['trade_date', 'ts_code'])['close']
+        assert result.loc[(pd.Timestamp('2023-01-03'), '600036.SH'), 'close'] == expected.loc[('20230103', '600036.SH')]
+    
+    def test_write_merges_existing(self, tmp_path):
+        """测试重复写入按新数据覆盖，不产生重复行"""
+        store = PartitionedStore(tmp_path / 'dataset')
+        store.write(self.bars)
+        
+        update = self.bars[self.bars['trade_date'] == '20240102'].assign(close=99.0)
+        store.write(update)
+        
+        result = store.query('20240101', '20241231')
+        assert len(result) == len(SYMBOLS)
+        assert (result['close'] == 99.0).all()
+        assert store.partitions['year=2024/exchange=SH']['rows'] == 2
+
+class TestDataManagerDataset:
+    """DataManager分区查询测试类"""
+    
+    def _make_manager(self, tmp_path):
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path),
+                                    'cache_enabled': False})
+        data_manager.pro = ReplayPro(make_replay_bars(SYMBOLS, DATES))
+        return data_manager
+    
+    def test_build_and_query_by_industry(self, tmp_path):
+        """测试由本地缓存构建数据集并按行业查询"""
+        data_manager = self._make_manager(tmp_path)
+        for code, daily in data_manager.get_daily_data_by_dates(DATES[0], DATES[-1]).items():
+            data_manager.save_data(daily, f"daily_{code}")
+        data_manager.save_data(pd.DataFrame({
+            'ts_code': SYMBOLS, 'industry': ['银行', '全国地产', '白酒', '银行']
+        }), 'stock_list')
+        
+        assert data_manager.build_dataset(batch_size=3) == len(SYMBOLS) * len(DATES)
+        
+        banks = data_manager.query_daily('20230101', '20231231', industry='银行')
+        assert sorted(banks.index.get_level_values('ts_code').unique()) == ['000001.SZ', '600036.SH']
+        assert len(banks) == 4
+        
+        subset = data_manager.query_daily(industry='银行', stock_codes=['600036.SH'], columns=['close'])
+        assert len(subset) == len(DATES)
+    
+    def test_update_cache_writes_dataset(self, tmp_path):
+        """测试开启partitioned_dataset后缓存更新同时写入数据集"""
+        dates = list(pd.bdate_range(end=pd.Timestamp.now() - pd.Timedelta(days=1), periods=3).strftime('%Y%m%d'))
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path),
+                                    'partitioned_dataset': True})
+        data_manager.pro = ReplayPro(make_replay_bars(SYMBOLS, dates))
+        data_manager.update_cache()
+        
+        result = data_manager.query_daily(dates[0], dates[-1])
+        assert len(result) == len(SYMBOLS) * len(dates)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,182 @@
+"""
+数据预加载测试
+"""
+
+import threading
+import pytest
+import pandas as pd
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.data_manager import DataManager
+from src.data.fundamentals import PointInTimeFundamentals
+from src.data.preloader import Preloader
+from tests.helpers import ReplayPro, make_replay_bars
+
+SYMBOLS = ['000001.SZ', '000002.SZ', '600519.SH']
+
+class BlockingPro(ReplayPro):
+    """日线请求阻塞到放行为止的本地接口替身"""
+
+    def __init__(self, bars: pd.DataFrame):
+        super().__init__(bars)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def daily(self, **kwargs):
+        self.started.set()
+        self.release.wait(5)
+        return super().daily(**kwargs)
+
+class IndicatorPro(ReplayPro):
+    """按报告期返回财务指标的本地接口替身，记录请求的报告期"""
+
+    def __init__(self, bars: pd.DataFrame):
+        super().__init__(bars)
+        self.periods = []
+
+    def fina_indicator_vip(self, period=None, fields=None):
+        self.periods.append(period)
+        ann_date = (pd.Timestamp(period) + pd.Timedelta(days=30)).strftime('%Y%m%d')
+        return pd.DataFrame({'ts_code': SYMBOLS, 'ann_date': ann_date, 'end_date': period,
+                             'eps': 1.0, 'bps': 5.0, 'roe': 10.0})
+
+class TestPreloader:
+    """预加载器测试类"""
+
+    def setup_method(self):
+        """每个测试方法前运行"""
+        dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=10)
+        self.dates = list(dates.strftime('%Y%m%d'))
+        self.bars = make_replay_bars(SYMBOLS, self.dates)
+        self.bars['pre_close'] = self.bars['close'] - 0.1
+
+    def make_data_manager(self, tmp_path, pro: ReplayPro) -> DataManager:
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        data_manager.pro = pro
+        return data_manager
+
+    def test_from_config(self, tmp_path):
+        """测试读取 performance.preload 配置"""
+        config = {'performance': {'preload': {'enabled': True, 'stocks': SYMBOLS, 'factors': ['roe']}}}
+        preloader = Preloader.from_config(self.make_data_manager(tmp_path, ReplayPro(self.bars)), config)
+
+        assert Preloader.enabled(config)
+        assert not Preloader.enabled({'performance': {'preload': {'enabled': False}}})
+        assert not Preloader.enabled({})
+        assert preloader.stocks == SYMBOLS
+        assert preloader.status()['total'] == 1 + len(SYMBOLS) + 1
+        assert preloader.status()['state'] == 'pending'
+
+    def test_preload_fills_cache(self, tmp_path):
+        """测试预加载后相同请求直接命中缓存"""
+        pro = ReplayPro(self.bars)
+        data_manager = self.make_data_manager(tmp_path, pro)
+        preloader = Preloader(data_manager, SYMBOLS).start()
+
+        assert preloader.wait(10)
+        status = preloader.status()
+        assert status['state'] == 'ready'
+        assert status['completed'] == status['total'] == 1 + len(SYMBOLS)
+        assert status['progress'] == 1.0
+        assert status['failed'] == []
+
+        calls = len(pro.calls)
+        start_date = data_manager.trading_days_back(self.dates[-1], 252)
+        end_date = pd.Timestamp.today().strftime('%Y%m%d')
+        for code in SYMBOLS:
+            assert len(data_manager.get_daily_data(code, start_date, end_date)) == len(self.dates)
+        assert len(pro.calls) == calls
+
+    def test_request_during_warm_up_waits(self, tmp_path):
+        """测试预热期间的相同请求等待进行中的加载，不重复调用接口"""
+        pro = BlockingPro(self.bars)
+        data_manager = self.make_data_manager(tmp_path, pro)
+        preloader = Preloader(data_manager, SYMBOLS[:1]).start()
+        assert pro.started.wait(5)
+        assert not preloader.ready
+        assert preloader.status()['current'] == SYMBOLS[0]
+
+        start_date = data_manager.trading_days_back(self.dates[-1], 252)
+        end_date = pd.Timestamp.today().strftime('%Y%m%d')
+        results = []
+        request = threading.Thread(
+            target=lambda: results.append(data_manager.get_daily_data(SYMBOLS[0], start_date, end_date))
+        )
+        request.start()
+        pro.release.set()
+        request.join(5)
+
+        assert preloader.wait(5)
+        assert len(results[0]) == len(self.dates)
+        assert len(pro.calls) == 1
+
+    def test_failed_steps_reported(self, tmp_path):
+        """测试加载失败的股票记录在进度中，不影响其余步骤"""
+        data_manager = self.make_data_manager(tmp_path, ReplayPro(self.bars))
+        preloader = Preloader(data_manager, ['999999.SZ', SYMBOLS[0]]).start()
+
+        assert preloader.wait(10)
+        status = preloader.status()
+        assert status['completed'] == 3
+        assert status['failed'] == ['999999.SZ']
+
+    def test_factor_values_preloaded(self, tmp_path):
+        """测试预计算时点财务因子并写入缓存"""
+        data_manager = self.make_data_manager(tmp_path, ReplayPro(self.bars))
+        indicators = pd.DataFrame({
+            'ts_code': SYMBOLS,
+            'ann_date': ['20000415'] * 3,
+            'end_date': ['19991231'] * 3,
+            'eps': [1.0, 2.0, 50.0],
+            'bps': [5.0, 10.0, 200.0],
+            'roe': [10.0, 12.0, 30.0]
+        })
+        data_manager.save_data(PointInTimeFundamentals(indicators).table, 'fina_indicator_pit')
+
+        factors = ['pe_ratio', 'pb_ratio', 'roe']
+        preloader = Preloader(data_manager, SYMBOLS, factors).start()
+        assert preloader.wait(10)
+        assert preloader.status()['failed'] == []
+
+        # 请求部分因子时命中预加载的结果
+        computed = []
+        compute = data_manager._compute_factor_values
+        data_manager._compute_factor_values = lambda *args: computed.append(args) or compute(*args)
+        values = data_manager.get_factor_values(list(reversed(SYMBOLS)), ['roe', 'pb_ratio'])
+        assert computed == []
+        assert list(values.columns) == ['roe', 'pb_ratio']
+        assert len(values) == len(SYMBOLS) * len(self.dates)
+
+        close = self.bars.set_index(['trade_date', 'ts_code'])['close']
+        last = (pd.Timestamp(self.dates[-1]), '000002.SZ')
+        assert values.loc[last, 'pb_ratio'] == pytest.approx(close[(self.dates[-1], '000002.SZ')] / 10.0)
+        assert values.loc[last, 'roe'] == 12.0
+
+    def test_update_cache_builds_point_in_time_table(self, tmp_path):
+        """测试预加载财务因子时缓存更新同时更新时点财务指标表，之后只补取最近的报告期"""
+        config = {'tushare_token': 'test_token', 'data_dir': str(tmp_path), 'cache_days': 5,
+                  'performance': {'preload': {'factors': ['roe']}}}
+        data_manager = DataManager(config)
+        data_manager.pro = IndicatorPro(self.bars)
+        assert data_manager.pit_fundamentals
+        assert not DataManager({'tushare_token': 'test_token'}).pit_fundamentals
+
+        data_manager.update_cache()
+        periods = data_manager.pro.periods
+        assert len(periods) >= 4 * data_manager.fundamentals_years
+        pit = data_manager.get_point_in_time_fundamentals()
+        assert set(pit.table['ts_code']) == set(SYMBOLS)
+
+        data_manager.pro.periods = []
+        data_manager.update_cache()
+        latest = pit.table['end_date'].max()
+        assert data_manager.pro.periods == [
+            period for period in periods if pd.Timestamp(period) >= latest - pd.DateOffset(years=1)
+        ]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
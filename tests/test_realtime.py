@@ -0,0 +1,164 @@
+"""
+实时行情测试
+"""
+
+import time
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.realtime import AkShareSpotSource, QuoteRingBuffer, QuoteService, ReplaySpotSource
+
+SYMBOLS = ['000001.SZ', '000002.SZ', '600519.SH']
+
+def make_snapshots(count: int, symbols=SYMBOLS):
+    """生成录制的全市场快照，第i个快照价格为 10 + 股票序号 + i"""
+    return [
+        pd.DataFrame({
+            'ts_code': symbols,
+            'price': [10.0 + j + i for j in range(len(symbols))],
+            'vol': [100.0 * (i + 1)] * len(symbols),
+            'amount': [1000.0 * (j + 1) for j in range(len(symbols))]
+        })
+        for i in range(count)
+    ]
+
+class FakeAk:
+    """返回东方财富格式实时行情的akshare替身"""
+
+    def stock_zh_a_spot_em(self):
+        return pd.DataFrame({
+            '代码': ['000001', '600519', '830799'],
+            '名称': ['平安银行', '贵州茅台', '艾融软件'],
+            '最新价': [10.5, 1700.0, '-'],
+            '涨跌幅': [1.0, -0.5, '-'],
+            '成交量': [1000, 200, '-'],
+            '成交额': [1.05e6, 3.4e7, '-'],
+        })
+
+class TestQuoteRingBuffer:
+    """环形缓冲测试类"""
+
+    def test_latest_cross_section(self):
+        """测试最新截面"""
+        buffer = QuoteRingBuffer(SYMBOLS, capacity=4, fields=['price', 'vol'])
+        assert buffer.latest()[0] is None
+        assert buffer.latest_frame().empty
+
+        for i, snapshot in enumerate(make_snapshots(2)):
+            buffer.write(pd.Timestamp('2024-01-02 09:30') + pd.Timedelta(seconds=3 * i), snapshot)
+
+        timestamp, values = buffer.latest(['price'], symbols=['600519.SH', '000001.SZ'])
+        assert timestamp == pd.Timestamp('2024-01-02 09:30:03')
+        assert values['price'].tolist() == [13.0, 11.0]
+        assert buffer.latest_frame().loc['000002.SZ', 'vol'] == 200.0
+
+    def test_wraps_around(self):
+        """测试写满后覆盖最早的快照，窗口由旧到新"""
+        buffer = QuoteRingBuffer(SYMBOLS, capacity=3, fields=['price'])
+        times = pd.date_range('2024-01-02 09:30', periods=5, freq='3s')
+        for timestamp, snapshot in zip(times, make_snapshots(5)):
+            buffer.write(timestamp, snapshot)
+
+        assert len(buffer) == 3
+        assert buffer.total == 5
+        window_times, values = buffer.window('price', 10, symbols=['000001.SZ'])
+        assert list(window_times) == list(times[2:])
+        assert values[:, 0].tolist() == [12.0, 13.0, 14.0]
+
+        frame = buffer.window_frame('price', 2)
+        assert frame.shape == (2, 3)
+        assert frame['600519.SH'].tolist() == [15.0, 16.0]
+
+    def test_missing_and_unknown_symbols(self):
+        """测试快照缺少的股票为NaN，不在股票轴上的股票忽略"""
+        buffer = QuoteRingBuffer(SYMBOLS, capacity=2, fields=['price'])
+        buffer.write('2024-01-02 09:30', make_snapshots(1)[0])
+        written = buffer.write('2024-01-02 09:30:03', make_snapshots(1, ['000001.SZ', '300750.SZ'])[0])
+
+        assert written == 1
+        _, values = buffer.latest(['price'])
+        assert values['price'][0] == 10.0
+        assert np.isnan(values['price'][1:]).all()
+        assert list(buffer.latest_frame().index) == ['000001.SZ']
+        with pytest.raises(KeyError):
+            buffer.window('price', 2, symbols=['300750.SZ'])
+
+    def test_write_reuses_arrays(self):
+        """测试写入不重新分配缓冲数组"""
+        buffer = QuoteRingBuffer(SYMBOLS, capacity=2, fields=['price'])
+        array = buffer._values['price']
+        for snapshot in make_snapshots(5):
+            buffer.write(pd.Timestamp.now(), snapshot)
+        assert buffer._values['price'] is array
+
+    def test_read_latency(self):
+        """测试全市场规模下读取最新截面和窗口的耗时"""
+        symbols = [f"{i:06d}.SZ" for i in range(5000)]
+        buffer = QuoteRingBuffer(symbols, capacity=1200)
+        snapshot = pd.DataFrame({'ts_code': symbols, 'price': np.random.rand(5000)})
+        for _ in range(10):
+            buffer.write(pd.Timestamp.now(), snapshot)
+
+        start = time.perf_counter()
+        for _ in range(100):
+            buffer.latest(['price'])
+            buffer.window('price', 60, symbols=symbols[:10])
+        assert (time.perf_counter() - start) / 100 < 1e-3
+
+class TestQuoteService:
+    """行情服务测试类"""
+
+    def test_replay_polling(self):
+        """测试回放录制的快照"""
+        service = QuoteService(ReplaySpotSource(make_snapshots(3)), capacity=10)
+        for i in range(4):
+            service.poll_once(pd.Timestamp('2024-01-02 09:30') + pd.Timedelta(seconds=3 * i))
+
+        assert list(service.buffer.symbols) == SYMBOLS
+        assert service.latest().loc['000001.SZ', 'price'] == 12.0
+        assert service.window(['000002.SZ'], 'price', 4)['000002.SZ'].tolist() == [11.0, 12.0, 13.0, 13.0]
+        assert service.stats['polls'] == 4
+
+    def test_record_and_replay_dir(self, tmp_path):
+        """测试录制快照到目录后回放"""
+        ReplaySpotSource.record(ReplaySpotSource(make_snapshots(3)), tmp_path, 3)
+        source = ReplaySpotSource.from_dir(tmp_path)
+        assert len(source.snapshots) == 3
+        pd.testing.assert_frame_equal(source.snapshots[2], make_snapshots(3)[2])
+
+    def test_background_polling(self):
+        """测试后台按间隔轮询，获取失败不中断"""
+        class FlakySource(ReplaySpotSource):
+            def fetch(self):
+                if self.position == 1:
+                    self.position += 1
+                    raise ConnectionError("timeout")
+                return super().fetch()
+
+        service = QuoteService(FlakySource(make_snapshots(5)), symbols=SYMBOLS, capacity=10, interval=0.01)
+        service.start()
+        deadline = time.monotonic() + 5
+        while service.buffer.total < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        service.stop(timeout=5)
+
+        assert not service.running
+        assert service.buffer.total >= 3
+        assert service.stats['errors'] == 1
+
+    def test_akshare_spot_source(self):
+        """测试东方财富快照换算为统一字段"""
+        spot = AkShareSpotSource(FakeAk()).fetch()
+
+        assert spot['ts_code'].tolist() == ['000001.SZ', '600519.SH', '830799.BJ']
+        assert spot.loc[0, 'amount'] == pytest.approx(1050.0)
+        assert np.isnan(spot.loc[2, 'price'])
+
+if __name__ == "__main__":
+    pytest.main([__file__])
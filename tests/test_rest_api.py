@@ -0,0 +1,101 @@
+"""
+REST API测试
+"""
+
+import pytest
+import pandas as pd
+import copy
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# 回测模块不完整时无法导入REST API
+rest_api = pytest.importorskip('src.api.rest_api')
+
+from src.data.realtime import QuoteService, ReplaySpotSource
+from src.data.sql_store import SQLiteStore
+from src.utils.config_manager import ConfigManager
+
+CONFIG_FILE = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
+
+def load_config(tmp_path) -> dict:
+    """读取config.yaml，数据目录和数据库指向临时目录并关闭后台预加载"""
+    config = copy.deepcopy(ConfigManager(CONFIG_FILE).config)
+    config['data_dir'] = str(tmp_path)
+    config['database']['sqlite']['path'] = str(tmp_path / 'quantstock.db')
+    config['performance']['preload']['enabled'] = False
+    return config
+
+class TestRestAPIConfig:
+    """REST API配置测试类"""
+
+    def test_data_manager_uses_cache_config(self, tmp_path):
+        """测试DataManager读取performance.cache配置"""
+        config = load_config(tmp_path)
+        config['performance']['cache'].update({'ttl': 60, 'max_size': '10MB'})
+        cache = rest_api.RestAPI(config).data_manager.cache
+
+        assert cache.ttl == 60
+        assert cache.max_bytes == 10 * 1024 ** 2
+        assert cache.backend is None
+
+    def test_market_store_from_database_config(self, tmp_path):
+        """测试API进程按database配置使用SQLite行情库（WAL模式）"""
+        store = rest_api.RestAPI(load_config(tmp_path)).data_manager.market_store
+
+        assert isinstance(store, SQLiteStore)
+        assert store.path == tmp_path / 'quantstock.db'
+        assert store.connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    def test_redis_tier_from_config(self, tmp_path):
+        """测试开启performance.cache.redis时API进程创建共享的Redis二级缓存"""
+        pytest.importorskip('redis')
+        from src.utils.redis_cache import RedisCache
+
+        config = load_config(tmp_path)
+        config['performance']['cache']['redis']['enabled'] = True
+        cache = rest_api.RestAPI(config).data_manager.cache
+
+        assert isinstance(cache.backend, RedisCache)
+        assert cache.backend.prefix.startswith('quantstock:v1.')
+        assert cache.backend.client.connection_pool.connection_kwargs['host'] == 'redis'
+        assert cache.backend.ttl == config['performance']['cache']['ttl']
+
+class TestQuoteWindow:
+    """实时行情窗口接口测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.symbols = ['000001.SZ', '600519.SH']
+        self.snapshots = [pd.DataFrame({'ts_code': self.symbols, 'price': [10.0 + i, 1700.0 + i],
+                                        'vol': 100.0, 'amount': 1000.0})
+                          for i in range(3)]
+
+    def make_client(self, tmp_path):
+        api = rest_api.RestAPI(load_config(tmp_path))
+        api.quote_service = QuoteService(ReplaySpotSource(self.snapshots))
+        for i in range(3):
+            api.quote_service.poll_once(pd.Timestamp('2024-01-02 09:30') + pd.Timedelta(seconds=3 * i))
+        return api.app.test_client()
+
+    def test_window(self, tmp_path):
+        """测试返回最近n次快照"""
+        response = self.make_client(tmp_path).get('/api/quotes/000001.SZ/window?n=2')
+
+        assert response.status_code == 200
+        assert [row['price'] for row in response.get_json()['data']] == [11.0, 12.0]
+
+    def test_invalid_n(self, tmp_path):
+        """测试n不是正整数时返回400"""
+        client = self.make_client(tmp_path)
+        for n in ['abc', '0', '-5', '1.5']:
+            response = client.get(f'/api/quotes/000001.SZ/window?n={n}')
+            assert response.status_code == 400
+            assert response.get_json()['success'] is False
+
+        assert client.get('/api/quotes/999999.SZ/window').status_code == 404
+
+if __name__ == "__main__":
+    pytest.main([__file__])
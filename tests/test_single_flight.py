@@ -0,0 +1,96 @@
+"""
+并发请求合并测试
+"""
+
+import pytest
+import pandas as pd
+import threading
+import time
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.single_flight import SingleFlight
+from src.data.data_manager import DataManager
+from tests.helpers import ReplayPro, make_replay_bars
+
+class CountingPro(ReplayPro):
+    """记录调用次数并注入延迟的接口替身"""
+    
+    def __init__(self, bars: pd.DataFrame, latency: float = 0.2):
+        super().__init__(bars)
+        self.latency = latency
+    
+    def daily(self, **kwargs):
+        time.sleep(self.latency)
+        return super().daily(**kwargs)
+
+def fire_concurrently(func, n: int = 50):
+    """n个线程同时调用func，返回全部结果"""
+    barrier = threading.Barrier(n)
+    
+    def call():
+        barrier.wait()
+        return func()
+    
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        futures = [executor.submit(call) for _ in range(n)]
+        return [future.result() for future in futures]
+
+class TestSingleFlight:
+    """单飞请求合并测试类"""
+    
+    def test_concurrent_identical_requests(self):
+        """测试50个并发的相同请求只访问一次数据源"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'cache_enabled': False})
+        data_manager.pro = CountingPro(make_replay_bars(['000001.SZ'], ['20240102', '20240103']))
+        
+        results = fire_concurrently(
+            lambda: data_manager.get_daily_data('000001.SZ', '20240101', '20240131')
+        )
+        
+        assert len(data_manager.pro.calls) == 1
+        assert all(len(result) == 2 for result in results)
+        # 每个调用方拿到独立副本
+        assert len({id(result) for result in results}) == 50
+    
+    def test_different_keys_not_merged(self):
+        """测试不同区间的请求分别执行"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'cache_enabled': False})
+        data_manager.pro = CountingPro(make_replay_bars(['000001.SZ'], ['20240102', '20240103']), latency=0.05)
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(
+                lambda end: data_manager.get_daily_data('000001.SZ', '20240101', end),
+                ['20240102', '20240131']
+            ))
+        assert len(data_manager.pro.calls) == 2
+    
+    def test_error_shared_and_not_remembered(self):
+        """测试异常传递给所有等待者，之后的调用重新执行"""
+        flight = SingleFlight()
+        calls = []
+        
+        def failing():
+            calls.append(1)
+            time.sleep(0.1)
+            raise ConnectionError("接口超时")
+        
+        errors = fire_concurrently(lambda: _capture(lambda: flight.do('key', failing)), n=10)
+        assert len(calls) == 1
+        assert all(isinstance(error, ConnectionError) for error in errors)
+        
+        assert flight.do('key', lambda: 'ok') == 'ok'
+        assert not flight.in_flight('key')
+
+def _capture(func):
+    try:
+        return func()
+    except Exception as e:
+        return e
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,182 @@
+"""
+数据集快照测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.partitioned_store import PartitionedStore
+from src.data.snapshot import DatasetSnapshot, ResultCache
+from src.data.data_manager import DataManager
+from src.factor.factor_engine import Factor, FactorEngine
+from tests.helpers import make_replay_bars
+
+SYMBOLS = ['000001.SZ', '000002.SZ', '600519.SH']
+DATES = ['20231228', '20231229', '20240102', '20240103']
+
+class CountingFactor(Factor):
+    """记录计算次数的收盘价因子"""
+
+    def __init__(self, window: int = 1):
+        self.window = window
+        self.calls = 0
+
+    def calculate(self, data: pd.DataFrame) -> pd.Series:
+        self.calls += 1
+        return data['close'] * self.window
+
+    def get_name(self) -> str:
+        return 'counting'
+
+class TestDatasetSnapshot:
+    """数据集快照测试类"""
+
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.bars = make_replay_bars(SYMBOLS, DATES)
+
+    def test_id_is_content_hash(self, tmp_path):
+        """测试相同内容得到相同快照id，内容变化后id变化"""
+        store = PartitionedStore(tmp_path / 'dataset')
+        store.write(self.bars)
+
+        first = DatasetSnapshot.create(store)
+        assert DatasetSnapshot.create(store).snapshot_id == first.snapshot_id
+
+        other = PartitionedStore(tmp_path / 'other')
+        other.write(self.bars)
+        assert DatasetSnapshot.create(other).snapshot_id == first.snapshot_id
+
+        store.write(self.bars.assign(close=self.bars['close'] + 1).head(1))
+        assert DatasetSnapshot.create(store).snapshot_id != first.snapshot_id
+        assert DatasetSnapshot.available(store) == sorted([first.snapshot_id, DatasetSnapshot.create(store).snapshot_id])
+
+    def test_snapshot_is_immutable(self, tmp_path):
+        """测试快照不受数据集之后写入的影响"""
+        store = PartitionedStore(tmp_path / 'dataset')
+        store.write(self.bars)
+        snapshot = DatasetSnapshot.create(store)
+        expected = snapshot.query()
+
+        store.write(self.bars.assign(close=0.0))
+        assert (store.query()['close'] == 0.0).all()
+        pd.testing.assert_frame_equal(DatasetSnapshot.open(store, snapshot.snapshot_id).query(), expected)
+
+        with pytest.raises(TypeError):
+            snapshot.write(self.bars)
+        with pytest.raises(FileNotFoundError):
+            DatasetSnapshot.open(store, 'missing')
+
+    def test_unchanged_partitions_shared(self, tmp_path):
+        """测试内容未变的分区在快照间共享同一副本"""
+        store = PartitionedStore(tmp_path / 'dataset')
+        store.write(self.bars)
+        first = DatasetSnapshot.create(store)
+
+        store.write(self.bars[self.bars['trade_date'] == '20240103'].assign(close=1.0))
+        second = DatasetSnapshot.create(store)
+
+        objects = list((tmp_path / 'dataset' / '_snapshots' / 'objects').glob('*.parquet'))
+        assert len(objects) == len(first.partitions) + 2
+        assert first.partitions['year=2023/exchange=SZ']['sha256'] == second.partitions['year=2023/exchange=SZ']['sha256']
+        assert first.partitions['year=2024/exchange=SZ']['sha256'] != second.partitions['year=2024/exchange=SZ']['sha256']
+
+    def test_cache_key(self, tmp_path):
+        """测试缓存键由快照id、类型和参数决定"""
+        store = PartitionedStore(tmp_path / 'dataset')
+        store.write(self.bars)
+        snapshot = DatasetSnapshot.create(store)
+
+        key = snapshot.cache_key('factors', {'a': 1, 'b': [1, 2]})
+        assert key == snapshot.cache_key('factors', {'b': [1, 2], 'a': 1})
+        assert key != snapshot.cache_key('factors', {'a': 2, 'b': [1, 2]})
+        assert key != snapshot.cache_key('backtest', {'a': 1, 'b': [1, 2]})
+
+    def test_data_manager_pin(self, tmp_path):
+        """测试固定快照后查询只读取快照数据"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'data_dir': str(tmp_path)})
+        data_manager.dataset.write(self.bars)
+        snapshot = data_manager.create_snapshot()
+
+        data_manager.dataset.write(self.bars.assign(close=0.0))
+        assert (data_manager.query_daily()['close'] != 0.0).all()
+
+        data_manager.unpin_snapshot()
+        assert (data_manager.query_daily()['close'] == 0.0).all()
+
+        assert data_manager.pin_snapshot(snapshot.snapshot_id).snapshot_id == snapshot.snapshot_id
+        assert snapshot.snapshot_id in data_manager.list_snapshots()
+
+    def test_factor_results_reused(self, tmp_path):
+        """测试相同快照和参数的因子结果跨引擎复用"""
+        store = PartitionedStore(tmp_path / 'dataset')
+        store.write(self.bars)
+        snapshot = DatasetSnapshot.create(store)
+        config = {'result_cache_dir': str(tmp_path / 'results')}
+
+        first = FactorEngine(config)
+        first.register_factor(CountingFactor())
+        expected = first.calculate_snapshot_factors(snapshot, '20231229', '20240103')
+
+        second = FactorEngine(config)
+        factor = CountingFactor()
+        second.register_factor(factor)
+        result = second.calculate_snapshot_factors(snapshot, '20231229', '20240103')
+        assert factor.calls == 0
+        pd.testing.assert_frame_equal(result, expected)
+
+        # 参数不同时重新计算
+        third = FactorEngine(config)
+        factor = CountingFactor(window=2)
+        third.register_factor(factor)
+        result = third.calculate_snapshot_factors(snapshot, '20231229', '20240103')
+        assert factor.calls == 1
+        np.testing.assert_allclose(result['counting'], expected['counting'] * 2)
+
+    def test_result_cache_formats(self, tmp_path):
+        """测试DataFrame和字典结果的保存读取"""
+        cache = ResultCache(tmp_path)
+        assert cache.get('missing') is None
+
+        cache.set('frame', pd.DataFrame({'x': [1.0, 2.0]}))
+        cache.set('dict', {'sharpe': 1.5, 'trades': [1, 2]})
+        pd.testing.assert_frame_equal(cache.get('frame'), pd.DataFrame({'x': [1.0, 2.0]}))
+        assert cache.get('dict') == {'sharpe': 1.5, 'trades': [1, 2]}
+
+    def test_result_cache_keeps_types(self, tmp_path):
+        """测试回测分析结果中的numpy标量、Series和Timestamp读取后类型不变"""
+        dates = pd.bdate_range('2024-01-02', periods=20)
+        values = pd.Series(1e6 * np.cumprod(1 + np.linspace(-0.01, 0.02, 20)), index=dates, name='portfolio_value')
+        returns = values.pct_change().dropna()
+        drawdown = values / values.cummax() - 1
+        results = {
+            'total_return': values.iloc[-1] / values.iloc[0] - 1,
+            'sharpe_ratio': returns.mean() / returns.std() * np.sqrt(252),
+            'max_drawdown': drawdown.min(),
+            'max_drawdown_date': drawdown.idxmin(),
+            'trade_count': np.int64(7),
+            'portfolio_values': values,
+            'returns': returns,
+            'trades': pd.DataFrame({'date': dates[:2], 'ts_code': ['000001.SZ', '600519.SH']})
+        }
+
+        cache = ResultCache(tmp_path)
+        cache.set('backtest', results)
+        cached = cache.get('backtest')
+
+        assert set(cached) == set(results)
+        for name, value in results.items():
+            assert type(cached[name]) is type(value), name
+        assert cached['total_return'] == results['total_return']
+        assert cached['max_drawdown_date'] == results['max_drawdown_date']
+        pd.testing.assert_series_equal(cached['portfolio_values'], values)
+        pd.testing.assert_frame_equal(cached['trades'], results['trades'])
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,277 @@
+"""
+数据源路由测试
+
+Tushare和AkShare都使用本地替身，测试可离线运行。
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.source_router import (AkShareSource, AllSourcesFailed, DataSource, SourceRouter,
+                                    TushareSource, DAILY_COLUMNS, INDEX_DAILY_COLUMNS)
+from src.data.data_manager import DataManager
+from tests.helpers import ReplayPro, make_replay_bars
+
+DATES = ['20240102', '20240103', '20240104']
+
+class FakeAkShare:
+    """AkShare本地替身，返回与东方财富接口相同的中文字段"""
+    
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars
+        self.calls = 0
+    
+    def stock_zh_a_hist(self, symbol, period='daily', start_date='', end_date='', adjust=''):
+        self.calls += 1
+        bars = self.bars[self.bars['ts_code'].str[:6] == symbol].sort_values('trade_date')
+        bars = bars[(bars['trade_date'] >= start_date) & (bars['trade_date'] <= end_date)]
+        return pd.DataFrame({
+            '日期': pd.to_datetime(bars['trade_date']).dt.strftime('%Y-%m-%d'),
+            '股票代码': symbol,
+            '开盘': bars['open'], '收盘': bars['close'], '最高': bars['high'], '最低': bars['low'],
+            '成交量': bars['vol'], '成交额': bars['amount'] * 1000,
+            '涨跌额': bars['close'] - bars['pre_close'],
+            '涨跌幅': (bars['close'] / bars['pre_close'] - 1) * 100
+        })
+    
+    def stock_info_a_code_name(self):
+        codes = sorted(self.bars['ts_code'].str[:6].unique())
+        return pd.DataFrame({'code': codes, 'name': [f"股票{c}" for c in codes]})
+    
+    def stock_info_sh_name_code(self, symbol='主板A股'):
+        codes = ['600519'] if symbol == '主板A股' else []
+        return pd.DataFrame({'证券代码': codes, '上市日期': [pd.Timestamp('2001-08-27').date()] * len(codes)})
+    
+    def stock_info_sz_name_code(self, symbol='A股列表'):
+        return pd.DataFrame({'板块': ['主板'], 'A股代码': ['000001'], 'A股简称': ['平安银行'],
+                             'A股上市日期': ['1991-04-03'], '所属行业': ['J 金融业']})
+    
+    def stock_info_bj_name_code(self):
+        return pd.DataFrame(columns=['证券代码', '证券简称', '上市日期', '所属行业'])
+    
+    def tool_trade_date_hist_sina(self):
+        return pd.DataFrame({'trade_date': pd.to_datetime(['20231229'] + DATES).date})
+    
+    def stock_zh_a_daily(self, symbol, adjust=''):
+        # 只在上市日和除权除息日有记录
+        return pd.DataFrame({'date': pd.to_datetime(['1991-04-03', '2024-01-03']), 'hfq_factor': [1.0, 2.0]})
+    
+    def stock_zh_index_daily_em(self, symbol, start_date='', end_date=''):
+        self.calls += 1
+        return pd.DataFrame({
+            'date': pd.to_datetime(DATES).strftime('%Y-%m-%d'),
+            'open': [3000.0, 3010.0, 3020.0], 'close': [3010.0, 3020.0, 3030.0],
+            'high': [3015.0, 3025.0, 3035.0], 'low': [2995.0, 3005.0, 3015.0],
+            'volume': [1e8, 1.1e8, 1.2e8], 'amount': [1e11, 1.1e11, 1.2e11]
+        })
+
+class ScriptedSource(DataSource):
+    """按脚本返回结果、延迟或异常的数据源"""
+    
+    def __init__(self, name, latency=0.0, error=None):
+        self.name = name
+        self.latency = latency
+        self.error = error
+        self.calls = 0
+    
+    def daily(self, stock_code, start_date, end_date):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        return pd.DataFrame({'ts_code': [stock_code], 'source': [self.name]})
+    
+    def stock_basic(self):
+        return pd.DataFrame()
+
+def make_bars():
+    bars = make_replay_bars(['000001.SZ', '600519.SH'], DATES)
+    bars['pre_close'] = bars['close'] - 0.1
+    bars['change'] = 0.1
+    bars['pct_chg'] = bars['change'] / bars['pre_close'] * 100
+    return bars
+
+class TestSourceNormalization:
+    """数据源格式统一测试类"""
+    
+    def test_akshare_matches_tushare_schema(self):
+        """测试AkShare日线换算为Tushare字段和单位"""
+        bars = make_bars()
+        pro = ReplayPro(bars)
+        tushare = TushareSource(lambda api_name, **kwargs: getattr(pro, api_name)(**kwargs))
+        akshare = AkShareSource(FakeAkShare(bars))
+        
+        expected = tushare.daily('600519.SH', DATES[0], DATES[-1]).sort_values('trade_date')
+        actual = akshare.daily('600519.SH', DATES[0], DATES[-1])
+        
+        assert list(actual.columns) == DAILY_COLUMNS
+        for column in ['trade_date', 'ts_code']:
+            assert actual[column].tolist() == expected[column].tolist()
+        for column in ['open', 'close', 'pre_close', 'vol', 'amount']:
+            np.testing.assert_allclose(actual[column].to_numpy(), expected[column].to_numpy())
+    
+    def test_akshare_stock_basic(self):
+        """测试AkShare股票列表补全交易所后缀"""
+        stock_list = AkShareSource(FakeAkShare(make_bars())).stock_basic()
+        assert stock_list['ts_code'].tolist() == ['000001.SZ', '600519.SH']
+        assert stock_list['list_date'].tolist() == ['19910403', '20010827']
+        assert stock_list['industry'].iloc[0] == 'J 金融业'
+    
+    def test_akshare_trade_cal_and_adj_factor(self):
+        """测试AkShare交易日历和按交易日填充的复权因子"""
+        akshare = AkShareSource(FakeAkShare(make_bars()))
+        assert akshare.trade_cal(DATES[0], DATES[-1])['cal_date'].tolist() == DATES
+        
+        factors = akshare.adj_factor('000001.SZ', DATES[0], DATES[-1])
+        assert factors['trade_date'].tolist() == DATES
+        assert factors['adj_factor'].tolist() == [1.0, 2.0, 2.0]
+    
+    def test_akshare_index_daily(self):
+        """测试AkShare指数日线换算为Tushare字段和单位"""
+        index_daily = AkShareSource(FakeAkShare(make_bars())).index_daily('000300.SH', DATES[0], DATES[-1])
+        
+        assert list(index_daily.columns) == INDEX_DAILY_COLUMNS
+        assert index_daily['trade_date'].tolist() == DATES
+        assert index_daily['pre_close'].iloc[1] == 3010.0
+        assert index_daily['amount'].iloc[0] == pytest.approx(1e8)
+    
+    def test_akshare_past_cross_section_not_provided(self):
+        """测试AkShare不提供历史交易日的全市场截面"""
+        with pytest.raises(NotImplementedError):
+            AkShareSource(FakeAkShare(make_bars())).daily_by_date(DATES[0])
+
+class TestSourceRouter:
+    """数据源路由测试类"""
+    
+    def test_failover(self):
+        """测试首选数据源出错时切换到下一个"""
+        primary = ScriptedSource('tushare', error=ConnectionError('网络错误'))
+        backup = ScriptedSource('akshare')
+        router = SourceRouter([primary, backup])
+        
+        result = router.fetch('daily', '000001.SZ', DATES[0], DATES[-1])
+        assert result['source'].iloc[0] == 'akshare'
+        assert router.get_stats()['tushare']['failures'] == 1
+    
+    def test_throttled_source_paused(self):
+        """测试被限流的数据源在冷却期内不再请求"""
+        primary = ScriptedSource('tushare', error=Exception('抱歉，您每分钟最多访问该接口500次'))
+        backup = ScriptedSource('akshare')
+        router = SourceRouter([primary, backup], cooldown=60)
+        
+        router.fetch('daily', '000001.SZ', DATES[0], DATES[-1])
+        router.fetch('daily', '000002.SZ', DATES[0], DATES[-1])
+        
+        assert primary.calls == 1
+        assert backup.calls == 2
+        assert router.get_stats()['tushare']['throttled'] == 1
+    
+    def test_all_sources_failed(self):
+        """测试所有数据源都失败时抛出异常"""
+        router = SourceRouter([ScriptedSource('tushare', error=ValueError('a')),
+                               ScriptedSource('akshare', error=ValueError('b'))])
+        with pytest.raises(AllSourcesFailed):
+            router.fetch('daily', '000001.SZ', DATES[0], DATES[-1])
+    
+    def test_hedged_request_bounds_tail_latency(self):
+        """测试首选数据源超过延迟分位数时对冲请求先返回"""
+        primary = ScriptedSource('tushare', latency=0.01)
+        backup = ScriptedSource('akshare', latency=0.01)
+        router = SourceRouter([primary, backup], hedge=True, hedge_min_samples=5)
+        for i in range(5):
+            router.fetch('daily', f"{i:06d}.SZ", DATES[0], DATES[-1])
+        assert backup.calls == 0
+        
+        # 冷门股票首选数据源变慢
+        primary.latency = 0.5
+        start = time.perf_counter()
+        result = router.fetch('daily', '300999.SZ', DATES[0], DATES[-1])
+        elapsed = time.perf_counter() - start
+        
+        assert result['source'].iloc[0] == 'akshare'
+        assert elapsed < 0.3
+        stats = router.get_stats()['akshare']
+        assert stats['hedges'] == 1 and stats['hedge_wins'] == 1
+    
+    def test_hedge_not_needed_when_primary_fast(self):
+        """测试首选数据源及时返回时不发出对冲请求，快速失败时正常切换"""
+        primary = ScriptedSource('tushare', latency=0.01)
+        backup = ScriptedSource('akshare')
+        router = SourceRouter([primary, backup], hedge=True, hedge_min_samples=3)
+        for i in range(4):
+            router.fetch('daily', f"{i:06d}.SZ", DATES[0], DATES[-1])
+        assert backup.calls == 0
+        
+        primary.latency, primary.error = 0.0, ConnectionError('网络错误')
+        result = router.fetch('daily', '000001.SZ', DATES[0], DATES[-1])
+        assert result['source'].iloc[0] == 'akshare'
+        assert router.get_stats()['akshare']['hedges'] == 0
+
+    def test_unsupported_method_skipped(self):
+        """测试数据源不提供的接口直接跳过，不计为失败"""
+        router = SourceRouter([ScriptedSource('akshare'), ScriptedSource('tushare')])
+        router.sources[1].index_daily = lambda *args: pd.DataFrame({'source': ['tushare']})
+        
+        result = router.fetch('index_daily', '000300.SH', DATES[0], DATES[-1])
+        assert result['source'].iloc[0] == 'tushare'
+        assert router.get_stats()['akshare']['failures'] == 0
+
+class FailingPro(ReplayPro):
+    """每次调用都失败的Tushare替身"""
+    
+    def _fail(self, **kwargs):
+        raise ConnectionError('api.waditu.com 连接超时')
+    
+    daily = trade_cal = adj_factor = index_daily = _fail
+
+class TestDataManagerRouting:
+    """DataManager数据源切换测试类"""
+    
+    def test_daily_falls_back_to_akshare(self):
+        """测试Tushare失败时从AkShare获取并保持相同格式"""
+        bars = make_bars()
+        data_manager = DataManager({
+            'tushare_token': 'test_token',
+            'cache_enabled': False,
+            'data_sources': {'tushare': {'retry_count': 0}, 'akshare': {'enabled': True}}
+        })
+        data_manager.pro = FailingPro(bars)
+        data_manager.router.sources[1]._ak = FakeAkShare(bars)
+        
+        daily = data_manager.get_daily_data('000001.SZ', DATES[0], DATES[-1])
+        
+        assert isinstance(daily.index, pd.DatetimeIndex)
+        assert len(daily) == len(DATES)
+        assert daily['close'].is_monotonic_increasing
+    
+    def test_calendar_and_index_fall_back_to_akshare(self, tmp_path):
+        """测试交易日历、复权因子和指数日线同样切换到AkShare"""
+        bars = make_bars()
+        data_manager = DataManager({
+            'tushare_token': 'test_token',
+            'data_dir': str(tmp_path),
+            'index_start': DATES[0],
+            'data_sources': {'tushare': {'retry_count': 0}, 'akshare': {'enabled': True}}
+        })
+        data_manager.pro = FailingPro(bars)
+        data_manager.router.sources[1]._ak = FakeAkShare(bars)
+        
+        assert data_manager.get_trade_dates(DATES[0], DATES[-1]) == DATES
+        assert data_manager.get_adj_factor('000001.SZ', DATES[0], DATES[-1])['adj_factor'].tolist() == [1.0, 2.0, 2.0]
+        index_daily = data_manager.get_index_daily('000300.SH', DATES[0], DATES[-1])
+        assert len(index_daily) == len(DATES)
+    
+    def test_akshare_disabled_by_default(self):
+        """测试未启用AkShare时只使用Tushare"""
+        data_manager = DataManager({'tushare_token': 'test_token', 'cache_enabled': False})
+        assert [source.name for source in data_manager.router.sources] == ['tushare']
+
+if __name__ == "__main__":
+    pytest.main([__file__])
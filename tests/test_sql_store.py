@@ -0,0 +1,102 @@
+"""
+行情数据库存储测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sqlite3
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.sql_store import SQLiteStore, create_market_store
+from tests.helpers import ReplayPro, make_replay_bars
+from src.data.data_manager import DataManager
+
+class TestSQLiteStore:
+    """SQLite存储测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.symbols = ['000001.SZ', '000002.SZ', '600519.SH']
+        self.dates = ['20240102', '20240103', '20240104']
+        self.bars = make_replay_bars(self.symbols, self.dates)
+    
+    def test_wal_and_indexes(self, tmp_path):
+        """测试WAL模式和复合索引"""
+        store = SQLiteStore(tmp_path / 'test.db')
+        mode = store.connection.execute('PRAGMA journal_mode').fetchone()[0]
+        indexes = [row[1] for row in store.connection.execute("PRAGMA index_list('daily_bar')")]
+        
+        assert mode == 'wal'
+        assert 'idx_daily_bar_date' in indexes
+    
+    def test_symbol_range_query(self, tmp_path):
+        """测试单只股票区间查询"""
+        store = SQLiteStore(tmp_path / 'test.db')
+        assert store.upsert_daily_bars(self.bars) == len(self.bars)
+        bars = store.get_daily_bars('000002.SZ', '20240103', '20240104')
+        
+        assert list(bars.index) == [pd.Timestamp('20240103'), pd.Timestamp('20240104')]
+        assert bars['close'].iloc[0] == pytest.approx(11.3)
+    
+    def test_cross_section_query(self, tmp_path):
+        """测试单日全市场查询"""
+        store = SQLiteStore(tmp_path / 'test.db')
+        store.upsert_daily_bars(self.bars)
+        section = store.get_cross_section(pd.Timestamp('2024-01-02'))
+        
+        assert list(section.index) == self.symbols
+    
+    def test_upsert_is_idempotent(self, tmp_path):
+        """测试重复写入按主键更新"""
+        store = SQLiteStore(tmp_path / 'test.db')
+        store.upsert_daily_bars(self.bars)
+        updated = self.bars.copy()
+        updated['close'] = 99.0
+        store.upsert_daily_bars(updated)
+        
+        count = store.connection.execute('SELECT COUNT(*) FROM daily_bar').fetchone()[0]
+        assert count == len(self.bars)
+        assert (store.get_cross_section('20240103')['close'] == 99.0).all()
+    
+    def test_stock_basic_and_fina_indicator(self, tmp_path):
+        """测试股票列表和财务指标表"""
+        store = SQLiteStore(tmp_path / 'test.db')
+        store.upsert_stock_basic(pd.DataFrame({'ts_code': self.symbols, 'name': ['平安银行', '万科A', '贵州茅台']}))
+        store.upsert_fina_indicator(pd.DataFrame({
+            'ts_code': ['000001.SZ', '000001.SZ'],
+            'ann_date': ['20240315', '20240420'],
+            'end_date': ['20231231', '20240331'],
+            'roe': [10.5, 2.8]
+        }))
+        
+        assert len(store.get_stock_basic()) == 3
+        fina = store.get_fina_indicator('000001.SZ', end_date='20240331')
+        assert fina['roe'].tolist() == [10.5]
+    
+    def test_unsupported_database(self):
+        """测试未实现的数据库类型"""
+        with pytest.raises(ValueError):
+            create_market_store({'type': 'mysql'})
+    
+    def test_update_cache_writes_database(self, tmp_path):
+        """测试缓存更新同步写入行情数据库"""
+        dates = list(pd.bdate_range(end=pd.Timestamp.now() - pd.Timedelta(days=1), periods=2).strftime('%Y%m%d'))
+        data_manager = DataManager({
+            'tushare_token': 'test_token',
+            'data_dir': str(tmp_path),
+            'database': {'type': 'sqlite', 'sqlite': {'path': str(tmp_path / 'quantstock.db')}}
+        })
+        data_manager.pro = ReplayPro(make_replay_bars(self.symbols, dates))
+        data_manager.update_cache()
+        
+        assert len(data_manager.load_cross_section(dates[-1])) == 3
+        assert len(data_manager.load_daily_bars('600519.SH')) == 2
+        assert len(data_manager.market_store.get_stock_basic()) == 3
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,130 @@
+"""
+交易日历测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.trading_calendar import TradingCalendar
+from src.data.data_manager import DataManager
+from tests.helpers import ReplayPro, make_replay_bars
+
+# 2024年春节前后的交易日（2月9日至2月16日休市）
+TRADE_DATES = ['20240205', '20240206', '20240207', '20240208',
+               '20240219', '20240220', '20240221']
+
+class TestTradingCalendar:
+    """交易日历测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.calendar = TradingCalendar(reversed(TRADE_DATES))
+    
+    def test_ordinal_lookup(self):
+        """测试日期到序号的查找"""
+        assert self.calendar.ordinal('20240205') == 0
+        assert self.calendar.ordinal(pd.Timestamp('2024-02-19')) == 4
+        assert self.calendar.ordinal(np.datetime64('2024-02-21')) == 6
+        assert '20240212' not in self.calendar
+        with pytest.raises(KeyError):
+            self.calendar.ordinal('20240212')
+        
+        ordinals = self.calendar.ordinals(['20240208', '20240210', '20240220'])
+        assert ordinals.tolist() == [3, -1, 5]
+    
+    def test_shift_skips_holidays(self):
+        """测试按交易日移动跨越节假日"""
+        assert self.calendar.shift('20240219', -1) == pd.Timestamp('2024-02-08')
+        assert self.calendar.shift('20240208', 2) == pd.Timestamp('2024-02-20')
+        # 非交易日归到之前最近的交易日
+        assert self.calendar.shift('20240212', 0) == pd.Timestamp('2024-02-08')
+        # 超出范围截断
+        assert self.calendar.shift('20240206', -10) == pd.Timestamp('2024-02-05')
+        assert self.calendar.window_start('20240221', 3) == pd.Timestamp('2024-02-19')
+    
+    def test_range_and_neighbours(self):
+        """测试区间和相邻交易日"""
+        trade_dates = self.calendar.range('20240207', '20240218')
+        assert list(trade_dates.strftime('%Y%m%d')) == ['20240207', '20240208']
+        assert self.calendar.count('20240210', '20240218') == 0
+        assert self.calendar.previous_trading_day('20240214') == pd.Timestamp('2024-02-08')
+        assert self.calendar.next_trading_day('20240214') == pd.Timestamp('2024-02-19')
+        assert self.calendar.next_trading_day('20240301') is None
+    
+    def test_align_marks_suspension(self):
+        """测试单只股票对齐并标记停牌日"""
+        series = pd.Series([1.0, 2.0, 3.0], index=pd.to_datetime(['20240205', '20240208', '20240220']))
+        aligned, mask = self.calendar.align(series)
+        
+        assert len(aligned) == 6
+        assert mask.tolist() == [True, False, False, True, False, True]
+        assert aligned[~mask].isna().all()
+        # 对齐后按交易日计算收益，停牌日不计入周期
+        assert aligned.pct_change(3, fill_method=None).loc['2024-02-08'] == pytest.approx(1.0)
+    
+    def test_align_panel(self):
+        """测试多只股票对齐为矩阵"""
+        frames = {
+            '000002.SZ': pd.DataFrame({'close': [20.0, 21.0]},
+                                      index=pd.to_datetime(['20240206', '20240221'])),
+            '000001.SZ': pd.DataFrame({'close': [10.0, 11.0, 12.0]},
+                                      index=pd.to_datetime(['20240205', '20240219', '20240220'])),
+        }
+        panel = self.calendar.align_panel(frames, 'close', '20240205', '20240221')
+        
+        assert panel.symbols == ['000001.SZ', '000002.SZ']
+        assert panel.values.shape == (7, 2)
+        assert panel.mask.sum(axis=0).tolist() == [3, 2]
+        assert panel.values[4, 0] == 11.0
+        assert np.isnan(panel.values[4, 1])
+        assert panel.to_frame().loc['2024-02-21', '000002.SZ'] == 21.0
+
+class TestDataManagerCalendar:
+    """DataManager交易日历测试类"""
+    
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.data_manager = DataManager({'tushare_token': 'test_token', 'cache_enabled': False})
+        self.data_manager.pro = CountingPro(make_replay_bars(['000001.SZ'], TRADE_DATES))
+    
+    def test_calendar_fetched_once(self):
+        """测试交易日历只获取一次并复用"""
+        first = self.data_manager.get_trading_calendar('20240201', '20240229')
+        second = self.data_manager.get_trading_calendar('20240205', '20240220')
+        
+        assert first is second
+        assert self.data_manager.pro.calendar_calls == 1
+        assert len(first) == len(TRADE_DATES)
+    
+    def test_trading_days_back(self):
+        """测试按交易日回溯"""
+        assert self.data_manager.trading_days_back('20240220', 2) == '20240208'
+        assert self.data_manager.trading_days_back('20240218', 1) == '20240207'
+    
+    def test_by_date_fetch_uses_calendar(self):
+        """测试按交易日批量获取使用缓存的日历"""
+        self.data_manager.get_daily_data_by_dates('20240205', '20240208')
+        self.data_manager.get_daily_data_by_dates('20240219', '20240221')
+        
+        assert self.data_manager.pro.calendar_calls == 1
+        assert [call['trade_date'] for call in self.data_manager.pro.calls] == TRADE_DATES
+
+class CountingPro(ReplayPro):
+    """记录交易日历调用次数的本地接口替身"""
+    
+    def __init__(self, bars: pd.DataFrame):
+        super().__init__(bars)
+        self.calendar_calls = 0
+    
+    def trade_cal(self, **kwargs):
+        self.calendar_calls += 1
+        return super().trade_cal(**kwargs)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
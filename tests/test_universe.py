@@ -0,0 +1,232 @@
+"""
+股票池位图索引测试
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data.trading_calendar import TradingCalendar
+from src.data.universe import CRITERIA, UniverseIndex
+from src.data.data_manager import DataManager
+from tests.helpers import ReplayPro
+
+DATES = ['20240102', '20240103', '20240104', '20240105']
+
+class BasicPro(ReplayPro):
+    """提供股票列表和每日指标的本地接口替身"""
+
+    def __init__(self, bars: pd.DataFrame, stock_list: pd.DataFrame, basic: pd.DataFrame,
+                 name_history: pd.DataFrame = None):
+        super().__init__(bars)
+        self.stock_list = stock_list
+        self.basic = basic
+        self.name_history = name_history if name_history is not None else pd.DataFrame()
+
+    def stock_basic(self, **kwargs):
+        return self.stock_list
+
+    def daily_basic(self, trade_date=None, fields=None):
+        return self.basic[self.basic['trade_date'] == trade_date].reset_index(drop=True)
+
+    def namechange(self, fields=None):
+        return self.name_history
+
+class TestUniverseIndex:
+    """股票池位图索引测试类"""
+
+    def setup_method(self):
+        """每个测试方法前运行"""
+        self.calendar = TradingCalendar(DATES, start='20231225')
+        self.stock_list = pd.DataFrame({
+            'ts_code': ['000001.SZ', '000002.SZ', '600000.SH', '688001.SH'],
+            'name': ['平安银行', '万科A', '*ST浦发', '新股'],
+            'list_date': ['19910403', '19910129', '19991110', '20240103']
+        })
+        self.daily = pd.DataFrame({
+            'ts_code': ['000001.SZ', '000002.SZ', '600000.SH', '688001.SH'],
+            'close': [10.0, 1.5, 8.0, 50.0],
+            'vol': [1000.0, 2000.0, 500.0, 100.0],
+            'amount': [50000.0, 3000.0, 800.0, 20000.0]
+        })
+        self.basic = pd.DataFrame({
+            'ts_code': ['000001.SZ', '000002.SZ', '600000.SH', '688001.SH'],
+            'total_mv': [2e7, 3e5, 1e6, 4e5]
+        })
+        # 600000.SH 在20240104戴帽，此前不是ST
+        self.name_history = pd.DataFrame({
+            'ts_code': ['600000.SH', '600000.SH'],
+            'name': ['浦发银行', '*ST浦发'],
+            'start_date': ['19991110', '20240104'],
+            'end_date': ['20240103', None],
+            'change_reason': ['', '*ST']
+        })
+
+    def make_index(self, root=None) -> UniverseIndex:
+        return UniverseIndex(root, min_listing_days=2, min_market_cap=50, price_min=2, turnover_min=1e6)
+
+    def test_flags(self):
+        """测试各条件的计算"""
+        index = self.make_index()
+        index.update('20240104', self.daily, self.basic, self.stock_list, self.calendar)
+
+        assert index.members('20240104', ['listed']) == ['000001.SZ', '000002.SZ', '600000.SH', '688001.SH']
+        assert index.members('20240104', ['not_st']) == ['000001.SZ', '000002.SZ', '688001.SH']
+        assert index.members('20240104', ['market_cap']) == ['000001.SZ', '600000.SH']
+        assert index.members('20240104', ['price']) == ['000001.SZ', '600000.SH', '688001.SH']
+        assert index.members('20240104', ['turnover']) == ['000001.SZ', '000002.SZ', '688001.SH']
+        assert index.members('20240104') == ['000001.SZ']
+
+    def test_listing_age_in_trading_days(self):
+        """测试上市交易日数不足时不在股票池中"""
+        index = self.make_index()
+        index.update('20240103', self.daily, self.basic, self.stock_list, self.calendar)
+        index.update('20240104', self.daily, self.basic, self.stock_list, self.calendar)
+
+        assert not index.mask('20240103', ['listed'], symbols=['688001.SH'])[0]
+        assert index.mask('20240104', ['listed'], symbols=['688001.SH'])[0]
+
+    def test_st_from_name_history(self):
+        """测试按当日使用的名称判断ST，避免用当前名称回看历史"""
+        index = self.make_index()
+        for trade_date in DATES:
+            index.update(trade_date, self.daily, self.basic, self.stock_list, self.calendar, self.name_history)
+
+        masks = index.masks(criteria=['not_st'], symbols=['600000.SH', '000001.SZ'])
+        assert masks['600000.SH'].tolist() == [True, True, False, False]
+        assert masks['000001.SZ'].all()
+
+    def test_suspension_and_new_symbols(self):
+        """测试停牌股票不满足trading条件，新股票追加到股票轴末尾"""
+        index = self.make_index()
+        index.update('20240102', self.daily.iloc[:3], self.basic, self.stock_list.iloc[:3], self.calendar)
+        assert index.symbols == ['000001.SZ', '000002.SZ', '600000.SH']
+
+        suspended = self.daily[self.daily['ts_code'] != '000002.SZ']
+        index.update('20240103', suspended, self.basic, self.stock_list, self.calendar)
+        assert index.symbols == ['000001.SZ', '000002.SZ', '600000.SH', '688001.SH']
+
+        masks = index.masks(criteria=['trading'])
+        assert masks.shape == (2, 4)
+        assert masks.loc['2024-01-02'].tolist() == [True, True, True, False]
+        assert masks.loc['2024-01-03'].tolist() == [True, False, True, True]
+
+    def test_mask_aligned_to_symbols(self):
+        """测试按指定股票顺序取掩码，未知股票为False"""
+        index = self.make_index()
+        index.update('20240104', self.daily, self.basic, self.stock_list, self.calendar)
+
+        mask = index.mask('20240104', ['price'], symbols=['688001.SH', '999999.SZ', '000002.SZ'])
+        assert mask.tolist() == [True, False, False]
+        with pytest.raises(KeyError):
+            index.mask('20240105')
+        with pytest.raises(ValueError):
+            index.mask('20240104', ['unknown'])
+
+    def test_append_only(self):
+        """测试只能按交易日顺序追加，已有交易日可以覆盖"""
+        index = self.make_index()
+        index.update('20240104', self.daily, self.basic, self.stock_list, self.calendar)
+        index.update('20240104', self.daily.assign(close=1.0), self.basic, self.stock_list, self.calendar)
+        assert index.members('20240104', ['price']) == []
+        assert len(index.dates) == 1
+
+        with pytest.raises(ValueError):
+            index.update('20240103', self.daily, self.basic, self.stock_list, self.calendar)
+
+    def test_persistence(self, tmp_path):
+        """测试保存后重新打开，阈值变化时丢弃旧索引"""
+        index = self.make_index(tmp_path)
+        for trade_date in DATES[:2]:
+            index.update(trade_date, self.daily, self.basic, self.stock_list, self.calendar)
+        index.save()
+
+        reopened = self.make_index(tmp_path)
+        assert reopened.shape == (2, 4)
+        for name in CRITERIA:
+            assert reopened.members('20240103', [name]) == index.members('20240103', [name])
+
+        changed = UniverseIndex(tmp_path, min_listing_days=10)
+        assert changed.shape == (0, 0)
+
+    def test_packed_storage(self):
+        """测试位图按每字节8只股票压缩"""
+        symbols = [f"{i:06d}.SZ" for i in range(20)]
+        daily = pd.DataFrame({'ts_code': symbols, 'close': 10.0, 'vol': 1.0, 'amount': 1e4})
+        stock_list = pd.DataFrame({'ts_code': symbols, 'name': 'A', 'list_date': '20000101'})
+        index = self.make_index()
+        index.update('20240102', daily, pd.DataFrame(), stock_list, self.calendar)
+
+        assert index.packed_bits()['price'].shape == (1, 3)
+        assert index.mask('20240102', ['price']).sum() == 20
+        assert index.mask('20240102', ['market_cap']).sum() == 0
+
+    def test_capacity_growth(self, tmp_path):
+        """测试逐日追加时位图按倍数扩容，保存时截去预留的行"""
+        days = pd.bdate_range('2024-01-01', periods=100).strftime('%Y%m%d')
+        calendar = TradingCalendar(list(days))
+        symbols = [f"{i:06d}.SZ" for i in range(10)]
+        stock_list = pd.DataFrame({'ts_code': symbols, 'name': 'A', 'list_date': '20000101'})
+        index = UniverseIndex(tmp_path, min_listing_days=1)
+
+        buffer, allocations = None, 0
+        for i, trade_date in enumerate(days):
+            daily = pd.DataFrame({'ts_code': symbols[:i % 10 + 1], 'close': 10.0, 'vol': 1.0, 'amount': 1e4})
+            index.update(trade_date, daily, pd.DataFrame(), stock_list, calendar)
+            if index._bits['price'] is not buffer:
+                buffer, allocations = index._bits['price'], allocations + 1
+        index.save()
+
+        assert allocations <= 5
+        assert index.shape == (100, 10)
+        assert list(index.dates.strftime('%Y%m%d')) == list(days)
+        reopened = UniverseIndex(tmp_path, min_listing_days=1)
+        assert reopened.packed_bits()['price'].shape == (100, 2)
+        assert reopened.members(days[-1], ['price']) == symbols
+        assert reopened.members(days[3], ['price']) == symbols[:4]
+
+    def test_data_manager_update(self, tmp_path):
+        """测试数据管理器按交易日增量更新索引"""
+        bars = pd.concat([self.daily.assign(trade_date=d) for d in DATES], ignore_index=True)
+        basic = pd.concat([self.basic.assign(trade_date=d) for d in DATES], ignore_index=True)
+        config = {
+            'tushare_token': 'test_token',
+            'data_dir': str(tmp_path),
+            'calendar_start': '20231225',
+            'stock_selection': {'universe': {'min_listing_days': 2, 'min_market_cap': 50}}
+        }
+        data_manager = DataManager(config)
+        data_manager.pro = BasicPro(bars, self.stock_list, basic, self.name_history)
+
+        assert data_manager.update_universe('20240102', '20240103') == 2
+        assert data_manager.update_universe(end_date='20240105') == 2
+        assert data_manager.update_universe(end_date='20240105') == 0
+
+        universe = DataManager(config).universe
+        assert list(universe.dates.strftime('%Y%m%d')) == DATES
+        assert universe.members('20240105') == ['000001.SZ']
+        assert universe.members('20240103', ['not_st']) == ['000001.SZ', '000002.SZ', '600000.SH', '688001.SH']
+
+    def test_data_manager_update_from_fetched_bars(self, tmp_path):
+        """测试使用已获取的日线构建索引，不再逐日调用日线接口"""
+        bars = pd.concat([self.daily.assign(trade_date=d) for d in DATES], ignore_index=True)
+        basic = pd.concat([self.basic.assign(trade_date=d) for d in DATES], ignore_index=True)
+        data_manager = DataManager({
+            'tushare_token': 'test_token',
+            'data_dir': str(tmp_path),
+            'calendar_start': '20231225',
+            'stock_selection': {'universe': {'min_listing_days': 2, 'min_market_cap': 50}}
+        })
+        data_manager.pro = BasicPro(bars, self.stock_list, basic)
+
+        assert data_manager.update_universe(DATES[0], DATES[-1], bars) == len(DATES)
+        assert data_manager.pro.calls == []
+        assert data_manager.universe.members(DATES[-1]) == ['000001.SZ']
+
+if __name__ == "__main__":
+    pytest.main([__file__])